@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+
+"""Measures what a request for published documentation costs, with and without the dispatcher in front of the app.
+
+Requests are sent to the ASGI application in-process, so that what is measured is vdoc and nothing of a server or
+a network. Each file is asked for once before measuring, so that both paths answer from the hot file cache and
+differ only in how the request gets to the docs mount.
+
+    python benchmark_docs_mount.py --requests 20000
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from collections.abc import Awaitable, Callable
+from http import HTTPStatus
+from pathlib import Path
+
+import anyio
+from starlette.types import ASGIApp, Message, Scope
+
+_FILES = {
+    "index.html": b"<html><body>" + b"<p>Lorem ipsum dolor sit amet.</p>" * 100 + b"</body></html>",
+    "_static/theme.css": b"body { color: black }\n" * 200,
+    "_static/logo.png": bytes(range(256)) * 16,
+}
+
+
+def _http_scope(path: str) -> Scope:
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0", "spec_version": "2.4"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"localhost"), (b"accept-encoding", b"br, gzip")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("localhost", 8080),
+        "state": {},
+    }
+
+
+async def _get(app: ASGIApp, path: str) -> int:
+    status = 0
+
+    async def receive() -> Message:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: Message) -> None:
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(_http_scope(path=path), receive, send)
+    return status
+
+
+async def _with_lifespan(app: ASGIApp, run: Callable[[], Awaitable[None]]) -> None:
+    """Starts the application the way a server would, runs something against it and stops it again."""
+    started = anyio.Event()
+    stopping = anyio.Event()
+    messages = iter([{"type": "lifespan.startup"}])
+
+    async def receive() -> Message:
+        if (message := next(messages, None)) is not None:
+            return message
+        await stopping.wait()
+        return {"type": "lifespan.shutdown"}
+
+    async def send(message: Message) -> None:
+        if message["type"] == "lifespan.startup.failed":
+            raise RuntimeError(message.get("message"))
+        if message["type"] == "lifespan.startup.complete":
+            started.set()
+
+    async def serve() -> None:
+        await app({"type": "lifespan", "asgi": {"version": "3.0"}, "state": {}}, receive, send)
+
+    async with anyio.create_task_group() as task_group:
+        task_group.start_soon(serve)
+        await started.wait()
+        await run()
+        stopping.set()
+
+
+async def _measure(app: ASGIApp, requests: int) -> float:
+    paths = [f"/static/projects/benchmark/1.0.0/{name}" for name in _FILES]
+    for path in paths:
+        assert await _get(app=app, path=path) == HTTPStatus.OK, path  # noqa: S101
+    start = time.perf_counter()
+    for index in range(requests):
+        await _get(app=app, path=paths[index % len(paths)])
+    return (time.perf_counter() - start) / requests
+
+
+def main() -> None:
+    """Publishes a small version into a temporary docs directory, and measures both paths to it."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=10000, help="How many requests to measure each path with.")
+    arguments = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as docs_dir:
+        for name, content in _FILES.items():
+            path = Path(docs_dir, "benchmark", "1.0.0", name)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(content)
+        os.environ["VDOC_DOCS_DIR"] = docs_dir
+
+        # Imported once the settings point at the temporary docs directory
+        from vdoc.api import create_app  # noqa: PLC0415
+
+        dispatcher = create_app()
+        results: dict[str, float] = {}
+
+        async def run() -> None:
+            results["through the app"] = await _measure(app=dispatcher.app, requests=arguments.requests)
+            results["dispatched"] = await _measure(app=dispatcher, requests=arguments.requests)
+
+        anyio.run(_with_lifespan, dispatcher, run)
+
+    for name, seconds in results.items():
+        print(f"{name:>16}: {seconds * 1e6:8.1f} µs per request")  # noqa: T201
+    saved = results["through the app"] - results["dispatched"]
+    print(f"{'saved':>16}: {saved * 1e6:8.1f} µs per request ({saved / results['through the app']:.0%})")  # noqa: T201
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,12 @@
+import { describe, expect, test } from 'vitest'
+import { isVersionAlias } from '../../helpers/Versions'
+
+describe('isVersionAlias', () => {
+  test.each(['latest', 'stable', '2.x', '2.1.x'])('%s is an alias', (version) => {
+    expect(isVersionAlias(version)).toBe(true)
+  })
+
+  test.each(['2.0.0', '2', '2.1.0.x', 'x', '2.x.1', 'stable-1'])('%s is not an alias', (version) => {
+    expect(isVersionAlias(version)).toBe(false)
+  })
+})
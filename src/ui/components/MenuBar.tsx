@@ -2,7 +2,7 @@ import { AppBar, Box, type SelectChangeEvent, Slide, Toolbar, Typography, useMed
 import { getRouteApi, useNavigate, useParams } from '@tanstack/react-router'
 import { useEffect, useMemo, useRef, useState } from 'react'
 import { useContentInset } from '../contexts/ContentInsetContext'
-import { fetchAppVersion, fetchPluginConfig, fetchProjectVersion, fetchProjectVersions } from '../helpers/APIFunctions'
+import { fetchAppVersion, fetchPluginConfig, fetchProjectVersionsAndLatest } from '../helpers/APIFunctions'
 import type OramaPluginT from '../interfacesAndTypes/plugins/OramaPluginT'
 import testIDs from '../interfacesAndTypes/testIDs'
 import ColorModeToggle from './ColorModeToggle'
@@ -49,7 +49,7 @@ function MiddleGroup() {
   const [oramaPluginConfig, setOramaPluginConfig] = useState<OramaPluginT | null>(null)
 
   useEffect(() => {
-    fetchPluginConfig<OramaPluginT>('orama').then((config) => setOramaPluginConfig(config))
+    fetchPluginConfig('orama').then((config) => setOramaPluginConfig(config))
   }, [])
 
   if (!oramaPluginConfig?.active) {
@@ -71,11 +71,8 @@ function RightGroup() {
   }, [])
 
   useEffect(() => {
-    const fetchData = async (name: string): Promise<[string[], string]> => {
-      return await Promise.all([fetchProjectVersions(name), fetchProjectVersion(name, 'latest')])
-    }
     if (params.projectName) {
-      fetchData(params.projectName).then(([versions, latestVersion]) => {
+      fetchProjectVersionsAndLatest(params.projectName).then(([versions, latestVersion]) => {
         setProjectVersions(versions)
         setLatestVersion(latestVersion)
       })
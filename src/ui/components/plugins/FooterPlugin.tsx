@@ -11,7 +11,7 @@ export const FooterPlugin = () => {
   const theme = useTheme()
 
   useEffect(() => {
-    fetchPluginConfig<FooterPluginT>('footer').then((config) => setFooterPluginConfig(config))
+    fetchPluginConfig('footer').then((config) => setFooterPluginConfig(config))
   }, [])
 
   if (footerPluginConfig == null || !footerPluginConfig.active) {
@@ -1,5 +1,5 @@
 import axios from 'axios'
-import type { Project, ProjectCategory } from '../interfacesAndTypes/Project'
+import type { Catalog } from '../interfacesAndTypes/Catalog'
 
 export const fetchProjectVersion = async (projectName: string, version: string): Promise<string> => {
   return (await axios.get(`/api/projects/${projectName}/versions/${version}`)).data
@@ -9,18 +9,90 @@ export const fetchProjectVersions = async (projectName: string): Promise<string[
   return (await axios.get(`/api/projects/${projectName}/versions/`)).data
 }
 
-export const fetchProjects = async (): Promise<Project[]> => {
-  return (await axios.get(`/api/projects/`)).data
-}
-
 export const fetchAppVersion = async (): Promise<string> => {
   return (await axios.get('/api/version/')).data
 }
 
-export const fetchProjectCategories = async (): Promise<ProjectCategory[]> => {
-  return (await axios.get(`/api/project_categories/`)).data
+/**
+ * How long a catalog is handed out again before it is asked for anew.
+ *
+ * Long enough that every loader and component of the first render shares one request, short enough
+ * that a reader browsing for a while sees what was published meanwhile. Asking anew is cheap: the
+ * response carries an ETag, so the browser revalidates it and an unchanged catalog costs a 304.
+ */
+const CATALOG_MAX_AGE_MS = 30_000
+
+let catalogRequest: { promise: Promise<Catalog>; requestedAt: number } | null = null
+
+/**
+ * Fetches the projects with their versions, the categories and the active plugins' configuration.
+ *
+ * One request for what used to be one per list and one per plugin, which on a slow link was a round
+ * trip each before the first paint. Callers asking at the same time share the request.
+ *
+ * @param refresh Asks again even if a recent catalog is at hand, for a caller that knows it is outdated.
+ */
+export const fetchCatalog = (refresh = false): Promise<Catalog> => {
+  if (refresh || catalogRequest === null || Date.now() - catalogRequest.requestedAt > CATALOG_MAX_AGE_MS) {
+    const request = {
+      promise: axios.get<Catalog>('/api/catalog').then((response) => response.data),
+      requestedAt: Date.now(),
+    }
+    // A failed request is not handed out again, so that the next caller retries
+    request.promise.catch(() => {
+      if (catalogRequest === request) {
+        catalogRequest = null
+      }
+    })
+    catalogRequest = request
+  }
+  return catalogRequest.promise
+}
+
+export const fetchPluginConfig = async <Name extends keyof Catalog['plugins']>(
+  name: Name
+): Promise<NonNullable<Catalog['plugins'][Name]> | null> => {
+  return (await fetchCatalog()).plugins[name] ?? null
+}
+
+/**
+ * Fetches the versions of a project and which of them is the newest.
+ *
+ * Taken from the catalog. A project it does not list was published after it was fetched, or does not
+ * exist, and only the versions API can tell which - and answer the latter with the error the pages
+ * show for it.
+ */
+export const fetchProjectVersionsAndLatest = async (projectName: string): Promise<[string[], string]> => {
+  const project = (await fetchCatalog()).projects.find((project) => project.name === projectName)
+  if (project?.latest != null) {
+    return [project.versions, project.latest]
+  }
+  return Promise.all([fetchProjectVersions(projectName), fetchProjectVersion(projectName, 'latest')])
 }
 
-export const fetchPluginConfig = async <Type>(name: string): Promise<Type> => {
-  return (await axios.get(`/api/plugins/${name}/`)).data
+/**
+ * Resolves a version of a project, or a version alias such as `stable` or `2.x`, and tells which version
+ * is the newest.
+ *
+ * Taken from the catalog, which lists every version and alias of every project, so that opening a page
+ * costs no request of its own. What the catalog does not know - a project or version published after
+ * it was fetched, another spelling of a version, or one that does not exist - is asked of the versions
+ * API, which answers the latter with the error the pages show for it.
+ */
+export const fetchResolvedVersionAndLatest = async (
+  projectName: string,
+  version: string
+): Promise<[string, string]> => {
+  const project = (await fetchCatalog()).projects.find((project) => project.name === projectName)
+  if (project?.latest != null) {
+    if (project.versions.includes(version)) {
+      return [version, project.latest]
+    }
+    // A Map, so that no name an object inherits, such as `constructor`, passes for an alias
+    const aliasedVersion = new Map(Object.entries(project.aliases)).get(version)
+    if (aliasedVersion !== undefined) {
+      return [aliasedVersion, project.latest]
+    }
+  }
+  return Promise.all([fetchProjectVersion(projectName, version), fetchProjectVersion(projectName, 'latest')])
 }
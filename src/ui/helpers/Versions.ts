@@ -11,3 +11,14 @@ export function groupVersionsByMajorVersion(versions: string[]): Record<number,
 
   return grouped
 }
+
+/**
+ * Reports whether `version` names a version alias rather than a version, whether or not it resolves.
+ *
+ * `latest` is the newest version, `stable` the newest final release, and a series such as `2.x` or
+ * `2.1.x` the newest final release within it. The server resolves them; an address naming one is
+ * redirected to what it resolved to, so that what the reader bookmarks stays put.
+ */
+export function isVersionAlias(version: string): boolean {
+  return version === 'latest' || version === 'stable' || /^\d+(\.\d+)?\.x$/.test(version)
+}
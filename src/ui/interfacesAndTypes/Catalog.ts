@@ -0,0 +1,28 @@
+import type FooterPluginT from './plugins/FooterPlugin'
+import type OramaPluginT from './plugins/OramaPluginT'
+import type SitePluginT from './plugins/SitePlugin'
+import type ThemePluginT from './plugins/ThemePlugin'
+import type { Project, ProjectCategory } from './Project'
+
+export interface CatalogProject extends Project {
+  /** Every published version, oldest first */
+  versions: string[]
+  /** The newest published version, or null while the project has none */
+  latest: string | null
+  /** Every version alias, such as `stable` or `2.x`, with the version it resolves to */
+  aliases: Record<string, string>
+}
+
+/** Everything the interface needs to render any page, as `/api/catalog` answers it. */
+export interface Catalog {
+  generation: number
+  projects: CatalogProject[]
+  categories: ProjectCategory[]
+  /** Active plugins only. A plugin that is switched off is absent rather than listed as inactive. */
+  plugins: {
+    footer?: FooterPluginT
+    orama?: OramaPluginT
+    site?: SitePluginT
+    theme?: ThemePluginT
+  }
+}
@@ -3,17 +3,11 @@ import { createFileRoute, Outlet, redirect, useRouter } from '@tanstack/react-ro
 import { useCallback } from 'react'
 import ErrorComponent from '../../components/ErrorComponent'
 import { LoadingSpinner } from '../../components/LoadingSpinner'
-import { fetchProjectVersion } from '../../helpers/APIFunctions'
+import { fetchResolvedVersionAndLatest } from '../../helpers/APIFunctions'
 import { sanitizeDocuUri } from '../../helpers/RouteHelpers'
+import { isVersionAlias } from '../../helpers/Versions'
 import type { FastAPIAxiosErrorT } from '../../interfacesAndTypes/Error'
 
-const fetchVersionAndLatestVersion = async (projectName: string, version: string): Promise<string> => {
-  // Check if requested version is available. If not, the loader throws an error and the error component is shown
-  await fetchProjectVersion(projectName, version)
-
-  return await fetchProjectVersion(projectName, 'latest')
-}
-
 /**
  * Resolves which version of a project is being read, for every page of it.
  *
@@ -26,13 +20,15 @@ const fetchVersionAndLatestVersion = async (projectName: string, version: string
 export const Route = createFileRoute('/$projectName/$version')({
   component: Outlet,
   loader: async ({ params: { projectName, version }, location }) => {
-    const latestVersion = await fetchVersionAndLatestVersion(projectName, version)
-    if (version === 'latest') {
+    // Check if requested version is available. If not, the loader throws an error and the error component is shown.
+    // For an alias, what it resolves to. Both from the catalog every page shares, unless it does not know them.
+    const [resolvedVersion, latestVersion] = await fetchResolvedVersionAndLatest(projectName, version)
+    if (isVersionAlias(version)) {
       throw redirect({
         to: '/$projectName/$version/$',
         params: {
           projectName,
-          version: latestVersion,
+          version: resolvedVersion,
           // The page to land on is not in this route's params, so it is read back out of the
           // address being resolved.
           _splat: sanitizeDocuUri(location.pathname)._splat,
@@ -4,13 +4,13 @@ import { useCallback } from 'react'
 import ErrorComponent from '../../components/ErrorComponent'
 import { LoadingSpinner } from '../../components/LoadingSpinner'
 import { ProjectVersionsOverview } from '../../components/ProjectVersionsOverview'
-import { fetchProjectVersion, fetchProjectVersions } from '../../helpers/APIFunctions'
+import { fetchProjectVersionsAndLatest } from '../../helpers/APIFunctions'
 import type { FastAPIAxiosErrorT } from '../../interfacesAndTypes/Error'
 
 export const Route = createFileRoute('/$projectName/')({
   component: ProjectVersionsOverview,
   loader: async ({ params: { projectName } }): Promise<[string[], string]> => {
-    return Promise.all([fetchProjectVersions(projectName), fetchProjectVersion(projectName, 'latest')])
+    return fetchProjectVersionsAndLatest(projectName)
   },
   pendingComponent: LoadingSpinner,
   errorComponent: ({ error }) => {
@@ -1,23 +1,18 @@
 import SentimentDissatisfied from '@mui/icons-material/SentimentDissatisfied'
 import { createFileRoute, useRouter } from '@tanstack/react-router'
 import ErrorComponent from '../components/ErrorComponent'
-import { fetchPluginConfig, fetchProjectCategories, fetchProjects } from '../helpers/APIFunctions'
-import type SitePluginT from '../interfacesAndTypes/plugins/SitePlugin'
+import { fetchCatalog } from '../helpers/APIFunctions'
 
 export const Route = createFileRoute('/')({
-  loader: async () => {
-    const [projects, projectCategories, sitePluginConfig] = await Promise.all([
-      fetchProjects(),
-      fetchProjectCategories(),
-      // In the loader so the banner is part of the first paint rather than arriving after it and
-      // pushing the projects down. Caught, because the projects are what the page is for: a plugin
-      // that cannot be read costs the introduction, not the page.
-      fetchPluginConfig<SitePluginT>('site').catch(() => null),
-    ])
+  // One request for the projects, their categories and the site plugin, so the banner is part of the
+  // first paint rather than arriving after it and pushing the projects down. Asked anew when the page
+  // is reloaded from its error component, which is what a reader waiting for a first upload does.
+  loader: async ({ cause }) => {
+    const { projects, categories, plugins } = await fetchCatalog(cause === 'stay')
     if (projects.length === 0) {
       throw new Error('No projects found')
     }
-    return [projects, projectCategories, sitePluginConfig] as const
+    return [projects, categories, plugins.site ?? null] as const
   },
   errorComponent: ({ error }) => {
     const ErrorComponentWithRouter = () => {
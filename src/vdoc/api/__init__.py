@@ -7,6 +7,7 @@ from servestatic.asgi import ServeStaticASGI
 from starlette.requests import Request
 
 from vdoc.api import lifespan
+from vdoc.api.static_dispatch import StaticProjectsDispatcher
 from vdoc.exceptions import VDocException
 
 # Vite writes the build's content hash into the name of every asset it emits, as eight characters
@@ -16,12 +17,13 @@ from vdoc.exceptions import VDocException
 _HASHED_ASSET_NAME = r"-[A-Za-z0-9_-]{8}\."
 
 
-def create_app() -> ServeStaticASGI:
+def create_app() -> StaticProjectsDispatcher:
     """Creates the ASGI application.
 
     The API and the web UI's own routes are a FastAPI app, wrapped in a static file server that answers
     for the files of the built web UI and passes everything else through. That server is what sends the
     compressed copy the UI build wrote next to each asset, and what says how long each may be cached.
+    In front of both, the published documentation is answered by the docs mount directly.
 
     Returns:
         The application, ready to be served.
@@ -46,6 +48,9 @@ def create_app() -> ServeStaticASGI:
         Returns:
             The exception as formatted JSONResponse.
         """
-        return JSONResponse(status_code=exc.status_code, content={"message": exc.detail})
+        return JSONResponse(status_code=exc.status_code, content={"message": exc.detail}, headers=exc.headers)
 
-    return ServeStaticASGI(application=app, root=lifespan.webapp_path, immutable_file_test=_HASHED_ASSET_NAME)
+    return StaticProjectsDispatcher(
+        app=ServeStaticASGI(application=app, root=lifespan.webapp_path, immutable_file_test=_HASHED_ASSET_NAME),
+        fastapi=app,
+    )
@@ -0,0 +1,23 @@
+"""Contains what tells which compressed forms of a response a client can read."""
+
+
+def accepted_codings(accept_encoding: str) -> set[str]:
+    """Returns the content codings an ``Accept-Encoding`` header accepts.
+
+    Args:
+        accept_encoding: The header value.
+
+    Returns:
+        The names of the codings, leaving out the ones refused with ``q=0``.
+    """
+    accepted = set()
+    for element in accept_encoding.split(","):
+        coding, *parameters = (part.strip() for part in element.split(";"))
+        weights = [value for name, _, value in (parameter.partition("=") for parameter in parameters) if name == "q"]
+        try:
+            refused = bool(weights) and float(weights[0]) == 0
+        except ValueError:
+            refused = False
+        if coding and not refused:
+            accepted.add(coding.lower())
+    return accepted
@@ -1,32 +1,50 @@
 """Defines the FastAPI lifespan and route loading."""
 
-from collections.abc import AsyncGenerator
+import hashlib
+import os
+from collections.abc import AsyncGenerator, Mapping
 from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from email.utils import formatdate
+from functools import lru_cache
 from pathlib import Path
+from types import MappingProxyType
 from urllib.parse import quote
 
 from fastapi import FastAPI, status
 from fastapi.routing import Mount
-from fastapi.staticfiles import StaticFiles
-from starlette.responses import FileResponse, RedirectResponse
+from starlette.convertors import Convertor, register_url_convertor
+from starlette.responses import FileResponse, RedirectResponse, Response
 
+from vdoc.api.published_files import ArchiveMemberResponse, PublishedFiles
 from vdoc.api.routes import agent_discovery as agent_discovery_module
+from vdoc.api.routes import catalog as catalog_module
+from vdoc.api.routes import hot_files as hot_files_module
+from vdoc.api.routes import jobs as jobs_module
 from vdoc.api.routes import plugins as plugins_module
 from vdoc.api.routes import project_categories as project_categories_module
 from vdoc.api.routes import projects as projects_module
 from vdoc.api.routes import version as version_module
+from vdoc.catalog import get_catalog
 from vdoc.config_file import log_configuration_source
-from vdoc.constants import LATEST_VERSION_ALIAS, STATIC_PROJECTS_PREFIX
+from vdoc.constants import ALIAS_REDIRECT_CACHE_CONTROL, STATIC_PROJECTS_PREFIX, VERSION_ALIAS_PATTERN
 from vdoc.exceptions import ProjectInventoryNotFound
+from vdoc.hot_files import get_hot_file_cache
 from vdoc.methods.api.projects import get_project_version_impl
+from vdoc.models.plugins.base import Plugin
 from vdoc.models.project import Project
+from vdoc.offload import offload_headers
+from vdoc.published_manifests import published_file_etag
 from vdoc.settings import get_settings
+from vdoc.version_archives import get_version_archive
+from vdoc.watcher import start_watcher
 
 _PACKAGE_PATH = Path(__file__).parent.parent
 
 webapp_path = _PACKAGE_PATH / "webapp"
 
 _SPHINX_INVENTORY_FILE_NAME = "objects.inv"
+_WEBAPP_INDEX_FILE_NAME = "index.html"
 
 
 @asynccontextmanager
@@ -47,20 +65,38 @@ async def routes_loader_lifespan(fastapi: FastAPI) -> AsyncGenerator[None, None]
     # goes through it, while every way of starting the app goes through the lifespan.
     log_configuration_source()
 
+    # Catches up with whatever changed under the docs directory while vdoc was not running, so that the
+    # first request does not have to. The watcher keeps it caught up from here on.
+    settings = get_settings()
+    catalog = get_catalog(settings.docs_dir)
+    catalog.refresh()
+    watcher = start_watcher(catalog=catalog, mode=settings.docs_watcher, interval=settings.docs_watcher_interval)
+    # Read before the first request, which would otherwise pay for it
+    _read_webapp(webapp_root=webapp_path)
+
     fastapi = _include_static_api_routers(fastapi=fastapi)
     fastapi = _include_agent_discovery_router(fastapi=fastapi)
     fastapi = _include_intersphinx_router(fastapi=fastapi)
-    fastapi = _include_static_latest_router(fastapi=fastapi)
+    fastapi = _include_static_alias_router(fastapi=fastapi)
     fastapi = _include_static_documentation_routers(fastapi=fastapi)
     fastapi = _include_frontend_router(fastapi=fastapi)
-    yield
+    try:
+        yield
+    finally:
+        if watcher is not None:
+            watcher.stop()
 
 
 def _include_static_api_routers(fastapi: FastAPI) -> FastAPI:
     fastapi.include_router(projects_module.router, prefix="/api")
     fastapi.include_router(project_categories_module.router, prefix="/api")
     fastapi.include_router(version_module.router, prefix="/api")
-    fastapi.include_router(plugins_module.get_router(), prefix="/api")
+    fastapi.include_router(jobs_module.router, prefix="/api")
+    fastapi.include_router(hot_files_module.router, prefix="/api")
+    # Loaded once for both: the catalog document carries what each plugin's own route answers
+    plugins = list(Plugin.load_plugins())
+    fastapi.include_router(plugins_module.get_router(plugins=plugins), prefix="/api")
+    fastapi.include_router(catalog_module.get_router(plugins=plugins), prefix="/api")
     return fastapi
 
 
@@ -70,19 +106,30 @@ def _include_agent_discovery_router(fastapi: FastAPI) -> FastAPI:
 
 
 def _include_static_documentation_routers(fastapi: FastAPI) -> FastAPI:
-    fastapi.routes.append(
-        Mount(
-            STATIC_PROJECTS_PREFIX,
-            app=StaticFiles(directory=get_settings().docs_dir.as_posix(), html=True, check_dir=False),
-            name="projects",
-        )
+    settings = get_settings()
+    published_files = PublishedFiles(
+        directory=settings.docs_dir.as_posix(),
+        html=True,
+        check_dir=False,
+        # Offloaded files are never read, so there is nothing to keep of them in memory
+        hot_files=(
+            get_hot_file_cache(docs_dir=settings.docs_dir, capacity=settings.hot_file_cache_size)
+            if settings.hot_file_cache_size and settings.static_offload == "off"
+            else None
+        ),
+        offload=settings.static_offload,
+        offload_location=settings.static_offload_location,
     )
+    # Most requests for it never reach the router, see `vdoc.api.static_dispatch`. Mounted all the same,
+    # for those that do and for building addresses to it.
+    fastapi.state.published_files = published_files
+    fastapi.routes.append(Mount(STATIC_PROJECTS_PREFIX, app=published_files, name="projects"))
     return fastapi
 
 
 def _include_intersphinx_router(fastapi: FastAPI) -> FastAPI:
     @fastapi.get(f"/{{project_name}}/{{version}}/{_SPHINX_INVENTORY_FILE_NAME}")
-    def serve_sphinx_objects_inventory(project_name: str, version: str) -> FileResponse:
+    def serve_sphinx_objects_inventory(project_name: str, version: str) -> Response:
         """Serves the objects.inv sphinx file for intersphinx mappings.
 
         Args:
@@ -93,68 +140,165 @@ def _include_intersphinx_router(fastapi: FastAPI) -> FastAPI:
             ProjectInventoryNotFound: If the project version doesn't contain an objects.inv file.
 
         Returns:
-            FileResponse: The objects.inv file.
+            Response: The objects.inv file.
         """
         served_version, version_path = Project.get_version_and_docs_path(name=project_name, version=version)
-        inventory_path = version_path / _SPHINX_INVENTORY_FILE_NAME
+        project = Project(name=project_name)
 
         # Only a generator that builds on Sphinx writes one. Without this check, asking a version built by
-        # any other generator for its inventory raises out of FileResponse as a 500.
-        if not inventory_path.is_file():
+        # any other generator for its inventory raises out of FileResponse as a 500. Answered from the
+        # version's summary, while its manifest names the content the inventory is tagged by.
+        if not project.contains(version=served_version, file_name=_SPHINX_INVENTORY_FILE_NAME):
             raise ProjectInventoryNotFound(
                 name=project_name, version=served_version, inventory=_SPHINX_INVENTORY_FILE_NAME
             )
+        headers = {}
+        if (manifest := project.version_manifest(version=served_version)) is not None:
+            headers["ETag"] = published_file_etag(file=manifest.files[_SPHINX_INVENTORY_FILE_NAME])
+
+        if (archive_path := project.version_archive(version=served_version)) is not None:
+            member = get_version_archive(path=archive_path).members[_SPHINX_INVENTORY_FILE_NAME]
+            return ArchiveMemberResponse(
+                archive_path=archive_path, member=member, headers=headers, media_type="application/octet-stream"
+            )
 
-        return FileResponse(path=inventory_path)
+        inventory_path = version_path / _SPHINX_INVENTORY_FILE_NAME
+
+        settings = get_settings()
+        offload = offload_headers(
+            path=inventory_path,
+            docs_dir=settings.docs_dir,
+            mode=settings.static_offload,
+            location=settings.static_offload_location,
+        )
+        if offload is not None:
+            return Response(headers=offload, media_type="application/octet-stream")
+        return FileResponse(path=inventory_path, headers=headers)
 
     return fastapi
 
 
-def _include_static_latest_router(fastapi: FastAPI) -> FastAPI:
-    @fastapi.get(f"{STATIC_PROJECTS_PREFIX}/{{project_name}}/{LATEST_VERSION_ALIAS}/{{file_path:path}}")
-    def redirect_latest_to_published_version(project_name: str, file_path: str) -> RedirectResponse:
-        """Redirects a ``latest`` static address to the newest published version of the project.
+class _VersionAliasConvertor(Convertor[str]):
+    """Matches a path segment naming a version alias, and nothing a version can be published under."""
+
+    regex = VERSION_ALIAS_PATTERN
+
+    def convert(self, value: str) -> str:
+        return value
 
-        Redirecting rather than serving the file under the ``latest`` address is what keeps relative links
-        inside the page working: the browser resolves them against the address it ended up on, which has
-        to be the resolved version for them to stay inside it.
+    def to_string(self, value: str) -> str:
+        return value
+
+
+register_url_convertor("version_alias", _VersionAliasConvertor())
+
+
+def _include_static_alias_router(fastapi: FastAPI) -> FastAPI:
+    @fastapi.get(f"{STATIC_PROJECTS_PREFIX}/{{project_name}}/{{alias:version_alias}}/{{file_path:path}}")
+    def redirect_alias_to_published_version(project_name: str, alias: str, file_path: str) -> RedirectResponse:
+        """Redirects a static address naming a version alias to the version it resolves to.
+
+        Redirecting rather than serving the file under the alias is what keeps relative links inside the
+        page working: the browser resolves them against the address it ended up on, which has to be the
+        resolved version for them to stay inside it.
+
+        No alias is a valid version, so this never stands in front of a published one.
 
         Args:
             project_name: The requested project name.
+            alias: The requested version alias, such as ``latest``, ``stable`` or ``2.x``.
             file_path: The path of the requested file within the published version.
 
         Returns:
-            A temporary redirect to the same file under the resolved version. Temporary, because which
-            version ``latest`` names changes with every upload.
+            A temporary redirect to the same file under the resolved version. Temporary, and never kept
+            without asking again, because which version an alias names changes with uploads.
         """
-        served_version = get_project_version_impl(name=project_name, version=LATEST_VERSION_ALIAS)
+        served_version = get_project_version_impl(name=project_name, version=alias)
 
         return RedirectResponse(
             url=f"{STATIC_PROJECTS_PREFIX}/{project_name}/{served_version}/{file_path}",
             status_code=status.HTTP_307_TEMPORARY_REDIRECT,
+            headers={"Cache-Control": ALIAS_REDIRECT_CACHE_CONTROL},
         )
 
     return fastapi
 
 
+@dataclass(frozen=True)
+class _WebappBuild:
+    """The built web UI, read once: which files it ships, and the shell every route of it is answered with."""
+
+    files: frozenset[str]
+    """The path of every file, relative to the web UI directory and with forward slashes."""
+
+    index: bytes | None
+    """The content of ``index.html``, or None if the directory holds no build."""
+
+    index_headers: Mapping[str, str]
+    """The headers ``index.html`` is answered with, other than the ones that depend on the request."""
+
+
+@lru_cache(maxsize=4)
+def _read_webapp(webapp_root: Path) -> _WebappBuild:
+    """Reads the built web UI in a directory, once.
+
+    A build does not change while it is served, so whether a request path names one of its files is a
+    set lookup, and the shell is kept as bytes rather than opened and stat'ed for every route it answers.
+    The static file server in front of the app keeps an index of the same files for the same reason; this
+    one is for the paths it passes through. Keyed by the directory rather than read at import, so that it
+    follows ``webapp_path`` wherever that points.
+
+    Args:
+        webapp_root: The web UI directory.
+
+    Returns:
+        The build.
+    """
+    root = webapp_root.resolve()
+    files: set[str] = set()
+    for directory, _, file_names in os.walk(root):
+        for file_name in file_names:
+            file_path = (Path(directory) / file_name).resolve()
+            # A link that leads out of the web UI directory leads to nothing that is ours to serve
+            if file_path.is_relative_to(root) and file_path.is_file():
+                files.add((Path(directory) / file_name).relative_to(root).as_posix())
+
+    index_path = root / _WEBAPP_INDEX_FILE_NAME
+    if _WEBAPP_INDEX_FILE_NAME not in files:
+        return _WebappBuild(files=frozenset(files), index=None, index_headers=MappingProxyType({}))
+
+    index = index_path.read_bytes()
+    return _WebappBuild(
+        files=frozenset(files),
+        index=index,
+        index_headers=MappingProxyType(
+            {
+                "content-type": "text/html; charset=utf-8",
+                "etag": f'"{hashlib.sha256(index).hexdigest()[:32]}"',
+                "last-modified": formatdate(index_path.stat().st_mtime, usegmt=True),
+            }
+        ),
+    )
+
+
 def _resolve_webapp_asset(file_path: str) -> Path | None:
     """Resolves a request path to a file shipped with the web UI.
 
+    Answered from the build's list of files, so a path naming none of them -- every documentation page,
+    and every path a vulnerability scanner tries -- costs a set lookup rather than two path resolutions
+    and a stat.
+
     Args:
         file_path: The requested file path.
 
     Returns:
         The path of the asset, or None if the request does not name one inside the web UI directory.
     """
-    webapp_root = webapp_path.resolve()
-    asset_path = (webapp_root / file_path).resolve()
-
-    # A request path is untrusted input, and ``/`` on a Path appends ``..`` segments rather than resolving
-    # them, so the joined path can leave the web UI directory. Nothing outside it is ours to serve.
-    if not asset_path.is_relative_to(webapp_root):
+    # Only what the build holds is in the list, so a path that tries to leave the directory is not in it
+    relative_path = "/".join(segment for segment in file_path.split("/") if segment)
+    if relative_path not in _read_webapp(webapp_root=webapp_path).files:
         return None
-
-    return asset_path if asset_path.is_file() else None
+    return webapp_path / relative_path
 
 
 def _static_alternate(file_path: str) -> str | None:
@@ -205,7 +349,7 @@ def _is_frontend_route(file_path: str) -> bool:
 
 def _include_frontend_router(fastapi: FastAPI) -> FastAPI:
     @fastapi.get("/{file_path:path}")
-    def serve_ui_and_assets(file_path: str) -> FileResponse:
+    def serve_ui_and_assets(file_path: str) -> Response:
         """Serves the web UI and the static assets (JS bundles, ...) as a last fallback for all non-matched requests.
 
         The UI is returned for anything it has a route for, and for everything else too -- but under a
@@ -222,18 +366,19 @@ def _include_frontend_router(fastapi: FastAPI) -> FastAPI:
             file_path (str): The requested file path.
 
         Returns:
-            FileResponse: The requested asset file if existing, otherwise the index.html.
+            Response: The requested asset file if existing, otherwise the index.html.
         """
         if (asset_path := _resolve_webapp_asset(file_path=file_path)) is not None:
             return FileResponse(path=asset_path)
 
         is_route = _is_frontend_route(file_path=file_path)
         alternate = _static_alternate(file_path=file_path) if is_route else None
+        status_code = status.HTTP_200_OK if is_route else status.HTTP_404_NOT_FOUND
+        link = {"Link": f'<{alternate}>; rel="alternate"; type="text/html"'} if alternate else {}
 
-        return FileResponse(
-            path=webapp_path / "index.html",
-            status_code=status.HTTP_200_OK if is_route else status.HTTP_404_NOT_FOUND,
-            headers={"Link": f'<{alternate}>; rel="alternate"; type="text/html"'} if alternate else None,
-        )
+        if (build := _read_webapp(webapp_root=webapp_path)).index is None:
+            # Without a build there is no shell to keep, and this says so the way it always did
+            return FileResponse(path=webapp_path / _WEBAPP_INDEX_FILE_NAME, status_code=status_code, headers=link)
+        return Response(content=build.index, status_code=status_code, headers={**build.index_headers, **link})
 
     return fastapi
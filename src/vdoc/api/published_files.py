@@ -0,0 +1,662 @@
+"""Contains the file server for the published documentation.
+
+Nothing under a published version ever changes: an upload never replaces a version that exists, and the
+files of one are links into a blob store that is never written to in place. So a file of a version is sent
+with a lifetime of a year and marked immutable, and browsers and proxies keep it without ever asking again.
+What does change, which version an alias such as ``latest`` names, is a redirect of its own, which is not
+served from here.
+
+A version kept as an archive, see ``vdoc.version_archives``, is served out of it: every file of it is a
+range of bytes of the archive, sent as it is.
+
+The small files asked for most are answered from memory, see ``vdoc.hot_files``, without the disk. A large
+one, a PDF or an offline bundle a version ships for download, is handed to the server to send straight from
+the file where it offers an ASGI extension for it, and a request for parts of it, such as a download that
+is resumed, is sent those parts.
+
+Behind a reverse proxy configured to, a file is not sent at all but handed to the proxy, see
+``vdoc.offload``. A version kept as an archive is not: its files are no files the proxy could send.
+"""
+
+import os
+import stat
+from email.utils import formatdate
+from functools import cached_property
+from mimetypes import guess_type
+from pathlib import Path
+from secrets import token_hex
+from types import MappingProxyType
+
+import anyio
+import anyio.to_thread
+from fastapi import HTTPException, status
+from fastapi.staticfiles import StaticFiles
+from packaging.version import InvalidVersion, Version
+from starlette.datastructures import URL, Headers, MutableHeaders
+from starlette.responses import FileResponse, RedirectResponse, Response
+from starlette.staticfiles import NotModifiedResponse, PathLike
+from starlette.types import Receive, Scope, Send
+
+from vdoc.api.content_coding import accepted_codings
+from vdoc.catalog import get_catalog
+from vdoc.constants import (
+    DEFAULT_STATIC_OFFLOAD_LOCATION,
+    HOT_FILE_MAX_SIZE,
+    IMMUTABLE_CACHE_CONTROL,
+    PRECOMPRESSED_ENCODINGS,
+    PRECOMPRESSED_FILE_SUFFIXES,
+    VERSION_ARCHIVE_SUFFIX,
+)
+from vdoc.hot_files import HotFile, HotFileCache
+from vdoc.models.manifest import PublishedFile
+from vdoc.offload import StaticOffloadT, offload_headers
+from vdoc.published_manifests import get_published_manifest, published_file_etag
+from vdoc.version_archives import ArchiveMember, VersionArchive, get_version_archive
+
+# The ASGI extension a server offers to send a range of a file without reading it into the process
+_ZEROCOPY_EXTENSION = "http.response.zerocopy"
+# The most ranges of a file one request is sent, in as many parts. Download clients ask for one.
+_MAX_RANGES = 100
+
+
+def _file_etag(stat_result: os.stat_result) -> str:
+    """Returns the strong entity tag of a published file that its version's manifest does not list.
+
+    Taken from the inode of the file rather than from its modification time alone: every distinct content
+    is one blob, and every file with that content a link to it. The tag changes with the content, and with
+    nothing else.
+
+    Args:
+        stat_result: The status of the file.
+
+    Returns:
+        The entity tag, quoted.
+    """
+    return f'"{stat_result.st_ino:x}-{stat_result.st_size:x}-{stat_result.st_mtime_ns:x}"'
+
+
+class PublishedFiles(StaticFiles):
+    """Serves the published documentation, and nothing else that lives in the docs directory."""
+
+    def __init__(  # noqa: PLR0913
+        self,
+        *,
+        directory: PathLike,
+        html: bool = False,
+        check_dir: bool = True,
+        hot_files: HotFileCache | None = None,
+        offload: StaticOffloadT = "off",
+        offload_location: str = DEFAULT_STATIC_OFFLOAD_LOCATION,
+    ) -> None:
+        """Creates the file server.
+
+        Args:
+            directory: The docs directory.
+            html: Whether a directory is answered with its ``index.html``.
+            check_dir: Whether the docs directory has to exist already.
+            hot_files: The cache to answer the files asked for most from, or None to always read the disk.
+            offload: How files are handed to the reverse proxy to send, if they are.
+            offload_location: The address of the proxy's internal location that serves the docs directory.
+        """
+        super().__init__(directory=directory, html=html, check_dir=check_dir)
+        self.hot_files = hot_files
+        self.offload = offload
+        self.offload_location = offload_location
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        """Returns the response for a file of a published version.
+
+        vdoc keeps its own state in a hidden directory next to the projects, and a hidden directory is never
+        a project. Refused here, since the directory served from is the docs directory itself.
+
+        A request for part of a file is always answered from the disk, and so is every file that is not
+        small enough to be kept in memory.
+
+        Args:
+            path: The requested path, relative to the docs directory.
+            scope: The ASGI scope of the request.
+
+        Raises:
+            HTTPException: If the path leads into a hidden directory.
+
+        Returns:
+            The response.
+        """
+        if path.startswith("."):
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+        parts = Path(path).parts
+        request_headers = Headers(scope=scope)
+        if self.hot_files is None or "range" in request_headers:
+            return await self._disk_response(path=path, parts=parts, scope=scope)
+
+        # Each form of a text file is kept on its own, by the content codings that decide which one is sent
+        codings: tuple[str, ...] = ()
+        if Path(path).suffix.lower() in PRECOMPRESSED_FILE_SUFFIXES:
+            accepted = accepted_codings(accept_encoding=request_headers.get("accept-encoding", ""))
+            codings = tuple(coding for coding in PRECOMPRESSED_ENCODINGS if coding in accepted)
+        # The path as requested rather than as resolved: a directory is answered differently with a trailing slash
+        key = (scope["path"], codings)
+        generation = self._generation(parts=parts)
+
+        if (hot_file := self.hot_files.get(key=key, generation=generation)) is not None:
+            headers = Headers(headers=hot_file.headers)
+            if self.is_not_modified(headers, request_headers):
+                return NotModifiedResponse(headers)
+            return Response(content=hot_file.body, headers=hot_file.headers)
+
+        response = await self._disk_response(path=path, parts=parts, scope=scope)
+        if (body := await _read_small_file(response=response)) is None:
+            return response
+        hot_file = HotFile(body=body, headers=MappingProxyType(dict(response.headers)), generation=generation)
+        self.hot_files.put(key=key, hot_file=hot_file)
+        return Response(content=hot_file.body, headers=hot_file.headers)
+
+    async def _disk_response(self, path: str, parts: tuple[str, ...], scope: Scope) -> Response:
+        if (archive_path := self._version_archive(parts=parts)) is not None:
+            return await anyio.to_thread.run_sync(self._archive_response, archive_path, parts, scope)
+        return await super().get_response(path=path, scope=scope)
+
+    def _generation(self, parts: tuple[str, ...]) -> int:
+        """Returns the catalog generation that a file's response is kept at.
+
+        That of the project the file belongs to, so that publishing to one project does not drop what is
+        kept of every other one.
+
+        Args:
+            parts: The parts of the requested path, relative to the docs directory.
+
+        Returns:
+            The generation.
+        """
+        catalog = get_catalog(Path(self.directory or "."))
+        if parts and (published := catalog.versions(parts[0])) is not None:
+            return published.generation
+        return catalog.generation
+
+    def file_response(
+        self, full_path: PathLike, stat_result: os.stat_result, scope: Scope, status_code: int = 200
+    ) -> Response:
+        """Returns the response for a file, in the smallest form the client can read.
+
+        A text file was given compressed copies next to it when its version was published, and its version's
+        manifest lists them. Sending one of those costs no more than sending the file itself. Any other file
+        next to it that only looks like a copy, one the upload shipped or one copied in by hand, is never
+        sent in its place, and a version without a manifest is sent as it is.
+
+        Handed to the reverse proxy instead, if it is configured to send files. A file answered with another
+        status, a ``404.html``, is not: the proxy would send it as found.
+
+        Args:
+            full_path: The path of the file.
+            stat_result: The status of the file.
+            scope: The ASGI scope of the request.
+            status_code: The status code to answer with.
+
+        Returns:
+            The response, or ``304 Not Modified`` if the client holds the form it would be sent already.
+        """
+        path = Path(full_path)
+        request_headers = Headers(scope=scope)
+        headers = {}
+        if status_code == status.HTTP_200_OK and self._is_version_file(path=path):
+            headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+
+        served, served_stat = path, stat_result
+        listed = self._listed_file(path=path)
+        if path.suffix.lower() in PRECOMPRESSED_FILE_SUFFIXES:
+            # Every form of the file is answered for the same address, so a cache has to keep them apart
+            headers["Vary"] = "Accept-Encoding"
+            accepted = accepted_codings(accept_encoding=request_headers.get("accept-encoding", ""))
+            if listed is not None and (copy := _precompressed_copy(path=path, accepted=accepted, file=listed)):
+                headers["Content-Encoding"], served, served_stat = copy
+        if self.offload != "off" and status_code == status.HTTP_200_OK:
+            return self._offload_response(path=path, served=served, headers=headers)
+        if listed is not None:
+            headers["ETag"] = published_file_etag(file=listed, coding=headers.get("Content-Encoding"))
+        else:
+            headers["ETag"] = _file_etag(stat_result=served_stat)
+
+        response = FileResponse(
+            served,
+            status_code=status_code,
+            headers=headers,
+            media_type=guess_type(path.name)[0],
+            stat_result=served_stat,
+        )
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
+
+    def _offload_response(self, path: Path, served: Path, headers: dict[str, str]) -> Response:
+        """Returns the response that hands a file to the reverse proxy to send.
+
+        nginx keeps none of the headers of the response but the content type and the caching ones, so it is
+        handed the file itself. It picks the compressed copy with ``gzip_static`` and ``brotli_static``, and
+        answers conditional requests itself. Other proxies send what they are handed with the headers of the
+        response, so they are handed the form chosen here.
+
+        Args:
+            path: The requested file.
+            served: The form of it that is sent, the file itself or a compressed copy.
+            headers: The headers of the response.
+
+        Returns:
+            The response, without a body.
+        """
+        if self.offload == "x-accel-redirect":
+            served = path
+            headers.pop("Content-Encoding", None)
+        # The file was looked up by its real path, so the docs directory is taken by its real path as well
+        docs_dir = Path(os.path.realpath(self.directory or "."))
+        offload = offload_headers(path=served, docs_dir=docs_dir, mode=self.offload, location=self.offload_location)
+        return Response(headers=headers | (offload or {}), media_type=guess_type(path.name)[0])
+
+    def _version_archive(self, parts: tuple[str, ...]) -> Path | None:
+        """Returns the archive a requested file is served from, if its version is kept as one.
+
+        Args:
+            parts: The parts of the requested path, relative to the docs directory.
+
+        Returns:
+            The archive of the version the path leads into, or None if it does not lead into an archived one.
+        """
+        if len(parts) < 2:  # noqa: PLR2004
+            return None
+        published = get_catalog(Path(self.directory or ".")).versions(parts[0])
+        if published is None or parts[1] not in published.archives:
+            return None
+        return Path(self.directory or ".", parts[0], f"{parts[1]}{VERSION_ARCHIVE_SUFFIX}")
+
+    def _archive_response(self, archive_path: Path, parts: tuple[str, ...], scope: Scope) -> Response:
+        """Returns the response for a file of a version that is kept as an archive.
+
+        Answered the way a version directory is: a directory is served its ``index.html``, once the address
+        ends in a slash for the links in the page to resolve against it.
+
+        Args:
+            archive_path: The archive of the version.
+            parts: The parts of the requested path, relative to the docs directory.
+            scope: The ASGI scope of the request.
+
+        Raises:
+            HTTPException: If the archive has no such file.
+
+        Returns:
+            The response, or ``304 Not Modified`` if the client holds the form it would be sent already.
+        """
+        try:
+            archive = get_version_archive(path=archive_path)
+        except FileNotFoundError as error:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND) from error
+
+        name = "/".join(parts[2:])
+        if not name or archive.is_directory(name=name):
+            if not scope["path"].endswith("/"):
+                url = URL(scope=scope)
+                return RedirectResponse(url=url.replace(path=f"{url.path}/"))
+            name = f"{name}/index.html" if name else "index.html"
+        if (member := archive.members.get(name)) is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+
+        request_headers = Headers(scope=scope)
+        headers = {"Cache-Control": IMMUTABLE_CACHE_CONTROL, "Last-Modified": formatdate(archive.modified, usegmt=True)}
+        listed = self._version_file(parts=(*parts[:2], *name.split("/")))
+        if Path(name).suffix.lower() in PRECOMPRESSED_FILE_SUFFIXES:
+            headers["Vary"] = "Accept-Encoding"
+            accepted = accepted_codings(accept_encoding=request_headers.get("accept-encoding", ""))
+            if listed is not None and (
+                copy := _precompressed_member(archive=archive, name=name, accepted=accepted, file=listed)
+            ):
+                headers["Content-Encoding"], member = copy
+        if listed is not None:
+            headers["ETag"] = published_file_etag(file=listed, coding=headers.get("Content-Encoding"))
+        else:
+            headers["ETag"] = f'"{member.crc:08x}-{member.size:x}"'
+
+        response = ArchiveMemberResponse(
+            archive_path=archive_path,
+            member=member,
+            headers=headers,
+            media_type=guess_type(name)[0] or "application/octet-stream",
+        )
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
+
+    @cached_property
+    def _root(self) -> Path:
+        # Resolved like the paths `lookup_path` hands out, so that they are relative to it
+        return Path(os.path.realpath(self.directory or "."))
+
+    def _listed_file(self, path: Path) -> PublishedFile | None:
+        """Returns a file of a version as the version's manifest lists it.
+
+        Args:
+            path: The path of the file, as ``lookup_path`` found it.
+
+        Returns:
+            The file, or None if it is not listed in a manifest.
+        """
+        if not self._is_version_file(path=path):
+            return None
+        return self._version_file(parts=path.relative_to(self._root).parts)
+
+    def _version_file(self, parts: tuple[str, ...]) -> PublishedFile | None:
+        """Returns a file of a version as the version's manifest lists it.
+
+        Which tells the entity tag of the file, taken from the digest of its content so that it is the same
+        for every version that ships the same file, in every worker process, and after the docs directory is
+        copied somewhere else. And which compressed copies vdoc placed next to it, the only ones it is sent as.
+
+        Args:
+            parts: The parts of the path of the file, relative to the docs directory.
+
+        Returns:
+            The file, or None if it is not listed in a manifest, such as one of a version copied in by hand.
+        """
+        docs_dir = Path(self.directory or ".")
+        published = get_catalog(docs_dir).versions(parts[0])
+        if published is None or parts[1] not in published.directories:
+            return None
+        manifest = get_published_manifest(
+            docs_dir=docs_dir, name=parts[0], version=parts[1], generation=published.generation
+        )
+        return manifest.files.get("/".join(parts[2:])) if manifest is not None else None
+
+    def _is_version_file(self, path: Path) -> bool:
+        """Returns whether a file belongs to a published version, as opposed to lying next to the versions.
+
+        Args:
+            path: The path of the file, as ``lookup_path`` found it.
+
+        Returns:
+            True if it is inside the directory of a version of a project.
+        """
+        try:
+            parts = path.relative_to(self._root).parts
+        except ValueError:
+            return False
+        if len(parts) < 3:  # noqa: PLR2004
+            return False
+        try:
+            Version(parts[1])
+        except InvalidVersion:
+            return False
+        return True
+
+
+def _precompressed_copy(path: Path, accepted: set[str], file: PublishedFile) -> tuple[str, Path, os.stat_result] | None:
+    """Finds the compressed copy of a file to send to a client, if it has one the client can read.
+
+    Args:
+        path: The path of the file.
+        accepted: The content codings the client accepts.
+        file: The file, as its version's manifest lists it with the copies vdoc placed next to it.
+
+    Returns:
+        The content coding, the path and the status of the copy, or None if the file is to be sent as it is.
+    """
+    for coding, suffix in PRECOMPRESSED_ENCODINGS.items():
+        if coding not in accepted or suffix not in file.precompressed:
+            continue
+        copy = path.with_name(f"{path.name}{suffix}")
+        try:
+            copy_stat = copy.stat()
+        except OSError:
+            continue
+        if stat.S_ISREG(copy_stat.st_mode):
+            return coding, copy, copy_stat
+    return None
+
+
+async def _read_small_file(response: Response) -> bytes | None:
+    """Reads the content of a file response, if it is small enough to be kept in memory.
+
+    Args:
+        response: The response read from the disk.
+
+    Returns:
+        The content, or None if the response is not a whole file, or the file is too large.
+    """
+    if response.status_code != status.HTTP_200_OK:
+        return None
+    if isinstance(response, ArchiveMemberResponse) and response.member.size <= HOT_FILE_MAX_SIZE:
+        return await anyio.to_thread.run_sync(response.read)
+    if (
+        isinstance(response, FileResponse)
+        and response.stat_result is not None
+        and response.stat_result.st_size <= HOT_FILE_MAX_SIZE
+    ):
+        return await anyio.to_thread.run_sync(Path(response.path).read_bytes)
+    return None
+
+
+def _precompressed_member(
+    archive: VersionArchive, name: str, accepted: set[str], file: PublishedFile
+) -> tuple[str, ArchiveMember] | None:
+    """Finds the compressed copy of an archive member to send to a client, if it has one the client can read.
+
+    Args:
+        archive: The archive.
+        name: The name of the member.
+        accepted: The content codings the client accepts.
+        file: The member, as its version's manifest lists it with the copies vdoc wrote next to it.
+
+    Returns:
+        The content coding and the copy, or None if the member is to be sent as it is.
+    """
+    for coding, suffix in PRECOMPRESSED_ENCODINGS.items():
+        if (
+            coding in accepted
+            and suffix in file.precompressed
+            and (copy := archive.members.get(f"{name}{suffix}")) is not None
+        ):
+            return coding, copy
+    return None
+
+
+class ArchiveMemberResponse(Response):
+    """Sends the content of a stored archive member, a range of bytes of the archive file.
+
+    Handed to the server to send straight from the file where it offers to, and read a chunk at a time in
+    a worker thread otherwise, without ever holding more than a chunk of it in the process. A request for
+    parts of it, such as a download that was interrupted, is sent those parts only.
+    """
+
+    chunk_size = 64 * 1024
+
+    def __init__(
+        self,
+        archive_path: Path,
+        member: ArchiveMember,
+        status_code: int = status.HTTP_200_OK,
+        headers: dict[str, str] | None = None,
+        media_type: str | None = None,
+    ) -> None:
+        """Creates the response.
+
+        Args:
+            archive_path: The archive file.
+            member: Where the content to send is in the archive.
+            status_code: The status code to answer with.
+            headers: The headers to answer with.
+            media_type: The media type of the content.
+        """
+        self.archive_path = archive_path
+        self.member = member
+        self.status_code = status_code
+        self.media_type = media_type
+        self.background = None
+        self.init_headers(headers)
+        self.headers["content-length"] = str(member.size)
+        self.headers.setdefault("accept-ranges", "bytes")
+
+    def read(self) -> bytes:
+        """Reads the whole content to send.
+
+        Returns:
+            The content.
+        """
+        with self.archive_path.open("rb") as file:
+            return os.pread(file.fileno(), self.member.size, self.member.offset)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Sends the response, or the parts of it the request asks for.
+
+        Args:
+            scope: The ASGI scope of the request.
+            receive: The ASGI receive channel.
+            send: The ASGI send channel.
+        """
+        request_headers = Headers(scope=scope)
+        size = self.member.size
+        ranges = None
+        if (
+            self.status_code == status.HTTP_200_OK
+            and (range_header := request_headers.get("range")) is not None
+            and self._is_current(if_range=request_headers.get("if-range"))
+        ):
+            ranges = _requested_ranges(range_header=range_header, size=size)
+
+        status_code, headers = self.status_code, MutableHeaders(raw=list(self.raw_headers))
+        pieces: list[bytes | tuple[int, int]]
+        if ranges is None:
+            pieces = [(0, size)]
+        elif not ranges:
+            response = Response(
+                status_code=status.HTTP_416_RANGE_NOT_SATISFIABLE, headers={"Content-Range": f"bytes */{size}"}
+            )
+            await response(scope, receive, send)
+            return
+        elif len(ranges) == 1:
+            (start, end), status_code = ranges[0], status.HTTP_206_PARTIAL_CONTENT
+            headers["content-range"] = f"bytes {start}-{end - 1}/{size}"
+            headers["content-length"] = str(end - start)
+            pieces = [(start, end)]
+        else:
+            status_code, pieces = status.HTTP_206_PARTIAL_CONTENT, []
+            boundary = token_hex(13)
+            for start, end in ranges:
+                part_headers = (
+                    f"--{boundary}\r\nContent-Type: {self.media_type or 'application/octet-stream'}\r\n"
+                    f"Content-Range: bytes {start}-{end - 1}/{size}\r\n\r\n"
+                )
+                pieces.extend((part_headers.encode("latin-1"), (start, end), b"\r\n"))
+            pieces.append(f"--{boundary}--".encode("latin-1"))
+            headers["content-type"] = f"multipart/byteranges; boundary={boundary}"
+            headers["content-length"] = str(
+                sum(len(piece) if isinstance(piece, bytes) else piece[1] - piece[0] for piece in pieces)
+            )
+
+        await send({"type": "http.response.start", "status": status_code, "headers": headers.raw})
+        if scope.get("method", "GET").upper() == "HEAD":
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+        await self._send_pieces(scope=scope, send=send, pieces=pieces)
+
+    def _is_current(self, if_range: str | None) -> bool:
+        """Tells whether the parts a request asks for may be sent, rather than all of it.
+
+        Args:
+            if_range: The ``If-Range`` header of the request, naming the form of the content its parts are of.
+
+        Returns:
+            True if there is no condition, or the content is still in the form the condition names.
+        """
+        if if_range is None:
+            return True
+        if if_range.startswith("W/"):
+            return False
+        return if_range in {self.headers.get("etag"), self.headers.get("last-modified")}
+
+    async def _send_pieces(self, scope: Scope, send: Send, pieces: list[bytes | tuple[int, int]]) -> None:
+        """Sends the body, made of bytes as they are and of ranges of the member's content.
+
+        Args:
+            scope: The ASGI scope of the request.
+            send: The ASGI send channel.
+            pieces: What to send, in order: bytes, or the start and end of a range of the content.
+
+        Raises:
+            RuntimeError: If the archive is shorter than its index says.
+        """
+        zerocopy = _ZEROCOPY_EXTENSION in scope.get("extensions", {})
+        file = await anyio.open_file(self.archive_path, mode="rb")
+        try:
+            for index, piece in enumerate(pieces):
+                more_body = index < len(pieces) - 1
+                if isinstance(piece, bytes):
+                    await send({"type": "http.response.body", "body": piece, "more_body": more_body})
+                    continue
+                position, stop = self.member.offset + piece[0], self.member.offset + piece[1]
+                if zerocopy:
+                    await send(
+                        {
+                            "type": _ZEROCOPY_EXTENSION,
+                            "file": file.wrapped,
+                            "offset": position,
+                            "count": stop - position,
+                            "more_body": more_body,
+                        }
+                    )
+                    continue
+                if position == stop:
+                    await send({"type": "http.response.body", "body": b"", "more_body": more_body})
+                descriptor = file.wrapped.fileno()
+                while position < stop:
+                    chunk = await anyio.to_thread.run_sync(
+                        os.pread, descriptor, min(self.chunk_size, stop - position), position
+                    )
+                    if not chunk:
+                        msg = f"The archive '{self.archive_path}' is shorter than its index says"
+                        raise RuntimeError(msg)
+                    position += len(chunk)
+                    await send({"type": "http.response.body", "body": chunk, "more_body": more_body or position < stop})
+        finally:
+            # Closing must finish even when the transfer is canceled
+            with anyio.CancelScope(shield=True):
+                await file.aclose()
+
+
+def _requested_ranges(range_header: str, size: int) -> list[tuple[int, int]] | None:
+    """Reads the ranges of bytes a ``Range`` header asks for.
+
+    Whatever is not understood is ignored rather than refused, as RFC 9110 allows, and the whole content
+    sent instead. So is a request for more ranges than any download client asks for, which only costs
+    a response split into that many parts.
+
+    Args:
+        range_header: The ``Range`` header of the request.
+        size: The size of the content.
+
+    Returns:
+        The ranges, each as its start and the end after its last byte, in order and merged where they
+        overlap. Empty if none of them is within the content, or None if the whole content is to be sent.
+    """
+    unit, _, specifications = range_header.partition("=")
+    if unit.strip().lower() != "bytes" or specifications.count(",") >= _MAX_RANGES:
+        return None
+
+    ranges: list[tuple[int, int]] = []
+    for specification in specifications.split(","):
+        first, dash, last = specification.strip().partition("-")
+        if not dash or not (first or last) or not all(bound.isdigit() for bound in (first, last) if bound):
+            return None
+        if not first:
+            # The last bytes, however many there are
+            if int(last) and size:
+                ranges.append((max(size - int(last), 0), size))
+            continue
+        start = int(first)
+        if last and int(last) < start:
+            return None
+        if start < size:
+            ranges.append((start, min(int(last) + 1, size) if last else size))
+
+    merged: list[tuple[int, int]] = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
@@ -0,0 +1,51 @@
+"""Contains what lets a client revalidate an API response instead of downloading it again.
+
+The web UI asks for the projects, their versions and the categories every time it renders a page, and
+what it is told almost never changes in between. Each of those responses carries an entity tag derived from
+the catalog generation rather than from the payload, so that answering ``304 Not Modified`` to a client that
+already holds it costs neither building nor serializing the payload.
+"""
+
+from fastapi import Request, Response, status
+
+from vdoc.constants import REVALIDATE_CACHE_CONTROL
+
+
+def _matches(if_none_match: str, etag: str) -> bool:
+    """Compares an ``If-None-Match`` header with an entity tag, the way RFC 9110 section 13.1.2 asks.
+
+    The comparison is weak: a ``W/`` prefix on either side is ignored.
+
+    Args:
+        if_none_match: The header value, ``*`` or a comma-separated list of entity tags.
+        etag: The current entity tag.
+
+    Returns:
+        True if the client holds the current representation, False otherwise.
+    """
+    if if_none_match.strip() == "*":
+        return True
+    return etag.removeprefix("W/") in {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+
+
+def revalidate(request: Request, response: Response, etag: str | None) -> Response | None:
+    """Tags a response, and answers in its place if the client already holds it.
+
+    Args:
+        request: The incoming request.
+        response: The response the route is about to fill in, which receives the validator headers.
+        etag: The entity tag of what the route would answer, or None if it cannot tell and has to answer
+            in full, for instance with an error.
+
+    Returns:
+        A ``304 Not Modified`` response to send instead, or None if the route has to answer in full.
+    """
+    if etag is None:
+        return None
+
+    headers = {"ETag": etag, "Cache-Control": REVALIDATE_CACHE_CONTROL}
+    if (if_none_match := request.headers.get("if-none-match")) is not None and _matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    response.headers.update(headers)
+    return None
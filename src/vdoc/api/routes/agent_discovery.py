@@ -4,53 +4,84 @@ from fastapi import APIRouter, Response
 from fastapi.responses import PlainTextResponse
 from starlette.requests import Request
 
+from vdoc.api.content_coding import accepted_codings
+from vdoc.api.revalidation import revalidate
 from vdoc.methods.api.agent_discovery import (
+    DiscoveryDocumentT,
+    get_discovery_document_impl,
     get_public_base_url,
-    render_llms_txt_impl,
-    render_robots_txt_impl,
-    render_sitemap_xml_impl,
 )
 
 router = APIRouter(tags=["Agent discovery"])
 
 
+def _serve(request: Request, response: Response, name: DiscoveryDocumentT, media_type: str) -> Response:
+    """Answers with a discovery document, in the smallest form the client can read.
+
+    Args:
+        request: The incoming request, which is what knows the public base URL to link to.
+        response: The response, which receives the entity tag.
+        name: The document.
+        media_type: The media type of the document.
+
+    Returns:
+        The document, or ``304 Not Modified`` if the client holds it already.
+    """
+    document = get_discovery_document_impl(name=name, base_url=get_public_base_url(request=request))
+    accepted = accepted_codings(accept_encoding=request.headers.get("accept-encoding", ""))
+    # In the order of preference, the smaller one first
+    coding = next((coding for coding in ("br", "gzip") if coding in accepted and coding in document.encoded), None)
+
+    # Every form of the document is answered for the same address, so a cache has to keep them apart
+    response.headers["Vary"] = "Accept-Encoding"
+    etag = document.etag(coding=coding)
+    if (not_modified := revalidate(request=request, response=response, etag=etag)) is not None:
+        not_modified.headers["Vary"] = response.headers["Vary"]
+        return not_modified
+
+    if coding is None:
+        return Response(content=document.content, media_type=media_type, headers=dict(response.headers))
+    response.headers["Content-Encoding"] = coding
+    return Response(content=document.encoded[coding], media_type=media_type, headers=dict(response.headers))
+
+
 @router.get("/llms.txt", response_class=PlainTextResponse)
-def get_llms_txt(request: Request) -> PlainTextResponse:
+def get_llms_txt(request: Request, response: Response) -> Response:
     """Serves the ``llms.txt`` index of everything currently published.
 
     Args:
         request: The incoming request, which is what knows the public base URL to link to.
+        response: The response, which receives the entity tag.
 
     Returns:
         The rendered ``llms.txt``.
     """
-    return PlainTextResponse(content=render_llms_txt_impl(base_url=get_public_base_url(request=request)))
+    return _serve(request=request, response=response, name="llms.txt", media_type="text/plain")
 
 
 @router.get("/sitemap.xml", response_class=Response)
-def get_sitemap_xml(request: Request) -> Response:
+def get_sitemap_xml(request: Request, response: Response) -> Response:
     """Serves the ``sitemap.xml`` listing the entry point of every published project.
 
     Args:
         request: The incoming request, which is what knows the public base URL to link to.
+        response: The response, which receives the entity tag.
 
     Returns:
         The rendered ``sitemap.xml``.
     """
-    return Response(
-        content=render_sitemap_xml_impl(base_url=get_public_base_url(request=request)),
-        media_type="application/xml",
-    )
+    return _serve(request=request, response=response, name="sitemap.xml", media_type="application/xml")
 
 
 @router.get("/robots.txt", response_class=PlainTextResponse)
-def get_robots_txt(request: Request) -> PlainTextResponse:
+def get_robots_txt(request: Request, response: Response) -> Response:
     """Serves ``robots.txt``, which points at ``llms.txt`` and at ``sitemap.xml``.
 
     Args:
         request: The incoming request, which is what knows the public base URL to link to.
+        response: The response, which receives the entity tag.
 
     Returns:
         The rendered ``robots.txt``.
     """
-    return PlainTextResponse(content=render_robots_txt_impl(base_url=get_public_base_url(request=request)))
+    return _serve(request=request, response=response, name="robots.txt", media_type="text/plain")
@@ -0,0 +1,47 @@
+"""Contains the catalog document REST API route."""
+
+from collections.abc import Sequence
+
+from fastapi import APIRouter, Request, Response
+
+from vdoc.api.revalidation import revalidate
+from vdoc.catalog import get_catalog
+from vdoc.methods.api.catalog import CatalogDocumentRenderer
+from vdoc.models.catalog import CatalogDocument
+from vdoc.models.plugins.base import Plugin
+from vdoc.settings import get_settings
+
+
+def get_router(plugins: Sequence[Plugin]) -> APIRouter:
+    """Configures the router serving the catalog document.
+
+    Args:
+        plugins: The loaded plugins, whose configuration the document carries.
+
+    Returns:
+        The FastAPI router instance.
+    """
+    router = APIRouter(prefix="/catalog", tags=["Catalog"])
+    renderer = CatalogDocumentRenderer(plugins=plugins)
+
+    @router.get("", response_model=CatalogDocument)
+    def get_catalog_document(request: Request, response: Response) -> Response:
+        """Returns every project with its versions, the categories and the active plugins' configuration.
+
+        Everything the web UI needs to render any page, in one request.
+
+        Args:
+            request: The incoming request, which may already hold the document.
+            response: The response, which receives the entity tag.
+
+        Returns:
+            The catalog document, or ``304 Not Modified`` if the client holds it already.
+        """
+        snapshot = get_catalog(get_settings().docs_dir).snapshot
+        if (not_modified := revalidate(request=request, response=response, etag=renderer.etag(snapshot))) is not None:
+            return not_modified
+        return Response(
+            content=renderer.render(snapshot), media_type="application/json", headers=dict(response.headers)
+        )
+
+    return router
@@ -0,0 +1,21 @@
+"""Contains the hot file cache REST API routes."""
+
+from fastapi import APIRouter
+
+from vdoc.methods.api.hot_files import get_hot_file_cache_statistics_impl
+from vdoc.models.hot_file_cache import HotFileCacheStatistics
+
+router = APIRouter(prefix="/hot-files", tags=["Hot files"])
+
+
+@router.get("/")
+def get_hot_file_cache_statistics() -> HotFileCacheStatistics:
+    """Reports what the cache of the files asked for most holds, and how often it had what was asked for.
+
+    Each worker process has a cache of its own, so with several of them this is what the one answering
+    has seen.
+
+    Returns:
+        The statistics of the cache.
+    """
+    return get_hot_file_cache_statistics_impl()
@@ -0,0 +1,25 @@
+"""Contains all publish job related REST API routes."""
+
+from fastapi import APIRouter
+
+from vdoc.methods.api.jobs import get_publish_job_impl
+from vdoc.models.publish_job import PublishJob
+
+router = APIRouter(prefix="/jobs", tags=["Jobs"])
+
+
+@router.get("/{job_id}")
+def get_publish_job(job_id: str) -> PublishJob:
+    """Reports on the job publishing an upload.
+
+    A client that needs the version to be live before it carries on polls this until the job either
+    succeeded or failed. Once it did, ``status_code`` and ``message`` say what the upload would have been
+    answered with had it waited.
+
+    Args:
+        job_id: The ID of the job, as the upload was answered with.
+
+    Returns:
+        The job as it currently stands.
+    """
+    return get_publish_job_impl(job_id=job_id)
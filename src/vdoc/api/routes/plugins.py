@@ -1,18 +1,23 @@
 """Contains all plugin routes."""
 
+from collections.abc import Sequence
+
 from fastapi import APIRouter
 
 from vdoc.models.plugins.base import Plugin
 
 
-def get_router() -> APIRouter:
+def get_router(plugins: Sequence[Plugin] | None = None) -> APIRouter:
     """Dynamically configures the router and loads all plugin routes.
 
+    Args:
+        plugins: The plugins, for a caller that has loaded them already. Loaded here if None.
+
     Returns:
         The FastAPI router instance.
     """
     router = APIRouter(prefix="/plugins")
-    loaded_plugins = list(Plugin.load_plugins())
+    loaded_plugins = list(Plugin.load_plugins() if plugins is None else plugins)
     for plugin in loaded_plugins:
         router.include_router(plugin.router, prefix=f"/{plugin.name}", tags=[f"Plugins.{plugin.name}"])
 
@@ -1,18 +1,26 @@
 """Contains all project category related REST API routes."""
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Request, Response
 
-from vdoc.methods.api.project_categories import list_project_categories_impl
+from vdoc.api.revalidation import revalidate
+from vdoc.methods.api.project_categories import get_project_categories_etag_impl, list_project_categories_impl
 from vdoc.models.project_category import ProjectCategory
 
 router = APIRouter(prefix="/project_categories", tags=["Project Categories"])
 
 
-@router.get("/")
-def list_project_categories() -> list[ProjectCategory]:
+@router.get("/", response_model=list[ProjectCategory])
+def list_project_categories(request: Request, response: Response) -> Response | list[ProjectCategory]:
     """Lists all available project categories.
 
+    Args:
+        request: The incoming request, which may already hold the list.
+        response: The response, which receives the entity tag.
+
     Returns:
-        A list of all available project categories.
+        A list of all available project categories, or ``304 Not Modified`` if the client holds it already.
     """
+    etag = get_project_categories_etag_impl()
+    if (not_modified := revalidate(request=request, response=response, etag=etag)) is not None:
+        return not_modified
     return list_project_categories_impl()
@@ -2,51 +2,82 @@
 
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, UploadFile
+from fastapi import APIRouter, Depends, Query, Request, Response, UploadFile, status
 from fastapi.responses import JSONResponse
 
 from vdoc.api.dependencies.auth import require_authentication
+from vdoc.api.revalidation import revalidate
+from vdoc.archives import STREAMED_ARCHIVE_TYPES
 from vdoc.methods.api.projects import (
     get_project_version_impl,
+    get_project_versions_etag_impl,
+    get_projects_etag_impl,
     list_project_versions_impl,
     list_projects_impl,
+    stream_project_version_impl,
+    submit_version_manifest_impl,
     upload_project_version_impl,
+    upload_version_blobs_impl,
 )
+from vdoc.models.manifest import MissingBlobs, VersionManifest
 from vdoc.models.project import Project
+from vdoc.models.publish_job import PublishJob
 
 router = APIRouter(prefix="/projects", tags=["Projects"])
 
 
-@router.get("/")
-def list_projects() -> list[Project]:
+@router.get("/", response_model=list[Project])
+def list_projects(request: Request, response: Response) -> Response | list[Project]:
     """Lists all available projects.
 
+    Args:
+        request: The incoming request, which may already hold the list.
+        response: The response, which receives the entity tag.
+
     Returns:
-        A list of all available projects.
+        A list of all available projects, or ``304 Not Modified`` if the client holds it already.
     """
+    if (not_modified := revalidate(request=request, response=response, etag=get_projects_etag_impl())) is not None:
+        return not_modified
     return list_projects_impl()
 
 
-@router.get("/{name}/versions/")
-def list_project_versions(name: str) -> list[str]:
-    """Lists all versions of a project.
+@router.get("/{name}/versions/", response_model=list[str])
+def list_project_versions(
+    name: str,
+    request: Request,
+    response: Response,
+    spec: Annotated[str | None, Query(description="A PEP 440 specifier set such as '>=2,<3'.")] = None,
+) -> Response | list[str]:
+    """Lists all versions of a project, or those a version specifier set admits.
+
+    Filtered on the server, so that a client looking for one release series does not have to download
+    every version and filter them itself.
 
     Args:
         name: The name of the project.
+        request: The incoming request, which may already hold the list.
+        response: The response, which receives the entity tag.
+        spec: The version specifier set. Every version if None.
 
     Returns:
-        A list of all versions of a project.
+        A list of the versions of a project, oldest first, or ``304 Not Modified`` if the client holds it
+        already.
     """
-    return list_project_versions_impl(name=name)
+    # Checks the specifier set too, so that one that is invalid is refused however the client tags it
+    etag = get_project_versions_etag_impl(name=name, spec=spec)
+    if (not_modified := revalidate(request=request, response=response, etag=etag)) is not None:
+        return not_modified
+    return list_project_versions_impl(name=name, spec=spec)
 
 
 @router.get("/{name}/versions/{version}")
 def get_project_versions(name: str, version: str) -> str:
-    """Returns the requested project version.
+    """Returns the requested project version, or the one a version alias resolves to.
 
     Args:
         name: The name of the project.
-        version: The requested version.
+        version: The requested version, or a version alias such as ``latest``, ``stable`` or ``2.x``.
 
     Returns:
         The requested project version.
@@ -54,11 +85,14 @@ def get_project_versions(name: str, version: str) -> str:
     return get_project_version_impl(name=name, version=version)
 
 
-@router.post("/{name}/versions/{version}")
+@router.post("/{name}/versions/{version}", status_code=status.HTTP_202_ACCEPTED, response_model=PublishJob)
 def upload_project_version(
     name: str, version: str, file: UploadFile, _: Annotated[str, Depends(require_authentication)]
 ) -> JSONResponse:
-    """Accepts and processes an uploaded project documentation.
+    """Accepts an uploaded project documentation, and queues publishing it.
+
+    Answered as soon as the archive is checked, rather than once it is extracted, so that uploads never
+    hold a thread the rest of the API needs for longer than that.
 
     Args:
         name: The project name.
@@ -66,6 +100,78 @@ def upload_project_version(
         file: The documentation zip file.
 
     Returns:
-        A message that the documentation has been uploaded successfully.
+        The publish job, which ``/api/jobs/<id>`` reports on.
     """
     return upload_project_version_impl(name=name, version=version, file=file)
+
+
+@router.post("/{name}/versions/{version}/manifest")
+def submit_version_manifest(
+    name: str, version: str, manifest: VersionManifest, _: Annotated[str, Depends(require_authentication)]
+) -> MissingBlobs:
+    """Takes the manifest of a version to be published, and answers which of its files the server is missing.
+
+    The first half of a delta upload: the client sends the path, size and SHA-256 digest of every file, and
+    then only the contents the server does not hold yet to ``/api/projects/<name>/versions/<version>/blobs``.
+
+    Args:
+        name: The project name.
+        version: The project version.
+        manifest: The manifest of every file of the version.
+
+    Returns:
+        The digests of the contents the server is missing.
+    """
+    return submit_version_manifest_impl(name=name, version=version, manifest=manifest)
+
+
+@router.post("/{name}/versions/{version}/blobs", status_code=status.HTTP_202_ACCEPTED, response_model=PublishJob)
+def upload_version_blobs(
+    name: str, version: str, _: Annotated[str, Depends(require_authentication)], file: UploadFile | None = None
+) -> JSONResponse:
+    """Takes the contents a version was missing, and queues assembling it from its manifest.
+
+    The second half of a delta upload.
+
+    Args:
+        name: The project name.
+        version: The project version.
+        file: A ZIP archive of the missing contents, each named by its SHA-256 digest. Left out if nothing
+            was missing.
+
+    Returns:
+        The publish job, which ``/api/jobs/<id>`` reports on.
+    """
+    return upload_version_blobs_impl(name=name, version=version, file=file)
+
+
+@router.put(
+    "/{name}/versions/{version}",
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                media_type: {"schema": {"type": "string", "format": "binary"}} for media_type in STREAMED_ARCHIVE_TYPES
+            },
+        }
+    },
+)
+async def stream_project_version(
+    name: str, version: str, request: Request, _: Annotated[str, Depends(require_authentication)]
+) -> JSONResponse:
+    """Accepts a project documentation as a tar archive in the request body, and extracts it as it arrives.
+
+    The archive may be compressed with gzip or zstd, as the ``Content-Type`` says. Unlike a ZIP archive in a
+    form, it is never written to a temporary file first.
+
+    Args:
+        name: The project name.
+        version: The project version.
+        request: The incoming request, whose body is the archive.
+
+    Returns:
+        A message that the documentation has been uploaded successfully.
+    """
+    return await stream_project_version_impl(
+        name=name, version=version, content_type=request.headers.get("content-type"), chunks=request.stream()
+    )
@@ -0,0 +1,87 @@
+"""Contains the dispatcher that hands requests for published documentation straight to the docs mount.
+
+The files of the published versions are most of what vdoc is asked for, and the docs mount is the last
+route of the app: the static file server of the web UI, the CORS middleware, and every API, discovery,
+inventory and alias route looked at each such request before the mount did. The dispatcher sits in front
+of all of that, and recognizes a request for the docs mount by the prefix of its path alone.
+
+What the mount does not answer on its own is still passed through: the alias redirects, which are routes
+of the app that share its prefix, and a request with an ``Origin``, which the CORS middleware answers.
+"""
+
+import re
+
+from fastapi import FastAPI
+from fastapi.exception_handlers import http_exception_handler
+from starlette.datastructures import Headers
+from starlette.exceptions import HTTPException
+from starlette.requests import Request
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from vdoc.constants import STATIC_PROJECTS_PREFIX, VERSION_ALIAS_PATTERN
+
+_VERSION_ALIAS = re.compile(VERSION_ALIAS_PATTERN)
+_FAST_METHODS = frozenset({"GET", "HEAD"})
+
+
+class StaticProjectsDispatcher:
+    """Serves the published documentation ahead of the app, and passes everything else to it."""
+
+    def __init__(self, app: ASGIApp, fastapi: FastAPI) -> None:
+        """Creates the dispatcher.
+
+        Args:
+            app: The application to pass everything that is not published documentation to.
+            fastapi: The FastAPI app within it, whose lifespan hands over the docs mount once it started.
+        """
+        self.app = app
+        self.fastapi = fastapi
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Answers a request for published documentation, or passes it on.
+
+        Args:
+            scope: The ASGI scope.
+            receive: The ASGI receive channel.
+            send: The ASGI send channel.
+        """
+        published_files = getattr(self.fastapi.state, "published_files", None)
+        if published_files is None or not _is_published_file_request(scope=scope):
+            await self.app(scope, receive, send)
+            return
+
+        # What the mount would have been handed, had the app's router matched it
+        root_path = scope.get("root_path", "")
+        child_scope = {
+            **scope,
+            "app_root_path": scope.get("app_root_path", root_path),
+            "root_path": f"{root_path}{STATIC_PROJECTS_PREFIX}",
+        }
+        try:
+            await published_files(child_scope, receive, send)
+        except HTTPException as error:
+            # Answered as the app answers it, which only the app's exception middleware would have done
+            response = await http_exception_handler(Request(scope=child_scope), error)
+            await response(child_scope, receive, send)
+
+
+def _is_published_file_request(scope: Scope) -> bool:
+    """Tells whether a request is one the docs mount answers on its own.
+
+    Args:
+        scope: The ASGI scope.
+
+    Returns:
+        True if it asks for a file under the docs mount, and nothing but the mount has to see it.
+    """
+    if scope["type"] != "http" or scope["method"] not in _FAST_METHODS:
+        return False
+    route_path: str = scope["path"]
+    if (root_path := scope.get("root_path", "")) and route_path.startswith(f"{root_path}/"):
+        route_path = route_path[len(root_path) :]
+    if not route_path.startswith(f"{STATIC_PROJECTS_PREFIX}/"):
+        return False
+    parts = route_path[len(STATIC_PROJECTS_PREFIX) + 1 :].split("/", 2)
+    if len(parts) > 1 and _VERSION_ALIAS.fullmatch(parts[1]):
+        return False
+    return "origin" not in Headers(scope=scope)
@@ -0,0 +1,568 @@
+"""Contains how an uploaded archive is unpacked into the directory of a version.
+
+A ZIP archive names its members in a central directory at its very end, so nothing can be extracted
+before the whole archive has arrived: the multipart parser spools it into a temporary file, and the
+members are written out of that a second time. What the central directory is good for is that every
+member can be found without reading the ones before it, so the members are extracted by several threads
+at once, each through a handle of its own. A tar archive names each member right before its
+content, so it can be extracted while the request body is still arriving, whether it is compressed as a
+whole with gzip or zstd or not at all. For an API reference of several hundred megabytes that is half
+the disk writes, and no temporary copy of the archive at all.
+
+Either way an archive is never extracted where it is going to be served from. It is extracted into a
+staging directory inside the state directory of the docs directory, which is on the same filesystem, and
+renamed into place once complete. Until then nobody sees it, neither the catalog nor a reader, and the
+rename is a single step that either happens or not, however large the version.
+
+Every file extracted is placed through the blob store in ``vdoc.blobs``, so that whatever an earlier
+version published already is linked to rather than written again.
+
+Where versions are configured to be kept as archives, a ZIP upload is not extracted at all. It is repacked
+into the one archive the version is served from, see ``vdoc.version_archives``, staged and moved into place
+the same way.
+"""
+
+from __future__ import annotations
+
+import errno
+import gzip
+import io
+import os
+import shutil
+import sys
+import tarfile
+import threading
+import zipfile
+import zlib
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import ExitStack
+from pathlib import PurePosixPath
+from typing import TYPE_CHECKING, BinaryIO, Literal
+from uuid import uuid4
+
+import anyio.from_thread
+import anyio.to_thread
+
+from vdoc.constants import PRECOMPRESSED_ENCODINGS, STAGING_DIR_NAME, STATE_DIR_NAME, VERSION_ARCHIVE_SUFFIX
+from vdoc.exceptions import UploadedFileInvalid
+from vdoc.precompression import compressed_copies, is_precompressible
+
+if sys.version_info >= (3, 14):
+    from compression import zstd
+else:
+    from backports import zstd
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator, Callable
+    from pathlib import Path
+
+    from vdoc.blobs import BlobStore
+
+ArchiveCompressionT = Literal["none", "gzip", "zstd"]
+
+STREAMED_ARCHIVE_TYPES: dict[str, ArchiveCompressionT] = {
+    "application/x-tar": "none",
+    "application/gzip": "gzip",
+    "application/x-gzip": "gzip",
+    "application/zstd": "zstd",
+}
+"""The media types a version can be uploaded as in the request body itself, and how each is compressed."""
+
+# What a truncated or corrupt archive raises, depending on where in it the damage is
+_INVALID_ARCHIVE_ERRORS = (tarfile.TarError, EOFError, zlib.error, gzip.BadGzipFile, zstd.ZstdError)
+_INVALID_ZIP_ERRORS = (zipfile.BadZipFile, EOFError, zlib.error, NotImplementedError)
+
+# Fewer members than this per thread, and starting another thread costs more than it saves
+_ZIP_MEMBERS_PER_THREAD = 64
+# What creating a file costs compared with reading the archive, in compressed bytes. Weighs the members
+# split across the threads, since most of a documentation build is files far smaller than this.
+_ZIP_MEMBER_COST = 16 * 1024
+# Text files up to this size are read into memory to be compressed while they are repacked. Larger ones are
+# copied as they are, which is also how everything else is copied, a chunk at a time.
+_REPACK_IN_MEMORY_LIMIT = 64 * 1024 * 1024
+_REPACK_CHUNK_SIZE = 1024 * 1024
+
+
+async def _next_chunk(chunks: AsyncIterator[bytes]) -> bytes | None:
+    return await anext(chunks, None)
+
+
+class _RequestBodyReader(io.RawIOBase):
+    """Reads a request body that is still arriving, from a worker thread, as a file.
+
+    ``tarfile`` reads a file, synchronously, and the body arrives as an asynchronous stream on the event
+    loop. Each read asks the event loop for the next chunk once the previous one is used up, so the body
+    is read exactly as fast as it is extracted, and never held in memory beyond the chunk at hand.
+    """
+
+    def __init__(self, chunks: AsyncIterator[bytes]) -> None:
+        super().__init__()
+        self._chunks = chunks
+        self._pending = memoryview(b"")
+        self._exhausted = False
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: memoryview) -> int:  # type: ignore[override]
+        while not self._pending and not self._exhausted:
+            chunk = anyio.from_thread.run(_next_chunk, self._chunks)
+            if chunk is None:
+                self._exhausted = True
+            else:
+                self._pending = memoryview(chunk)
+
+        size = min(len(buffer), len(self._pending))
+        buffer[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        return size
+
+
+def _extract_tar(
+    body: io.BufferedIOBase, target_path: Path, compression: ArchiveCompressionT, blobs: BlobStore
+) -> dict[str, str]:
+    """Extracts a tar archive member by member, in the order the members arrive.
+
+    Args:
+        body: The archive, as it arrives.
+        target_path: The directory to extract it into.
+        compression: How the archive is compressed as a whole.
+        blobs: The blob store to place the files through.
+
+    Raises:
+        UploadedFileInvalid: If the archive is truncated, corrupt or not an archive of that kind.
+
+    Returns:
+        The SHA-256 digest of every file placed, by its path relative to the directory.
+    """
+    target_path.mkdir(parents=True, exist_ok=True)
+    digests: dict[str, str] = {}
+    try:
+        with ExitStack() as stack:
+            source = stack.enter_context(zstd.ZstdFile(body)) if compression == "zstd" else body
+            archive = stack.enter_context(tarfile.open(fileobj=source, mode="r|gz" if compression == "gzip" else "r|"))
+            for member in archive:
+                # The data filter refuses absolute paths, links leading out of the target and device files,
+                # none of which a documentation build has any business shipping
+                if not member.isreg():
+                    archive.extract(member, path=target_path, filter="data")
+                    # Whatever it replaced is no longer the content placed there
+                    digests.pop(PurePosixPath(member.name).as_posix(), None)
+                    continue
+                accepted = tarfile.data_filter(member, str(target_path))
+                path = target_path / accepted.name
+                path.parent.mkdir(parents=True, exist_ok=True)
+                digests[path.relative_to(target_path).as_posix()] = blobs.place(
+                    source=archive.extractfile(accepted),  # type: ignore[arg-type]
+                    target=path,
+                )
+    except _INVALID_ARCHIVE_ERRORS as error:
+        raise UploadedFileInvalid(str(error) or type(error).__name__) from error
+    return digests
+
+
+async def extract_tar_stream(
+    chunks: AsyncIterator[bytes],
+    target_path: Path,
+    compression: ArchiveCompressionT,
+    blobs: BlobStore,
+    limiter: anyio.CapacityLimiter | None = None,
+) -> dict[str, str]:
+    """Extracts a tar archive into a directory while it is still arriving.
+
+    The extraction runs on a worker thread, so that writing the members never blocks the event loop.
+
+    Args:
+        chunks: The archive, as the request body delivers it.
+        target_path: The directory to extract it into. Created if it does not exist.
+        compression: How the archive is compressed as a whole.
+        blobs: The blob store to place the files through.
+        limiter: The limiter of the thread it runs on, or None for AnyIO's default one.
+
+    Returns:
+        The SHA-256 digest of every file placed, by its path relative to the directory.
+    """
+    body = io.BufferedReader(_RequestBodyReader(chunks=chunks), buffer_size=1024 * 1024)
+    return await anyio.to_thread.run_sync(_extract_tar, body, target_path, compression, blobs, limiter=limiter)
+
+
+class _PositionalReader(io.RawIOBase):
+    """Reads a file through a descriptor shared with other readers, each from a position of its own.
+
+    A file object has one position, so threads reading the same archive at once need a handle each. Reading
+    with ``os.pread`` leaves the position of the descriptor alone, so they can all share the descriptor the
+    upload was spooled to, which is a temporary file without a name that could be opened again.
+    """
+
+    def __init__(self, descriptor: int) -> None:
+        super().__init__()
+        self._descriptor = descriptor
+        self._size = os.fstat(descriptor).st_size
+        self._position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self._position, io.SEEK_END: self._size}[whence]
+        self._position = max(base + offset, 0)
+        return self._position
+
+    def readinto(self, buffer: memoryview) -> int:  # type: ignore[override]
+        content = os.pread(self._descriptor, len(buffer), self._position)
+        buffer[: len(content)] = content
+        self._position += len(content)
+        return len(content)
+
+
+def _handle_opener(source: BinaryIO) -> Callable[[], BinaryIO]:
+    """Returns how to open another handle on an archive, with a position of its own.
+
+    Args:
+        source: The archive.
+
+    Returns:
+        What opens a handle on it.
+    """
+    try:
+        descriptor = source.fileno()
+    except (OSError, ValueError):
+        pass
+    else:
+        return lambda: io.BufferedReader(_PositionalReader(descriptor=descriptor))
+
+    # Held in memory only, so its content is read once and shared by every handle
+    source.seek(0)
+    content = source.read()
+    return lambda: io.BytesIO(content)
+
+
+def _member_path(target_path: Path, name: str) -> Path | None:
+    """Returns where a member of a ZIP archive is extracted to, as ``ZipFile.extract`` would.
+
+    Args:
+        target_path: The directory the archive is extracted into.
+        name: The name of the member.
+
+    Returns:
+        The path, which never leads out of the directory, or None if the name names nothing but it.
+    """
+    parts = [part for part in name.split("/") if part not in {"", os.curdir, os.pardir}]
+    return target_path.joinpath(*parts) if parts else None
+
+
+def _split(members: list[tuple[zipfile.ZipInfo, Path]], runs: int) -> list[list[tuple[zipfile.ZipInfo, Path]]]:
+    """Splits the members of an archive into runs that take about as long as each other to extract.
+
+    Each run is a stretch of members that follow each other in the archive, so that every thread reads its
+    part of the archive from front to back.
+
+    Args:
+        members: The members, in the order of the archive, with where each is extracted to.
+        runs: How many runs to split them into at most.
+
+    Returns:
+        The runs, none of them empty.
+    """
+    split: list[list[tuple[zipfile.ZipInfo, Path]]] = [[] for _ in range(runs)]
+    share = max(sum(info.compress_size + _ZIP_MEMBER_COST for info, _ in members) / runs, 1)
+    done = 0
+    for info, path in members:
+        split[min(int(done // share), runs - 1)].append((info, path))
+        done += info.compress_size + _ZIP_MEMBER_COST
+    return [run for run in split if run]
+
+
+def _extract_members(
+    open_handle: Callable[[], BinaryIO],
+    members: list[tuple[zipfile.ZipInfo, Path]],
+    blobs: BlobStore,
+    failed: threading.Event,
+) -> dict[Path, str]:
+    """Extracts a run of members of a ZIP archive, through a handle and a ``ZipFile`` of its own.
+
+    Every member is read to its end, which is when ``ZipFile`` checks its CRC.
+
+    Args:
+        open_handle: What opens a handle on the archive.
+        members: The members, with where each is extracted to. Their directories exist already.
+        blobs: The blob store to place the files through.
+        failed: Set once any run failed, which is reason enough for the others to stop.
+
+    Returns:
+        The SHA-256 digest of every member extracted, by where it was extracted to.
+    """
+    digests = {}
+    try:
+        with open_handle() as handle, zipfile.ZipFile(file=handle, mode="r") as archive:
+            for info, path in members:
+                if failed.is_set():
+                    break
+                with archive.open(info) as source:
+                    digests[path] = blobs.place(source=source, target=path)  # type: ignore[arg-type]
+    except BaseException:
+        failed.set()
+        raise
+    return digests
+
+
+def extract_zip(source: BinaryIO, target_path: Path, threads: int, blobs: BlobStore) -> dict[str, str]:
+    """Extracts a ZIP archive, its members split across several threads.
+
+    A documentation build is tens of thousands of small files, so extracting one is mostly waiting for the
+    filesystem to create each of them. Both that and decompressing release the GIL, so threads do both at
+    once. Every directory is created up front from the central directory, so that no two threads race to
+    create the same one.
+
+    Args:
+        source: The archive.
+        target_path: The directory to extract it into. Created if it does not exist.
+        threads: How many threads to extract with at most.
+        blobs: The blob store to place the files through.
+
+    Raises:
+        UploadedFileInvalid: If the archive is truncated or corrupt, or a member fails its CRC check.
+
+    Returns:
+        The SHA-256 digest of every file placed, by its path relative to the directory.
+    """
+    open_handle = _handle_opener(source=source)
+    try:
+        with open_handle() as handle, zipfile.ZipFile(file=handle, mode="r") as archive:
+            infos = archive.infolist()
+
+        directories = {target_path}
+        # The same member twice is extracted once, as the last one, so that no two threads place the same
+        # file and which of them won is known
+        extracted: dict[Path, zipfile.ZipInfo] = {}
+        for info in infos:
+            if (path := _member_path(target_path=target_path, name=info.filename)) is None:
+                continue
+            if info.is_dir():
+                directories.add(path)
+            else:
+                directories.add(path.parent)
+                extracted[path] = info
+        members = [(info, path) for path, info in extracted.items()]
+        for directory in sorted(directories):
+            directory.mkdir(parents=True, exist_ok=True)
+
+        failed = threading.Event()
+        runs = _split(members=members, runs=max(min(threads, len(members) // _ZIP_MEMBERS_PER_THREAD), 1))
+        if len(runs) <= 1:
+            placed = [
+                _extract_members(open_handle=open_handle, members=run, blobs=blobs, failed=failed) for run in runs
+            ]
+        else:
+            with ThreadPoolExecutor(max_workers=len(runs), thread_name_prefix="vdoc-extract") as pool:
+                futures = [pool.submit(_extract_members, open_handle, run, blobs, failed) for run in runs]
+            placed = [future.result() for future in futures]
+    except _INVALID_ZIP_ERRORS as error:
+        raise UploadedFileInvalid(str(error) or type(error).__name__) from error
+    return {path.relative_to(target_path).as_posix(): digest for digests in placed for path, digest in digests.items()}
+
+
+def _member_name(name: str) -> str | None:
+    """Returns what a member of an uploaded ZIP archive is named in the archive it is repacked into.
+
+    Args:
+        name: The name of the member in the upload.
+
+    Returns:
+        The name, made safe as ``_member_path`` makes it, or None if it names nothing.
+    """
+    parts = [part for part in name.split("/") if part not in {"", os.curdir, os.pardir}]
+    return "/".join(parts) if parts else None
+
+
+def _write_pending(
+    target: zipfile.ZipFile,
+    pending: deque[tuple[zipfile.ZipInfo, Future[dict[str, bytes]]]],
+    precompressed: dict[str, dict[str, int]],
+) -> None:
+    """Writes the compressed copies of the member that waited longest for them, once they are done.
+
+    Args:
+        target: The archive being written.
+        pending: The members whose copies are being compressed, in the order they were written.
+        precompressed: The copies written so far, which those of the member are added to.
+    """
+    info, copies = pending.popleft()
+    for suffix, copy in copies.result().items():
+        target.writestr(zipfile.ZipInfo(filename=f"{info.filename}{suffix}", date_time=info.date_time), copy)
+        precompressed.setdefault(info.filename, {})[suffix] = len(copy)
+
+
+def repack_zip(source: BinaryIO, target_path: Path, threads: int) -> dict[str, dict[str, int]]:
+    """Repacks an uploaded ZIP archive into the archive a version is served from, without extracting it.
+
+    Every member is stored rather than compressed, so that its content can be served as the range of bytes
+    it is in the archive. Each text file gets its compressed copies as members next to it, as a version in
+    a directory gets them as files, compressed by a pool of threads while the rest is copied.
+
+    Args:
+        source: The uploaded archive.
+        target_path: The archive to write. Its directory exists already.
+        threads: How many threads compress at the same time.
+
+    Raises:
+        UploadedFileInvalid: If the archive is truncated or corrupt, or a member fails its CRC check.
+
+    Returns:
+        The compressed copies written, by the member they are copies of, each by its suffix with its size in
+        bytes. The version's manifest lists them, and only these are sent.
+    """
+    # The same member twice in an upload is extracted twice, the last one winning, and repacked that way
+    precompressed: dict[str, dict[str, int]] = {}
+    try:
+        source.seek(0)
+        with zipfile.ZipFile(file=source, mode="r") as archive:
+            members = {
+                name: info
+                for info in archive.infolist()
+                if not info.is_dir() and (name := _member_name(name=info.filename)) is not None
+            }
+            with (
+                zipfile.ZipFile(file=target_path, mode="w", compression=zipfile.ZIP_STORED) as target,
+                ThreadPoolExecutor(max_workers=threads, thread_name_prefix="vdoc-precompress") as pool,
+            ):
+                pending: deque[tuple[zipfile.ZipInfo, Future[dict[str, bytes]]]] = deque()
+                for name, info in members.items():
+                    stored = zipfile.ZipInfo(filename=name, date_time=info.date_time)
+                    stored.file_size = info.file_size
+                    if not is_precompressible(name=name) or info.file_size > _REPACK_IN_MEMORY_LIMIT:
+                        with archive.open(info) as member_file, target.open(stored, mode="w") as copy:
+                            shutil.copyfileobj(member_file, copy, _REPACK_CHUNK_SIZE)
+                        continue
+
+                    content = archive.read(info)
+                    target.writestr(stored, content)
+                    # Never in place of a file the upload brought itself
+                    suffixes = {
+                        suffix for suffix in PRECOMPRESSED_ENCODINGS.values() if f"{name}{suffix}" not in members
+                    }
+                    if suffixes:
+                        pending.append((stored, pool.submit(compressed_copies, content, suffixes)))
+                    # Written as they are done, so that no more contents wait in memory than the threads need
+                    while len(pending) > 2 * threads or (pending and pending[0][1].done()):
+                        _write_pending(target=target, pending=pending, precompressed=precompressed)
+                while pending:
+                    _write_pending(target=target, pending=pending, precompressed=precompressed)
+            with target_path.open("rb") as written:
+                os.fsync(written.fileno())
+    except _INVALID_ZIP_ERRORS as error:
+        raise UploadedFileInvalid(str(error) or type(error).__name__) from error
+    return precompressed
+
+
+def create_staging_directory(docs_dir: Path) -> Path:
+    """Creates an empty directory to extract an upload into before it is published.
+
+    Args:
+        docs_dir: The docs directory the upload is going to be published in.
+
+    Returns:
+        The staging directory, unique to the upload.
+    """
+    staging_path = docs_dir / STATE_DIR_NAME / STAGING_DIR_NAME / uuid4().hex
+    staging_path.mkdir(parents=True)
+    return staging_path
+
+
+def _sync(path: str | Path) -> None:
+    descriptor = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(descriptor)
+    finally:
+        os.close(descriptor)
+
+
+def _sync_tree(path: Path) -> None:
+    """Writes the directories below a directory to disk, each after the directories it lists.
+
+    Only the directories: every file of a staged version was placed through the blob store, which writes
+    it to disk already, and writing it again through its link to the blob would only write it twice.
+
+    Args:
+        path: The directory.
+    """
+    for directory, _, _ in os.walk(path, topdown=False):
+        _sync(directory)
+
+
+def publish_staged_version(staging_path: Path, target_path: Path) -> None:
+    """Moves a completely extracted version from its staging directory to where it is served from.
+
+    Everything is written to disk before the rename, so that a crash right after it cannot leave a
+    published version with files that are empty or missing, and the rename is written to disk after it.
+
+    Args:
+        staging_path: The staging directory the version was extracted into.
+        target_path: The directory the version is served from.
+
+    Raises:
+        FileExistsError: If the version was published in the meantime, by an upload that finished first.
+    """
+    _sync_tree(path=staging_path)
+    if target_path.with_name(f"{target_path.name}{VERSION_ARCHIVE_SUFFIX}").exists():
+        raise FileExistsError(errno.EEXIST, "The version is already published", str(target_path))
+    project_path = target_path.parent
+    created_project = not project_path.is_dir()
+    project_path.mkdir(parents=True, exist_ok=True)
+
+    try:
+        staging_path.rename(target_path)
+    except OSError as error:
+        # Either of them, depending on the platform, when the target is a directory that is not empty
+        if error.errno in {errno.EEXIST, errno.ENOTEMPTY} or target_path.exists():
+            raise FileExistsError(errno.EEXIST, "The version is already published", str(target_path)) from error
+        raise
+
+    _sync(project_path)
+    if created_project:
+        _sync(project_path.parent)
+
+
+def publish_version_archive(staged_path: Path, target_path: Path) -> None:
+    """Moves a completely written version archive to where it is served from.
+
+    Linked into place rather than renamed, since a link never replaces a file that exists: of two uploads
+    of the same version at the same time, the second fails rather than replacing the first.
+
+    Args:
+        staged_path: The archive, written to disk already, in a staging directory.
+        target_path: The directory the version would be served from, had it been extracted. The archive is
+            placed next to it, named by it.
+
+    Raises:
+        FileExistsError: If the version was published in the meantime, by an upload that finished first.
+    """
+    archive_path = target_path.with_name(f"{target_path.name}{VERSION_ARCHIVE_SUFFIX}")
+    project_path = target_path.parent
+    created_project = not project_path.is_dir()
+    project_path.mkdir(parents=True, exist_ok=True)
+    if target_path.exists():
+        raise FileExistsError(errno.EEXIST, "The version is already published", str(target_path))
+
+    try:
+        archive_path.hardlink_to(staged_path)
+    except FileExistsError:
+        raise
+    except OSError:
+        # No hard links on this filesystem
+        if archive_path.exists():
+            raise FileExistsError(errno.EEXIST, "The version is already published", str(target_path)) from None
+        staged_path.rename(archive_path)
+    else:
+        staged_path.unlink()
+
+    _sync(project_path)
+    if created_project:
+        _sync(project_path.parent)
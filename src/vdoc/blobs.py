@@ -0,0 +1,210 @@
+"""Contains the blob store, where every published file is kept once however many versions ship it.
+
+Consecutive versions of a project share most of their files: the theme's scripts, stylesheets and fonts,
+the images, and every page that did not change. Each version used to be a full copy of all of them. Now
+every file's content is kept once, named by its SHA-256 digest, under ``docs_dir/.vdoc/blobs/``, and a
+version's directory holds hard links to those blobs. A file that any version already published costs a
+directory entry rather than its size, both on disk and in the page cache, since all its links are one
+inode.
+
+A version's directory still looks exactly like a copy to anything that reads it, a web server serving it
+directly included. Published files must never be modified in place, which versions never are anyway:
+writing to one would change it in every version that links to it. Removing a version removes its links;
+a blob that no version links to anymore has a link count of one and can be deleted.
+
+Where a link cannot be made, because the filesystem has no hard links, or a blob is linked as often as
+the filesystem allows, the file is written as a copy of its own instead.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import shutil
+from typing import TYPE_CHECKING, BinaryIO
+from uuid import uuid4
+
+from vdoc.constants import BLOBS_DIR_NAME, STATE_DIR_NAME
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+    from pathlib import Path
+
+_logger = logging.getLogger(__name__)
+
+# Files up to this size are read into memory to be hashed before anything is written, so that content the
+# store already holds is never written at all. That is most files of a documentation build. Larger ones are
+# hashed while they are written, and the copy is dropped if it turns out the store held it already.
+_IN_MEMORY_LIMIT = 1024 * 1024
+_CHUNK_SIZE = 1024 * 1024
+
+
+class BlobStore:
+    """The blob store of one docs directory."""
+
+    def __init__(self, docs_dir: Path) -> None:
+        """Creates the store. Its directory is created with the first blob.
+
+        Args:
+            docs_dir: The directory the projects are published in.
+        """
+        self._path = docs_dir / STATE_DIR_NAME / BLOBS_DIR_NAME
+
+    def place(self, source: BinaryIO, target: Path) -> str:
+        """Places a file, as a link to the blob of its content.
+
+        Args:
+            source: The content of the file, read to its end.
+            target: Where to place the file. Its directory exists already. Replaced if it exists.
+
+        Returns:
+            The SHA-256 digest of the content, in hex, so that what the file is need not be read again.
+        """
+        digest = self.add(source=source)
+        self.link(digest=digest, target=target)
+        return digest
+
+    def add(self, source: BinaryIO) -> str:
+        """Adds a blob, unless the store holds its content already.
+
+        Args:
+            source: The content, read to its end.
+
+        Returns:
+            The SHA-256 digest of the content, in hex.
+        """
+        head = source.read(_IN_MEMORY_LIMIT + 1)
+        if len(head) > _IN_MEMORY_LIMIT:
+            return self._store_stream(head=head, source=source)
+
+        digest = hashlib.sha256(head).hexdigest()
+        if not self.has(digest=digest):
+            self._store(chunks=(head,), blob=self._blob_path(digest=digest))
+        return digest
+
+    def has(self, digest: str) -> bool:
+        """Returns whether the store holds a blob.
+
+        Args:
+            digest: The SHA-256 digest of its content, in hex.
+
+        Returns:
+            True if it does.
+        """
+        return self._blob_path(digest=digest).is_file()
+
+    def size(self, digest: str) -> int:
+        """Returns the size of a blob.
+
+        Args:
+            digest: The SHA-256 digest of its content, in hex.
+
+        Returns:
+            Its size in bytes.
+        """
+        return self._blob_path(digest=digest).stat().st_size
+
+    def add_encoded(self, digest: str, suffix: str, encode: Callable[[], bytes | None]) -> int | None:
+        """Adds a blob's content in an encoding, unless the store holds it in that encoding already.
+
+        Kept next to the blob, named by its digest and the suffix of the encoding, so that a content is
+        compressed once however many versions ship it, and publishing a version that changed a few pages
+        only compresses those.
+
+        Args:
+            digest: The SHA-256 digest of the content, in hex.
+            suffix: The suffix of the encoding, such as ``.gz``.
+            encode: What encodes the content, only called if the store does not hold it encoded yet. Returns
+                None if the content is not worth keeping in the encoding, which is then not stored at all:
+                nothing would ever link to it.
+
+        Returns:
+            The size of the content encoded, in bytes, or None if it was not worth keeping.
+        """
+        encoded = self._blob_path(digest=digest, suffix=suffix)
+        if not encoded.is_file():
+            if (content := encode()) is None:
+                return None
+            self._store(chunks=(content,), blob=encoded)
+        return encoded.stat().st_size
+
+    def link(self, digest: str, target: Path, suffix: str = "") -> None:
+        """Places a file as a link to a blob the store holds.
+
+        The file is on disk once it is placed: a link shares the blob's inode, which is on disk already, and a
+        copy is written to disk before it is left there. Publishing a version only has its directories left
+        to write to disk.
+
+        Args:
+            digest: The SHA-256 digest of its content, in hex.
+            target: Where to place the file. Its directory exists already. Replaced if it exists.
+            suffix: The suffix of the encoding to link the content in, as added by ``add_encoded``. The
+                content itself if empty.
+        """
+        blob = self._blob_path(digest=digest, suffix=suffix)
+        target.unlink(missing_ok=True)
+        try:
+            target.hardlink_to(blob)
+        except OSError:
+            # No hard links on this filesystem, or as many links to the blob as it allows
+            _logger.debug("Cannot link '%s' to '%s', copying it instead.", target, blob, exc_info=True)
+            shutil.copyfile(blob, target)
+            with target.open("rb+") as copy:
+                os.fsync(copy.fileno())
+
+    def _blob_path(self, digest: str, suffix: str = "") -> Path:
+        # Fanned out by the first two digits, so that no directory holds more than a few thousand of them
+        return self._path / digest[:2] / f"{digest}{suffix}"
+
+    def _temporary_path(self) -> Path:
+        temporary = self._path / "tmp" / uuid4().hex
+        temporary.parent.mkdir(parents=True, exist_ok=True)
+        return temporary
+
+    def _store(self, chunks: Iterable[bytes], blob: Path) -> None:
+        """Stores a blob.
+
+        Written under a name of its own and renamed once it is complete and on disk, so that a blob that
+        exists is always whole, even after a crash, however many uploads store it at once.
+
+        Args:
+            chunks: The content.
+            blob: Where to store it.
+        """
+        temporary = self._temporary_path()
+        with temporary.open("wb") as file:
+            for chunk in chunks:
+                file.write(chunk)
+            file.flush()
+            os.fsync(file.fileno())
+        blob.parent.mkdir(exist_ok=True)
+        temporary.replace(blob)
+
+    def _store_stream(self, head: bytes, source: BinaryIO) -> str:
+        """Stores a blob too large to be hashed before it is written.
+
+        Args:
+            head: What was read of the content already.
+            source: The rest of it.
+
+        Returns:
+            The SHA-256 digest of the content, in hex.
+        """
+        digest = hashlib.sha256(head)
+        temporary = self._temporary_path()
+        with temporary.open("wb") as file:
+            file.write(head)
+            while chunk := source.read(_CHUNK_SIZE):
+                digest.update(chunk)
+                file.write(chunk)
+            file.flush()
+            os.fsync(file.fileno())
+
+        blob = self._blob_path(digest=digest.hexdigest())
+        if blob.is_file():
+            temporary.unlink()
+        else:
+            blob.parent.mkdir(exist_ok=True)
+            temporary.replace(blob)
+        return digest.hexdigest()
@@ -0,0 +1,712 @@
+"""Contains the catalog, the index of everything published under a docs directory.
+
+Listing what is published used to mean listing the docs directory: a glob over it, a stat per project, and
+a walk of every project asked about. With thousands of projects that is tens of thousands of system calls
+for a single ``/api/projects/`` or ``/llms.txt``. The catalog answers the same questions from memory.
+
+It is kept in two places. In memory, as an immutable snapshot that a request reads without taking a lock,
+and in a SQLite database under the docs directory, so that a restart only has to look again at the
+projects that changed while vdoc was not running rather than at all of them.
+
+What vdoc publishes itself it records as it publishes. What appears or disappears behind its back, a
+version copied in or a directory removed by hand, is noticed on the next ``Catalog.refresh``, which runs
+on every startup and, if one is running, whenever the watcher in ``vdoc.watcher`` reports a change.
+
+Several worker processes each keep a catalog of their own, and share the database and a generation
+counter. A process that publishes moves the counter on, and every other one reads what changed the next
+time it is asked something.
+"""
+
+from __future__ import annotations
+
+import fcntl
+import logging
+import mmap
+import os
+import sqlite3
+import struct
+import threading
+from bisect import bisect_left, bisect_right
+from contextlib import closing
+from dataclasses import dataclass, field, replace
+from functools import lru_cache
+from operator import itemgetter
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Self
+
+from packaging.version import InvalidVersion, Version
+
+from vdoc.constants import (
+    CATALOG_FILE_NAME,
+    GENERATION_FILE_NAME,
+    LATEST_VERSION_ALIAS,
+    SERIES_VERSION_ALIAS_SUFFIX,
+    STABLE_VERSION_ALIAS,
+    STATE_DIR_NAME,
+    VERSION_ARCHIVE_SUFFIX,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Mapping
+    from pathlib import Path
+
+    from packaging.specifiers import SpecifierSet
+
+_logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS projects (
+    name TEXT PRIMARY KEY,
+    scanned_mtime_ns INTEGER NOT NULL,
+    generation INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS versions (
+    project TEXT NOT NULL REFERENCES projects (name) ON DELETE CASCADE,
+    directory TEXT NOT NULL,
+    PRIMARY KEY (project, directory)
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+_GENERATION_KEY = "generation"
+
+
+@dataclass(frozen=True)
+class PublishedVersions:
+    """What is published for one project, in each of the forms its readers ask for."""
+
+    ordered: tuple[tuple[Version, str], ...]
+    """Every version and the directory it is published under, oldest first, so the newest is last."""
+
+    public_forms: frozenset[str]
+    """The normalized form of each, to test a requested version against without walking them all."""
+
+    generation: int = field(default=0, compare=False)
+    """The catalog generation the project last changed at. Not part of what is published, so not compared."""
+
+    aliases: Mapping[str, str] = field(default_factory=lambda: MappingProxyType({}), compare=False)
+    """The directory each version alias resolves to. Derived from ``ordered``, so not compared either."""
+
+    archives: frozenset[str] = frozenset()
+    """The versions kept as one archive each rather than as a directory, see ``vdoc.version_archives``."""
+
+    @classmethod
+    def from_directories(cls, directories: Iterable[str], generation: int = 0) -> PublishedVersions:
+        """Builds what is published from the names of a project's version directories and archives.
+
+        A name that does not parse as a version is not one, and skipped rather than failing the whole
+        project: a stray directory must not take every version of a project offline. A version that is both
+        a directory and an archive is served from the directory.
+
+        Args:
+            directories: The names of the directories in the project directory, and of the version archives
+                with their suffix.
+            generation: The catalog generation they were read at.
+
+        Returns:
+            The published versions.
+        """
+        parsed_versions: dict[Version, str] = {}
+        archives: set[str] = set()
+        # Directories last, so that they win
+        for entry in sorted(directories, key=lambda entry: not entry.endswith(VERSION_ARCHIVE_SUFFIX)):
+            directory = entry.removesuffix(VERSION_ARCHIVE_SUFFIX)
+            try:
+                parsed_version = Version(directory)
+            except InvalidVersion:
+                continue
+            if (replaced := parsed_versions.get(parsed_version)) is not None:
+                archives.discard(replaced)
+            parsed_versions[parsed_version] = directory
+            if directory != entry:
+                archives.add(directory)
+        ordered = tuple(sorted(parsed_versions.items()))
+
+        return cls(
+            ordered=ordered,
+            public_forms=frozenset(version.public for version, _ in ordered),
+            generation=generation,
+            aliases=_resolve_aliases(ordered=ordered),
+            archives=frozenset(archives),
+        )
+
+    @property
+    def directories(self) -> tuple[str, ...]:
+        """Returns the directory of every published version, oldest first.
+
+        Returns:
+            The version directories.
+        """
+        return tuple(directory for _, directory in self.ordered)
+
+    @property
+    def entries(self) -> tuple[str, ...]:
+        """Returns the name of every published version's entry in the project directory, oldest first.
+
+        Returns:
+            The version directories, and the version archives with their suffix.
+        """
+        return tuple(
+            f"{directory}{VERSION_ARCHIVE_SUFFIX}" if directory in self.archives else directory
+            for directory in self.directories
+        )
+
+    def matching(self, specifiers: SpecifierSet) -> tuple[str, ...]:
+        """Returns the directory of every published version a PEP 440 specifier set admits, oldest first.
+
+        The versions are sorted already, so the lower bound of ``>=``, ``>`` and ``~=`` and the upper bound of
+        ``<`` narrow them down by bisection before the specifiers are applied to what is left. The other
+        operators cannot narrow it exactly -- ``<=2.0`` admits ``2.0+local``, which sorts after ``2.0`` -- and
+        are only applied.
+
+        Pre-releases are admitted as ``SpecifierSet.filter`` admits them: if the specifiers name one, or if
+        nothing else matches.
+
+        Args:
+            specifiers: The specifiers to admit versions by.
+
+        Returns:
+            The directories of the admitted versions.
+        """
+        low, high = 0, len(self.ordered)
+        for specifier in specifiers:
+            if specifier.operator in {">=", "~="}:
+                low = max(low, bisect_left(self.ordered, Version(specifier.version), key=itemgetter(0)))
+            elif specifier.operator == ">":
+                low = max(low, bisect_right(self.ordered, Version(specifier.version), key=itemgetter(0)))
+            elif specifier.operator == "<":
+                high = min(high, bisect_left(self.ordered, Version(specifier.version), key=itemgetter(0)))
+
+        candidates = dict(self.ordered[low:high])
+        return tuple(candidates[version] for version in specifiers.filter(candidates))
+
+
+def _resolve_aliases(ordered: tuple[tuple[Version, str], ...]) -> Mapping[str, str]:
+    """Resolves every version alias of a project once, when what it publishes is read.
+
+    Resolving ``stable`` or a series on request would mean walking the versions of the project on every
+    request that names one, and the web UI names one on every page it opens at an alias.
+
+    Args:
+        ordered: Every version and the directory it is published under, oldest first.
+
+    Returns:
+        The directory each alias resolves to. An alias nothing resolves to is missing.
+    """
+    if not ordered:
+        return MappingProxyType({})
+
+    aliases = {LATEST_VERSION_ALIAS: ordered[-1][1]}
+    # Oldest first, so each alias ends up at the newest final release it admits
+    for version, directory in ordered:
+        if version.is_prerelease:
+            continue
+        aliases[STABLE_VERSION_ALIAS] = directory
+        aliases[f"{version.major}{SERIES_VERSION_ALIAS_SUFFIX}"] = directory
+        aliases[f"{version.major}.{version.minor}{SERIES_VERSION_ALIAS_SUFFIX}"] = directory
+    return MappingProxyType(aliases)
+
+
+# Compared and hashed by identity: one snapshot is one state of the catalog, which is exactly what whatever is
+# derived from it wants to tell apart.
+@dataclass(frozen=True, eq=False)
+class CatalogSnapshot:
+    """Everything the catalog knows at one point in time. Replaced as a whole, never modified."""
+
+    generation: int
+    """Counts the changes to what is published, so that whatever was derived from a snapshot can tell it apart."""
+
+    projects: Mapping[str, PublishedVersions]
+    """Every project and its published versions."""
+
+
+_EMPTY = CatalogSnapshot(generation=0, projects=MappingProxyType({}))
+
+
+def _list_directories(path: Path) -> dict[str, int]:
+    """Lists the visible subdirectories of a directory and when each was last changed.
+
+    Args:
+        path: The directory to list.
+
+    Returns:
+        The name and modification time in nanoseconds of every subdirectory, or nothing if the directory
+        does not exist.
+    """
+    try:
+        with os.scandir(path) as entries:
+            return {
+                entry.name: entry.stat().st_mtime_ns
+                for entry in entries
+                if not entry.name.startswith(".") and entry.is_dir()
+            }
+    except FileNotFoundError:
+        return {}
+
+
+def _list_version_entries(path: Path) -> list[str]:
+    """Lists what may be a version in a project directory: its visible subdirectories and version archives.
+
+    Args:
+        path: The project directory.
+
+    Returns:
+        The names of the entries, or nothing if the directory does not exist.
+    """
+    try:
+        with os.scandir(path) as entries:
+            return [
+                entry.name
+                for entry in entries
+                if not entry.name.startswith(".")
+                and (entry.is_dir() or (entry.name.endswith(VERSION_ARCHIVE_SUFFIX) and entry.is_file()))
+            ]
+    except FileNotFoundError:
+        return []
+
+
+class _SharedGeneration:
+    """The catalog generation, in a file that every vdoc process on the host maps into its memory.
+
+    Each worker process keeps a catalog of its own in memory, and only the one that handled an upload knows
+    about it. This is how the others find out: reading it is a read from memory rather than a system call,
+    so that it can be asked on every request, and the kernel shares the mapped page between every process
+    that maps the file.
+    """
+
+    _FORMAT = struct.Struct("<Q")
+
+    def __init__(self, path: Path) -> None:
+        """Maps the file, creating it if it does not exist yet.
+
+        Args:
+            path: The path of the file.
+        """
+        # Kept open to lock while announcing a generation
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        if os.fstat(self._fd).st_size < self._FORMAT.size:
+            os.ftruncate(self._fd, self._FORMAT.size)
+        self._map = mmap.mmap(self._fd, self._FORMAT.size)
+
+    @property
+    def value(self) -> int:
+        """Returns the newest generation any process has written.
+
+        Returns:
+            The generation.
+        """
+        return self._FORMAT.unpack_from(self._map)[0]
+
+    def advance(self, generation: int) -> None:
+        """Announces a generation to every other process.
+
+        Only called once the generation is committed, and no longer under the database's write lock. Two
+        writers may announce theirs in either order, so the file is locked while the one announced is compared
+        and replaced, and a lower generation never moves it backwards.
+
+        Args:
+            generation: The generation just written.
+        """
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            if generation > self.value:
+                self._FORMAT.pack_into(self._map, 0, generation)
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def close(self) -> None:
+        """Unmaps the file and closes it."""
+        self._map.close()
+        os.close(self._fd)
+
+
+class Catalog:
+    """The index of every project and version published under one docs directory."""
+
+    def __init__(self, docs_dir: Path) -> None:
+        """Creates the catalog of a docs directory without reading anything yet.
+
+        Args:
+            docs_dir: The directory the projects are published in.
+        """
+        self._docs_dir = docs_dir
+        self._database = docs_dir / STATE_DIR_NAME / CATALOG_FILE_NAME
+        # Serializes writers. Readers never take it, they read whichever snapshot is current.
+        self._lock = threading.Lock()
+        self._snapshot: CatalogSnapshot | None = None
+        self._shared: _SharedGeneration | None = None
+
+    def __enter__(self) -> Self:
+        """Returns the catalog, to be closed once the block ends.
+
+        Returns:
+            The catalog.
+        """
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        """Closes the catalog."""
+        self.close()
+
+    def close(self) -> None:
+        """Lets go of the shared generation, the one thing the catalog keeps open between two calls.
+
+        A process keeps its catalog for as long as it runs, so only a catalog made for a while, as a test
+        makes one, needs closing. Asked anything after, it opens what it needs again.
+        """
+        with self._lock:
+            if self._shared is not None:
+                self._shared.close()
+                self._shared = None
+
+    @property
+    def _current(self) -> CatalogSnapshot:
+        snapshot = self._snapshot
+        if snapshot is None:
+            self.refresh()
+        elif self._shared is not None and self._shared.value > snapshot.generation:
+            # Another process published something
+            with self._lock:
+                self._catch_up()
+        return self._snapshot or _EMPTY
+
+    @property
+    def snapshot(self) -> CatalogSnapshot:
+        """Returns everything the catalog knows right now.
+
+        Returns:
+            The current snapshot, which stays as it is while the catalog moves on.
+        """
+        return self._current
+
+    @property
+    def generation(self) -> int:
+        """Returns a number that changes whenever what is published does.
+
+        Returns:
+            The catalog generation.
+        """
+        return self._current.generation
+
+    @property
+    def projects(self) -> Mapping[str, PublishedVersions]:
+        """Returns every project and its published versions.
+
+        Returns:
+            A read-only mapping of project names to their published versions.
+        """
+        return self._current.projects
+
+    def versions(self, name: str) -> PublishedVersions | None:
+        """Returns the published versions of a project.
+
+        Args:
+            name: The project name.
+
+        Returns:
+            The published versions, or None if there is no such project.
+        """
+        return self._current.projects.get(name)
+
+    @property
+    def docs_dir(self) -> Path:
+        """Returns the directory this is the catalog of.
+
+        Returns:
+            The docs directory.
+        """
+        return self._docs_dir
+
+    def refresh(self, names: Iterable[str] | None = None) -> None:
+        """Brings the catalog up to date with the docs directory.
+
+        Incremental: the versions of a project are only read again if its directory changed since they
+        were last read, which is what the operating system's modification time on it says. Everything else
+        is taken from the database, so that a restart costs a stat per project rather than a walk of each.
+
+        Args:
+            names: Only look at these projects, for a caller that knows which ones changed. A name that
+                no longer exists is removed. All of them if None.
+        """
+        with self._lock:
+            self._open_shared()
+            if names is None or self._snapshot is None:
+                self._refresh_all()
+            else:
+                self._refresh_projects(names=set(names))
+
+    def record_version(self, name: str, version: str, archived: bool = False) -> None:  # noqa: FBT001, FBT002
+        """Records a version that has just been published.
+
+        Args:
+            name: The project name.
+            version: The version, spelled as the directory it was published under.
+            archived: Whether it was published as an archive rather than as a directory.
+        """
+        if self._snapshot is None:
+            # Loaded first, so that what is written is added to what is published rather than replacing it
+            self.refresh()
+        with self._lock:
+            self._open_shared()
+            existing = (self._snapshot or _EMPTY).projects.get(name)
+            entry = f"{version}{VERSION_ARCHIVE_SUFFIX}" if archived else version
+            published = PublishedVersions.from_directories((*(existing.entries if existing else ()), entry))
+            try:
+                mtime_ns = (self._docs_dir / name).stat().st_mtime_ns
+            except FileNotFoundError:
+                mtime_ns = 0
+            self._commit(changed={name: (mtime_ns, published)}, removed=set())
+
+    def _refresh_all(self) -> None:
+        stored_generation, stored_projects = self._read_database()
+        own_generation = self._snapshot.generation if self._snapshot is not None else 0
+        self._snapshot = CatalogSnapshot(
+            generation=max(stored_generation, own_generation),
+            projects=MappingProxyType({name: published for name, (_, published) in stored_projects.items()}),
+        )
+
+        on_disk = _list_directories(path=self._docs_dir)
+        changed = {
+            name: (mtime_ns, PublishedVersions.from_directories(_list_version_entries(path=self._docs_dir / name)))
+            for name, mtime_ns in on_disk.items()
+            if name not in stored_projects or stored_projects[name][0] != mtime_ns
+        }
+        removed = stored_projects.keys() - on_disk.keys()
+
+        if changed or removed:
+            self._commit(changed=changed, removed=removed)
+
+    def _refresh_projects(self, names: set[str]) -> None:
+        projects = (self._snapshot or _EMPTY).projects
+        changed: dict[str, tuple[int, PublishedVersions]] = {}
+        removed: set[str] = set()
+        for name in names:
+            path = self._docs_dir / name
+            try:
+                mtime_ns = path.stat().st_mtime_ns
+            except FileNotFoundError:
+                mtime_ns = None
+            if mtime_ns is None or name.startswith(".") or not path.is_dir():
+                if name in projects:
+                    removed.add(name)
+                continue
+            published = PublishedVersions.from_directories(_list_version_entries(path=path))
+            if projects.get(name) != published:
+                changed[name] = (mtime_ns, published)
+
+        if changed or removed:
+            self._commit(changed=changed, removed=removed)
+
+    def _open_shared(self) -> None:
+        """Maps the shared generation, once the docs directory exists to keep it in."""
+        if self._shared is not None or not self._docs_dir.is_dir():
+            return
+        try:
+            self._database.parent.mkdir(exist_ok=True)
+            self._shared = _SharedGeneration(path=self._database.parent / GENERATION_FILE_NAME)
+        except OSError:
+            _logger.warning("Cannot share the catalog generation under '%s'.", self._database.parent, exc_info=True)
+
+    def _connect(self) -> sqlite3.Connection:
+        # Written by whichever process publishes and read by all of them. Write-ahead logging is what lets a
+        # reader open it while a writer holds it.
+        connection = sqlite3.connect(self._database, timeout=30, isolation_level=None)
+        try:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA foreign_keys=ON")
+            connection.executescript(_SCHEMA)
+        except BaseException:
+            # Busy, or not a database, which every caller gets over, and then without a connection left open
+            connection.close()
+            raise
+        return connection
+
+    def _read_database(self) -> tuple[int, dict[str, tuple[int, PublishedVersions]]]:
+        """Reads what the database last recorded.
+
+        Returns:
+            The generation it was recorded at, and every project with the modification time of its
+            directory when it was read and its published versions. Nothing, if there is no database yet
+            or it cannot be read.
+        """
+        if not self._database.is_file():
+            return 0, {}
+        try:
+            with closing(self._connect()) as connection:
+                directories = _read_versions(connection=connection, since=None)
+                projects = {
+                    name: (mtime_ns, directories[name])
+                    for name, mtime_ns in connection.execute("SELECT name, scanned_mtime_ns FROM projects")
+                }
+                return _read_generation(connection=connection), projects
+        except sqlite3.Error:
+            _logger.warning("Cannot read the catalog at '%s', rebuilding it.", self._database, exc_info=True)
+            return 0, {}
+
+    def _catch_up(self) -> None:
+        """Reads what other processes have published since this one last looked."""
+        snapshot = self._snapshot or _EMPTY
+        try:
+            with closing(self._connect()) as connection:
+                generation = _read_generation(connection=connection)
+                if generation <= snapshot.generation:
+                    return
+                projects = _merge_changes(connection=connection, projects=snapshot.projects, since=snapshot.generation)
+        except sqlite3.Error:
+            _logger.warning("Cannot read the catalog at '%s'.", self._database, exc_info=True)
+            return
+
+        self._snapshot = CatalogSnapshot(generation=generation, projects=projects)
+
+    def _commit(self, changed: Mapping[str, tuple[int, PublishedVersions]], removed: set[str]) -> None:
+        """Applies a change to what is published, in memory and in the database.
+
+        Other processes may have written since this one last looked, so whatever they wrote is read back in
+        the same transaction. What this process knows is then exactly what the database says.
+
+        The database only saves a restart the walk of every project, so failing to write it is not worth
+        failing a request over: the catalog in memory is still right, and the next startup rebuilds
+        whatever the database missed.
+
+        Args:
+            changed: The projects added or changed, with the modification time of their directory and their
+                published versions.
+            removed: The projects that no longer exist.
+        """
+        snapshot = self._snapshot or _EMPTY
+        generation = snapshot.generation + 1
+        projects: Mapping[str, PublishedVersions] = {
+            **{name: published for name, published in snapshot.projects.items() if name not in removed},
+            **{name: replace(published, generation=generation) for name, (_, published) in changed.items()},
+        }
+
+        if self._docs_dir.is_dir():
+            try:
+                generation, projects = self._write(changed=changed, removed=removed, projects=projects, since=snapshot)
+            except (sqlite3.Error, OSError):
+                _logger.warning("Cannot write the catalog at '%s'.", self._database, exc_info=True)
+
+        self._snapshot = CatalogSnapshot(
+            generation=generation, projects=MappingProxyType(dict(sorted(projects.items())))
+        )
+
+    def _write(
+        self,
+        changed: Mapping[str, tuple[int, PublishedVersions]],
+        removed: set[str],
+        projects: Mapping[str, PublishedVersions],
+        since: CatalogSnapshot,
+    ) -> tuple[int, Mapping[str, PublishedVersions]]:
+        """Writes a change to the database, and reads back what other processes wrote in the meantime.
+
+        Args:
+            changed: The projects added or changed, with the modification time of their directory and their
+                published versions.
+            removed: The projects that no longer exist.
+            projects: Every project after the change, as far as this process knows.
+            since: The snapshot the change was made to.
+
+        Returns:
+            The generation written, and every project as the database holds them.
+        """
+        self._database.parent.mkdir(exist_ok=True)
+        with closing(self._connect()) as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            generation = max(_read_generation(connection=connection), since.generation) + 1
+            connection.executemany("DELETE FROM projects WHERE name = ?", ((name,) for name in removed))
+            for name, (mtime_ns, published) in changed.items():
+                connection.execute(
+                    "INSERT INTO projects (name, scanned_mtime_ns, generation) VALUES (?, ?, ?) "
+                    "ON CONFLICT (name) DO UPDATE "
+                    "SET scanned_mtime_ns = excluded.scanned_mtime_ns, generation = excluded.generation",
+                    (name, mtime_ns, generation),
+                )
+                connection.execute("DELETE FROM versions WHERE project = ?", (name,))
+                connection.executemany(
+                    "INSERT INTO versions (project, directory) VALUES (?, ?)",
+                    ((name, entry) for entry in published.entries),
+                )
+            connection.execute(
+                "INSERT INTO meta (key, value) VALUES (?, ?) ON CONFLICT (key) DO UPDATE SET value = excluded.value",
+                (_GENERATION_KEY, generation),
+            )
+            merged = _merge_changes(connection=connection, projects=projects, since=since.generation)
+            connection.execute("COMMIT")
+            # Only once it is committed, or a failed commit leaves every worker reading a generation the
+            # database never reaches, and opening it on every request to look for it
+            if self._shared is not None:
+                self._shared.advance(generation=generation)
+
+        return generation, merged
+
+
+def _read_generation(connection: sqlite3.Connection) -> int:
+    row = connection.execute("SELECT value FROM meta WHERE key = ?", (_GENERATION_KEY,)).fetchone()
+    return row[0] if row else 0
+
+
+def _read_versions(connection: sqlite3.Connection, since: int | None) -> dict[str, PublishedVersions]:
+    """Reads the published versions of the projects that changed after a generation.
+
+    Args:
+        connection: The database connection.
+        since: The generation after which a project has to have changed to be read, or None for all.
+
+    Returns:
+        The published versions of every project read.
+    """
+    directories: dict[str, tuple[int, list[str]]] = {}
+    for name, generation, directory in connection.execute(
+        "SELECT projects.name, projects.generation, versions.directory FROM projects "
+        "LEFT JOIN versions ON versions.project = projects.name WHERE projects.generation > ?",
+        (-1 if since is None else since,),
+    ):
+        _, names = directories.setdefault(name, (generation, []))
+        if directory is not None:
+            names.append(directory)
+    return {
+        name: PublishedVersions.from_directories(names, generation=generation)
+        for name, (generation, names) in directories.items()
+    }
+
+
+def _merge_changes(
+    connection: sqlite3.Connection, projects: Mapping[str, PublishedVersions], since: int
+) -> Mapping[str, PublishedVersions]:
+    """Brings a set of projects up to date with what the database holds.
+
+    Args:
+        connection: The database connection.
+        projects: What is known, as of a generation.
+        since: That generation.
+
+    Returns:
+        What the database holds. Only the projects that changed after the generation are read in full.
+    """
+    names = {name for (name,) in connection.execute("SELECT name FROM projects")}
+    changed = _read_versions(connection=connection, since=since)
+    if unknown := names - changed.keys() - projects.keys():
+        # Only if this process had a snapshot the database never saw, after failing to write it
+        changed |= {name: published for name, published in _read_versions(connection, None).items() if name in unknown}
+    return MappingProxyType(
+        {name: changed[name] if name in changed else projects[name] for name in sorted(names)},
+    )
+
+
+@lru_cache(maxsize=8)
+def get_catalog(docs_dir: Path) -> Catalog:
+    """Returns the catalog of a docs directory, one per process.
+
+    A deployed vdoc has exactly one docs directory. Keyed by it anyway, so that a test pointing the settings
+    somewhere else gets a catalog of its own rather than the previous test's.
+
+    Args:
+        docs_dir: The directory the projects are published in.
+
+    Returns:
+        The catalog. It reads the docs directory the first time it is asked something.
+    """
+    return Catalog(docs_dir=docs_dir)
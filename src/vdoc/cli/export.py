@@ -0,0 +1,38 @@
+"""This module defines the typer export method."""
+
+import logging
+import os
+from pathlib import Path
+from typing import Annotated
+
+import typer
+
+from vdoc.export import AliasStyle
+from vdoc.methods.cli.cli_export_method import export_impl
+
+_logger = logging.getLogger(__name__)
+
+
+def _cli_export(
+    destination: Annotated[
+        Path,
+        typer.Argument(help="The directory to write the mirror to, or the one an earlier export wrote to."),
+    ],
+    base_url: Annotated[
+        str,
+        typer.Option(help="The absolute base URL the mirror is served under, such as 'https://docs.example.com'."),
+    ],
+    aliases: Annotated[
+        AliasStyle,
+        typer.Option(help="How the version aliases such as 'latest' are written: as links, or as redirect pages."),
+    ] = AliasStyle.SYMLINKS,
+    processes: Annotated[
+        int,
+        typer.Option(help="Number of processes copying versions at once.", min=1),
+    ] = os.cpu_count() or 1,
+) -> None:  # noqa: disable=D103
+    try:
+        export_impl(destination=destination, base_url=base_url, aliases=aliases, processes=processes)
+    except Exception as error:
+        _logger.exception(error)  # noqa: TRY401
+        raise typer.Exit(1) from error
@@ -7,6 +7,7 @@ import typer
 from rich.logging import RichHandler
 
 from vdoc import get_app_name, get_app_version
+from vdoc.cli.export import _cli_export
 from vdoc.cli.run import _cli_run
 from vdoc.constants import DEFAULT_API_PASSWORD, DEFAULT_API_USERNAME
 from vdoc.settings import get_settings
@@ -16,6 +17,7 @@ _logger = logging.getLogger(__name__)
 
 app = typer.Typer()
 app.command(name="run", help="Runs the application")(_cli_run)
+app.command(name="export", help="Writes a static mirror of the published documentation")(_cli_export)
 
 
 class LogLevel(StrEnum):
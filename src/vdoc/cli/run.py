@@ -20,9 +20,13 @@ def _cli_run(
         int,
         typer.Option(help="Application bind port."),
     ] = get_settings().bind_port,
+    workers: Annotated[
+        int,
+        typer.Option(help="Number of worker processes.", min=1),
+    ] = get_settings().workers,
 ) -> None:  # noqa: disable=D103
     try:
-        run_impl(bind_address=bind_address, bind_port=bind_port)
+        run_impl(bind_address=bind_address, bind_port=bind_port, workers=workers)
     except KeyboardInterrupt as error:
         raise typer.Exit(0) from error
     except Exception as error:
@@ -17,9 +17,55 @@ CONFIG_FILE_SECTION_PLUGINS = "plugins"
 
 ## ADDRESSING
 
-# Where the published files are served from, and the version alias that resolves to the newest one.
+# Where the published files are served from, and the version aliases. ``latest`` resolves to the newest
+# version, ``stable`` to the newest final release, and a series such as ``2.x`` or ``2.1.x`` to the newest
+# final release within it.
 STATIC_PROJECTS_PREFIX = "/static/projects"
 LATEST_VERSION_ALIAS = "latest"
+STABLE_VERSION_ALIAS = "stable"
+SERIES_VERSION_ALIAS_SUFFIX = ".x"
+# What every alias matches, whether or not it resolves for a project. None of them is a valid version.
+VERSION_ALIAS_PATTERN = (
+    rf"{LATEST_VERSION_ALIAS}|{STABLE_VERSION_ALIAS}|[0-9]+(?:\.[0-9]+)?\{SERIES_VERSION_ALIAS_SUFFIX}"
+)
+
+## STATE
+
+# What vdoc keeps about the docs directory, kept inside it so that it moves with the volume. Hidden, so
+# that it is never mistaken for a project, and never served.
+STATE_DIR_NAME = ".vdoc"
+CATALOG_FILE_NAME = "catalog.sqlite3"
+GENERATION_FILE_NAME = "generation"
+# Where an upload is extracted before it is published, on the same filesystem as the docs directory so
+# that publishing it is a rename
+STAGING_DIR_NAME = "staging"
+BLOBS_DIR_NAME = "blobs"
+# Where the manifest of a delta upload is kept until the contents it was missing arrive
+PENDING_MANIFESTS_DIR_NAME = "pending"
+JOBS_FILE_NAME = "jobs.sqlite3"
+# Where what every published version is made of is written when it is published, one file per version
+PUBLISHED_MANIFESTS_DIR_NAME = "manifests"
+# Where the summary of every published version is written next to it, which is all that listing one reads
+PUBLISHED_SUMMARIES_DIR_NAME = "summaries"
+# How many manifests each worker process keeps read, those of the versions it served a file of last. One
+# lists every file of its version, tens of thousands for a large one.
+PUBLISHED_MANIFEST_CACHE_SIZE = 8
+# How many summaries each worker process keeps read, enough for the latest version of every project
+PUBLISHED_SUMMARY_CACHE_SIZE = 4096
+
+## HTTP CACHING
+
+# For API responses tagged with an ETag: a client may keep them, but has to ask whether they are still
+# current before using them again, which costs a 304 when they are.
+REVALIDATE_CACHE_CONTROL = "no-cache"
+# For the files of a published version, which never change: kept for a year without ever asking again
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# For the redirect of a version alias such as `latest`, which names another version after the next upload
+ALIAS_REDIRECT_CACHE_CONTROL = "no-cache"
+# The largest file of the docs mount that is kept in memory, see `vdoc.hot_files`. What is read most, the
+# pages, stylesheets, scripts and search index of the latest versions, is far smaller, and a single large
+# file would otherwise push out hundreds of them.
+HOT_FILE_MAX_SIZE = 1024 * 1024
 
 ## AGENT DISCOVERY
 
@@ -39,12 +85,54 @@ PAGE_INVENTORY_FILES = {
     "search-index.json": "full-text search index with the title and URL of every page",
 }
 
+# How many public base URLs the rendered documents are kept for at once. The base URL comes from the
+# request's forwarded headers, which anyone can set, so it is bounded rather than trusted to be one or two.
+DISCOVERY_CACHE_BASE_URLS = 16
+
+## PUBLISHING
+
+# How long a finished publish job can still be asked about, in seconds. Long enough for any pipeline that
+# polls for it, short enough that the jobs kept never add up to anything.
+PUBLISH_JOB_RETENTION = 24 * 60 * 60
+# What a client is told to wait before uploading again when the queue is full, in seconds
+PUBLISH_QUEUE_RETRY_AFTER = 30
+
+# What a version kept as one archive is named by, next to the directories of the versions that are not
+VERSION_ARCHIVE_SUFFIX = ".zip"
+
+# The files a published version gets compressed copies of, next to each, for the docs mount to send to a
+# client that accepts them: text, which is most of a documentation build by size and compresses to a
+# fraction of it. Images and fonts are compressed already.
+PRECOMPRESSED_FILE_SUFFIXES = frozenset(
+    {".css", ".htm", ".html", ".js", ".json", ".map", ".mjs", ".svg", ".txt", ".xml"}
+)
+# The content codings they are compressed with, in the order of preference, and the suffix of each copy
+PRECOMPRESSED_ENCODINGS = {"br": ".br", "gzip": ".gz"}
+# Smaller files are not compressed at all. What little compression saves on them is lost to the headers of
+# the encoding, and a copy not worth keeping is not kept, so it would be compressed again at every upload.
+PRECOMPRESSED_MIN_SIZE = 256
+
+## STATIC EXPORT
+
+# What an export remembers of itself in the directory it wrote, to write only what changed the next time
+EXPORT_STATE_FILE_NAME = ".vdoc-export.json"
+# The file an API address ending in a slash is written to, since an object store has no directories
+EXPORT_DIRECTORY_INDEX = "index.json"
+# The page a static host answers an address it has no file for with, which is the web UI's to route
+EXPORT_NOT_FOUND_PAGE = "404.html"
+
 DEFAULT_DOCS_DIR = Path("/srv/vdoc/docs/")
 DEFAULT_CONFIG_FILE = Path("/srv/vdoc/vdoc.yaml")
 DEFAULT_API_USERNAME = b"admin"
 DEFAULT_API_PASSWORD = b"admin"
 DEFAULT_BIND_ADDRESS = "0.0.0.0"  # noqa: S104
 DEFAULT_BIND_PORT = 8080
+DEFAULT_DOCS_WATCHER_INTERVAL = 10.0
+DEFAULT_PUBLISH_CONCURRENCY = 2
+DEFAULT_PUBLISH_QUEUE_DEPTH = 16
+DEFAULT_PUBLISH_EXTRACT_THREADS = 4
+DEFAULT_HOT_FILE_CACHE_SIZE = 64 * 1024 * 1024
+DEFAULT_STATIC_OFFLOAD_LOCATION = "/_vdoc/docs/"
 
 ## PLUGIN CONSTANTS
 
@@ -4,6 +4,8 @@ from fastapi import status
 from fastapi.exceptions import HTTPException
 from packaging.version import Version
 
+from vdoc.constants import PUBLISH_QUEUE_RETRY_AFTER
+
 
 class VDocException(HTTPException):
     """Base exception class for all vdoc exceptions."""
@@ -36,6 +38,15 @@ class InvalidVersion(VDocException):
         )
 
 
+class InvalidVersionSpecifier(VDocException):
+    """Exception when a requested version specifier isn't a valid PEP 440 specifier set."""
+
+    def __init__(self, specifier: str) -> None:  # noqa: D107
+        super().__init__(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=f"'{specifier}' is not a valid version specifier."
+        )
+
+
 class InvalidProjectName(VDocException):
     """Exception when a requested project name is invalid."""
 
@@ -72,8 +83,36 @@ class ProjectVersionAlreadyExists(VDocException):
         )
 
 
+class VersionManifestNotFound(VDocException):
+    """Exception when the contents of a version are uploaded before its manifest was."""
+
+    def __init__(self, name: str, version: Version | str) -> None:  # noqa: D107
+        super().__init__(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No manifest was submitted for version '{version}' of project '{name}'.",
+        )
+
+
 class UploadedFileInvalid(VDocException):
     """Exception when the uploaded file is invalid."""
 
     def __init__(self, reason: str) -> None:  # noqa: D107
         super().__init__(status_code=status.HTTP_400_BAD_REQUEST, detail=f"The uploaded file is invalid: {reason}.")
+
+
+class PublishJobNotFound(VDocException):
+    """Exception when a publish job doesn't exist, or finished too long ago to be known anymore."""
+
+    def __init__(self, job_id: str) -> None:  # noqa: D107
+        super().__init__(status_code=status.HTTP_404_NOT_FOUND, detail=f"Publish job '{job_id}' doesn't exist.")
+
+
+class PublishQueueFull(VDocException):
+    """Exception when as many uploads are waiting to be published as the queue holds."""
+
+    def __init__(self) -> None:  # noqa: D107
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many uploads are waiting to be published, try again later.",
+            headers={"Retry-After": str(PUBLISH_QUEUE_RETRY_AFTER)},
+        )
@@ -0,0 +1,151 @@
+"""Contains the writing of a static mirror of the published documentation.
+
+A mirror is laid out the way vdoc serves it, so that a CDN or an object store can answer the addresses a
+reader and the web UI ask for, and vdoc only has to take uploads. Every version is copied once: a
+version never changes, so one the mirror holds is never written again. What does change, which version
+an alias stands for, is written again whenever it does.
+
+A static host cannot redirect an address by a pattern, so an alias is either a symbolic link to the
+directory of its version, for hosts that follow them, or a directory of small pages that redirect each
+page of the version, for hosts that do not.
+"""
+
+import html
+import logging
+import os
+import shutil
+from enum import StrEnum
+from pathlib import Path
+from urllib.parse import quote
+
+from vdoc.version_archives import get_version_archive
+
+_logger = logging.getLogger(__name__)
+
+# How much of an archive member is copied at once
+_COPY_CHUNK_SIZE = 1024 * 1024
+
+_REDIRECT_PAGE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>Redirecting to {title}</title>
+<link rel="canonical" href="{url}">
+<meta http-equiv="refresh" content="0; url={url}">
+</head>
+<body><a href="{url}">{title}</a></body>
+</html>
+"""
+
+
+class AliasStyle(StrEnum):
+    """How the aliases of the versions are written to a mirror."""
+
+    SYMLINKS = "symlinks"
+    STUBS = "stubs"
+
+    def __str__(self) -> str:
+        """String representation of the alias style.
+
+        Returns:
+            The alias style as string.
+        """
+        return self.value
+
+
+def _partial_path(target_path: Path) -> Path:
+    # Hidden, so that neither a static host nor a later export takes one that was left behind for a version
+    return target_path.with_name(f".{target_path.name}.partial")
+
+
+def _remove(path: Path) -> None:
+    """Removes a file, a link or a directory tree, if there is one.
+
+    Args:
+        path: What to remove.
+    """
+    if path.is_symlink() or path.is_file():
+        path.unlink()
+    elif path.is_dir():
+        shutil.rmtree(path)
+
+
+def export_version(source_path: Path, archive_path: Path | None, target_path: Path) -> int:
+    """Copies a published version into a mirror.
+
+    Written next to its place first and moved there once complete, so that an export that is interrupted
+    leaves no version in the mirror that is missing files. Runs in a process of its own, so everything it
+    needs is in its arguments.
+
+    Args:
+        source_path: The directory of the version in the docs directory.
+        archive_path: The archive the version is kept as, or None if it is kept as a directory.
+        target_path: The directory of the version in the mirror.
+
+    Returns:
+        How many files were copied.
+    """
+    partial_path = _partial_path(target_path=target_path)
+    _remove(partial_path)
+
+    if archive_path is None:
+        shutil.copytree(source_path, partial_path)
+        copied = sum(len(file_names) for _, _, file_names in os.walk(partial_path))
+    else:
+        archive = get_version_archive(path=archive_path)
+        partial_path.mkdir(parents=True)
+        with archive_path.open("rb") as archive_file:
+            for name, member in archive.members.items():
+                file_path = partial_path / name
+                file_path.parent.mkdir(parents=True, exist_ok=True)
+                with file_path.open("wb") as file:
+                    for offset in range(member.offset, member.offset + member.size, _COPY_CHUNK_SIZE):
+                        size = min(_COPY_CHUNK_SIZE, member.offset + member.size - offset)
+                        file.write(os.pread(archive_file.fileno(), size, offset))
+        copied = len(archive.members)
+
+    _remove(target_path)
+    partial_path.rename(target_path)
+    return copied
+
+
+def write_alias(project_path: Path, alias: str, version: str, style: AliasStyle) -> None:
+    """Writes an alias of a version that is in the mirror already, replacing what it stood for before.
+
+    Redirect pages are only written for the pages of the version. Its other files are reached by the
+    address of the version itself, which is what every page links them by.
+
+    Args:
+        project_path: The directory of the project in the mirror.
+        alias: The alias, such as ``latest``.
+        version: The version it stands for.
+        style: How it is written.
+    """
+    alias_path = project_path / alias
+    partial_path = _partial_path(target_path=alias_path)
+    _remove(partial_path)
+
+    if style is AliasStyle.SYMLINKS:
+        partial_path.symlink_to(version, target_is_directory=True)
+    else:
+        version_path = project_path / version
+        partial_path.mkdir()
+        for page_path in version_path.rglob("*.html"):
+            relative_path = page_path.relative_to(version_path)
+            url = "../" * len(relative_path.parts) + quote(f"{version}/{relative_path.as_posix()}")
+            stub_path = partial_path / relative_path
+            stub_path.parent.mkdir(parents=True, exist_ok=True)
+            stub_path.write_text(_REDIRECT_PAGE.format(url=html.escape(url), title=html.escape(version)))
+
+    _remove(alias_path)
+    partial_path.rename(alias_path)
+
+
+def remove_from_mirror(path: Path) -> None:
+    """Removes a version or an alias that is no longer published from a mirror.
+
+    Args:
+        path: Its directory, or link, in the mirror.
+    """
+    _logger.info("Removing '%s', which is no longer published", path)
+    _remove(path)
@@ -0,0 +1,129 @@
+"""Contains the cache of the files of the docs mount that are read most, kept in memory.
+
+Most requests for documentation are for a few files: the pages of the latest versions, their stylesheets
+and scripts, and their search index. Served from the disk, each of them costs finding the file, a look at
+its status, opening and reading it, every time. The cache keeps the responses for the files read most,
+their content and the headers they are sent with, in memory, each in every form it was asked for, so that
+sending one again costs a dictionary lookup.
+
+Nothing is ever stale for long: a file of a published version never changes, and a response is kept with
+the catalog generation its project was at, so that one removed or replaced by hand is read again once the
+catalog noticed. Once the cache holds as many bytes as configured, the file read least recently goes first.
+
+Each worker process has a cache of its own, and counts its own hits and misses.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import TYPE_CHECKING
+
+from vdoc.models.hot_file_cache import HotFileCacheStatistics
+
+if TYPE_CHECKING:
+    from collections.abc import Hashable, Mapping
+    from pathlib import Path
+
+
+@dataclass(frozen=True, slots=True)
+class HotFile:
+    """The response for a file of the docs mount, as it is kept in memory."""
+
+    body: bytes
+    """The content sent, in the form it was asked for."""
+
+    headers: Mapping[str, str]
+    """The headers it is sent with."""
+
+    generation: int
+    """The catalog generation the project of the file was at when it was read."""
+
+
+class HotFileCache:
+    """Keeps the responses for the files of the docs mount read most, up to a number of bytes."""
+
+    def __init__(self, capacity: int) -> None:
+        """Creates an empty cache.
+
+        Args:
+            capacity: How many bytes of content it keeps at most.
+        """
+        self.capacity = capacity
+        self._files: OrderedDict[Hashable, HotFile] = OrderedDict()
+        self._size = 0
+        self._hits = 0
+        self._misses = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, generation: int) -> HotFile | None:
+        """Returns a response that is kept, and counts whether there was one.
+
+        Args:
+            key: What the response was kept by: the requested path, and what form of it.
+            generation: The catalog generation the project of the file is at now.
+
+        Returns:
+            The response, or None if there is none, or none read at that generation.
+        """
+        with self._lock:
+            hot_file = self._files.get(key)
+            if hot_file is not None and hot_file.generation != generation:
+                self._remove(key=key)
+                hot_file = None
+            if hot_file is None:
+                self._misses += 1
+                return None
+            self._files.move_to_end(key)
+            self._hits += 1
+            return hot_file
+
+    def put(self, key: Hashable, hot_file: HotFile) -> None:
+        """Keeps a response, making room for it by dropping the ones read least recently.
+
+        Args:
+            key: What the response is kept by.
+            hot_file: The response.
+        """
+        if len(hot_file.body) > self.capacity:
+            return
+        with self._lock:
+            if key in self._files:
+                self._remove(key=key)
+            self._files[key] = hot_file
+            self._size += len(hot_file.body)
+            while self._size > self.capacity:
+                self._remove(key=next(iter(self._files)))
+
+    def statistics(self) -> HotFileCacheStatistics:
+        """Reports what the cache holds, and how often it had what was asked for.
+
+        Returns:
+            The statistics of this process's cache.
+        """
+        with self._lock:
+            return HotFileCacheStatistics(
+                capacity=self.capacity, size=self._size, files=len(self._files), hits=self._hits, misses=self._misses
+            )
+
+    def _remove(self, key: Hashable) -> None:
+        self._size -= len(self._files.pop(key).body)
+
+
+@lru_cache(maxsize=8)
+def get_hot_file_cache(docs_dir: Path, capacity: int) -> HotFileCache:  # noqa: ARG001
+    """Returns the hot file cache of a docs directory, one per process.
+
+    Keyed by everything it is configured with, for the same reason as ``get_catalog``: so that a test
+    serving another directory, or configuring it differently, gets a cache of its own.
+
+    Args:
+        docs_dir: The directory the projects are published in, only part of the cache key.
+        capacity: How many bytes of content it keeps at most.
+
+    Returns:
+        The hot file cache.
+    """
+    return HotFileCache(capacity=capacity)
@@ -6,21 +6,33 @@ is actually published, so an upload is enough to appear in them. The "Agent and
 of the documentation says what they contain.
 """
 
-from collections.abc import Sequence
+import gzip
+import hashlib
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Mapping, Sequence
+from dataclasses import dataclass
 from functools import partial
+from types import MappingProxyType
+from typing import Literal
 
+import brotli
 from jinja2 import Environment, PackageLoader, select_autoescape
 from starlette.requests import Request
 
+from vdoc.catalog import CatalogSnapshot, get_catalog
 from vdoc.constants import (
     DEFAULT_SITE_TITLE,
+    DISCOVERY_CACHE_BASE_URLS,
     LATEST_VERSION_ALIAS,
     PAGE_INVENTORY_FILES,
     STATIC_PROJECTS_PREFIX,
 )
 from vdoc.models.plugins.site import SitePlugin
-from vdoc.models.project import Project
-from vdoc.settings import get_settings
+from vdoc.models.project import Project, ProjectRecord
+from vdoc.settings import VDocSettings, get_settings
+
+DiscoveryDocumentT = Literal["llms.txt", "sitemap.xml", "robots.txt"]
 
 _UNCATEGORIZED_SECTION_TITLE = "Projects"
 
@@ -61,7 +73,7 @@ def get_public_base_url(request: Request) -> str:
     return f"{scheme}://{host}"
 
 
-def _sections(projects: Sequence[Project]) -> list[tuple[str, list[Project]]]:
+def _sections(projects: Sequence[ProjectRecord]) -> list[tuple[str, list[ProjectRecord]]]:
     """Groups projects into their configured categories, in the order the categories are configured.
 
     Projects without a category are collected into a trailing section, so that a partially categorized
@@ -74,7 +86,7 @@ def _sections(projects: Sequence[Project]) -> list[tuple[str, list[Project]]]:
         The title of each section and the projects in it, skipping the sections no project belongs to.
     """
 
-    def members(category_id: int | None) -> list[Project]:
+    def members(category_id: int | None) -> list[ProjectRecord]:
         # By display name, because that is the name the reader sees in the list
         return sorted(
             (project for project in projects if project.category_id == category_id),
@@ -88,7 +100,7 @@ def _sections(projects: Sequence[Project]) -> list[tuple[str, list[Project]]]:
     return [(title, section_projects) for title, section_projects in sections if section_projects]
 
 
-def _static_url(base_url: str, project: Project, file_name: str) -> str:
+def _static_url(base_url: str, project: ProjectRecord, file_name: str) -> str:
     """Returns the address a file of a project's newest version is served at.
 
     Both documents link the same addresses, so both compose them here.
@@ -104,7 +116,7 @@ def _static_url(base_url: str, project: Project, file_name: str) -> str:
     return f"{base_url}{STATIC_PROJECTS_PREFIX}/{project.name}/{project.latest}/{file_name}"
 
 
-def _inventories(projects: Sequence[Project]) -> list[tuple[Project, str, str]]:
+def _inventories(projects: Sequence[ProjectRecord]) -> list[tuple[ProjectRecord, str, str]]:
     """Collects the page inventories the newest version of each project actually ships.
 
     Args:
@@ -121,7 +133,7 @@ def _inventories(projects: Sequence[Project]) -> list[tuple[Project, str, str]]:
     ]
 
 
-def _entry_points(projects: Sequence[Project], base_url: str) -> list[tuple[str, str]]:
+def _entry_points(projects: Sequence[ProjectRecord], base_url: str) -> list[tuple[str, str]]:
     """Collects the static address a crawler should enter each project at, and when it last changed.
 
     The newest version only. Every superseded version says nearly the same thing at a different address,
@@ -198,3 +210,126 @@ def render_robots_txt_impl(base_url: str) -> str:
         base_url=base_url,
         static_prefix=STATIC_PROJECTS_PREFIX,
     )
+
+
+@dataclass(frozen=True)
+class RenderedDocument:
+    """A discovery document as it is sent: rendered once, and compressed once per encoding."""
+
+    content: bytes
+    """The document, uncompressed."""
+
+    encoded: Mapping[str, bytes]
+    """The document in each content coding that makes it smaller, by the coding's name."""
+
+    digest: str
+    """The SHA-256 digest of the document, uncompressed, in hex. Every worker process agrees on it."""
+
+    def etag(self, coding: str | None = None) -> str:
+        """Returns the strong entity tag of the document in a content coding.
+
+        Each coding has a tag of its own, since the bytes sent differ, as a strong tag says they do not.
+
+        Args:
+            coding: The content coding the document is sent in, or None if it is sent as it is.
+
+        Returns:
+            The entity tag, quoted.
+        """
+        return f'"{self.digest[:32]}-{coding}"' if coding else f'"{self.digest[:32]}"'
+
+    @classmethod
+    def from_text(cls, text: str) -> "RenderedDocument":
+        """Encodes and compresses a rendered document.
+
+        Args:
+            text: The rendered document.
+
+        Returns:
+            The document, ready to be sent.
+        """
+        content = text.encode()
+        candidates = {"br": brotli.compress(content), "gzip": gzip.compress(content, mtime=0)}
+        return cls(
+            content=content,
+            encoded=MappingProxyType({coding: body for coding, body in candidates.items() if len(body) < len(content)}),
+            digest=hashlib.sha256(content).hexdigest(),
+        )
+
+
+class _RenderCache:
+    """Keeps each discovery document, per public base URL, until the catalog or the settings change.
+
+    Crawlers fetch these documents far more often than anything is published, and rendering one lists
+    every project, stats the newest version of each and looks for every page inventory in it. Between two
+    changes of the catalog each document is rendered once per base URL, and a repeat fetch is a lookup.
+
+    The base URL comes from headers any client can set, so only the most recently used ones are kept.
+    """
+
+    def __init__(self, max_base_urls: int) -> None:
+        self._max_base_urls = max_base_urls
+        self._lock = threading.Lock()
+        self._state: tuple[CatalogSnapshot, VDocSettings] | None = None
+        self._documents: OrderedDict[tuple[str, DiscoveryDocumentT], RenderedDocument] = OrderedDict()
+
+    def get(
+        self, name: DiscoveryDocumentT, base_url: str, render: Callable[[str], str], snapshot: CatalogSnapshot
+    ) -> RenderedDocument:
+        """Returns a document, rendering it only if it is not kept for the current state.
+
+        Args:
+            name: The document.
+            base_url: The absolute base URL of this vdoc instance, without a trailing slash.
+            render: Renders the document for a base URL.
+            snapshot: The current catalog snapshot.
+
+        Returns:
+            The rendered document.
+        """
+        settings, key = get_settings(), (base_url, name)
+        with self._lock:
+            if not self._holds(snapshot=snapshot, settings=settings):
+                self._state = (snapshot, settings)
+                self._documents.clear()
+            elif (document := self._documents.get(key)) is not None:
+                self._documents.move_to_end(key)
+                return document
+
+        # Rendered outside the lock, so that one slow render does not hold up the lookups of every other
+        # request. Two requests rendering the same document at once both get a correct one.
+        document = RenderedDocument.from_text(text=render(base_url))
+        with self._lock:
+            # Kept only if nothing changed meanwhile, which would have made it stale already
+            if self._holds(snapshot=snapshot, settings=settings):
+                self._documents[key] = document
+                # Three documents per base URL
+                while len(self._documents) > self._max_base_urls * 3:
+                    self._documents.popitem(last=False)
+        return document
+
+    def _holds(self, snapshot: CatalogSnapshot, settings: VDocSettings) -> bool:
+        return self._state is not None and self._state[0] is snapshot and self._state[1] is settings
+
+
+_rendered = _RenderCache(max_base_urls=DISCOVERY_CACHE_BASE_URLS)
+
+_RENDERERS: Mapping[DiscoveryDocumentT, Callable[[str], str]] = {
+    "llms.txt": render_llms_txt_impl,
+    "sitemap.xml": render_sitemap_xml_impl,
+    "robots.txt": render_robots_txt_impl,
+}
+
+
+def get_discovery_document_impl(name: DiscoveryDocumentT, base_url: str) -> RenderedDocument:
+    """Returns a discovery document, rendered at most once per state of the catalog and base URL.
+
+    Args:
+        name: The document.
+        base_url: The absolute base URL of this vdoc instance, without a trailing slash.
+
+    Returns:
+        The rendered document.
+    """
+    snapshot = get_catalog(get_settings().docs_dir).snapshot
+    return _rendered.get(name=name, base_url=base_url, render=_RENDERERS[name], snapshot=snapshot)
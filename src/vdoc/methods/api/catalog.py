@@ -0,0 +1,88 @@
+"""Contains the catalog document REST API methods."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from typing import TYPE_CHECKING
+
+from vdoc.models.catalog import CatalogDocument, CatalogProject
+from vdoc.models.project import Project
+from vdoc.settings import get_settings
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+    from typing import Any
+
+    from vdoc.catalog import CatalogSnapshot
+    from vdoc.models.plugins.base import Plugin
+    from vdoc.settings import VDocSettings
+
+
+class CatalogDocumentRenderer:
+    """Renders the catalog document, once per state of the catalog.
+
+    The web UI used to ask for the projects, the categories, the versions of the project on screen and the
+    configuration of each plugin in requests of their own, which on a slow link is a round trip each before
+    anything renders. The document answers all of them at once.
+
+    It is serialized once per catalog snapshot and settings instance and served as those bytes until
+    either changes. The plugins are configured when the app starts, so their part is serialized only then.
+    """
+
+    def __init__(self, plugins: Sequence[Plugin]) -> None:
+        """Creates a renderer for the plugins of one app.
+
+        Args:
+            plugins: The loaded plugins. Only the active ones are listed.
+        """
+        self._plugins: dict[Any, dict[str, Any]] = {
+            plugin.name: plugin.model_dump(mode="json") for plugin in plugins if plugin.active
+        }
+        serialized = json.dumps(self._plugins, sort_keys=True).encode()
+        self._plugins_tag = hashlib.sha256(serialized).hexdigest()[:16]
+        self._rendered: tuple[CatalogSnapshot, VDocSettings, bytes] | None = None
+
+    def etag(self, snapshot: CatalogSnapshot) -> str:
+        """Returns the entity tag of the document a snapshot renders to, without rendering it.
+
+        Args:
+            snapshot: The catalog snapshot.
+
+        Returns:
+            The entity tag, quoted.
+        """
+        return f'"catalog-{snapshot.generation}-{get_settings().presentation_tag}-{self._plugins_tag}"'
+
+    def render(self, snapshot: CatalogSnapshot) -> bytes:
+        """Returns the document a snapshot renders to, serialized.
+
+        Args:
+            snapshot: The catalog snapshot.
+
+        Returns:
+            The document as JSON.
+        """
+        settings = get_settings()
+        rendered = self._rendered
+        if rendered is None or rendered[0] is not snapshot or rendered[1] is not settings:
+            rendered = self._rendered = (snapshot, settings, self._build(snapshot=snapshot).model_dump_json().encode())
+        return rendered[2]
+
+    def _build(self, snapshot: CatalogSnapshot) -> CatalogDocument:
+        return CatalogDocument(
+            generation=snapshot.generation,
+            projects=[
+                CatalogProject(
+                    name=record.name,
+                    display_name=record.display_name,
+                    category_id=record.category_id,
+                    versions=list(record.versions),
+                    latest=record.latest if record.published.ordered else None,
+                    aliases=dict(record.published.aliases),
+                )
+                for record in Project.records(snapshot=snapshot).values()
+            ],
+            categories=get_settings().project_categories,
+            plugins=self._plugins,
+        )
@@ -0,0 +1,15 @@
+"""Contains all hot file cache REST API methods."""
+
+from vdoc.hot_files import get_hot_file_cache
+from vdoc.models.hot_file_cache import HotFileCacheStatistics
+from vdoc.settings import get_settings
+
+
+def get_hot_file_cache_statistics_impl() -> HotFileCacheStatistics:
+    """Returns the statistics of the hot file cache of the process answering.
+
+    Returns:
+        What the cache holds, and how often it had what was asked for.
+    """
+    settings = get_settings()
+    return get_hot_file_cache(docs_dir=settings.docs_dir, capacity=settings.hot_file_cache_size).statistics()
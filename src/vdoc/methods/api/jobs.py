@@ -0,0 +1,27 @@
+"""Contains all publish job REST API methods."""
+
+from vdoc.exceptions import PublishJobNotFound
+from vdoc.models.publish_job import PublishJob
+from vdoc.publish_queue import get_publish_queue
+from vdoc.settings import get_settings
+
+
+def get_publish_job_impl(job_id: str) -> PublishJob:
+    """Returns a publish job.
+
+    Args:
+        job_id: The ID of the job.
+
+    Raises:
+        PublishJobNotFound: If there is no such job, or it finished too long ago to be known anymore.
+
+    Returns:
+        The job as it currently stands.
+    """
+    settings = get_settings()
+    queue = get_publish_queue(
+        docs_dir=settings.docs_dir, concurrency=settings.publish_concurrency, queue_depth=settings.publish_queue_depth
+    )
+    if (job := queue.get(job_id=job_id)) is None:
+        raise PublishJobNotFound(job_id=job_id)
+    return job
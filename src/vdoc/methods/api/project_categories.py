@@ -11,3 +11,14 @@ def list_project_categories_impl() -> list[ProjectCategory]:
         A list of all projects.
     """
     return get_settings().project_categories
+
+
+def get_project_categories_etag_impl() -> str:
+    """Returns the entity tag of the list of project categories.
+
+    The categories are configured, so they only change with the settings.
+
+    Returns:
+        The entity tag, quoted.
+    """
+    return f'"categories-{get_settings().presentation_tag}"'
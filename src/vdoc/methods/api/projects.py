@@ -1,16 +1,50 @@
 """Contains all projects REST API methods."""
 
+import hashlib
+import os
 import re
 import shutil
 import zipfile
+import zlib
+from collections.abc import AsyncIterator, Callable, Mapping
+from functools import partial
+from pathlib import Path
+from typing import BinaryIO
+from uuid import uuid4
 
+import anyio.to_thread
 from fastapi import UploadFile, status
 from fastapi.responses import JSONResponse
+from packaging.specifiers import InvalidSpecifier, SpecifierSet
 from packaging.version import InvalidVersion as PackagingInvalidVersion
 from packaging.version import Version
 
-from vdoc.exceptions import InvalidProjectName, InvalidVersion, ProjectVersionAlreadyExists, UploadedFileInvalid
-from vdoc.models.project import Project, invalidate_published_versions
+from vdoc.archives import (
+    STREAMED_ARCHIVE_TYPES,
+    create_staging_directory,
+    extract_tar_stream,
+    extract_zip,
+    publish_staged_version,
+    publish_version_archive,
+    repack_zip,
+)
+from vdoc.blobs import BlobStore
+from vdoc.catalog import get_catalog
+from vdoc.constants import PENDING_MANIFESTS_DIR_NAME, STATE_DIR_NAME, VERSION_ARCHIVE_SUFFIX
+from vdoc.exceptions import (
+    InvalidProjectName,
+    InvalidVersion,
+    InvalidVersionSpecifier,
+    ProjectVersionAlreadyExists,
+    PublishQueueFull,
+    UploadedFileInvalid,
+    VersionManifestNotFound,
+)
+from vdoc.models.manifest import MissingBlobs, VersionManifest
+from vdoc.models.project import Project
+from vdoc.precompression import precompress_version
+from vdoc.publish_queue import get_publish_queue, get_stream_limiter
+from vdoc.published_manifests import build_archive_manifest, build_directory_manifest, write_published_manifest
 from vdoc.settings import get_settings
 
 
@@ -23,16 +57,70 @@ def list_projects_impl() -> list[Project]:
     return Project.list()
 
 
-def list_project_versions_impl(name: str) -> list[str]:
-    """Lists all available versions of a project.
+def get_projects_etag_impl() -> str:
+    """Returns the entity tag of the list of projects.
+
+    It changes whenever a project is added, removed or gains a version, which is what the catalog
+    generation counts, and whenever the settings present a project differently.
+
+    Returns:
+        The entity tag, quoted.
+    """
+    settings = get_settings()
+    return f'"projects-{get_catalog(settings.docs_dir).generation}-{settings.presentation_tag}"'
+
+
+def _specifier_set(spec: str) -> SpecifierSet:
+    try:
+        return SpecifierSet(spec)
+    except InvalidSpecifier as error:
+        raise InvalidVersionSpecifier(specifier=spec) from error
+
+
+def get_project_versions_etag_impl(name: str, spec: str | None = None) -> str | None:
+    """Returns the entity tag of the list of versions of a project, or of those a specifier set admits.
+
+    Derived from the generation the project itself last changed at, so that publishing to one project
+    does not make every client download the versions of every other one again, and from the specifier
+    set as it normalizes, so that each filtered list is tagged apart from the others.
+
+    Args:
+        name: The project name.
+        spec: A specifier set such as ``>=2,<3``. Every version if None.
+
+    Raises:
+        InvalidVersionSpecifier: If the specifier set is of an invalid format, which no tag stands for.
+
+    Returns:
+        The entity tag, quoted, or None if there is no such project.
+    """
+    if (published := get_catalog(get_settings().docs_dir).versions(name)) is None:
+        return None
+    if spec is None:
+        return f'"versions-{published.generation}"'
+    # Hashed, since a specifier set has commas in it, which separate the tags a client sends back
+    specifiers = hashlib.sha256(str(_specifier_set(spec=spec)).encode()).hexdigest()[:16]
+    return f'"versions-{published.generation}-{specifiers}"'
+
+
+def list_project_versions_impl(name: str, spec: str | None = None) -> list[str]:
+    """Lists all available versions of a project, or those a PEP 440 specifier set admits.
 
     Args:
         name: The project name.
+        spec: A specifier set such as ``>=2,<3``. Every version if None.
+
+    Raises:
+        InvalidVersionSpecifier: If the specifier set is of an invalid format.
 
     Returns:
-        A list of all available versions of the project.
+        A list of the available versions of the project, oldest first.
     """
-    return list(Project(name=name).versions.values())
+    project = Project(name=name)
+    if spec is None:
+        return list(project.versions.values())
+
+    return list(project.versions_matching(specifiers=_specifier_set(spec=spec)))
 
 
 def get_project_version_impl(name: str, version: str) -> str:
@@ -49,25 +137,20 @@ def get_project_version_impl(name: str, version: str) -> str:
     return parsed_version
 
 
-def upload_project_version_impl(name: str, version: str, file: UploadFile) -> JSONResponse:
-    """Processes the uploaded documentation.
+def _new_version_path(name: str, version: str) -> Path:
+    """Validates where an uploaded version is to be published, before anything of it is read.
 
     Args:
         name: The project name.
         version: The version of the project.
-        file: The uploaded file.
 
     Raises:
         InvalidProjectName: If the project name is invalid.
         InvalidVersion: If the project version is invalid.
         ProjectVersionAlreadyExists: If the uploaded version already exists for the project.
-        UploadedFileInvalid: If the uploaded file's content type is invalid.
-        UploadedFileInvalid: If the uploaded file's name is invalid.
-        UploadedFileInvalid: If the uploaded documentation ZIP is invalid.
-        UploadedFileInvalid: If the uploaded documentation ZIP doesn't contain an index.html file.
 
     Returns:
-        _description_
+        The directory the version is to be published in.
     """
     if not re.match(r"^[a-zA-Z0-9_-]+$", name):
         raise InvalidProjectName(name=name)
@@ -78,9 +161,99 @@ def upload_project_version_impl(name: str, version: str, file: UploadFile) -> JS
 
     target_path = get_settings().docs_dir / name / version
 
-    if target_path.is_dir():
+    if target_path.is_dir() or target_path.with_name(f"{version}{VERSION_ARCHIVE_SUFFIX}").is_file():
         raise ProjectVersionAlreadyExists(name=name, version=version)
 
+    return target_path
+
+
+def _publish(staging_path: Path, target_path: Path, name: str, version: str, digests: Mapping[str, str]) -> str:
+    """Publishes a version that was extracted completely, and tells the catalog about it.
+
+    Args:
+        staging_path: The staging directory the version was extracted into.
+        target_path: The directory the version is to be published in.
+        name: The project name.
+        version: The version of the project.
+        digests: The SHA-256 digests of its files, as extracting them placed them, so that neither
+            compressing nor describing them hashes them again.
+
+    Raises:
+        ProjectVersionAlreadyExists: If another upload of the same version finished first.
+
+    Returns:
+        The message to tell the client that uploaded the version.
+    """
+    # Here rather than in each kind of upload, so that every version is published with its compressed copies
+    settings = get_settings()
+    precompressed = precompress_version(
+        path=staging_path,
+        blobs=BlobStore(docs_dir=settings.docs_dir),
+        threads=settings.publish_extract_threads,
+        digests=digests,
+    )
+    manifest = build_directory_manifest(
+        path=staging_path, threads=settings.publish_extract_threads, precompressed=precompressed, digests=digests
+    )
+    try:
+        publish_staged_version(staging_path=staging_path, target_path=target_path)
+    except FileExistsError as error:
+        raise ProjectVersionAlreadyExists(name=name, version=version) from error
+    # Only once the version is in place, so that a version published first never loses its own
+    write_published_manifest(docs_dir=settings.docs_dir, name=name, version=version, manifest=manifest)
+
+    # The only thing that changes what vdoc serves while it runs, so the one place that tells the catalog.
+    # A failed upload has nothing to tell: nothing of it was ever where a reader looks.
+    get_catalog(settings.docs_dir).record_version(name=name, version=version)
+
+    return f"Version '{version}' of project '{name}' uploaded successfully."
+
+
+def _publish_archive(
+    staged_archive: Path, precompressed: dict[str, dict[str, int]], target_path: Path, name: str, version: str
+) -> str:
+    """Publishes a version that was repacked into an archive, and tells the catalog about it.
+
+    Args:
+        staged_archive: The archive the version was repacked into, in a staging directory.
+        precompressed: The compressed copies it was given, as ``repack_zip`` wrote them.
+        target_path: The directory the version would be published in. The archive is placed next to it.
+        name: The project name.
+        version: The version of the project.
+
+    Raises:
+        ProjectVersionAlreadyExists: If another upload of the same version finished first.
+
+    Returns:
+        The message to tell the client that uploaded the version.
+    """
+    settings = get_settings()
+    manifest = build_archive_manifest(path=staged_archive, precompressed=precompressed)
+    try:
+        publish_version_archive(staged_path=staged_archive, target_path=target_path)
+    except FileExistsError as error:
+        raise ProjectVersionAlreadyExists(name=name, version=version) from error
+    write_published_manifest(docs_dir=settings.docs_dir, name=name, version=version, manifest=manifest)
+
+    get_catalog(settings.docs_dir).record_version(name=name, version=version, archived=True)
+
+    return f"Version '{version}' of project '{name}' uploaded successfully."
+
+
+def _zip_member_names(file: UploadFile) -> list[str]:
+    """Checks that an uploaded file is a ZIP archive, and lists its members from its table of contents.
+
+    Args:
+        file: The uploaded file.
+
+    Raises:
+        UploadedFileInvalid: If the uploaded file's content type is invalid.
+        UploadedFileInvalid: If the uploaded file's name is invalid.
+        UploadedFileInvalid: If the uploaded file is not a ZIP archive.
+
+    Returns:
+        The names of the members.
+    """
     if file.content_type != "application/zip":
         msg = "Content type is not 'application/zip'"
         raise UploadedFileInvalid(msg)
@@ -89,20 +262,325 @@ def upload_project_version_impl(name: str, version: str, file: UploadFile) -> JS
         raise UploadedFileInvalid(msg)
     try:
         with zipfile.ZipFile(file=file.file, mode="r") as archive:
-            if "index.html" not in archive.namelist():
-                msg = "The archive doesn't contain an index.html file"
-                raise UploadedFileInvalid(msg)
-            target_path.mkdir(parents=True, exist_ok=True)
-            archive.extractall(target_path)
+            return archive.namelist()
     except zipfile.BadZipFile as error:
-        shutil.rmtree(path=target_path, ignore_errors=True)
         raise UploadedFileInvalid(str(error)) from error
-    finally:
-        # The only thing that changes what vdoc serves while it runs, so the only place that has to drop
-        # what was derived from it. In the `finally` because a half-written upload that was cleaned up
-        # again changed the directory just as much as a successful one.
-        invalidate_published_versions()
+
+
+def _take_upload(file: UploadFile) -> BinaryIO:
+    """Opens an uploaded file for a job that reads it after the upload was answered.
+
+    The request closes its upload once answered, so the job reads it through a descriptor of its own, which
+    keeps the file alive until the job closes it. Asking an upload still held in memory for its descriptor
+    writes it to disk first.
+
+    Args:
+        file: The uploaded file.
+
+    Returns:
+        The file, opened at its start.
+    """
+    upload = os.fdopen(os.dup(file.file.fileno()), "rb")
+    upload.seek(0)
+    return upload
+
+
+def _queue_publish(name: str, version: str, publish: Callable[[], str], upload: BinaryIO | None) -> JSONResponse:
+    """Queues publishing a version, and answers the upload with the job.
+
+    Args:
+        name: The project name.
+        version: The version of the project.
+        publish: What publishes it, on the publish queue.
+        upload: The uploaded file the job reads, if any, as ``_take_upload`` opened it. The job owns it once
+            queued, and closes it.
+
+    Raises:
+        PublishQueueFull: If the queue holds as many jobs as it can. The uploaded file is closed.
+
+    Returns:
+        ``202 Accepted`` with the publish job, which ``/api/jobs/<id>`` reports on.
+    """
+    settings = get_settings()
+    queue = get_publish_queue(
+        docs_dir=settings.docs_dir, concurrency=settings.publish_concurrency, queue_depth=settings.publish_queue_depth
+    )
+    try:
+        job = queue.submit(project=name, version=version, publish=publish)
+    except PublishQueueFull:
+        if upload is not None:
+            upload.close()
+        raise
 
     return JSONResponse(
-        status_code=status.HTTP_201_CREATED, content=f"Version '{version}' of project '{name}' uploaded successfully."
+        status_code=status.HTTP_202_ACCEPTED,
+        content=job.model_dump(mode="json"),
+        headers={"Location": f"/api/jobs/{job.id}"},
+    )
+
+
+def upload_project_version_impl(name: str, version: str, file: UploadFile) -> JSONResponse:
+    """Checks the uploaded documentation and queues extracting it.
+
+    Everything that can be told from the archive's table of contents is checked before the upload is
+    answered, so that a client that sent the wrong thing learns so right away. Extracting the archive
+    is what takes long, and is left to the publish queue.
+
+    Args:
+        name: The project name.
+        version: The version of the project.
+        file: The uploaded file.
+
+    Raises:
+        UploadedFileInvalid: If the uploaded documentation ZIP doesn't contain an index.html file.
+
+    Returns:
+        ``202 Accepted`` with the publish job, which ``/api/jobs/<id>`` reports on.
+    """
+    target_path = _new_version_path(name=name, version=version)
+
+    if "index.html" not in _zip_member_names(file=file):
+        msg = "The archive doesn't contain an index.html file"
+        raise UploadedFileInvalid(msg)
+
+    settings = get_settings()
+    archive_file = _take_upload(file=file)
+
+    if settings.version_storage == "archive":
+
+        def repack_and_publish() -> str:
+            with archive_file:
+                staging_path = create_staging_directory(docs_dir=settings.docs_dir)
+                try:
+                    staged_archive = staging_path / f"{version}{VERSION_ARCHIVE_SUFFIX}"
+                    precompressed = repack_zip(
+                        source=archive_file, target_path=staged_archive, threads=settings.publish_extract_threads
+                    )
+                    return _publish_archive(
+                        staged_archive=staged_archive,
+                        precompressed=precompressed,
+                        target_path=target_path,
+                        name=name,
+                        version=version,
+                    )
+                finally:
+                    shutil.rmtree(path=staging_path, ignore_errors=True)
+
+        return _queue_publish(name=name, version=version, publish=repack_and_publish, upload=archive_file)
+
+    def extract_and_publish() -> str:
+        with archive_file:
+            staging_path = create_staging_directory(docs_dir=settings.docs_dir)
+            try:
+                digests = extract_zip(
+                    source=archive_file,
+                    target_path=staging_path,
+                    threads=settings.publish_extract_threads,
+                    blobs=BlobStore(docs_dir=settings.docs_dir),
+                )
+                return _publish(
+                    staging_path=staging_path, target_path=target_path, name=name, version=version, digests=digests
+                )
+            finally:
+                # Gone already if the version was published
+                shutil.rmtree(path=staging_path, ignore_errors=True)
+
+    return _queue_publish(name=name, version=version, publish=extract_and_publish, upload=archive_file)
+
+
+def _pending_manifest_path(name: str, version: str) -> Path:
+    return get_settings().docs_dir / STATE_DIR_NAME / PENDING_MANIFESTS_DIR_NAME / name / f"{version}.json"
+
+
+def submit_version_manifest_impl(name: str, version: str, manifest: VersionManifest) -> MissingBlobs:
+    """Takes the manifest of a version to be published, and tells which of its files the server is missing.
+
+    The first half of a delta upload. A build that differs from the last one by a few pages is mostly files
+    the server holds already, and the client only has to send what it does not.
+
+    Args:
+        name: The project name.
+        version: The version of the project.
+        manifest: The manifest of every file of the version.
+
+    Raises:
+        UploadedFileInvalid: If the manifest doesn't list an index.html file.
+
+    Returns:
+        The digests of the contents the server is missing, to be sent with ``upload_version_blobs_impl``.
+    """
+    _new_version_path(name=name, version=version)
+    if not any(entry.path == "index.html" for entry in manifest.files):
+        msg = "The manifest doesn't list an index.html file"
+        raise UploadedFileInvalid(msg)
+
+    # Kept on disk rather than in memory, since the second half may well reach another worker process
+    pending_path = _pending_manifest_path(name=name, version=version)
+    pending_path.parent.mkdir(parents=True, exist_ok=True)
+    temporary_path = pending_path.with_name(f".{pending_path.name}.{uuid4().hex}")
+    temporary_path.write_text(manifest.model_dump_json())
+    temporary_path.replace(pending_path)
+
+    blobs = BlobStore(docs_dir=get_settings().docs_dir)
+    return MissingBlobs(
+        missing=sorted({entry.sha256 for entry in manifest.files if not blobs.has(digest=entry.sha256)})
     )
+
+
+def upload_version_blobs_impl(name: str, version: str, file: UploadFile | None) -> JSONResponse:
+    """Takes the file contents a version was missing, and queues assembling the version from its manifest.
+
+    The second half of a delta upload.
+
+    Args:
+        name: The project name.
+        version: The version of the project.
+        file: A ZIP archive of the missing contents, each named by its SHA-256 digest. None if nothing was
+            missing.
+
+    Raises:
+        VersionManifestNotFound: If no manifest was submitted for the version.
+
+    Returns:
+        ``202 Accepted`` with the publish job, which ``/api/jobs/<id>`` reports on.
+    """
+    target_path = _new_version_path(name=name, version=version)
+    pending_path = _pending_manifest_path(name=name, version=version)
+    try:
+        manifest = VersionManifest.model_validate_json(pending_path.read_bytes())
+    except FileNotFoundError as error:
+        raise VersionManifestNotFound(name=name, version=version) from error
+    if file is not None:
+        _zip_member_names(file=file)
+
+    docs_dir = get_settings().docs_dir
+    archive_file = _take_upload(file=file) if file is not None else None
+
+    def assemble_and_publish() -> str:
+        blobs = BlobStore(docs_dir=docs_dir)
+        if archive_file is not None:
+            with archive_file:
+                _add_blobs(archive_file=archive_file, blobs=blobs)
+
+        staging_path = create_staging_directory(docs_dir=docs_dir)
+        try:
+            digests = _assemble(manifest=manifest, target_path=staging_path, blobs=blobs)
+            message = _publish(
+                staging_path=staging_path, target_path=target_path, name=name, version=version, digests=digests
+            )
+        finally:
+            shutil.rmtree(path=staging_path, ignore_errors=True)
+        pending_path.unlink(missing_ok=True)
+        return message
+
+    return _queue_publish(name=name, version=version, publish=assemble_and_publish, upload=archive_file)
+
+
+def _add_blobs(archive_file: BinaryIO, blobs: BlobStore) -> None:
+    """Adds the contents in a ZIP archive of them to the blob store.
+
+    Args:
+        archive_file: The archive, whose members are each named by the SHA-256 digest of their content.
+        blobs: The blob store.
+
+    Raises:
+        UploadedFileInvalid: If the archive is corrupt, or a member is not named by its digest.
+    """
+    try:
+        with zipfile.ZipFile(file=archive_file, mode="r") as archive:
+            for info in archive.infolist():
+                if info.is_dir():
+                    continue
+                with archive.open(info) as source:
+                    # What is added is named by what it turned out to be, so a wrong name adds nothing wrong
+                    if (digest := blobs.add(source=source)) != info.filename:  # type: ignore[arg-type]
+                        msg = f"The content of '{info.filename}' has the digest '{digest}'"
+                        raise UploadedFileInvalid(msg)
+    except (zipfile.BadZipFile, zlib.error, EOFError) as error:
+        raise UploadedFileInvalid(str(error)) from error
+
+
+def _assemble(manifest: VersionManifest, target_path: Path, blobs: BlobStore) -> dict[str, str]:
+    """Assembles a version from its manifest, out of links to the blob store.
+
+    Args:
+        manifest: The manifest of the version.
+        target_path: The directory to assemble it in.
+        blobs: The blob store.
+
+    Raises:
+        UploadedFileInvalid: If a content of the version is neither in the store nor was sent.
+        UploadedFileInvalid: If a content in the store has another size than the manifest says.
+
+    Returns:
+        The SHA-256 digest of every file placed, by its path relative to the directory.
+    """
+    if missing := sorted({entry.sha256 for entry in manifest.files if not blobs.has(digest=entry.sha256)}):
+        msg = f"The contents {', '.join(missing)} are missing"
+        raise UploadedFileInvalid(msg)
+    digests = {}
+    for entry in manifest.files:
+        if blobs.size(digest=entry.sha256) != entry.size:
+            msg = f"'{entry.path}' is {entry.size} bytes according to the manifest, but its content is not"
+            raise UploadedFileInvalid(msg)
+
+        path = target_path.joinpath(*entry.path.split("/"))
+        path.parent.mkdir(parents=True, exist_ok=True)
+        blobs.link(digest=entry.sha256, target=path)
+        digests[path.relative_to(target_path).as_posix()] = entry.sha256
+    return digests
+
+
+async def stream_project_version_impl(
+    name: str, version: str, content_type: str | None, chunks: AsyncIterator[bytes]
+) -> JSONResponse:
+    """Publishes documentation uploaded as a tar archive in the request body, extracting it as it arrives.
+
+    Args:
+        name: The project name.
+        version: The version of the project.
+        content_type: The media type of the request body.
+        chunks: The request body, as it arrives.
+
+    Raises:
+        UploadedFileInvalid: If the media type is not one of a tar archive.
+        UploadedFileInvalid: If the archive doesn't contain an index.html file.
+
+    Returns:
+        The response to the upload.
+    """
+    target_path = _new_version_path(name=name, version=version)
+
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    if (compression := STREAMED_ARCHIVE_TYPES.get(media_type)) is None:
+        msg = f"Content type is not one of {', '.join(repr(known) for known in STREAMED_ARCHIVE_TYPES)}"
+        raise UploadedFileInvalid(msg)
+
+    settings = get_settings()
+    limiter = get_stream_limiter(concurrency=settings.publish_concurrency)
+    # Nothing that touches the disk runs on the event loop, which a large tree to remove would hold up
+    staging_path = await anyio.to_thread.run_sync(create_staging_directory, settings.docs_dir, limiter=limiter)
+    try:
+        digests = await extract_tar_stream(
+            chunks=chunks,
+            target_path=staging_path,
+            compression=compression,
+            blobs=BlobStore(docs_dir=settings.docs_dir),
+            limiter=limiter,
+        )
+        # Only known once all of it arrived, since a tar archive has no table of contents to look in first
+        if not (staging_path / "index.html").is_file():
+            msg = "The archive doesn't contain an index.html file"
+            raise UploadedFileInvalid(msg)
+        message = await anyio.to_thread.run_sync(
+            _publish, staging_path, target_path, name, version, digests, limiter=limiter
+        )
+    finally:
+        # Whatever went wrong, including the client going away halfway, leaves nothing half published. Shielded,
+        # since the client going away cancels the request, and with it anything awaited unshielded.
+        with anyio.CancelScope(shield=True):
+            await anyio.to_thread.run_sync(
+                partial(shutil.rmtree, path=staging_path, ignore_errors=True), limiter=limiter
+            )
+
+    return JSONResponse(status_code=status.HTTP_201_CREATED, content=message)
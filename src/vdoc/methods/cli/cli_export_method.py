@@ -0,0 +1,187 @@
+"""Contains all CLI methods for exporting a static mirror of the application."""
+
+import json
+import logging
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any
+
+from vdoc import get_app_version
+from vdoc.api.lifespan import webapp_path
+from vdoc.catalog import get_catalog
+from vdoc.constants import (
+    EXPORT_DIRECTORY_INDEX,
+    EXPORT_NOT_FOUND_PAGE,
+    EXPORT_STATE_FILE_NAME,
+    STATIC_PROJECTS_PREFIX,
+)
+from vdoc.export import AliasStyle, export_version, remove_from_mirror, write_alias
+from vdoc.methods.api.agent_discovery import render_llms_txt_impl, render_robots_txt_impl, render_sitemap_xml_impl
+from vdoc.methods.api.catalog import CatalogDocumentRenderer
+from vdoc.models.export import ExportState
+from vdoc.models.plugins.base import Plugin
+from vdoc.models.project import Project, ProjectRecord
+from vdoc.settings import get_settings
+
+_logger = logging.getLogger(__name__)
+
+
+def _write_file(path: Path, content: bytes | str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if isinstance(content, str):
+        content = content.encode()
+    path.write_bytes(content)
+
+
+def _write_api_document(destination: Path, address: str, document: Any) -> None:  # noqa: ANN401
+    """Writes what an API address answers to the file a static host answers it from.
+
+    Args:
+        destination: The directory the mirror is written to.
+        address: The address, relative to ``/api/``. One ending in a slash is written to its directory index.
+        document: What the address answers, serializable to JSON.
+    """
+    relative_path = f"{address}{EXPORT_DIRECTORY_INDEX}" if address.endswith("/") else address
+    _write_file(path=destination / "api" / relative_path, content=json.dumps(document))
+
+
+def _export_versions(
+    projects: dict[str, ProjectRecord], state: ExportState, static_path: Path, processes: int
+) -> tuple[int, int]:
+    """Copies every version that is not in the mirror yet, and removes those that are no longer published.
+
+    Args:
+        projects: Every project that has a version to serve, by name.
+        state: What the last export wrote, which is updated with what this one writes.
+        static_path: The directory of the projects in the mirror.
+        processes: How many versions are copied at once.
+
+    Returns:
+        How many versions were copied, and how many removed.
+    """
+    removed = 0
+    for name, versions in state.versions.items():
+        if name not in projects:
+            # Its aliases with it
+            remove_from_mirror(path=static_path / name)
+            removed += len(versions)
+            continue
+        for version in set(versions) - set(projects[name].versions):
+            remove_from_mirror(path=static_path / name / version)
+            removed += 1
+
+    # A version the mirror holds already is never written again, since it never changes
+    pending = [
+        (record, version)
+        for record in projects.values()
+        for version in record.versions
+        if version not in state.versions.get(record.name, ()) or not (static_path / record.name / version).is_dir()
+    ]
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        copied = executor.map(
+            export_version,
+            [record.version_path(version=version) for record, version in pending],
+            [record.version_archive(version=version) for record, version in pending],
+            [static_path / record.name / version for record, version in pending],
+        )
+        for (record, version), files in zip(pending, copied, strict=True):
+            _logger.info("Exported %s of '%s', %d files", version, record.name, files)
+
+    state.versions = {name: list(record.versions) for name, record in projects.items()}
+    return len(pending), removed
+
+
+def _export_aliases(
+    projects: dict[str, ProjectRecord], state: ExportState, static_path: Path, style: AliasStyle
+) -> None:
+    """Writes every alias that stands for another version than it did in the last export.
+
+    Args:
+        projects: Every project that has a version to serve, by name.
+        state: What the last export wrote, which is updated with what this one writes.
+        static_path: The directory of the projects in the mirror.
+        style: How an alias is written.
+    """
+    for name, aliases in state.aliases.items():
+        if name in projects:
+            for alias in set(aliases) - set(projects[name].published.aliases):
+                remove_from_mirror(path=static_path / name / alias)
+
+    for name, record in projects.items():
+        written = state.aliases.get(name, {})
+        for alias, version in record.published.aliases.items():
+            alias_path = static_path / name / alias
+            if written.get(alias) != version or not (alias_path.is_symlink() or alias_path.is_dir()):
+                write_alias(project_path=static_path / name, alias=alias, version=version, style=style)
+
+    state.aliases = {name: dict(record.published.aliases) for name, record in projects.items()}
+
+
+def _export_api(destination: Path, projects: dict[str, ProjectRecord]) -> None:
+    """Writes what every API address the web UI reads answers.
+
+    Args:
+        destination: The directory the mirror is written to.
+        projects: Every project that has a version to serve, by name.
+    """
+    snapshot = get_catalog(get_settings().docs_dir).snapshot
+    catalog = CatalogDocumentRenderer(plugins=list(Plugin.load_plugins())).render(snapshot)
+    _write_file(path=destination / "api" / "catalog", content=catalog)
+    _write_api_document(destination=destination, address="version/", document=get_app_version())
+
+    # Written anew, so that nothing is left of the projects and versions no longer published
+    shutil.rmtree(destination / "api" / "projects", ignore_errors=True)
+    for name, record in projects.items():
+        _write_api_document(destination=destination, address=f"projects/{name}/versions/", document=record.versions)
+        for version in (*record.versions, *record.published.aliases):
+            resolved = record.published.aliases.get(version, version)
+            _write_api_document(
+                destination=destination, address=f"projects/{name}/versions/{version}", document=resolved
+            )
+
+
+def _export_webapp(destination: Path) -> None:
+    """Copies the built web UI, which answers every address the mirror has no file for.
+
+    Args:
+        destination: The directory the mirror is written to.
+    """
+    if not (webapp_path / "index.html").is_file():
+        _logger.warning("There is no built web UI in '%s' to export", webapp_path)
+        return
+    shutil.copytree(webapp_path, destination, dirs_exist_ok=True)
+    shutil.copyfile(webapp_path / "index.html", destination / EXPORT_NOT_FOUND_PAGE)
+
+
+def export_impl(destination: Path, base_url: str, aliases: AliasStyle, processes: int) -> None:
+    """Writes a static mirror of everything published, or brings one written before up to date.
+
+    Args:
+        destination: The directory to write the mirror to.
+        base_url: The absolute base URL the mirror is served under, which the discovery documents link to.
+        aliases: How the aliases of the versions are written.
+        processes: How many versions are copied at once, each in a process of its own.
+    """
+    _logger.info("Exporting the published documentation to '%s'", destination)
+    destination.mkdir(parents=True, exist_ok=True)
+    state_path = destination / EXPORT_STATE_FILE_NAME
+    state = ExportState.model_validate_json(state_path.read_bytes()) if state_path.is_file() else ExportState()
+
+    # Read from the docs directory now rather than from what the catalog database says it held
+    get_catalog(get_settings().docs_dir).refresh()
+    projects = {record.name: record for record in Project.list_published()}
+    static_path = destination / STATIC_PROJECTS_PREFIX.lstrip("/")
+    copied, removed = _export_versions(projects=projects, state=state, static_path=static_path, processes=processes)
+    _export_aliases(projects=projects, state=state, static_path=static_path, style=aliases)
+
+    base_url = base_url.rstrip("/")
+    _write_file(path=destination / "llms.txt", content=render_llms_txt_impl(base_url=base_url))
+    _write_file(path=destination / "sitemap.xml", content=render_sitemap_xml_impl(base_url=base_url))
+    _write_file(path=destination / "robots.txt", content=render_robots_txt_impl(base_url=base_url))
+    _export_api(destination=destination, projects=projects)
+    _export_webapp(destination=destination)
+
+    # Written last, so that an export that is interrupted is finished by the next one
+    state_path.write_text(state.model_dump_json())
+    _logger.info("Exported %d new versions and removed %d from '%s'", copied, removed, destination)
@@ -8,13 +8,24 @@ from vdoc.api import create_app
 
 _logger = logging.getLogger(__name__)
 
+_APP_FACTORY = "vdoc.api:create_app"
 
-def run_impl(bind_address: str, bind_port: int) -> None:
+
+def run_impl(bind_address: str, bind_port: int, workers: int = 1) -> None:
     """Starts the FastAPI app with the given parameters.
 
     Args:
         bind_address: The bind address of the application.
         bind_port: The bind port of the application.
+        workers: The number of worker processes to serve requests with.
     """
     _logger.info("Starting service on '%s:%s'", bind_address, bind_port)
-    uvicorn_run(app=create_app(), host=bind_address, port=bind_port)
+    if workers == 1:
+        uvicorn_run(app=create_app(), host=bind_address, port=bind_port)
+        return
+
+    # Every worker is a process of its own and builds its own app, so uvicorn is handed where to find the
+    # factory rather than an app. The catalog is what keeps them agreeing on what is published, see
+    # `vdoc.catalog`.
+    _logger.info("Serving with %s worker processes", workers)
+    uvicorn_run(app=_APP_FACTORY, factory=True, host=bind_address, port=bind_port, workers=workers)
@@ -0,0 +1,34 @@
+"""Contains the models of the catalog document, everything the web UI needs to know in one response."""
+
+from typing import Any
+
+from pydantic import BaseModel
+
+from vdoc.models.plugins.base import ValidPluginsT
+from vdoc.models.project_category import ProjectCategory
+
+
+class CatalogProject(BaseModel):
+    """A project as the catalog document lists it: what ``/api/projects/`` says, plus its versions."""
+
+    name: str
+    display_name: str
+    category_id: int | None
+    versions: list[str]
+    """Every published version, oldest first."""
+    latest: str | None
+    """The newest published version, or None if the project directory holds none."""
+    aliases: dict[str, str]
+    """Every version alias, such as ``stable`` or ``2.x``, with the version it resolves to. Lets the web UI
+    resolve an address that names one without asking the versions API."""
+
+
+class CatalogDocument(BaseModel):
+    """Pydantic model for the catalog document."""
+
+    generation: int
+    """The catalog generation the document was built at."""
+    projects: list[CatalogProject]
+    categories: list[ProjectCategory]
+    plugins: dict[ValidPluginsT, dict[str, Any]]
+    """The configuration of every active plugin, as ``/api/plugins/<name>/`` answers it."""
@@ -0,0 +1,12 @@
+"""Contains the model of what a static export wrote, which the next export of the same directory reads."""
+
+from pydantic import BaseModel, Field
+
+
+class ExportState(BaseModel):
+    """Pydantic model for the state of a static export."""
+
+    versions: dict[str, list[str]] = Field(default_factory=dict)
+    """Every version written, by project."""
+    aliases: dict[str, dict[str, str]] = Field(default_factory=dict)
+    """The version every alias written stands for, by project and alias."""
@@ -0,0 +1,18 @@
+"""Contains the model of the statistics of the hot file cache."""
+
+from pydantic import BaseModel
+
+
+class HotFileCacheStatistics(BaseModel):
+    """Pydantic model for what the hot file cache of one worker process holds, and how well it does."""
+
+    capacity: int
+    """How many bytes of content it keeps at most."""
+    size: int
+    """How many bytes of content it keeps now."""
+    files: int
+    """How many responses it keeps now, each form of a file counted on its own."""
+    hits: int
+    """How many requests it answered since the process started."""
+    misses: int
+    """How many requests it had nothing for since the process started, and the disk answered."""
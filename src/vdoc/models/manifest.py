@@ -0,0 +1,128 @@
+"""Contains the models of a version manifest, the list of files a version is made of.
+
+A client sends one to upload a version in parts, see ``VersionManifest``, and vdoc writes one for every
+version it publishes, see ``PublishedManifest``.
+"""
+
+from datetime import datetime
+from typing import Annotated
+
+from pydantic import BaseModel, Field, NonNegativeInt, field_validator
+
+Sha256T = Annotated[str, Field(pattern=r"^[0-9a-f]{64}$")]
+
+
+class ManifestEntry(BaseModel):
+    """A file of a version."""
+
+    path: str
+    """Where the file is in the version, relative to its root and separated by ``/``."""
+    size: NonNegativeInt
+    sha256: Sha256T
+    """The SHA-256 digest of the file's content, in lowercase hex."""
+
+    @field_validator("path")
+    @classmethod
+    def validate_path(cls, path: str) -> str:
+        """Validates that the path names a file inside the version.
+
+        Args:
+            path: The path.
+
+        Raises:
+            ValueError: If the path is absolute, or has a part that is empty, ``.`` or ``..``.
+
+        Returns:
+            The path.
+        """
+        if any(part in {"", ".", ".."} for part in path.split("/")) or "\\" in path:
+            msg = f"'{path}' is not a relative path inside the version"
+            raise ValueError(msg)
+        return path
+
+
+class VersionManifest(BaseModel):
+    """Pydantic model for the manifest of a version."""
+
+    files: list[ManifestEntry]
+
+    @field_validator("files")
+    @classmethod
+    def validate_files(cls, files: list[ManifestEntry]) -> list[ManifestEntry]:
+        """Validates that the files can all be placed in one directory tree.
+
+        Args:
+            files: The files.
+
+        Raises:
+            ValueError: If a path is listed twice, or is listed as a file and as a directory of another.
+
+        Returns:
+            The files.
+        """
+        paths = {entry.path for entry in files}
+        if len(paths) != len(files):
+            msg = "A path is listed more than once"
+            raise ValueError(msg)
+        for entry in files:
+            parts = entry.path.split("/")
+            for end in range(1, len(parts)):
+                if (directory := "/".join(parts[:end])) in paths:
+                    msg = f"'{directory}' is listed as a file and as the directory of '{entry.path}'"
+                    raise ValueError(msg)
+        return files
+
+
+class MissingBlobs(BaseModel):
+    """Pydantic model for what the server is missing of a version it was sent the manifest of."""
+
+    missing: list[Sha256T]
+    """The SHA-256 digests of every file content the server does not hold yet, each once."""
+
+
+class PublishedFile(BaseModel):
+    """A file of a published version, as it was when the version was published."""
+
+    size: NonNegativeInt
+    mtime: float
+    """When its content was written, in seconds since the epoch."""
+    sha256: Sha256T
+    media_type: str
+    precompressed: dict[str, NonNegativeInt] = {}
+    """The compressed copies vdoc placed next to it, by the suffix each is named with, such as ``.br``, and
+    the size of each in bytes. Only these are ever sent in its place."""
+
+
+class PublishedSummary(BaseModel):
+    """Pydantic model for the little that listing a published version needs to know about it.
+
+    Written next to its manifest, so that whatever lists every project, the discovery documents or the
+    project list, reads a few hundred bytes per version rather than a list of every one of its files.
+    """
+
+    published_on: datetime
+    file_count: NonNegativeInt
+    """How many files the upload delivered, not counting the compressed copies vdoc placed next to them."""
+    total_size: NonNegativeInt
+    """The size of those files together, in bytes."""
+    inventories: list[str]
+    """The page inventories it ships, such as ``objects.inv``."""
+
+
+class PublishedManifest(PublishedSummary):
+    """Pydantic model for what a published version is made of, written once when it is published.
+
+    A version never changes after that, so whatever is asked about it, whether it has a file, how large
+    it is or when it arrived, is answered from here rather than from its files.
+    """
+
+    files: dict[str, PublishedFile]
+    """Every file the upload delivered, by its path relative to the version's root and separated by ``/``."""
+
+    def summary(self) -> PublishedSummary:
+        """Returns the summary of the version, everything but its files.
+
+        Returns:
+            The summary.
+        """
+        return PublishedSummary.model_validate(self.model_dump(exclude={"files"}))
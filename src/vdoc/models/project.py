@@ -2,98 +2,258 @@
 
 from __future__ import annotations
 
+import re
 from dataclasses import dataclass
 from datetime import UTC, date, datetime
-from functools import cached_property, lru_cache
+from functools import cached_property
+from types import MappingProxyType
 from typing import TYPE_CHECKING
 
 from packaging.version import InvalidVersion as PackagingInvalidVersion
 from packaging.version import Version
 from pydantic import BaseModel, computed_field, field_validator
 
-from vdoc.constants import LATEST_VERSION_ALIAS
+from vdoc.catalog import get_catalog
+from vdoc.constants import PAGE_INVENTORY_FILES, VERSION_ALIAS_PATTERN, VERSION_ARCHIVE_SUFFIX
 from vdoc.exceptions import InvalidVersion, ProjectNotFound, ProjectVersionNotFound
+from vdoc.published_manifests import get_published_manifest, get_published_summary
 from vdoc.settings import get_settings
+from vdoc.version_archives import get_version_archive
 
 if TYPE_CHECKING:
-    from collections.abc import Sequence
+    from collections.abc import Mapping, Sequence
     from pathlib import Path
 
+    from packaging.specifiers import SpecifierSet
 
-@dataclass(frozen=True)
-class _PublishedVersions:
-    """What is published for one project, in each of the forms its readers ask for."""
+    from vdoc.catalog import Catalog, CatalogSnapshot, PublishedVersions
+    from vdoc.models.manifest import PublishedManifest, PublishedSummary
+    from vdoc.settings import VDocSettings
 
-    ordered: tuple[tuple[Version, str], ...]
-    """Every version and the directory it is published under, oldest first, so the newest is last."""
 
-    public_forms: frozenset[str]
-    """The normalized form of each, to test a requested version against without walking them all."""
+@dataclass(frozen=True, slots=True)
+class ProjectRecord:
+    """What there is to know about a project, in the form that listing and rendering read it in.
 
+    Built once per state of the catalog and shared by every request until the next one. Listing several
+    thousand projects as pydantic models validated each one and looked up its display name and category in
+    the settings again per request; a ``Project`` is now only built from one of these where it is serialized.
+    """
 
-def _directory_generation(path: Path) -> int:
-    """Returns a token that changes whenever an entry is added to a directory or removed from it.
+    name: str
+    display_name: str
+    category_id: int | None
+    path: Path
+    """The directory the project is published in."""
+    published: PublishedVersions
 
-    Args:
-        path: The directory to read.
+    @property
+    def versions(self) -> tuple[str, ...]:
+        """Returns every published version of the project, oldest first.
 
-    Returns:
-        The directory's modification time in nanoseconds.
-    """
-    return path.stat().st_mtime_ns
+        Returns:
+            The versions, spelled as they are published.
+        """
+        return self.published.directories
 
+    @property
+    def latest(self) -> str:
+        """Returns the latest version available of the project.
 
-@lru_cache(maxsize=64)
-def _scan_versions(project_path: Path, _generation: int) -> _PublishedVersions:
-    """Reads the versions published for a project, once per state of its directory.
+        Returns:
+            The newest published version of the project.
+        """
+        return self.published.ordered[-1][1]
 
-    Listing a project of two dozen versions costs a directory walk and a version parse per entry, and it
-    is on the path of nearly every request. The generation makes this cache self-invalidating rather than
-    something to remember to clear: the operating system bumps a directory's modification time when a
-    version is added to it, which is a cache key that has never been seen, while the entry for the
-    previous state ages out of the cache on its own.
+    def version_path(self, version: str) -> Path:
+        """Returns the directory a published version of this project is served from.
 
-    A version directory's own contents are deliberately not part of the generation, because an upload
-    refuses to overwrite a version that already exists. What is published is only ever added to.
+        The one place that knows how a version maps onto a location, so that whoever needs a file of a
+        version asks for it here instead of composing the layout again.
 
-    Args:
-        project_path: The path of the project.
-        _generation: The state of the project directory the result belongs to. Unread: it exists to be
-            part of the cache key.
+        Args:
+            version: The version, spelled as it is published.
 
-    Returns:
-        The published versions of the project.
-    """
-    parsed_versions = {Version(path.name): path.name for path in project_path.glob("[!.]*") if path.is_dir()}
-    ordered = tuple(sorted(parsed_versions.items()))
+        Returns:
+            The directory holding that version.
+        """
+        return self.path / version
+
+    def version_archive(self, version: str) -> Path | None:
+        """Returns the archive a published version of this project is served from, if it is kept as one.
+
+        Args:
+            version: The version, spelled as it is published.
+
+        Returns:
+            The archive holding that version, or None if the version is a directory.
+        """
+        if version not in self.published.archives:
+            return None
+        return self.path / f"{version}{VERSION_ARCHIVE_SUFFIX}"
+
+    def version_manifest(self, version: str) -> PublishedManifest | None:
+        """Returns what a published version of this project is made of, as written when it was published.
+
+        Read when a file of the version is served, and kept for the few versions served from last.
+
+        Args:
+            version: The version, spelled as it is published.
+
+        Returns:
+            The manifest of that version, or None if it has none, such as a version copied in by hand.
+        """
+        return get_published_manifest(
+            docs_dir=self.path.parent, name=self.name, version=version, generation=self.published.generation
+        )
+
+    def version_summary(self, version: str) -> PublishedSummary | None:
+        """Returns the summary of a published version of this project, as written when it was published.
+
+        Args:
+            version: The version, spelled as it is published.
+
+        Returns:
+            The summary of that version, or None if it has none, such as a version copied in by hand.
+        """
+        return get_published_summary(
+            docs_dir=self.path.parent, name=self.name, version=version, generation=self.published.generation
+        )
+
+    def contains(self, version: str, file_name: str) -> bool:
+        """Reports whether a published version ships a file.
+
+        An ``index.html`` or a page inventory, which is what listing the project asks about, is answered
+        from the version's summary, any other file from its manifest, and from the disk only for a version
+        that has neither.
+
+        Args:
+            version: The version, spelled as it is published.
+            file_name: The name of the file, relative to the version's root.
+
+        Returns:
+            True if the version contains it, False otherwise.
+        """
+        if (summary := self.version_summary(version=version)) is not None:
+            if file_name in PAGE_INVENTORY_FILES:
+                return file_name in summary.inventories
+            if file_name == "index.html":
+                # Every upload is refused without one
+                return True
+        if (manifest := self.version_manifest(version=version)) is not None:
+            return file_name in manifest.files
+        if (archive_path := self.version_archive(version=version)) is not None:
+            return file_name in get_version_archive(path=archive_path).members
+        return (self.version_path(version=version) / file_name).is_file()
+
+    @property
+    def latest_path(self) -> Path:
+        """Returns the directory the newest published version is served from.
+
+        Returns:
+            The directory holding the newest published version.
+        """
+        return self.version_path(version=self.latest)
+
+    @property
+    def latest_published_on(self) -> date:
+        """Returns the day the newest published version appeared.
+
+        Taken from its summary. A version without one was copied in by hand, and its directory or archive
+        was written once, when it was, so its modification time is when that version arrived.
+
+        Returns:
+            The publication date of the newest published version.
+        """
+        if (summary := self.version_summary(version=self.latest)) is not None:
+            return summary.published_on.astimezone(UTC).date()
+        published_path = self.version_archive(version=self.latest) or self.latest_path
+        return datetime.fromtimestamp(published_path.stat().st_mtime, tz=UTC).date()
+
+    def latest_contains(self, file_name: str) -> bool:
+        """Reports whether the newest published version ships a file.
 
-    return _PublishedVersions(ordered=ordered, public_forms=frozenset(version.public for version, _ in ordered))
+        Args:
+            file_name: The name of the file, relative to the version's root.
 
+        Returns:
+            True if the newest published version contains it, False otherwise.
+        """
+        return self.contains(version=self.latest, file_name=file_name)
 
-def invalidate_published_versions() -> None:
-    """Drops what has been read about the published versions of every project.
 
-    Call this after publishing or removing a version. The scan notices a change on its own too, but only
-    as precisely as the filesystem timestamp it reads, and those are too coarse to tell two uploads that
-    land in the same millisecond apart. Whoever writes knows exactly, so whoever writes says so.
+class _RecordCache:
+    """Keeps the project records of the newest catalog snapshot until the snapshot or the settings change.
+
+    Both are immutable and replaced as a whole when they change, so comparing them by identity is the whole
+    invalidation. Two requests building the records of a new snapshot at once both get a correct result,
+    and one of them is kept.
     """
-    _scan_versions.cache_clear()
 
+    def __init__(self) -> None:
+        self._built: tuple[CatalogSnapshot, VDocSettings, Mapping[str, ProjectRecord]] | None = None
+
+    def get(self, catalog: Catalog, snapshot: CatalogSnapshot | None = None) -> Mapping[str, ProjectRecord]:
+        """Returns the record of every project in a catalog.
+
+        Args:
+            catalog: The catalog.
+            snapshot: The snapshot of it to read, for a caller that has to stay with one it already holds.
+                The current one if None.
+
+        Returns:
+            The records by project name, sorted by it.
+        """
+        snapshot, settings = snapshot or catalog.snapshot, get_settings()
+        built = self._built
+        if built is None or built[0] is not snapshot or built[1] is not settings:
+            built = self._built = (snapshot, settings, _build_records(catalog=catalog, snapshot=snapshot))
+        return built[2]
+
+
+def _build_records(catalog: Catalog, snapshot: CatalogSnapshot) -> Mapping[str, ProjectRecord]:
+    settings = get_settings()
+    category_ids = {category.name: category.id for category in settings.project_categories}
 
-def _published(project_path: Path) -> _PublishedVersions:
-    """Returns the versions published for a project.
+    records: dict[str, ProjectRecord] = {}
+    for name, published in snapshot.projects.items():
+        category = settings.project_category_mapping.get(name)
+        records[name] = ProjectRecord(
+            name=name,
+            display_name=settings.project_display_name_mapping.get(name, name),
+            category_id=category_ids[category] if category is not None else None,
+            path=catalog.docs_dir / name,
+            published=published,
+        )
+    return MappingProxyType(records)
+
+
+_records = _RecordCache()
+
+
+def _record(name: str) -> ProjectRecord:
+    """Returns the record of a project.
 
     Args:
-        project_path: The path of the project.
+        name: The project name.
+
+    Raises:
+        ProjectNotFound: If the project doesn't exist.
 
     Returns:
-        The published versions of the project.
+        The record of the project.
     """
-    return _scan_versions(project_path=project_path, _generation=_directory_generation(path=project_path))
+    if (record := _records.get(get_catalog(get_settings().docs_dir)).get(name)) is None:
+        raise ProjectNotFound(name=name)
+    return record
 
 
 class Project(BaseModel):
-    """Pydantic model for a project."""
+    """Pydantic model for a project.
+
+    What the API serializes. Everything it says comes from the project's ``ProjectRecord``, which is what
+    code that is not about to serialize a project reads directly.
+    """
 
     name: str
 
@@ -102,6 +262,9 @@ class Project(BaseModel):
     def validate_project_exists(cls, value: str) -> str:
         """Validates the project's existence.
 
+        Asked of the catalog rather than of the disk, because a list of projects builds one of these per
+        project.
+
         Args:
             value: The project name.
 
@@ -111,19 +274,18 @@ class Project(BaseModel):
         Returns:
             The validated project name.
         """
-        project_dir = get_settings().docs_dir / value
-        if not project_dir.is_dir():
+        if get_catalog(get_settings().docs_dir).versions(value) is None:
             raise ProjectNotFound(name=value)
         return value
 
     @cached_property
-    def _base_path(self) -> Path:
-        """Returns and caches the project's base path.
+    def _record(self) -> ProjectRecord:
+        """Returns and caches the project's record.
 
         Returns:
-            The project's base path.
+            The project's record.
         """
-        return get_settings().docs_dir / self.name
+        return _record(name=self.name)
 
     @classmethod
     def list(cls, search_path: Path | None = None) -> list[Project]:
@@ -135,48 +297,59 @@ class Project(BaseModel):
         Returns:
             A a list of all projects.
         """
-        search_path = search_path or get_settings().docs_dir
-        paths = search_path.glob("[!.]*")
-        projects = [Project(name=path.name) for path in paths if path.is_dir()]
+        records = _records.get(get_catalog(search_path or get_settings().docs_dir))
+
+        # Not validated again: each name comes from the catalog, which is what validating would ask
+        return [cls.model_construct(name=name) for name in records]
 
-        return sorted(projects, key=lambda project: project.name)
+    @classmethod
+    def records(cls, snapshot: CatalogSnapshot | None = None) -> Mapping[str, ProjectRecord]:
+        """Returns the record of every project, built once per state of the catalog.
+
+        Args:
+            snapshot: The catalog snapshot to read. The current one if None.
+
+        Returns:
+            The records by project name, sorted by it.
+        """
+        return _records.get(get_catalog(get_settings().docs_dir), snapshot=snapshot)
 
     @classmethod
-    def list_published(cls) -> Sequence[Project]:
+    def list_published(cls) -> Sequence[ProjectRecord]:
         """Returns every project that has a version to serve.
 
         A project directory holding nothing that parses as a version has none, and asking it for its
         latest version raises.
 
         Returns:
-            The projects with at least one published version.
+            The records of the projects with at least one published version, by name.
         """
-        return [project for project in cls.list() if project.versions]
+        return [
+            record for record in _records.get(get_catalog(get_settings().docs_dir)).values() if record.published.ordered
+        ]
 
     @classmethod
     def is_published(cls, name: str, version: str | None = None) -> bool:
         """Reports whether a project, and if given a version of it, is published.
 
         Answers what ``get_version_and_docs_path`` answers, as a bool rather than as an exception, and
-        without building a ``Project`` for it. This is asked on every request the web UI serves, where
-        validating a model per request buys nothing.
+        without building a ``Project`` for it. This is asked on every request the web UI serves, so it is
+        answered from the catalog alone and never touches the disk.
 
         Args:
             name: The project name.
-            version: The project version, ``latest``, or None to ask only about the project.
+            version: The project version, a version alias, or None to ask only about the project.
 
         Returns:
             True if it is published, False otherwise.
         """
-        project_path = get_settings().docs_dir / name
-        if not project_path.is_dir():
+        if (published := get_catalog(get_settings().docs_dir).versions(name)) is None:
             return False
         if version is None:
             return True
 
-        published = _published(project_path=project_path)
-        if version == LATEST_VERSION_ALIAS:
-            return bool(published.ordered)
+        if version in published.aliases:
+            return True
 
         try:
             parsed_version = Version(version)
@@ -190,23 +363,29 @@ class Project(BaseModel):
     def get_version_and_docs_path(cls, name: str, version: str) -> tuple[str, Path]:
         """Returns the validated version and the path containing the documentation.
 
+        A version alias resolves from the table the catalog built when it read the project, so ``stable`` or
+        ``2.x`` costs a lookup rather than a walk over every version. One that resolves to nothing, such as
+        ``stable`` for a project that only published pre-releases, is a version the project doesn't have.
+
         Args:
             name: The project name.
-            version: The project version. If ``latest``, the path to the newest version will be returned.
+            version: The project version, or a version alias such as ``latest``, ``stable`` or ``2.x``, which
+                resolves to the version it currently stands for.
 
         Raises:
-            ProjectNotFound: If the project doesn't exist.
             InvalidVersion: If the version is of an invalid format.
             ProjectVersionNotFound: If the project doesn't have the requested version.
 
         Returns:
             The validated version and the path containing the documentation.
         """
-        project = Project(name=name)
+        record = _record(name=name)
         return_version: str
 
-        if version == LATEST_VERSION_ALIAS:
-            return_version = project.latest
+        if (aliased := record.published.aliases.get(version)) is not None:
+            return_version = aliased
+        elif re.fullmatch(VERSION_ALIAS_PATTERN, version):
+            raise ProjectVersionNotFound(name=name, version=version)
         else:
             try:
                 parsed_version = Version(version)
@@ -214,10 +393,10 @@ class Project(BaseModel):
             except PackagingInvalidVersion as error:
                 raise InvalidVersion(version=version) from error
             # Version("1") == Version("1.0.0") validates to True, comparing the plain public string mitigates this issue
-            if parsed_version.public not in _published(project_path=project._base_path).public_forms:
+            if parsed_version.public not in record.published.public_forms:
                 raise ProjectVersionNotFound(name=name, version=parsed_version)
 
-        return return_version, project.version_path(version=return_version)
+        return return_version, record.version_path(version=return_version)
 
     @computed_field  # type: ignore[prop-decorator]  # https://docs.pydantic.dev/2.0/usage/computed_fields/
     @cached_property
@@ -227,7 +406,7 @@ class Project(BaseModel):
         Returns:
             str: The project display name.
         """
-        return get_settings().project_display_name_mapping.get(self.name, self.name)
+        return self._record.display_name
 
     @computed_field  # type: ignore[prop-decorator]  # https://docs.pydantic.dev/2.0/usage/computed_fields/
     @cached_property
@@ -237,25 +416,27 @@ class Project(BaseModel):
         Returns:
             int | None: The optional project category ID.
         """
-        settings = get_settings()
-        if category_name := settings.project_category_mapping.get(self.name):
-            return next(category.id for category in settings.project_categories if category.name == category_name)
-        return None
+        return self._record.category_id
 
     @cached_property
     def versions(self) -> dict[Version, str]:
         """Returns a list of all available project versions.
 
-        Raises:
-            ProjectNotFound: If the project doesn't exist.
-
         Returns:
             A list of all versions of the project.
         """
-        # Cached per instance, like everything derived from it: a Project is built per request and never
-        # outlives the upload that would change the answer. `_scan_versions` holds the cache that spans
-        # requests; this one keeps rendering a document from re-reading the same project a dozen times.
-        return dict(_published(project_path=self._base_path).ordered)
+        return dict(self._record.published.ordered)
+
+    def versions_matching(self, specifiers: SpecifierSet) -> tuple[str, ...]:
+        """Returns the published versions a PEP 440 specifier set admits.
+
+        Args:
+            specifiers: The specifiers to admit versions by.
+
+        Returns:
+            The admitted versions, oldest first.
+        """
+        return self._record.published.matching(specifiers=specifiers)
 
     @cached_property
     def latest(self) -> str:
@@ -264,21 +445,52 @@ class Project(BaseModel):
         Returns:
             The newest published version of the project.
         """
-        return _published(project_path=self._base_path).ordered[-1][1]
+        return self._record.latest
 
     def version_path(self, version: str) -> Path:
         """Returns the directory a published version of this project is served from.
 
-        The one place that knows how a version maps onto a location, so that whoever needs a file of a
-        version asks for it here instead of composing the layout again.
-
         Args:
             version: The version, spelled as it is published.
 
         Returns:
             The directory holding that version.
         """
-        return self._base_path / version
+        return self._record.version_path(version=version)
+
+    def version_archive(self, version: str) -> Path | None:
+        """Returns the archive a published version of this project is served from, if it is kept as one.
+
+        Args:
+            version: The version, spelled as it is published.
+
+        Returns:
+            The archive holding that version, or None if the version is a directory.
+        """
+        return self._record.version_archive(version=version)
+
+    def version_manifest(self, version: str) -> PublishedManifest | None:
+        """Returns what a published version of this project is made of, as written when it was published.
+
+        Args:
+            version: The version, spelled as it is published.
+
+        Returns:
+            The manifest of that version, or None if it has none, such as a version copied in by hand.
+        """
+        return self._record.version_manifest(version=version)
+
+    def contains(self, version: str, file_name: str) -> bool:
+        """Reports whether a published version ships a file.
+
+        Args:
+            version: The version, spelled as it is published.
+            file_name: The name of the file, relative to the version's root.
+
+        Returns:
+            True if the version contains it, False otherwise.
+        """
+        return self._record.contains(version=version, file_name=file_name)
 
     @property
     def latest_path(self) -> Path:
@@ -287,19 +499,16 @@ class Project(BaseModel):
         Returns:
             The directory holding the newest published version.
         """
-        return self.version_path(version=self.latest)
+        return self._record.latest_path
 
     @property
     def latest_published_on(self) -> date:
         """Returns the day the newest published version appeared.
 
-        A version directory is written once, when it is published, so its modification time is when
-        that version arrived.
-
         Returns:
             The publication date of the newest published version.
         """
-        return datetime.fromtimestamp(self.latest_path.stat().st_mtime, tz=UTC).date()
+        return self._record.latest_published_on
 
     def latest_contains(self, file_name: str) -> bool:
         """Reports whether the newest published version ships a file.
@@ -310,4 +519,4 @@ class Project(BaseModel):
         Returns:
             True if the newest published version contains it, False otherwise.
         """
-        return (self.latest_path / file_name).is_file()
+        return self._record.latest_contains(file_name=file_name)
@@ -0,0 +1,29 @@
+"""Contains the model of a publish job, an upload that is extracted after it was answered."""
+
+from typing import Literal
+
+from pydantic import BaseModel
+
+PublishJobStatusT = Literal["queued", "running", "succeeded", "failed"]
+
+
+class PublishJob(BaseModel):
+    """Pydantic model for a publish job."""
+
+    id: str
+    project: str
+    version: str
+    status: PublishJobStatusT
+    status_code: int | None = None
+    """The status code the upload would have been answered with had it waited: ``201``, or that of the error."""
+    message: str | None = None
+    """What the upload would have been answered with had it waited. None until the job finished."""
+
+    @property
+    def finished(self) -> bool:
+        """Returns whether the job finished, one way or the other.
+
+        Returns:
+            True if the job succeeded or failed.
+        """
+        return self.status in {"succeeded", "failed"}
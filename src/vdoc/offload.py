@@ -0,0 +1,35 @@
+"""Contains the offloading of documentation files to the reverse proxy in front of vdoc.
+
+Behind nginx, Apache or lighttpd, reading a file only to hand it to the proxy chunk by chunk is work the
+proxy does better itself. Configured to, vdoc still answers every request for a file, and decides what is
+sent as it always does, but names the file in a header instead of sending it: ``X-Accel-Redirect`` for
+nginx, with an address under an internal location that serves the docs directory, or ``X-Sendfile`` for
+the others, with the path of the file. The proxy sends the file, and vdoc never reads it.
+"""
+
+import os
+from pathlib import Path
+from typing import Literal
+from urllib.parse import quote
+
+StaticOffloadT = Literal["off", "x-accel-redirect", "x-sendfile"]
+
+
+def offload_headers(path: Path, docs_dir: Path, mode: StaticOffloadT, location: str) -> dict[str, str] | None:
+    """Returns the header that hands a file to the reverse proxy to send.
+
+    Args:
+        path: The file, in the docs directory.
+        docs_dir: The docs directory.
+        mode: How files are offloaded.
+        location: The address of the proxy's internal location that serves the docs directory, for nginx.
+
+    Returns:
+        The header, or None if files are not offloaded.
+    """
+    if mode == "off":
+        return None
+    if mode == "x-sendfile":
+        # A header carries bytes, so the path goes through as the bytes the filesystem knows it by
+        return {"X-Sendfile": os.fsencode(path).decode("latin-1")}
+    return {"X-Accel-Redirect": f"{location.rstrip('/')}/{quote(path.relative_to(docs_dir).as_posix())}"}
@@ -0,0 +1,154 @@
+"""Contains the precompression of a version's text files, done once when the version is published.
+
+Documentation is mostly text, and text sent compressed is a fraction of its size on the wire: a Sphinx
+search index shrinks about five-fold. Compressing it for every request would cost CPU on every request, for
+files that never change once published. So a version gets a compressed copy of each of its text files next
+to the file itself, ``searchindex.js.br`` and ``searchindex.js.gz`` next to ``searchindex.js``, before it is
+published, and the docs mount sends whichever copy the client accepts.
+
+The copies are kept in the blob store like everything else, so a content is compressed once however many
+versions ship it. A copy is only placed where it is noticeably smaller than the file, and never in place of
+a file the upload brought itself.
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import cache, partial
+from itertools import repeat
+from pathlib import Path, PurePosixPath
+from typing import TYPE_CHECKING
+
+import brotli
+
+from vdoc.constants import PRECOMPRESSED_ENCODINGS, PRECOMPRESSED_FILE_SUFFIXES, PRECOMPRESSED_MIN_SIZE
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Collection, Mapping
+
+    from vdoc.blobs import BlobStore
+
+_ENCODERS: dict[str, Callable[[bytes], bytes]] = {
+    "br": brotli.compress,
+    "gzip": lambda content: gzip.compress(content, mtime=0),
+}
+
+# A compressed copy that saves less than this share of the file is not worth a file of its own, nor a
+# client decompressing it
+_MAX_COMPRESSED_RATIO = 0.95
+
+
+def is_precompressible(name: str) -> bool:
+    """Returns whether a file of a version gets compressed copies.
+
+    Args:
+        name: The name of the file.
+
+    Returns:
+        True if it is a text file.
+    """
+    return PurePosixPath(name).suffix.lower() in PRECOMPRESSED_FILE_SUFFIXES
+
+
+def compressed_copies(content: bytes, suffixes: Collection[str]) -> dict[str, bytes]:
+    """Compresses the content of a text file in precompressed encodings.
+
+    For a version kept as one archive, whose copies are members of it rather than blobs.
+
+    Args:
+        content: The content.
+        suffixes: The suffixes of the encodings to compress in.
+
+    Returns:
+        The copies worth keeping, by the suffix each is named with.
+    """
+    copies: dict[str, bytes] = {}
+    if len(content) < PRECOMPRESSED_MIN_SIZE:
+        return copies
+    for coding, suffix in PRECOMPRESSED_ENCODINGS.items():
+        if suffix not in suffixes:
+            continue
+        if len(copy := _ENCODERS[coding](content)) <= len(content) * _MAX_COMPRESSED_RATIO:
+            copies[suffix] = copy
+    return copies
+
+
+def precompress_version(
+    path: Path, blobs: BlobStore, threads: int, digests: Mapping[str, str] | None = None
+) -> dict[str, dict[str, int]]:
+    """Places a compressed copy next to each text file of a version, in every precompressed encoding.
+
+    Brotli and zlib both release the GIL while they compress, so the files are compressed on as many threads
+    as configured. A file whose digest is known, and whose copies the store holds already, is not even read.
+
+    Args:
+        path: The directory of the version, not yet published.
+        blobs: The blob store.
+        threads: How many threads compress at the same time.
+        digests: The SHA-256 digests of its files, by their path relative to the version's root, as
+            extracting them placed them. A file not among them is hashed here.
+
+    Returns:
+        The copies placed, by the path of the file they are copies of relative to the version's root, each
+        by its suffix with its size in bytes. The version's manifest lists them, and only these are sent.
+    """
+    files = [
+        Path(directory, name)
+        for directory, _, names in os.walk(path)
+        for name in names
+        if is_precompressible(name=name)
+    ]
+    names = [file.relative_to(path).as_posix() for file in files]
+    known = [(digests or {}).get(name) for name in names]
+    if threads <= 1 or len(files) <= 1:
+        placed = [
+            _precompress(file=file, blobs=blobs, digest=digest) for file, digest in zip(files, known, strict=True)
+        ]
+    else:
+        with ThreadPoolExecutor(max_workers=threads, thread_name_prefix="vdoc-precompress") as executor:
+            placed = list(executor.map(_precompress, files, repeat(blobs), known))
+    return {name: copies for name, copies in zip(names, placed, strict=True) if copies}
+
+
+def _encode(encoder: Callable[[bytes], bytes], content: Callable[[], bytes], max_size: float) -> bytes | None:
+    # Measured before it is stored, so that a copy not worth keeping never takes room in the store
+    encoded = encoder(content())
+    return encoded if len(encoded) <= max_size else None
+
+
+def _precompress(file: Path, blobs: BlobStore, digest: str | None) -> dict[str, int]:
+    """Places the compressed copies of one file.
+
+    Args:
+        file: The file.
+        blobs: The blob store.
+        digest: The SHA-256 digest of its content, or None if it is not known yet.
+
+    Returns:
+        The copies placed, by their suffix, with their size in bytes.
+    """
+    if file.is_symlink() or (file_size := file.stat().st_size) < PRECOMPRESSED_MIN_SIZE:
+        return {}
+    # Read once at most, and only if a copy is to be compressed, or the content is to be hashed
+    content = cache(file.read_bytes)
+    if digest is None:
+        digest = hashlib.sha256(content()).hexdigest()
+    max_size = file_size * _MAX_COMPRESSED_RATIO
+    placed = {}
+    for coding, suffix in PRECOMPRESSED_ENCODINGS.items():
+        copy = file.with_name(f"{file.name}{suffix}")
+        if copy.exists() or copy.is_symlink():
+            continue
+        size = blobs.add_encoded(
+            digest=digest,
+            suffix=suffix,
+            encode=partial(_encode, encoder=_ENCODERS[coding], content=content, max_size=max_size),
+        )
+        # A copy the store held already may have been stored by an earlier release, worth keeping or not
+        if size is not None and size <= max_size:
+            blobs.link(digest=digest, target=copy, suffix=suffix)
+            placed[suffix] = size
+    return placed
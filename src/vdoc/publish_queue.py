@@ -0,0 +1,227 @@
+"""Contains the publish queue, which extracts uploaded archives after the upload was answered.
+
+An upload used to be extracted by the request that brought it, on one of the worker threads that every
+synchronous route shares. A few large uploads at once were enough to take all of them, and with them every
+page load that asks the API whether a version is published. The queue extracts on threads of its own, as
+many at once as configured, and holds as many more as configured before it turns uploads away.
+
+What became of a job is kept in memory by the process that ran it, and in a SQLite database under the docs
+directory for every other one: with several worker processes, the client asking about a job is not
+necessarily talking to the process that accepted it. A job is forgotten a day after it last changed.
+
+The threads are not daemons, so a process that is asked to stop finishes publishing what it accepted
+before it exits.
+"""
+
+from __future__ import annotations
+
+import logging
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from functools import lru_cache
+from typing import TYPE_CHECKING
+from uuid import uuid4
+
+import anyio
+
+from vdoc.constants import JOBS_FILE_NAME, PUBLISH_JOB_RETENTION, STATE_DIR_NAME
+from vdoc.exceptions import PublishQueueFull, VDocException
+from vdoc.models.publish_job import PublishJob
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from pathlib import Path
+
+_logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    job TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+"""
+
+
+class PublishQueue:
+    """Runs uploads to one docs directory on a bounded pool of threads of its own."""
+
+    def __init__(self, docs_dir: Path, concurrency: int, queue_depth: int) -> None:
+        """Creates a queue. Its threads start with the first job.
+
+        Args:
+            docs_dir: The directory the projects are published in.
+            concurrency: How many jobs run at the same time.
+            queue_depth: How many more jobs wait for one of them to finish, before a job is turned away.
+        """
+        self._database = docs_dir / STATE_DIR_NAME / JOBS_FILE_NAME
+        self._capacity = concurrency + queue_depth
+        self._executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="vdoc-publish")
+        self._lock = threading.Lock()
+        self._jobs: dict[str, tuple[float, PublishJob]] = {}
+        self._pending = 0
+
+    def submit(self, project: str, version: str, publish: Callable[[], str]) -> PublishJob:
+        """Queues publishing an upload.
+
+        Args:
+            project: The project name.
+            version: The version of the project.
+            publish: What publishes it. Returns the message the job reports when it succeeds, and raises a
+                ``VDocException`` saying why if it fails.
+
+        Raises:
+            PublishQueueFull: If as many jobs are running and waiting as the queue holds.
+
+        Returns:
+            The job, queued.
+        """
+        job = PublishJob(id=uuid4().hex, project=project, version=version, status="queued")
+        with self._lock:
+            if self._pending >= self._capacity:
+                raise PublishQueueFull
+            self._pending += 1
+        try:
+            self._record(job=job)
+            self._executor.submit(self._run, job, publish)
+        except BaseException:
+            # A job that never got to run gives its place back, or the queue would fill up with none running
+            with self._lock:
+                self._pending -= 1
+            raise
+        return job
+
+    def get(self, job_id: str) -> PublishJob | None:
+        """Returns a job, whichever process accepted it.
+
+        Args:
+            job_id: The ID of the job.
+
+        Returns:
+            The job as it currently stands, or None if there is no such job or it was forgotten.
+        """
+        with self._lock:
+            known = self._jobs.get(job_id)
+        if known is not None:
+            return known[1]
+        return self._read(job_id=job_id)
+
+    def _run(self, job: PublishJob, publish: Callable[[], str]) -> None:
+        try:
+            self._execute(job=job, publish=publish)
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def _execute(self, job: PublishJob, publish: Callable[[], str]) -> None:
+        self._record(job=job.model_copy(update={"status": "running"}))
+        try:
+            message = publish()
+        except VDocException as error:
+            finished = job.model_copy(
+                update={"status": "failed", "status_code": error.status_code, "message": error.detail}
+            )
+        except Exception:
+            _logger.exception("Publishing version '%s' of project '%s' failed.", job.version, job.project)
+            finished = job.model_copy(
+                update={"status": "failed", "status_code": 500, "message": "Publishing the upload failed unexpectedly."}
+            )
+        else:
+            finished = job.model_copy(update={"status": "succeeded", "status_code": 201, "message": message})
+
+        self._record(job=finished)
+
+    def _record(self, job: PublishJob) -> None:
+        """Records what became of a job, in memory and in the database.
+
+        As with the catalog, failing to write the database only costs the other processes knowing about
+        the job, which is not worth failing the job over.
+
+        Args:
+            job: The job.
+        """
+        updated_at = time.time()
+        with self._lock:
+            self._jobs[job.id] = (updated_at, job)
+            if job.finished:
+                expired = updated_at - PUBLISH_JOB_RETENTION
+                for job_id in [job_id for job_id, (at, known) in self._jobs.items() if known.finished and at < expired]:
+                    del self._jobs[job_id]
+
+        try:
+            self._database.parent.mkdir(exist_ok=True)
+            with closing(self._connect()) as connection:
+                connection.execute(
+                    "INSERT INTO jobs (id, job, updated_at) VALUES (?, ?, ?) "
+                    "ON CONFLICT (id) DO UPDATE SET job = excluded.job, updated_at = excluded.updated_at",
+                    (job.id, job.model_dump_json(), updated_at),
+                )
+                if job.finished:
+                    connection.execute("DELETE FROM jobs WHERE updated_at < ?", (updated_at - PUBLISH_JOB_RETENTION,))
+        except (sqlite3.Error, OSError):
+            _logger.warning("Cannot record publish job '%s' at '%s'.", job.id, self._database, exc_info=True)
+
+    def _read(self, job_id: str) -> PublishJob | None:
+        if not self._database.is_file():
+            return None
+        try:
+            with closing(self._connect()) as connection:
+                row = connection.execute(
+                    "SELECT job FROM jobs WHERE id = ? AND updated_at >= ?",
+                    (job_id, time.time() - PUBLISH_JOB_RETENTION),
+                ).fetchone()
+        except sqlite3.Error:
+            _logger.warning("Cannot read publish job '%s' at '%s'.", job_id, self._database, exc_info=True)
+            return None
+        return PublishJob.model_validate_json(row[0]) if row else None
+
+    def _connect(self) -> sqlite3.Connection:
+        # Autocommit, since every statement stands on its own. Write-ahead logging lets a process read a job
+        # while another one writes.
+        connection = sqlite3.connect(self._database, timeout=30, isolation_level=None)
+        try:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.executescript(_SCHEMA)
+        except BaseException:
+            connection.close()
+            raise
+        return connection
+
+
+@lru_cache(maxsize=8)
+def get_publish_queue(docs_dir: Path, concurrency: int, queue_depth: int) -> PublishQueue:
+    """Returns the publish queue of a docs directory, one per process.
+
+    Keyed by everything it is configured with, for the same reason as ``get_catalog``: so that a test
+    configuring it differently gets a queue of its own.
+
+    Args:
+        docs_dir: The directory the projects are published in.
+        concurrency: How many jobs run at the same time.
+        queue_depth: How many more jobs wait for one of them to finish.
+
+    Returns:
+        The publish queue.
+    """
+    return PublishQueue(docs_dir=docs_dir, concurrency=concurrency, queue_depth=queue_depth)
+
+
+@lru_cache(maxsize=8)
+def get_stream_limiter(concurrency: int) -> anyio.CapacityLimiter:
+    """Returns the limiter of the threads that streamed uploads are extracted and published on, one per process.
+
+    A streamed upload is extracted while it arrives and published before it is answered, so it cannot wait
+    in the publish queue. It holds a thread all the while, which on AnyIO's default limiter is one fewer for
+    every synchronous route. These threads are limited on their own instead, as many at once as the queue
+    runs jobs.
+
+    Args:
+        concurrency: How many streamed uploads are extracted or published at the same time.
+
+    Returns:
+        The limiter.
+    """
+    return anyio.CapacityLimiter(concurrency)
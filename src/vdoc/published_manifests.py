@@ -0,0 +1,300 @@
+"""Contains the manifests vdoc writes of the versions it publishes.
+
+Which files a version has, how large each is and what its content hashes to are facts that never change
+once it is published, and the server used to find them out again on the disk each time it needed one:
+when a version was published from the modification time of its directory, whether it ships an
+``objects.inv`` from a stat. Each is now written down once, when the version is published, under
+``docs_dir/.vdoc/manifests/<project>/<version>.json``, and read from there.
+
+A manifest lists every file the upload delivered, tens of thousands for a large version. What listing a
+version needs of it, when it was published and which page inventories it ships, is written next to it as
+its summary, which is all that the project list and the discovery documents read. The files are only read
+when one of them is served, and only for as many versions at once as ``PUBLISHED_MANIFEST_CACHE_SIZE``.
+
+The compressed copies vdoc places next to a text file are not files the upload delivered, so they are
+listed with the file they are copies of rather than as files of their own.
+
+A version copied into the docs directory by hand, or published before manifests were written, has none,
+and is asked about on the disk as before.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import UTC, datetime
+from functools import lru_cache
+from mimetypes import guess_type
+from pathlib import Path
+from typing import TYPE_CHECKING, TypeVar
+from uuid import uuid4
+
+from pydantic import BaseModel, ValidationError
+
+from vdoc.constants import (
+    PAGE_INVENTORY_FILES,
+    PUBLISHED_MANIFEST_CACHE_SIZE,
+    PUBLISHED_MANIFESTS_DIR_NAME,
+    PUBLISHED_SUMMARIES_DIR_NAME,
+    PUBLISHED_SUMMARY_CACHE_SIZE,
+    STATE_DIR_NAME,
+)
+from vdoc.models.manifest import PublishedFile, PublishedManifest, PublishedSummary
+from vdoc.version_archives import get_version_archive
+
+if TYPE_CHECKING:
+    from collections.abc import Mapping
+
+_logger = logging.getLogger(__name__)
+
+_CHUNK_SIZE = 1024 * 1024
+_DEFAULT_MEDIA_TYPE = "application/octet-stream"
+
+_ModelT = TypeVar("_ModelT", bound=BaseModel)
+
+
+def _media_type(name: str) -> str:
+    return guess_type(name)[0] or _DEFAULT_MEDIA_TYPE
+
+
+def _manifest(files: Mapping[str, PublishedFile]) -> PublishedManifest:
+    return PublishedManifest(
+        published_on=datetime.now(tz=UTC),
+        file_count=len(files),
+        total_size=sum(file.size for file in files.values()),
+        files=dict(sorted(files.items())),
+        inventories=[file_name for file_name in PAGE_INVENTORY_FILES if file_name in files],
+    )
+
+
+def _describe_file(path: Path, precompressed: Mapping[str, int], digest: str | None) -> PublishedFile:
+    if digest is None:
+        with path.open("rb") as file:
+            status = os.fstat(file.fileno())
+            digest = hashlib.file_digest(file, "sha256").hexdigest()
+    else:
+        status = path.stat()
+    return PublishedFile(
+        size=status.st_size,
+        mtime=status.st_mtime,
+        sha256=digest,
+        media_type=_media_type(path.name),
+        precompressed=dict(precompressed),
+    )
+
+
+def _copy_names(precompressed: Mapping[str, Mapping[str, int]]) -> set[str]:
+    return {f"{name}{suffix}" for name, copies in precompressed.items() for suffix in copies}
+
+
+def build_directory_manifest(
+    path: Path,
+    threads: int,
+    precompressed: Mapping[str, Mapping[str, int]],
+    digests: Mapping[str, str] | None = None,
+) -> PublishedManifest:
+    """Describes a version that is published as a directory.
+
+    Read right after the version was extracted, while its files are still in the page cache. A file whose
+    digest extracting it found out already is only looked up for its size and modification time.
+
+    Args:
+        path: The directory of the version, staged or published.
+        threads: How many files are hashed at once.
+        precompressed: The compressed copies placed in it, as ``precompress_version`` placed them.
+        digests: The SHA-256 digests of its files, by their path relative to the version's root, as
+            extracting them placed them. A file not among them is hashed here.
+
+    Returns:
+        The manifest of the version.
+    """
+    copies = _copy_names(precompressed=precompressed)
+    file_paths = [
+        file_path
+        for directory, _, file_names in os.walk(path)
+        for file_name in file_names
+        if (file_path := Path(directory, file_name)).relative_to(path).as_posix() not in copies
+    ]
+    names = [file_path.relative_to(path).as_posix() for file_path in file_paths]
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        described = executor.map(
+            _describe_file,
+            file_paths,
+            [precompressed.get(name, {}) for name in names],
+            [(digests or {}).get(name) for name in names],
+        )
+        files = dict(zip(names, described, strict=True))
+    return _manifest(files=files)
+
+
+def build_archive_manifest(path: Path, precompressed: Mapping[str, Mapping[str, int]]) -> PublishedManifest:
+    """Describes a version that is published as an archive.
+
+    Args:
+        path: The archive of the version, staged or published.
+        precompressed: The compressed copies it was given, as ``repack_zip`` wrote them.
+
+    Returns:
+        The manifest of the version, listing every member the upload delivered.
+    """
+    archive = get_version_archive(path=path)
+    copies = _copy_names(precompressed=precompressed)
+    files = {}
+    with path.open("rb") as archive_file:
+        for name, member in archive.members.items():
+            if name in copies:
+                continue
+            digest = hashlib.sha256()
+            for offset in range(member.offset, member.offset + member.size, _CHUNK_SIZE):
+                digest.update(
+                    os.pread(archive_file.fileno(), min(_CHUNK_SIZE, member.offset + member.size - offset), offset)
+                )
+            files[name] = PublishedFile(
+                size=member.size,
+                mtime=archive.modified,
+                sha256=digest.hexdigest(),
+                media_type=_media_type(name),
+                precompressed=dict(precompressed.get(name, {})),
+            )
+    return _manifest(files=files)
+
+
+def published_file_etag(file: PublishedFile, coding: str | None = None) -> str:
+    """Returns the strong entity tag of a published file, which is derived from the digest of its content.
+
+    Args:
+        file: The file, as its version's manifest lists it.
+        coding: The content coding of the compressed copy it is sent as, or None if it is sent as it is.
+
+    Returns:
+        The entity tag, quoted.
+    """
+    return f'"{file.sha256[:32]}-{coding}"' if coding else f'"{file.sha256[:32]}"'
+
+
+def published_manifest_path(docs_dir: Path, name: str, version: str) -> Path:
+    """Returns where the manifest of a published version is kept.
+
+    Args:
+        docs_dir: The directory the projects are published in.
+        name: The project name.
+        version: The version, spelled as it is published.
+
+    Returns:
+        The path of the manifest.
+    """
+    return docs_dir / STATE_DIR_NAME / PUBLISHED_MANIFESTS_DIR_NAME / name / f"{version}.json"
+
+
+def published_summary_path(docs_dir: Path, name: str, version: str) -> Path:
+    """Returns where the summary of a published version is kept.
+
+    Args:
+        docs_dir: The directory the projects are published in.
+        name: The project name.
+        version: The version, spelled as it is published.
+
+    Returns:
+        The path of the summary.
+    """
+    return docs_dir / STATE_DIR_NAME / PUBLISHED_SUMMARIES_DIR_NAME / name / f"{version}.json"
+
+
+def _write(path: Path, model: BaseModel) -> None:
+    # Written next to its place and moved there, so that a reader never finds half of one
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary_path = path.with_name(f".{uuid4().hex}.tmp")
+    temporary_path.write_text(model.model_dump_json())
+    temporary_path.replace(path)
+
+
+def write_published_manifest(docs_dir: Path, name: str, version: str, manifest: PublishedManifest) -> None:
+    """Writes the manifest of a version that was just published, and its summary.
+
+    Args:
+        docs_dir: The directory the projects are published in.
+        name: The project name.
+        version: The version, spelled as it is published.
+        manifest: The manifest of the version.
+    """
+    _write(path=published_manifest_path(docs_dir=docs_dir, name=name, version=version), model=manifest)
+    _write(path=published_summary_path(docs_dir=docs_dir, name=name, version=version), model=manifest.summary())
+
+
+def _read(path: Path, model: type[_ModelT]) -> _ModelT | None:
+    try:
+        return model.model_validate_json(path.read_bytes())
+    except FileNotFoundError:
+        return None
+    except (OSError, ValidationError):
+        _logger.warning("The manifest '%s' cannot be read, the version is read from the disk.", path)
+        return None
+
+
+def read_published_manifest(docs_dir: Path, name: str, version: str) -> PublishedManifest | None:
+    """Reads the manifest of a published version.
+
+    Args:
+        docs_dir: The directory the projects are published in.
+        name: The project name.
+        version: The version, spelled as it is published.
+
+    Returns:
+        The manifest, or None if the version has none, or one that cannot be read.
+    """
+    return _read(path=published_manifest_path(docs_dir=docs_dir, name=name, version=version), model=PublishedManifest)
+
+
+def read_published_summary(docs_dir: Path, name: str, version: str) -> PublishedSummary | None:
+    """Reads the summary of a published version.
+
+    Args:
+        docs_dir: The directory the projects are published in.
+        name: The project name.
+        version: The version, spelled as it is published.
+
+    Returns:
+        The summary, or None if the version has none, or one that cannot be read.
+    """
+    return _read(path=published_summary_path(docs_dir=docs_dir, name=name, version=version), model=PublishedSummary)
+
+
+@lru_cache(maxsize=PUBLISHED_MANIFEST_CACHE_SIZE)
+def get_published_manifest(docs_dir: Path, name: str, version: str, generation: int) -> PublishedManifest | None:
+    """Returns the manifest of a published version, read once while its project does not change.
+
+    Args:
+        docs_dir: The directory the projects are published in.
+        name: The project name.
+        version: The version, spelled as it is published.
+        generation: The catalog generation the project last changed at. Only part of the key, so that a
+            version removed and published anew is read anew.
+
+    Returns:
+        The manifest, or None if the version has none, or one that cannot be read.
+    """
+    del generation
+    return read_published_manifest(docs_dir=docs_dir, name=name, version=version)
+
+
+@lru_cache(maxsize=PUBLISHED_SUMMARY_CACHE_SIZE)
+def get_published_summary(docs_dir: Path, name: str, version: str, generation: int) -> PublishedSummary | None:
+    """Returns the summary of a published version, read once while its project does not change.
+
+    Kept apart from the project records, which are built anew whenever any project changes, so that one
+    upload only has the summaries of its own project read again.
+
+    Args:
+        docs_dir: The directory the projects are published in.
+        name: The project name.
+        version: The version, spelled as it is published.
+        generation: The catalog generation the project last changed at. Only part of the key, so that a
+            version removed and published anew is read anew.
+
+    Returns:
+        The summary, or None if the version has none, or one that cannot be read.
+    """
+    del generation
+    return read_published_summary(docs_dir=docs_dir, name=name, version=version)
@@ -1,10 +1,11 @@
 """Contains the settings definition."""
 
-from functools import lru_cache
+import hashlib
+from functools import cached_property, lru_cache
 from pathlib import Path
 from typing import Self
 
-from pydantic import model_validator
+from pydantic import NonNegativeInt, PositiveInt, model_validator
 from pydantic_settings import BaseSettings, PydanticBaseSettingsSource, SettingsConfigDict
 
 from vdoc.config_file import ConfigFileSettingsSource
@@ -16,8 +17,17 @@ from vdoc.constants import (
     DEFAULT_BIND_ADDRESS,
     DEFAULT_BIND_PORT,
     DEFAULT_DOCS_DIR,
+    DEFAULT_DOCS_WATCHER_INTERVAL,
+    DEFAULT_HOT_FILE_CACHE_SIZE,
+    DEFAULT_PUBLISH_CONCURRENCY,
+    DEFAULT_PUBLISH_EXTRACT_THREADS,
+    DEFAULT_PUBLISH_QUEUE_DEPTH,
+    DEFAULT_STATIC_OFFLOAD_LOCATION,
 )
 from vdoc.models.project_category import ProjectCategory
+from vdoc.offload import StaticOffloadT
+from vdoc.version_archives import VersionStorageT
+from vdoc.watcher import WatcherModeT
 
 
 class VDocSettings(BaseSettings):
@@ -31,6 +41,18 @@ class VDocSettings(BaseSettings):
     api_password: bytes = DEFAULT_API_PASSWORD
     bind_address: str = DEFAULT_BIND_ADDRESS
     bind_port: int = DEFAULT_BIND_PORT
+    workers: PositiveInt = 1
+
+    docs_watcher: WatcherModeT = "auto"
+    docs_watcher_interval: float = DEFAULT_DOCS_WATCHER_INTERVAL
+
+    publish_concurrency: PositiveInt = DEFAULT_PUBLISH_CONCURRENCY
+    publish_queue_depth: NonNegativeInt = DEFAULT_PUBLISH_QUEUE_DEPTH
+    publish_extract_threads: PositiveInt = DEFAULT_PUBLISH_EXTRACT_THREADS
+    version_storage: VersionStorageT = "directory"
+    hot_file_cache_size: NonNegativeInt = DEFAULT_HOT_FILE_CACHE_SIZE
+    static_offload: StaticOffloadT = "off"
+    static_offload_location: str = DEFAULT_STATIC_OFFLOAD_LOCATION
 
     project_display_name_mapping: dict[str, str] = {}
 
@@ -103,6 +125,22 @@ class VDocSettings(BaseSettings):
 
         return self
 
+    @cached_property
+    def presentation_tag(self) -> str:
+        """Returns a digest of the settings that change how a project is presented, rather than what is published.
+
+        An entity tag derived from the catalog generation alone would stay the same across a restart that
+        renamed a project or moved it to another category. Combined with this one, it does not. The same
+        in every worker process, because they all read the same configuration.
+
+        Returns:
+            A short hex digest of the display names, the categories and the category mapping.
+        """
+        presentation = self.model_dump_json(
+            include={"project_display_name_mapping", "project_categories", "project_category_mapping"}
+        )
+        return hashlib.sha256(presentation.encode()).hexdigest()[:16]
+
 
 @lru_cache(maxsize=1)
 def get_settings() -> VDocSettings:
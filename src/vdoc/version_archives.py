@@ -0,0 +1,146 @@
+"""Contains the versions that are kept as one archive each, and served from it without being extracted.
+
+A documentation build is tens of thousands of files, and extracting one costs as many inodes, the metadata
+writes to create them and, for a large build, minutes of publishing. Most old versions are hardly ever read
+again after that. Configured to, vdoc keeps a ZIP upload as one file instead, ``<project>/<version>.zip``
+next to the directories of the versions that are not, and serves every file of the version out of it.
+
+The archive is the one the upload was repacked into, with every member stored rather than compressed, so
+that the content of a member is a range of bytes in the file that is sent as it is, and the compressed
+copies of its text files are members of their own. Its central directory is read once, into an index of
+where each member's content starts, so that serving a member costs a dictionary lookup and a read.
+Members that are compressed anyway, in an archive copied in by hand, are not served.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import struct
+import zipfile
+from dataclasses import dataclass
+from functools import lru_cache
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Literal
+
+if TYPE_CHECKING:
+    from collections.abc import Mapping
+    from pathlib import Path
+
+_logger = logging.getLogger(__name__)
+
+VersionStorageT = Literal["directory", "archive"]
+
+# The fixed part of a member's local header, which is followed by its name and its extra field
+_LOCAL_HEADER = struct.Struct("<4s2B4HL2L2H")
+_LOCAL_HEADER_NAME_LENGTH = 10
+_LOCAL_HEADER_EXTRA_LENGTH = 11
+
+# How many archives are kept indexed at once. An index costs about as much memory as the member names.
+_INDEXED_ARCHIVES = 256
+
+
+@dataclass(frozen=True, slots=True)
+class ArchiveMember:
+    """Where the content of a member is in the archive."""
+
+    offset: int
+    """The position of its first byte in the archive file."""
+
+    size: int
+    """Its size in bytes."""
+
+    crc: int
+    """Its CRC-32, which is what it is told apart from other contents by."""
+
+
+@dataclass(frozen=True)
+class VersionArchive:
+    """The index of a version archive, read once."""
+
+    path: Path
+    """The archive file."""
+
+    modified: float
+    """When the archive was written, which is when the version was published."""
+
+    members: Mapping[str, ArchiveMember]
+    """Every member that can be served, by its name."""
+
+    directories: frozenset[str]
+    """The name of every directory the members are in, without a trailing slash."""
+
+    def is_directory(self, name: str) -> bool:
+        """Returns whether a name is that of a directory in the archive.
+
+        Args:
+            name: The name, without a trailing slash.
+
+        Returns:
+            True if it names a directory.
+        """
+        return name in self.directories
+
+
+def get_version_archive(path: Path) -> VersionArchive:
+    """Returns the index of a version archive, reading it the first time it is asked for.
+
+    Keyed by the inode and the modification time of the file as well, so that an archive replaced by hand
+    is read again rather than served from an index of the one before.
+
+    Args:
+        path: The archive file.
+
+    Raises:
+        FileNotFoundError: If there is no such archive.
+
+    Returns:
+        The index of the archive.
+    """
+    status = path.stat()
+    return _read_version_archive(path=path, inode=status.st_ino, mtime_ns=status.st_mtime_ns)
+
+
+@lru_cache(maxsize=_INDEXED_ARCHIVES)
+def _read_version_archive(path: Path, inode: int, mtime_ns: int) -> VersionArchive:  # noqa: ARG001
+    """Reads the central directory of an archive into an index of where each member's content starts.
+
+    Args:
+        path: The archive file.
+        inode: The inode of the file, only part of the cache key.
+        mtime_ns: The modification time of the file in nanoseconds, which is when it was written.
+
+    Returns:
+        The index of the archive.
+    """
+    members: dict[str, ArchiveMember] = {}
+    directories: set[str] = set()
+    skipped = 0
+    with path.open("rb") as file, zipfile.ZipFile(file=file, mode="r") as archive:
+        for info in archive.infolist():
+            name = info.filename.rstrip("/")
+            parents = name.split("/")[:-1]
+            directories.update("/".join(parents[:end]) for end in range(1, len(parents) + 1))
+            if info.is_dir():
+                directories.add(name)
+                continue
+            if info.compress_type != zipfile.ZIP_STORED:
+                skipped += 1
+                continue
+            header = _LOCAL_HEADER.unpack(os.pread(file.fileno(), _LOCAL_HEADER.size, info.header_offset))
+            offset = (
+                info.header_offset
+                + _LOCAL_HEADER.size
+                + header[_LOCAL_HEADER_NAME_LENGTH]
+                + header[_LOCAL_HEADER_EXTRA_LENGTH]
+            )
+            members[name] = ArchiveMember(offset=offset, size=info.file_size, crc=info.CRC)
+    if skipped:
+        _logger.warning("%d compressed members of '%s' cannot be served, only stored ones can.", skipped, path)
+
+    return VersionArchive(
+        path=path,
+        modified=mtime_ns / 1e9,
+        members=MappingProxyType(members),
+        directories=frozenset(directories),
+    )
@@ -0,0 +1,233 @@
+"""Contains the watchers that keep the catalog current with changes made behind vdoc's back.
+
+An upload tells the catalog itself. A version copied into the docs directory or removed from it by hand
+does not, and without a watcher is only noticed on the next start. A watcher notices it while vdoc runs,
+without a request ever having to look at the disk.
+
+Only the first two levels of the docs directory are of interest: the projects, and the versions of each.
+What is inside a version never changes once it is published. Both backends look at exactly those levels,
+which for inotify also keeps the number of watches at one per project rather than one per directory of
+every published version, of which a single Sphinx build can have hundreds.
+"""
+
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import struct
+import sys
+import threading
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING, Literal
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from vdoc.catalog import Catalog
+
+_logger = logging.getLogger(__name__)
+
+WatcherModeT = Literal["off", "auto", "inotify", "polling"]
+
+# From <sys/inotify.h>. Only the events that add or remove an entry matter, see the module docstring.
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_DELETE_SELF = 0x00000400
+_IN_MOVE_SELF = 0x00000800
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_ONLYDIR = 0x01000000
+_IN_ISDIR = 0x40000000
+_WATCHED_EVENTS = _IN_CREATE | _IN_DELETE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_DELETE_SELF | _IN_MOVE_SELF
+
+_EVENT_HEADER = struct.Struct("iIII")
+
+# How long to wait for the burst of events a single change brings to settle before acting on it
+_SETTLE_SECONDS = 0.2
+
+
+class Watcher(ABC):
+    """Runs in a thread of its own and refreshes the catalog whenever something changes."""
+
+    def __init__(self, catalog: Catalog) -> None:
+        """Creates a watcher that is not running yet.
+
+        Args:
+            catalog: The catalog to keep current.
+        """
+        self._catalog = catalog
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"vdoc-{type(self).__name__}", daemon=True)
+
+    def start(self) -> None:
+        """Starts watching."""
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stops watching and waits for the thread to finish."""
+        self._stopped.set()
+        self._thread.join()
+
+    @abstractmethod
+    def _run(self) -> None: ...
+
+
+class PollingWatcher(Watcher):
+    """Looks at every project directory on an interval.
+
+    Works on any filesystem, including a network filesystem that never reports a change made on another
+    host. It costs a stat per project per interval, on a thread of its own rather than on a request.
+    """
+
+    def __init__(self, catalog: Catalog, interval: float) -> None:
+        """Creates a watcher that is not running yet.
+
+        Args:
+            catalog: The catalog to keep current.
+            interval: The seconds between two looks.
+        """
+        super().__init__(catalog=catalog)
+        self._interval = interval
+
+    def _run(self) -> None:
+        while not self._stopped.wait(timeout=self._interval):
+            try:
+                self._catalog.refresh()
+            except Exception:
+                _logger.exception("Cannot refresh the catalog of '%s'.", self._catalog.docs_dir)
+
+
+class InotifyWatcher(Watcher):
+    """Asks the Linux kernel to report changes to the docs directory and to every project directory in it."""
+
+    def __init__(self, catalog: Catalog) -> None:
+        """Creates a watcher that is not running yet.
+
+        Args:
+            catalog: The catalog to keep current.
+
+        Raises:
+            OSError: If inotify is not available, or the docs directory cannot be watched.
+        """
+        super().__init__(catalog=catalog)
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._wake_read, self._wake_write = os.pipe()
+        self._projects: dict[int, str] = {}
+        try:
+            self._root = self._add_watch(path=catalog.docs_dir)
+            for name in catalog.projects:
+                self._watch_project(name=name)
+        except OSError:
+            self._close()
+            raise
+
+    def stop(self) -> None:
+        """Stops watching and waits for the thread to finish."""
+        self._stopped.set()
+        os.write(self._wake_write, b"\0")
+        self._thread.join()
+        self._close()
+
+    def _close(self) -> None:
+        for fd in (self._fd, self._wake_read, self._wake_write):
+            os.close(fd)
+
+    def _add_watch(self, path: Path) -> int:
+        descriptor = self._libc.inotify_add_watch(self._fd, os.fsencode(path), _WATCHED_EVENTS | _IN_ONLYDIR)
+        if descriptor < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno), str(path))
+        return descriptor
+
+    def _watch_project(self, name: str) -> None:
+        try:
+            self._projects[self._add_watch(path=self._catalog.docs_dir / name)] = name
+        except OSError:
+            # Gone again already, or not a directory. The refresh that follows sorts out which.
+            _logger.debug("Cannot watch project '%s'.", name, exc_info=True)
+
+    def _read_events(self) -> set[str] | None:
+        """Reads whatever the kernel has reported so far.
+
+        Returns:
+            The projects that changed, or None if the kernel lost track and everything has to be looked at.
+        """
+        dirty: set[str] = set()
+        while True:
+            try:
+                buffer = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                return dirty
+            offset = 0
+            while offset < len(buffer):
+                descriptor, mask, _, length = _EVENT_HEADER.unpack_from(buffer, offset)
+                name = buffer[offset + _EVENT_HEADER.size : offset + _EVENT_HEADER.size + length].rstrip(b"\0")
+                offset += _EVENT_HEADER.size + length
+                if mask & _IN_Q_OVERFLOW:
+                    return None
+                if descriptor == self._root:
+                    if mask & (_IN_DELETE_SELF | _IN_MOVE_SELF):
+                        return None
+                    project = os.fsdecode(name)
+                    if mask & _IN_ISDIR and mask & (_IN_CREATE | _IN_MOVED_TO) and not project.startswith("."):
+                        self._watch_project(name=project)
+                    dirty.add(project)
+                elif (watched := self._projects.get(descriptor)) is not None:
+                    if mask & _IN_IGNORED:
+                        del self._projects[descriptor]
+                    dirty.add(watched)
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            select.select([self._fd, self._wake_read], [], [])
+            if self._stopped.is_set():
+                return
+            # A single upload or copy arrives as a burst, which is one refresh rather than one per event
+            self._stopped.wait(timeout=_SETTLE_SECONDS)
+            dirty = self._read_events()
+            try:
+                self._catalog.refresh(names=dirty)
+            except Exception:
+                _logger.exception("Cannot refresh the catalog of '%s'.", self._catalog.docs_dir)
+
+
+def start_watcher(catalog: Catalog, mode: WatcherModeT, interval: float) -> Watcher | None:
+    """Starts the watcher a mode asks for.
+
+    Args:
+        catalog: The catalog to keep current.
+        mode: ``inotify`` or ``polling`` for that backend, ``auto`` for inotify where the platform has it
+            and polling elsewhere, ``off`` for none.
+        interval: The seconds between two looks of the polling backend.
+
+    Returns:
+        The running watcher, or None if the mode is ``off``.
+
+    Raises:
+        OSError: If the mode is ``inotify`` and inotify cannot watch the docs directory.
+    """
+    if mode == "off":
+        return None
+
+    watcher: Watcher
+    if mode == "polling" or (mode == "auto" and not sys.platform.startswith("linux")):
+        watcher = PollingWatcher(catalog=catalog, interval=interval)
+    else:
+        try:
+            watcher = InotifyWatcher(catalog=catalog)
+        except OSError:
+            if mode == "inotify":
+                raise
+            _logger.info("Cannot watch '%s' with inotify, polling it instead.", catalog.docs_dir, exc_info=True)
+            watcher = PollingWatcher(catalog=catalog, interval=interval)
+
+    watcher.start()
+    return watcher
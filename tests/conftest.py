@@ -96,6 +96,9 @@ def cli_runner_fixture() -> CliRunner:
 @pytest.fixture(name="dummy_projects_dir")
 def dummy_projects_dir_fixture(tmp_path: Path) -> Generator[Path, None, None]:
     with patch.dict(os.environ, {f"{CONFIG_ENV_PREFIX}DOCS_DIR": str(tmp_path)}):
+        # Read again by the fixtures that build the app after this one, rather than taken from whatever read
+        # them before the first test, such as the collection of a test module
+        get_settings.cache_clear()
         for project_name, versions in DUMMY_DOCS_STRUCTURE.items():
             for version in versions:
                 path = tmp_path / project_name / version
@@ -9,6 +9,7 @@ import type {
   TestType,
 } from '@playwright/test'
 import test from '@playwright/test'
+import type { CatalogProject } from '../../src/ui/interfacesAndTypes/Catalog'
 import type { ColorMode } from '../../src/ui/interfacesAndTypes/ColorModes'
 
 export const prepareTestSuite = async (
@@ -45,25 +46,6 @@ export const mockAPIRequests = async (page: Page) => {
       pattern: '*/**/static/projects/example-project-03/1.0.0/nonexisting.html*',
       response: { body: fs.readFileSync(path.resolve('tests/ui/resources/nonExisting.html')) },
     },
-    {
-      pattern: '*/**/api/project_categories/',
-      response: {
-        json: [
-          { id: 0, name: 'General' },
-          { id: 1, name: 'Extensions' },
-        ],
-      },
-    },
-    {
-      pattern: '*/**/api/projects/',
-      response: {
-        json: [
-          { name: 'example-project-01', display_name: 'Example Project 01', category_id: 0 },
-          { name: 'example-project-02', display_name: 'example-project-02', category_id: 1 },
-          { name: 'example-project-03', display_name: 'example-project-03', category_id: null },
-        ],
-      },
-    },
     {
       pattern: '*/**/api/projects/example-project-01/versions/',
       response: { json: ['0.1.0', '0.2.0', '1.0.0', '2.0.0', '3.0.0', '3.1.0', '3.2.0'] },
@@ -97,40 +79,6 @@ export const mockAPIRequests = async (page: Page) => {
       pattern: '*/**/api/projects/example-project-03/versions/latest',
       response: { json: '1.0.0' },
     },
-    {
-      pattern: '*/**/api/plugins/theme/',
-      response: {
-        json: {
-          name: 'theme',
-          active: true,
-          border_radius: null,
-          flat_cards: false,
-          light: {
-            logo_url: 'https://logos.vorausrobotik.com/voraus-robotik_farbig_rgb.png',
-            logo_url_small: 'https://logos.vorausrobotik.com/v_rgb.png',
-            palette: {},
-          },
-          dark: {
-            logo_url: 'https://logos.vorausrobotik.com/voraus-robotik_farbig_negativ_rgb.png',
-            logo_url_small: 'https://logos.vorausrobotik.com/v_rgb.png',
-            palette: {},
-          },
-        },
-      },
-    },
-    {
-      pattern: '*/**/api/plugins/site/',
-      response: {
-        json: {
-          name: 'site',
-          active: false,
-          title: null,
-          description: null,
-          long_description: null,
-          show_on_landing_page: true,
-        },
-      },
-    },
     {
       pattern: '*/**/api/version/',
       response: { json: '42.0.42' },
@@ -139,6 +87,96 @@ export const mockAPIRequests = async (page: Page) => {
   for (const { pattern, response } of routes) {
     await page.route(pattern, (route) => route.fulfill(response))
   }
+  await mockCatalog(page)
+}
+
+const mockedCatalog = {
+  generation: 1,
+  projects: [
+    {
+      name: 'example-project-01',
+      display_name: 'Example Project 01',
+      category_id: 0,
+      versions: ['0.1.0', '0.2.0', '1.0.0', '2.0.0', '3.0.0', '3.1.0', '3.2.0'],
+      latest: '3.2.0',
+      aliases: {
+        latest: '3.2.0',
+        stable: '3.2.0',
+        '0.x': '0.2.0',
+        '0.1.x': '0.1.0',
+        '0.2.x': '0.2.0',
+        '1.x': '1.0.0',
+        '1.0.x': '1.0.0',
+        '2.x': '2.0.0',
+        '2.0.x': '2.0.0',
+        '3.x': '3.2.0',
+        '3.0.x': '3.0.0',
+        '3.1.x': '3.1.0',
+        '3.2.x': '3.2.0',
+      },
+    },
+    {
+      name: 'example-project-02',
+      display_name: 'example-project-02',
+      category_id: 1,
+      versions: ['1.0.0'],
+      latest: '1.0.0',
+      aliases: { latest: '1.0.0', stable: '1.0.0', '1.x': '1.0.0', '1.0.x': '1.0.0' },
+    },
+    {
+      name: 'example-project-03',
+      display_name: 'example-project-03',
+      category_id: null,
+      versions: ['0.1.0', '1.0.0'],
+      latest: '1.0.0',
+      aliases: {
+        latest: '1.0.0',
+        stable: '1.0.0',
+        '0.x': '0.1.0',
+        '0.1.x': '0.1.0',
+        '1.x': '1.0.0',
+        '1.0.x': '1.0.0',
+      },
+    },
+  ],
+  categories: [
+    { id: 0, name: 'General' },
+    { id: 1, name: 'Extensions' },
+  ],
+  plugins: {
+    theme: {
+      name: 'theme',
+      active: true,
+      border_radius: null,
+      flat_cards: false,
+      light: {
+        logo_url: 'https://logos.vorausrobotik.com/voraus-robotik_farbig_rgb.png',
+        logo_url_small: 'https://logos.vorausrobotik.com/v_rgb.png',
+        palette: {},
+      },
+      dark: {
+        logo_url: 'https://logos.vorausrobotik.com/voraus-robotik_farbig_negativ_rgb.png',
+        logo_url_small: 'https://logos.vorausrobotik.com/v_rgb.png',
+        palette: {},
+      },
+    },
+  },
+}
+
+interface CatalogOverrides {
+  projects?: CatalogProject[]
+  plugins?: Record<string, object>
+}
+
+/**
+ * Answers `/api/catalog` with the default mock, changed by whatever a test overrides.
+ *
+ * A plugin override is merged into the default plugins rather than replacing them all. Registering
+ * again takes precedence over an earlier registration, so a test can call this after `prepareTestSuite`.
+ */
+export const mockCatalog = async (page: Page, overrides: CatalogOverrides = {}) => {
+  const catalog = { ...mockedCatalog, ...overrides, plugins: { ...mockedCatalog.plugins, ...overrides.plugins } }
+  await page.route('*/**/api/catalog', (route) => route.fulfill({ json: catalog }))
 }
 
 interface ColorModeProps {
@@ -1,7 +1,7 @@
 import { expect } from '@playwright/test'
 import type { FooterPluginT } from '../../../src/ui/interfacesAndTypes/plugins/FooterPlugin'
 import testIDs from '../../../src/ui/interfacesAndTypes/testIDs'
-import test, { prepareTestSuite } from '../base'
+import test, { mockCatalog, prepareTestSuite } from '../base'
 import { assertLinkOpensInNewTab } from '../helpers'
 
 await prepareTestSuite(test)
@@ -59,11 +59,7 @@ test.describe('Footer plugin tests', () => {
   sites.forEach((site: string) => {
     test(`Footer plugin must not be visible on site ${site} when inactive`, async ({ page }) => {
       // GIVEN: The footer plugin is inactive
-      await page.route('*/**/api/plugins/footer/', (route) =>
-        route.fulfill({
-          json: footerDisabledDataMock,
-        })
-      )
+      await mockCatalog(page, { plugins: { footer: footerDisabledDataMock } })
       // WHEN: The user navigates to the tested page
       await page.goto(site)
       await page.waitForLoadState()
@@ -78,14 +74,14 @@ test.describe('Footer plugin tests', () => {
         page,
       }) => {
         // GIVEN: The footer plugin is active
-        await page.route('*/**/api/plugins/footer/', (route) =>
-          route.fulfill({
-            json: {
+        await mockCatalog(page, {
+          plugins: {
+            footer: {
               ...footerEnabledDataMock,
               ...(showCopyright ? { copyright: 'Example GmbH' } : {}),
             },
-          })
-        )
+          },
+        })
         // WHEN: The user navigates to the tested page
         await page.goto(site)
         await page.waitForLoadState()
@@ -1,6 +1,6 @@
 import { expect } from '@playwright/test'
 import testIDs from '../../../src/ui/interfacesAndTypes/testIDs'
-import test, { prepareTestSuite } from '../base'
+import test, { mockCatalog, prepareTestSuite } from '../base'
 
 await prepareTestSuite(test)
 
@@ -26,11 +26,7 @@ const oramaEnabledDataMock = {
 
 test.describe('Orama plugin tests', () => {
   test('Orama plugin must not be visible when disabled', async ({ page }) => {
-    await page.route('*/**/api/plugins/orama/', (route) =>
-      route.fulfill({
-        json: oramaDisabledDataMock,
-      })
-    )
+    await mockCatalog(page, { plugins: { orama: oramaDisabledDataMock } })
     await page.goto('/')
     await page.waitForLoadState()
 
@@ -39,7 +35,7 @@ test.describe('Orama plugin tests', () => {
   })
 
   test('Orama plugin must be visible when enabled', async ({ page }) => {
-    await page.route('*/**/api/plugins/orama/', (route) => route.fulfill({ json: oramaEnabledDataMock }))
+    await mockCatalog(page, { plugins: { orama: oramaEnabledDataMock } })
 
     await page.goto('/')
     await page.waitForLoadState()
@@ -52,7 +48,7 @@ test.describe('Orama plugin tests', () => {
   })
 
   test('Active orama plugin works as expected', async ({ page }) => {
-    await page.route('*/**/api/plugins/orama/', (route) => route.fulfill({ json: oramaEnabledDataMock }))
+    await mockCatalog(page, { plugins: { orama: oramaEnabledDataMock } })
 
     await page.goto('/')
     await page.waitForLoadState()
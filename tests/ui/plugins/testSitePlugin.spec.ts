@@ -1,7 +1,7 @@
 import { expect } from '@playwright/test'
 import type { SitePluginT } from '../../../src/ui/interfacesAndTypes/plugins/SitePlugin'
 import testIDs from '../../../src/ui/interfacesAndTypes/testIDs'
-import test, { prepareTestSuite } from '../base'
+import test, { mockCatalog, prepareTestSuite } from '../base'
 
 await prepareTestSuite(test)
 
@@ -24,7 +24,7 @@ const configured: SitePluginT = {
 
 test.describe('Site plugin', () => {
   test('introduces the instance above the projects', async ({ page }) => {
-    await page.route('*/**/api/plugins/site/', (route) => route.fulfill({ json: configured }))
+    await mockCatalog(page, { plugins: { site: configured } })
     await page.goto('/')
 
     await expect(page.getByTestId(testIDs.plugins.site.title)).toHaveText(title)
@@ -35,7 +35,7 @@ test.describe('Site plugin', () => {
   })
 
   test('renders the long description as markdown', async ({ page }) => {
-    await page.route('*/**/api/plugins/site/', (route) => route.fulfill({ json: configured }))
+    await mockCatalog(page, { plugins: { site: configured } })
     await page.goto('/')
 
     const body = page.getByTestId(testIDs.plugins.site.longDescription)
@@ -48,14 +48,14 @@ test.describe('Site plugin', () => {
   })
 
   test('links out safely and keeps internal links in the tab', async ({ page }) => {
-    await page.route('*/**/api/plugins/site/', (route) =>
-      route.fulfill({
-        json: {
+    await mockCatalog(page, {
+      plugins: {
+        site: {
           ...configured,
           long_description: ['See [the manual](https://example.com/manual) and [projects](/example-project-01).'],
         },
-      })
-    )
+      },
+    })
     await page.goto('/')
 
     const body = page.getByTestId(testIDs.plugins.site.longDescription)
@@ -68,11 +68,11 @@ test.describe('Site plugin', () => {
   })
 
   test('degrades disallowed markup to its text', async ({ page }) => {
-    await page.route('*/**/api/plugins/site/', (route) =>
-      route.fulfill({
-        json: { ...configured, long_description: ['# Not a heading here', '', '<script>window.pwned = true</script>'] },
-      })
-    )
+    await mockCatalog(page, {
+      plugins: {
+        site: { ...configured, long_description: ['# Not a heading here', '', '<script>window.pwned = true</script>'] },
+      },
+    })
     await page.goto('/')
 
     const body = page.getByTestId(testIDs.plugins.site.longDescription)
@@ -84,9 +84,7 @@ test.describe('Site plugin', () => {
   })
 
   test('renders only what is configured', async ({ page }) => {
-    await page.route('*/**/api/plugins/site/', (route) =>
-      route.fulfill({ json: { ...configured, description: null, long_description: null } })
-    )
+    await mockCatalog(page, { plugins: { site: { ...configured, description: null, long_description: null } } })
     await page.goto('/')
 
     await expect(page.getByTestId(testIDs.plugins.site.title)).toHaveText(title)
@@ -95,9 +93,7 @@ test.describe('Site plugin', () => {
   })
 
   test('stays hidden while it is switched off for the landing page', async ({ page }) => {
-    await page.route('*/**/api/plugins/site/', (route) =>
-      route.fulfill({ json: { ...configured, show_on_landing_page: false } })
-    )
+    await mockCatalog(page, { plugins: { site: { ...configured, show_on_landing_page: false } } })
     await page.goto('/')
 
     await expect(page.getByTestId(testIDs.landingPage.projectCategories.projectCategory.main).first()).toBeVisible()
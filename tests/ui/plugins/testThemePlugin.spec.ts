@@ -1,6 +1,6 @@
 import { expect } from '@playwright/test'
 import testIDs from '../../../src/ui/interfacesAndTypes/testIDs'
-import test, { prepareTestSuite } from '../base'
+import test, { mockCatalog, prepareTestSuite } from '../base'
 
 await prepareTestSuite(test)
 
@@ -15,7 +15,7 @@ const configured = {
 
 test.describe('Theme plugin palette', () => {
   test('colors the actionable elements per color mode', async ({ page }) => {
-    await page.route('*/**/api/plugins/theme/', (route) => route.fulfill({ json: configured }))
+    await mockCatalog(page, { plugins: { theme: configured } })
 
     for (const [mode, expected] of [
       ['light', 'rgb(225, 51, 255)'],
@@ -33,7 +33,7 @@ test.describe('Theme plugin palette', () => {
   })
 
   test('squares the corners and outlines the cards', async ({ page }) => {
-    await page.route('*/**/api/plugins/theme/', (route) => route.fulfill({ json: configured }))
+    await mockCatalog(page, { plugins: { theme: configured } })
     await page.goto('/')
 
     const card = page
@@ -1,6 +1,6 @@
 import { expect } from '@playwright/test'
 import testIDs from '../../src/ui/interfacesAndTypes/testIDs'
-import test, { prepareTestSuite } from './base'
+import test, { mockCatalog, prepareTestSuite } from './base'
 import { assertIndexPage, assertVersionDropdown, assertVersionOverview } from './helpers'
 
 await prepareTestSuite(test)
@@ -64,11 +64,7 @@ test('Test navigation index to documentation to version overview', async ({ page
 test('Test project overview on no projects', async ({ page }) => {
   // Reset global mocks
   await page.unrouteAll()
-  await page.route('*/**/api/projects/', (route) =>
-    route.fulfill({
-      json: [],
-    })
-  )
+  await mockCatalog(page, { projects: [] })
 
   // Make sure no projects are listed and the error component is shown with all correct parameters
   await page.goto('/')
@@ -81,14 +77,26 @@ test('Test project overview on no projects', async ({ page }) => {
   expect(await page.getByTestId(testIDs.errorComponent.actionButton).innerText()).toBe('RELOAD PROJECTS')
 
   // Mock the API request to return a list of projects and reload the page
-  await page.route('*/**/api/projects/', (route) =>
-    route.fulfill({
-      json: [
-        { name: 'test-01', display_name: 'Test 01', category_id: null },
-        { name: 'test-02', display_name: 'Test 02', category_id: null },
-      ],
-    })
-  )
+  await mockCatalog(page, {
+    projects: [
+      {
+        name: 'test-01',
+        display_name: 'Test 01',
+        category_id: null,
+        versions: ['1.0.0'],
+        latest: '1.0.0',
+        aliases: {},
+      },
+      {
+        name: 'test-02',
+        display_name: 'Test 02',
+        category_id: null,
+        versions: ['1.0.0'],
+        latest: '1.0.0',
+        aliases: {},
+      },
+    ],
+  })
   await page.getByTestId(testIDs.errorComponent.actionButton).click()
 
   // Expect the error component to be gone and a list of project cars to be present
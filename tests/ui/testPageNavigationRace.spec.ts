@@ -1,5 +1,5 @@
 import { expect } from '@playwright/test'
-import test, { prepareTestSuite } from './base'
+import test, { mockCatalog, prepareTestSuite } from './base'
 import { BASE_URL } from './helpers'
 
 await prepareTestSuite(test)
@@ -14,13 +14,17 @@ await prepareTestSuite(test)
  *
  * The race only manifests while the route loader is pending, because useLocation() updates
  * at navigation start while route.useParams() only updates after the loaders resolve.
- * The loader performs two sequential API calls, so realistic API latency opens the window.
- * We simulate that latency here by delaying the version API endpoints.
+ * The loader resolves the version from the catalog and only asks the versions API for what the catalog
+ * does not know, such as a project published after it was fetched. That lookup takes two API calls, so
+ * realistic API latency opens the window. We simulate it here by leaving the project out of the catalog
+ * and delaying the version API endpoints.
  */
 
 const API_DELAY_MS = 300
 
 test.beforeEach(async ({ page }) => {
+  // Leave the project out of the catalog, so that the route loader has to ask the versions API
+  await mockCatalog(page, { projects: [] })
   // Delay the two version API endpoints awaited by the /$projectName/$version/$ route loader.
   // Registered after the base mocks, so these take precedence.
   for (const version of ['3.2.0', 'latest']) {
@@ -163,3 +163,23 @@ test('Requesting non existing documentation page must be handled properly', asyn
   await page.waitForLoadState()
   await assertIndexPage(page, { timeout: 1000 })
 })
+
+test('Opening a version alias resolves it from the catalog', async ({ page }) => {
+  const versionLookups: string[] = []
+  page.on('request', (request) => {
+    const { pathname } = new URL(request.url())
+    if (pathname.includes('/api/projects/') && pathname.includes('/versions/')) {
+      versionLookups.push(pathname)
+    }
+  })
+
+  await page.goto('/example-project-01/0.x/index.html')
+  await page.waitForLoadState()
+
+  // The alias is redirected to the version it resolves to, which is not the newest one
+  await expect(page).toHaveURL(`${BASE_URL}/example-project-01/0.2.0/index.html`)
+  await expect(page.getByTestId(testIDs.project.documentation.documentationIframe)).toBeVisible()
+
+  // The catalog every page shares already knew it, so the versions API was never asked
+  expect(versionLookups).toStrictEqual([])
+})
@@ -1,7 +1,7 @@
 import { expect, type Locator } from '@playwright/test'
 import type { FooterPluginT } from '../../src/ui/interfacesAndTypes/plugins/FooterPlugin'
 import testIDs from '../../src/ui/interfacesAndTypes/testIDs'
-import test, { prepareTestSuite } from './base'
+import test, { mockCatalog, prepareTestSuite } from './base'
 import {
   expectHeaderHidden,
   expectHeaderVisible,
@@ -102,7 +102,7 @@ test.describe('Scroll behavior', () => {
   }
 
   test('content padding should match app bar and footer height when footer is enabled', async ({ page }) => {
-    await page.route('*/**/api/plugins/footer/', (route) => route.fulfill({ json: footerEnabledMock }))
+    await mockCatalog(page, { plugins: { footer: footerEnabledMock } })
     await page.goto('/example-project-01/1.0.0/')
     const footer = page.getByTestId(testIDs.plugins.footer.main)
     await expect(footer).toBeVisible()
@@ -118,7 +118,7 @@ test.describe('Scroll behavior', () => {
   })
 
   test('content padding should match app bar height when footer is disabled', async ({ page }) => {
-    await page.route('*/**/api/plugins/footer/', (route) => route.fulfill({ json: footerDisabledMock }))
+    await mockCatalog(page, { plugins: { footer: footerDisabledMock } })
     await page.goto('/example-project-01/1.0.0/')
     await expect(page.getByTestId(testIDs.plugins.footer.main)).not.toBeVisible()
 
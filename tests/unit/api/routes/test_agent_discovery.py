@@ -10,6 +10,7 @@ import pytest
 from fastapi.testclient import TestClient
 from httpx import Response
 
+from tests.utils import wait_for_publish_job
 from vdoc.constants import CONFIG_ENV_PREFIX_PLUGINS
 
 
@@ -145,7 +146,7 @@ def test_llms_txt_follows_an_upload(
         "/api/projects/dummy-project-01/versions/3.0.0",
         files={"file": ("docs.zip", example_docs_zip.read_bytes(), "application/zip")},
     )
-    assert response.status_code == 201
+    assert wait_for_publish_job(api=authenticated_api, response=response)["status"] == "succeeded"
 
     body = authenticated_api.get("/llms.txt").text
     assert "http://testserver/static/projects/dummy-project-01/3.0.0/index.html" in body
@@ -240,3 +241,91 @@ def test_llms_txt_before_the_docs_directory_exists(tmp_path: Path, request: pyte
 
     assert response.status_code == 200
     assert response.text.startswith("# Documentation\n")
+
+
+def test_discovery_documents_are_rendered_once_per_catalog_state(
+    dummy_projects_dir: Path,  # noqa: ARG001
+    authenticated_api: TestClient,
+    example_docs_zip: Path,
+) -> None:
+    """Crawlers fetch these far more often than anything is published."""
+    first = authenticated_api.get("/llms.txt")
+
+    with patch("vdoc.methods.api.agent_discovery.Project.list_published") as list_published_mock:
+        assert authenticated_api.get("/llms.txt").content == first.content
+        list_published_mock.assert_not_called()
+
+    response = authenticated_api.post(
+        "/api/projects/dummy-project-01/versions/3.0.0",
+        files={"file": ("docs.zip", example_docs_zip.read_bytes(), "application/zip")},
+    )
+    wait_for_publish_job(api=authenticated_api, response=response)
+    assert "dummy-project-01/3.0.0/" in authenticated_api.get("/llms.txt").text
+
+
+def test_discovery_documents_are_kept_per_base_url(dummy_projects_dir: Path, api: TestClient) -> None:  # noqa: ARG001
+    api.get("/sitemap.xml")
+
+    forwarded = api.get("/sitemap.xml", headers={"x-forwarded-host": "docs.example.com"})
+
+    assert "http://docs.example.com/" in forwarded.text
+    assert "http://testserver/" in api.get("/sitemap.xml").text
+
+
+@pytest.mark.parametrize("path", ["/llms.txt", "/sitemap.xml", "/robots.txt"])
+def test_discovery_documents_revalidate(dummy_projects_dir: Path, api: TestClient, path: str) -> None:  # noqa: ARG001
+    response = api.get(path)
+
+    not_modified = api.get(path, headers={"If-None-Match": response.headers["etag"]})
+
+    assert not_modified.status_code == 304
+    assert "Accept-Encoding" in not_modified.headers["vary"]
+
+
+def test_discovery_documents_are_sent_compressed(dummy_projects_dir: Path, api: TestClient) -> None:  # noqa: ARG001
+    identity = api.get("/llms.txt", headers={"accept-encoding": "identity"})
+    compressed = api.get("/llms.txt", headers={"accept-encoding": "gzip, br;q=0"})
+
+    assert "content-encoding" not in identity.headers
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in compressed.headers["vary"]
+    # The client decodes what it accepted, into what the other one received as it is
+    assert compressed.text == identity.text
+    assert int(compressed.headers["content-length"]) < len(identity.content)
+
+
+def test_discovery_documents_are_tagged_per_content_coding(dummy_projects_dir: Path, api: TestClient) -> None:  # noqa: ARG001
+    identity, brotli_coded, gzip_coded = (
+        api.get("/llms.txt", headers={"accept-encoding": accept_encoding})
+        for accept_encoding in ("identity", "br", "gzip")
+    )
+
+    digest = identity.headers["etag"].strip('"')
+    assert brotli_coded.headers["etag"] == f'"{digest}-br"'
+    assert gzip_coded.headers["etag"] == f'"{digest}-gzip"'
+
+
+@pytest.mark.parametrize("accept_encoding", ["identity", "br", "gzip"])
+def test_discovery_documents_revalidate_per_content_coding(
+    dummy_projects_dir: Path,  # noqa: ARG001
+    api: TestClient,
+    accept_encoding: str,
+) -> None:
+    etags = {
+        coding: api.get("/llms.txt", headers={"accept-encoding": coding}).headers["etag"]
+        for coding in ("identity", "br", "gzip")
+    }
+
+    not_modified = api.get(
+        "/llms.txt", headers={"accept-encoding": accept_encoding, "If-None-Match": etags[accept_encoding]}
+    )
+    # A client holding the document in another coding holds other bytes, and is sent the document in full
+    others = [
+        api.get("/llms.txt", headers={"accept-encoding": accept_encoding, "If-None-Match": etag})
+        for coding, etag in etags.items()
+        if coding != accept_encoding
+    ]
+
+    assert not_modified.status_code == 304
+    assert not_modified.headers["etag"] == etags[accept_encoding]
+    assert [other.status_code for other in others] == [200, 200]
@@ -0,0 +1,97 @@
+"""Contains all unit tests for the catalog document REST API."""
+
+import os
+from pathlib import Path
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+
+from tests.utils import wait_for_publish_job
+from vdoc.catalog import get_catalog
+
+
+@patch.dict(
+    os.environ,
+    {
+        "VDOC_PROJECT_DISPLAY_NAME_MAPPING": '{"dummy-project-01": "Dummy Project 01"}',
+        "VDOC_PROJECT_CATEGORIES": '[{"id": 1, "name": "General"}]',
+        "VDOC_PROJECT_CATEGORY_MAPPING": '{"dummy-project-01": "General"}',
+    },
+)
+def test_catalog_route(dummy_projects_dir: Path, api: TestClient) -> None:
+    (dummy_projects_dir / "empty-project").mkdir()
+    get_catalog(dummy_projects_dir).refresh(names=["empty-project"])
+
+    document = api.get("/api/catalog").json()
+    aliases = {project["name"]: project.pop("aliases") for project in document["projects"]}
+
+    assert document["generation"] == get_catalog(dummy_projects_dir).generation
+    assert document["projects"] == [
+        {
+            "name": "dummy-project-01",
+            "display_name": "Dummy Project 01",
+            "category_id": 1,
+            "versions": api.get("/api/projects/dummy-project-01/versions/").json(),
+            "latest": "2.0.0",
+        },
+        {
+            "name": "dummy-project-02",
+            "display_name": "dummy-project-02",
+            "category_id": None,
+            "versions": api.get("/api/projects/dummy-project-02/versions/").json(),
+            "latest": "6.0",
+        },
+        {
+            "name": "dummy-project-03",
+            "display_name": "dummy-project-03",
+            "category_id": None,
+            "versions": api.get("/api/projects/dummy-project-03/versions/").json(),
+            "latest": "2.0.0-beta",
+        },
+        {"name": "empty-project", "display_name": "empty-project", "category_id": None, "versions": [], "latest": None},
+    ]
+    # Each resolved as the versions API resolves it
+    assert aliases["dummy-project-02"]["5.x"] == "5.9.9"
+    assert aliases["empty-project"] == {}
+    for name, resolved in aliases.items():
+        for alias, version in resolved.items():
+            assert api.get(f"/api/projects/{name}/versions/{alias}").json() == version
+    assert document["categories"] == [{"id": 1, "name": "General"}]
+    # Active plugins only, each as its own route answers it. The others are inactive unless configured.
+    assert document["plugins"].keys() == {"theme"}
+    for name, config in document["plugins"].items():
+        assert config == api.get(f"/api/plugins/{name}/").json()
+
+
+def test_catalog_route_revalidates(
+    dummy_projects_dir: Path, authenticated_api: TestClient, example_docs_zip: Path
+) -> None:
+    response = authenticated_api.get("/api/catalog")
+    assert response.headers["content-type"] == "application/json"
+
+    not_modified = authenticated_api.get("/api/catalog", headers={"If-None-Match": response.headers["etag"]})
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+
+    upload = authenticated_api.post(
+        "/api/projects/dummy-project-01/versions/3.0.0",
+        files={"file": (example_docs_zip.name, example_docs_zip.read_bytes(), "application/zip")},
+    )
+    wait_for_publish_job(api=authenticated_api, response=upload)
+    changed = authenticated_api.get("/api/catalog", headers={"If-None-Match": response.headers["etag"]})
+    assert changed.status_code == 200
+    assert changed.json()["projects"][0]["latest"] == "3.0.0"
+    assert (dummy_projects_dir / "dummy-project-01" / "3.0.0").is_dir()
+
+
+def test_catalog_route_is_rendered_once_per_catalog_state(dummy_projects_dir: Path, api: TestClient) -> None:
+    first = api.get("/api/catalog")
+
+    with patch("vdoc.methods.api.catalog.CatalogDocumentRenderer._build") as build_mock:
+        assert api.get("/api/catalog").content == first.content
+        build_mock.assert_not_called()
+
+    (dummy_projects_dir / "new-project" / "1.0.0").mkdir(parents=True)
+    get_catalog(dummy_projects_dir).refresh(names=["new-project"])
+
+    assert "new-project" in [project["name"] for project in api.get("/api/catalog").json()["projects"]]
@@ -0,0 +1,64 @@
+"""Contains all unit tests for the hot file cache REST API."""
+
+import gzip
+import shutil
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+from vdoc.catalog import get_catalog
+from vdoc.published_manifests import build_directory_manifest, write_published_manifest
+
+SEARCH_INDEX = 'Search.setIndex({"docnames": ["index"], "titles": ["Home"]});\n' * 100
+
+
+def test_static_files_are_answered_from_memory(dummy_projects_dir: Path, api: TestClient) -> None:
+    version_path = dummy_projects_dir / "dummy-project-01" / "2.0.0"
+    url = "/static/projects/dummy-project-01/2.0.0/index.html"
+    before = api.get("/api/hot-files/").json()
+
+    first = api.get(url)
+    # A published version never changes, so what was read once is never read again
+    (version_path / "index.html").write_text("changed in place")
+    second = api.get(url)
+
+    assert second.text == first.text == "This is 2.0.0 of dummy-project-01"
+    assert second.headers["etag"] == first.headers["etag"]
+    assert second.headers["cache-control"] == "public, max-age=31536000, immutable"
+    assert api.get(url, headers={"If-None-Match": first.headers["etag"]}).status_code == 304
+    after = api.get("/api/hot-files/").json()
+    assert after["hits"] - before["hits"] == 2
+    assert after["misses"] - before["misses"] == 1
+    assert after["size"] > 0
+
+    # Removing the version changes the catalog generation of its project, and with it what is kept
+    shutil.rmtree(version_path)
+    get_catalog(dummy_projects_dir).refresh()
+    assert api.get(url).status_code == 404
+
+
+def test_static_files_are_kept_in_every_form(dummy_projects_dir: Path, api: TestClient) -> None:
+    version_path = dummy_projects_dir / "dummy-project-01" / "2.0.0"
+    (version_path / "searchindex.js").write_text(SEARCH_INDEX)
+    (version_path / "searchindex.js.gz").write_bytes(copy := gzip.compress(SEARCH_INDEX.encode()))
+    manifest = build_directory_manifest(
+        path=version_path, threads=1, precompressed={"searchindex.js": {".gz": len(copy)}}
+    )
+    write_published_manifest(docs_dir=dummy_projects_dir, name="dummy-project-01", version="2.0.0", manifest=manifest)
+    url = "/static/projects/dummy-project-01/2.0.0/searchindex.js"
+
+    for _ in range(2):
+        assert api.get(url, headers={"Accept-Encoding": "identity"}).text == SEARCH_INDEX
+        compressed = api.get(url, headers={"Accept-Encoding": "gzip"})
+        assert compressed.headers["content-encoding"] == "gzip"
+        assert compressed.text == SEARCH_INDEX
+
+
+def test_parts_of_static_files_are_answered_from_the_disk(dummy_projects_dir: Path, api: TestClient) -> None:  # noqa: ARG001
+    url = "/static/projects/dummy-project-01/2.0.0/index.html"
+    api.get(url)
+
+    response = api.get(url, headers={"Range": "bytes=0-3"})
+
+    assert response.status_code == 206
+    assert response.text == "This"
@@ -0,0 +1,30 @@
+"""Contains all unit tests for the publish job REST API."""
+
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+from tests.utils import assert_api_response, wait_for_publish_job
+
+
+def test_get_publish_job_route(authenticated_api: TestClient, example_docs_zip: Path, dummy_projects_dir: Path) -> None:  # noqa: ARG001
+    response = authenticated_api.post(
+        "/api/projects/dummy-project-01/versions/3.0.0",
+        files={"file": (example_docs_zip.name, example_docs_zip.read_bytes(), "application/zip")},
+    )
+    job = wait_for_publish_job(api=authenticated_api, response=response)
+
+    assert authenticated_api.get(f"/api/jobs/{job['id']}").json() == {
+        "id": response.json()["id"],
+        "project": "dummy-project-01",
+        "version": "3.0.0",
+        "status": "succeeded",
+        "status_code": 201,
+        "message": "Version '3.0.0' of project 'dummy-project-01' uploaded successfully.",
+    }
+
+
+def test_get_publish_job_route_unknown_job(api: TestClient, dummy_projects_dir: Path) -> None:  # noqa: ARG001
+    assert_api_response(
+        response=api.get("/api/jobs/unknown"), status_code=404, message="Publish job 'unknown' doesn't exist."
+    )
@@ -7,6 +7,8 @@ from unittest.mock import MagicMock, patch
 import pytest
 from fastapi.testclient import TestClient
 
+from vdoc.settings import get_settings
+
 BUNDLE_CONTENT = "console.log('the bundle itself');\n" * 100
 
 
@@ -41,6 +43,46 @@ def test_sphinx_inventory_not_shipped_by_the_version(dummy_projects_dir: Path, a
     }
 
 
+@pytest.fixture(name="offloading_api")
+def offloading_api_fixture(
+    monkeypatch: pytest.MonkeyPatch,
+    dummy_projects_dir: Path,  # noqa: ARG001
+    request: pytest.FixtureRequest,
+) -> TestClient:
+    """The app, configured to hand documentation files to nginx rather than send them."""
+    monkeypatch.setenv("VDOC_STATIC_OFFLOAD", "x-accel-redirect")
+    get_settings.cache_clear()
+    return request.getfixturevalue("api")
+
+
+def test_sphinx_inventory_offloaded(dummy_projects_dir: Path, offloading_api: TestClient) -> None:
+    (dummy_projects_dir / "dummy-project-01" / "2.0.0" / "objects.inv").write_text("dummy objects.inv content")
+
+    response = offloading_api.get("/dummy-project-01/latest/objects.inv")
+
+    assert response.status_code == 200
+    assert response.headers["x-accel-redirect"] == "/_vdoc/docs/dummy-project-01/2.0.0/objects.inv"
+    assert response.content == b""
+
+
+def test_static_files_offloaded(dummy_projects_dir: Path, offloading_api: TestClient) -> None:
+    version_path = dummy_projects_dir / "dummy-project-01" / "2.0.0"
+    (version_path / "index.html.gz").write_bytes(gzip.compress(b"This is 2.0.0 of dummy-project-01"))
+
+    response = offloading_api.get("/static/projects/dummy-project-01/2.0.0/", headers={"accept-encoding": "gzip"})
+
+    assert response.status_code == 200
+    assert response.headers["x-accel-redirect"] == "/_vdoc/docs/dummy-project-01/2.0.0/index.html"
+    assert response.headers["content-type"] == "text/html; charset=utf-8"
+    assert response.headers["cache-control"] == "public, max-age=31536000, immutable"
+    # nginx picks the compressed copy with gzip_static, and drops what it would be told here
+    assert "content-encoding" not in response.headers
+    assert response.content == b""
+    # Still vdoc's to decide what does not exist
+    assert offloading_api.get("/static/projects/dummy-project-01/2.0.0/missing.html").status_code == 404
+    assert "x-accel-redirect" not in offloading_api.get("/static/projects/.dummy_hidden/").headers
+
+
 def test_serve_frontend_assets(monkeypatch: pytest.MonkeyPatch, tmp_path: Path, api: TestClient) -> None:
     (tmp_path / "style.css").write_text("dummy style sheet")
     monkeypatch.setattr("vdoc.api.lifespan.webapp_path", tmp_path)
@@ -133,6 +175,43 @@ def test_serve_frontend_assets_rejects_path_traversal(
     assert response.text == "dummy index.html content"
 
 
+@pytest.mark.parametrize("path", ["/wp-admin/setup-config.php", "/dummy-project-01/1.0.0/index.html"])
+def test_serve_frontend_only_looks_for_assets_where_there_are_some(
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+    dummy_projects_dir: Path,  # noqa: ARG001
+    api: TestClient,
+    path: str,
+) -> None:
+    """Scanners send thousands of paths that lead nowhere, which are turned down without looking."""
+    (tmp_path / "webapp").mkdir()
+    (tmp_path / "webapp" / "index.html").write_text("dummy index.html content")
+    monkeypatch.setattr("vdoc.api.lifespan.webapp_path", tmp_path / "webapp")
+    api.get(path)  # The web UI and the settings are read once, by whichever request comes first
+
+    with patch.object(Path, "resolve") as resolve_mock, patch.object(Path, "stat") as stat_mock:
+        response = api.get(path)
+
+    assert response.text == "dummy index.html content"
+    resolve_mock.assert_not_called()
+    stat_mock.assert_not_called()
+
+
+def test_serve_frontend_index_from_memory(monkeypatch: pytest.MonkeyPatch, tmp_path: Path, api: TestClient) -> None:
+    """The build does not change while it is served, so its shell is read once."""
+    (tmp_path / "index.html").write_text("dummy index.html content")
+    monkeypatch.setattr("vdoc.api.lifespan.webapp_path", tmp_path)
+    first = api.get("/")
+
+    (tmp_path / "index.html").unlink()
+    response = api.get("/unknown")
+
+    assert response.status_code == 404
+    assert response.text == "dummy index.html content"
+    assert response.headers["content-type"] == "text/html; charset=utf-8"
+    assert response.headers["etag"] == first.headers["etag"]
+
+
 @pytest.mark.parametrize(
     ("path", "expected_status_code"),
     [
@@ -238,7 +317,69 @@ def test_static_latest_serves_the_file_it_redirects_to(dummy_projects_dir: Path,
     assert response.text == "This is 2.0.0 of dummy-project-01"
 
 
+def test_static_alias_redirects_to_the_published_version(dummy_projects_dir: Path, api: TestClient) -> None:  # noqa: ARG001
+    response = api.get("/static/projects/dummy-project-01/1.x/guide/index.html", follow_redirects=False)
+
+    assert response.status_code == 307
+    assert response.headers["location"] == "/static/projects/dummy-project-01/1.1.0/guide/index.html"
+    assert response.headers["cache-control"] == "no-cache"
+
+
+def test_static_version_files_are_immutable(dummy_projects_dir: Path, api: TestClient) -> None:  # noqa: ARG001
+    response = api.get("/static/projects/dummy-project-01/2.0.0/index.html")
+
+    assert response.status_code == 200
+    assert response.headers["cache-control"] == "public, max-age=31536000, immutable"
+    assert not response.headers["etag"].startswith("W/")
+    revalidated = api.get(
+        "/static/projects/dummy-project-01/2.0.0/", headers={"If-None-Match": response.headers["etag"]}
+    )
+    assert revalidated.status_code == 304
+    assert revalidated.headers["cache-control"] == "public, max-age=31536000, immutable"
+
+
+def test_static_version_files_resume(dummy_projects_dir: Path, api: TestClient) -> None:
+    download = bytes(range(256)) * 4096
+    (dummy_projects_dir / "dummy-project-01" / "2.0.0" / "manual.pdf").write_bytes(download)
+    url = "/static/projects/dummy-project-01/2.0.0/manual.pdf"
+    etag = api.get(url).headers["etag"]
+
+    resumed = api.get(url, headers={"Range": "bytes=1000000-", "If-Range": etag})
+    assert resumed.status_code == 206
+    assert resumed.headers["content-range"] == f"bytes 1000000-{len(download) - 1}/{len(download)}"
+    assert resumed.content == download[1000000:]
+
+    several = api.get(url, headers={"Range": "bytes=0-9,500-509"})
+    assert several.status_code == 206
+    assert several.headers["content-type"].startswith("multipart/byteranges; boundary=")
+    assert download[500:510] in several.content
+
+    changed = api.get(url, headers={"Range": "bytes=1000000-", "If-Range": '"another"'})
+    assert changed.status_code == 200
+    assert changed.content == download
+
+
+def test_static_files_next_to_the_versions_are_not_immutable(dummy_projects_dir: Path, api: TestClient) -> None:
+    (dummy_projects_dir / "dummy-project-01" / "README.txt").write_text("Not a version")
+    (dummy_projects_dir / "dummy-project-01" / "drafts").mkdir()
+    (dummy_projects_dir / "dummy-project-01" / "drafts" / "index.html").write_text("Not a version either")
+
+    for path in ("README.txt", "drafts/index.html"):
+        response = api.get(f"/static/projects/dummy-project-01/{path}")
+        assert response.status_code == 200
+        assert "cache-control" not in response.headers
+
+
 def test_static_latest_of_an_unknown_project(api: TestClient) -> None:
     response = api.get("/static/projects/not-a-project/latest/index.html", follow_redirects=False)
 
     assert response.status_code == 404
+
+
+def test_static_does_not_serve_vdocs_own_state(dummy_projects_dir: Path, api: TestClient) -> None:
+    """The catalog lives in the docs directory, which is what the static mount serves."""
+    assert (dummy_projects_dir / ".vdoc" / "catalog.sqlite3").is_file()
+
+    response = api.get("/static/projects/.vdoc/catalog.sqlite3")
+
+    assert response.status_code == 404
@@ -5,8 +5,23 @@ from unittest.mock import patch
 
 from fastapi.testclient import TestClient
 
+from vdoc.settings import get_settings
+
 
 @patch.dict(os.environ, {"VDOC_PROJECT_CATEGORIES": '[{"id": 1, "name": "General"}]'}, clear=True)
 def test_list_project_categories_route(api: TestClient) -> None:
     response = api.get("/api/project_categories/")
     assert response.json() == [{"name": "General", "id": 1}]
+
+
+@patch.dict(os.environ, {"VDOC_PROJECT_CATEGORIES": '[{"id": 1, "name": "General"}]'}, clear=True)
+def test_list_project_categories_route_revalidates(api: TestClient) -> None:
+    response = api.get("/api/project_categories/")
+    assert response.headers["cache-control"] == "no-cache"
+
+    revalidated = api.get("/api/project_categories/", headers={"If-None-Match": f'"other", {response.headers["etag"]}'})
+    assert revalidated.status_code == 304
+
+    get_settings.cache_clear()
+    os.environ["VDOC_PROJECT_CATEGORIES"] = '[{"id": 1, "name": "Renamed"}]'
+    assert api.get("/api/project_categories/", headers={"If-None-Match": response.headers["etag"]}).status_code == 200
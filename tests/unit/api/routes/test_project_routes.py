@@ -1,16 +1,38 @@
 """Contains all unit tests for the projects REST API."""
 
+import asyncio
+import gzip
+import hashlib
+import io
 import os
+import shutil
+import sys
+import tarfile
+import threading
 import zipfile
+from collections.abc import Callable, Iterator
 from pathlib import Path
+from typing import Any
 from unittest.mock import MagicMock, patch
 
+import pytest
 from fastapi.testclient import TestClient
+from httpx import Response
 from packaging.version import Version
 
-from tests.utils import assert_api_response, ensure_project_dir_not_created
+if sys.version_info >= (3, 14):
+    from compression import zstd
+else:
+    from backports import zstd
+
+from tests.utils import assert_api_response, ensure_project_dir_not_created, wait_for_publish_job
+from vdoc.archives import extract_tar_stream, extract_zip
 from vdoc.exceptions import ProjectVersionNotFound
 from vdoc.models.project import Project
+from vdoc.precompression import precompress_version
+from vdoc.publish_queue import get_stream_limiter
+from vdoc.published_manifests import read_published_manifest, read_published_summary
+from vdoc.settings import get_settings
 
 
 @patch.dict(
@@ -40,7 +62,7 @@ def test_get_project_versions_route(list_project_versions_impl_mock: MagicMock,
     list_project_versions_impl_mock.return_value = mocked_versions
     response = api.get("/api/projects/foo/versions/")
     assert response.json() == mocked_versions
-    list_project_versions_impl_mock.assert_called_once_with(name="foo")
+    list_project_versions_impl_mock.assert_called_once_with(name="foo", spec=None)
 
 
 @patch("vdoc.api.routes.projects.get_project_version_impl")
@@ -52,6 +74,114 @@ def test_get_project_version_route(get_project_version_impl_mock: MagicMock, api
     )
 
 
+def test_list_projects_route_revalidates(
+    dummy_projects_dir: Path, authenticated_api: TestClient, example_docs_zip: Path
+) -> None:
+    etag = authenticated_api.get("/api/projects/").headers["etag"]
+
+    response = authenticated_api.get("/api/projects/", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+
+    (dummy_projects_dir / "new-project").mkdir()
+    response = authenticated_api.post(
+        "/api/projects/new-project/versions/1.0.0",
+        files={"file": (example_docs_zip.name, example_docs_zip.read_bytes(), "application/zip")},
+    )
+    wait_for_publish_job(api=authenticated_api, response=response)
+    response = authenticated_api.get("/api/projects/", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert "new-project" in [project["name"] for project in response.json()]
+
+
+@patch.dict(os.environ, {"VDOC_PROJECT_DISPLAY_NAME_MAPPING": '{"dummy-project-01": "Dummy Project 01"}'})
+def test_list_projects_route_etag_follows_the_settings(dummy_projects_dir: Path, api: TestClient) -> None:  # noqa: ARG001
+    etag = api.get("/api/projects/").headers["etag"]
+    get_settings.cache_clear()
+    os.environ["VDOC_PROJECT_DISPLAY_NAME_MAPPING"] = '{"dummy-project-01": "Renamed"}'
+
+    assert api.get("/api/projects/", headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_list_project_versions_route_revalidates(
+    dummy_projects_dir: Path, authenticated_api: TestClient, example_docs_zip: Path
+) -> None:
+    """Publishing to one project must leave the versions of every other one valid."""
+    etags = {
+        name: authenticated_api.get(f"/api/projects/{name}/versions/").headers["etag"]
+        for name in ("dummy-project-01", "dummy-project-02")
+    }
+    assert (
+        authenticated_api.get(
+            "/api/projects/dummy-project-01/versions/", headers={"If-None-Match": f"W/{etags['dummy-project-01']}"}
+        ).status_code
+        == 304
+    )
+
+    response = authenticated_api.post(
+        "/api/projects/dummy-project-01/versions/3.0.0",
+        files={"file": (example_docs_zip.name, example_docs_zip.read_bytes(), "application/zip")},
+    )
+    wait_for_publish_job(api=authenticated_api, response=response)
+
+    for name, status_code in (("dummy-project-01", 200), ("dummy-project-02", 304)):
+        response = authenticated_api.get(f"/api/projects/{name}/versions/", headers={"If-None-Match": etags[name]})
+        assert response.status_code == status_code
+    assert (dummy_projects_dir / "dummy-project-01" / "3.0.0").is_dir()
+
+
+def test_list_project_versions_route_of_an_unknown_project(api: TestClient) -> None:
+    response = api.get("/api/projects/unknown/versions/", headers={"If-None-Match": "*"})
+    assert_api_response(response=response, status_code=404, message="Project 'unknown' doesn't exist.")
+    assert "etag" not in response.headers
+
+
+def test_list_project_versions_route_with_a_specifier(dummy_projects_dir: Path, api: TestClient) -> None:  # noqa: ARG001
+    response = api.get("/api/projects/dummy-project-01/versions/", params={"spec": ">=0.1,<2"})
+    assert response.json() == ["0.1.0", "1.0.0", "1.1.0"]
+
+
+def test_list_project_versions_route_with_an_invalid_specifier(dummy_projects_dir: Path, api: TestClient) -> None:  # noqa: ARG001
+    response = api.get("/api/projects/dummy-project-01/versions/", params={"spec": "2.x"})
+    assert_api_response(response=response, status_code=400, message="'2.x' is not a valid version specifier.")
+
+
+def test_list_project_versions_route_with_an_invalid_specifier_and_a_tag(
+    dummy_projects_dir: Path,  # noqa: ARG001
+    api: TestClient,
+) -> None:
+    etag = api.get("/api/projects/dummy-project-01/versions/").headers["etag"]
+
+    for if_none_match in (etag, "*"):
+        response = api.get(
+            "/api/projects/dummy-project-01/versions/", params={"spec": "2.x"}, headers={"If-None-Match": if_none_match}
+        )
+        assert_api_response(response=response, status_code=400, message="'2.x' is not a valid version specifier.")
+
+
+def test_list_project_versions_route_tags_each_specifier(dummy_projects_dir: Path, api: TestClient) -> None:  # noqa: ARG001
+    def etag(spec: str | None) -> str:
+        return api.get("/api/projects/dummy-project-01/versions/", params={"spec": spec} if spec else {}).headers[
+            "etag"
+        ]
+
+    assert len({etag(spec=None), etag(spec=">=0.1,<2"), etag(spec=">=1")}) == 3
+    # The same set, spelled another way
+    assert etag(spec=">=0.1,<2") == etag(spec="<2, >=0.1")
+    response = api.get(
+        "/api/projects/dummy-project-01/versions/",
+        params={"spec": "<2,>=0.1"},
+        headers={"If-None-Match": etag(">=0.1,<2")},
+    )
+    assert response.status_code == 304
+
+
+def test_get_project_version_route_resolves_an_alias(dummy_projects_dir: Path, api: TestClient) -> None:  # noqa: ARG001
+    assert api.get("/api/projects/dummy-project-02/versions/5.x").json() == "5.9.9"
+
+
 def test_upload_project_version_route_unauthenticated(api: TestClient, example_docs_zip: Path) -> None:
     response = api.post(
         "/api/projects/dummy-project-01/versions/1.0.0",
@@ -70,16 +200,279 @@ def test_upload_project_version_route(
         "/api/projects/dummy-project-01/versions/3.0.0",
         files={"file": (example_docs_zip.name, example_docs_zip.read_bytes(), "application/zip")},
     )
-    assert_api_response(
-        response=response,
-        status_code=201,
-        message="Version '3.0.0' of project 'dummy-project-01' uploaded successfully.",
-    )
+    assert response.json()["project"] == "dummy-project-01"
+    assert response.json()["version"] == "3.0.0"
+    assert response.headers["location"] == f"/api/jobs/{response.json()['id']}"
+
+    job = wait_for_publish_job(api=authenticated_api, response=response)
+    assert job["status"] == "succeeded"
+    assert job["status_code"] == 201
+    assert job["message"] == "Version '3.0.0' of project 'dummy-project-01' uploaded successfully."
     assert (project_version_dir).is_dir()
     index_file = project_version_dir / "index.html"
     assert index_file.is_file()
     assert index_file.read_text() == "<html><body>Test File</body></html>"
 
+    manifest = read_published_manifest(docs_dir=dummy_projects_dir, name="dummy-project-01", version="3.0.0")
+    assert manifest is not None
+    # Only what the upload delivered, the compressed copy placed next to it is listed with its file
+    assert list(manifest.files) == ["index.html"]
+    assert (manifest.file_count, manifest.total_size) == (1, index_file.stat().st_size)
+    # Too small to be worth compressing
+    assert manifest.files["index.html"].precompressed == {}
+    assert not (project_version_dir / "index.html.br").exists()
+    assert (
+        read_published_summary(docs_dir=dummy_projects_dir, name="dummy-project-01", version="3.0.0")
+        == manifest.summary()
+    )
+    digest = hashlib.sha256(b"<html><body>Test File</body></html>").hexdigest()
+    assert manifest.files["index.html"].sha256 == digest
+    # Tagged by its content, so every worker and every copy of the docs directory agrees
+    response = authenticated_api.get(
+        "/static/projects/dummy-project-01/3.0.0/index.html", headers={"accept-encoding": "identity"}
+    )
+    assert response.headers["etag"] == f'"{digest[:32]}"'
+    response = authenticated_api.get(
+        "/static/projects/dummy-project-01/3.0.0/index.html", headers={"accept-encoding": "br"}
+    )
+    assert "content-encoding" not in response.headers
+    assert response.headers["etag"] == f'"{digest[:32]}"'
+
+
+def test_upload_project_version_route_links_what_is_published_already(
+    dummy_projects_dir: Path, authenticated_api: TestClient, tmp_path: Path
+) -> None:
+    archive_path = tmp_path / "docs.zip"
+    for version in ("3.0.0", "3.1.0"):
+        with zipfile.ZipFile(file=archive_path, mode="w") as archive:
+            archive.writestr("index.html", f"<html>{version}</html>")
+            archive.writestr("_static/theme.css", "body { color: black }")
+        response = authenticated_api.post(
+            f"/api/projects/dummy-project-01/versions/{version}",
+            files={"file": (archive_path.name, archive_path.read_bytes(), "application/zip")},
+        )
+        assert wait_for_publish_job(api=authenticated_api, response=response)["status"] == "succeeded"
+
+    project_dir = dummy_projects_dir / "dummy-project-01"
+    assert (project_dir / "3.0.0" / "_static" / "theme.css").samefile(project_dir / "3.1.0" / "_static" / "theme.css")
+    assert (project_dir / "3.1.0" / "index.html").read_text() == "<html>3.1.0</html>"
+
+
+@pytest.mark.parametrize(("accept_encoding", "content_encoding"), [("gzip, br", "br"), ("gzip", "gzip"), ("", None)])
+def test_upload_project_version_route_serves_precompressed_copies(
+    dummy_projects_dir: Path,  # noqa: ARG001
+    authenticated_api: TestClient,
+    tmp_path: Path,
+    accept_encoding: str,
+    content_encoding: str | None,
+) -> None:
+    search_index = 'Search.setIndex({"docnames": ["index"], "titles": ["Home"]});\n' * 100
+    archive_path = tmp_path / "docs.zip"
+    with zipfile.ZipFile(file=archive_path, mode="w") as archive:
+        archive.writestr("index.html", "<html></html>")
+        archive.writestr("searchindex.js", search_index)
+    response = authenticated_api.post(
+        "/api/projects/dummy-project-01/versions/3.0.0",
+        files={"file": (archive_path.name, archive_path.read_bytes(), "application/zip")},
+    )
+    assert wait_for_publish_job(api=authenticated_api, response=response)["status"] == "succeeded"
+
+    url = "/static/projects/dummy-project-01/3.0.0/searchindex.js"
+    response = authenticated_api.get(url, headers={"Accept-Encoding": accept_encoding})
+
+    assert response.status_code == 200
+    assert response.text == search_index
+    assert response.headers.get("content-encoding") == content_encoding
+    assert response.headers["content-type"].startswith("text/javascript")
+    assert "Accept-Encoding" in response.headers["vary"]
+
+    revalidated = authenticated_api.get(
+        url, headers={"Accept-Encoding": accept_encoding, "If-None-Match": response.headers["etag"]}
+    )
+    assert revalidated.status_code == 304
+    assert "Accept-Encoding" in revalidated.headers["vary"]
+
+
+@pytest.mark.parametrize("storage", ["directory", "archive"])
+def test_upload_project_version_route_sends_no_copy_it_did_not_place(
+    dummy_projects_dir: Path, authenticated_api: TestClient, tmp_path: Path, storage: str
+) -> None:
+    """A file that only looks like a compressed copy is the upload's own, and never sent in place of another."""
+    archive_path = tmp_path / "docs.zip"
+    with zipfile.ZipFile(file=archive_path, mode="w") as archive:
+        archive.writestr("index.html", "<html></html>")
+        archive.writestr("data.json", '{"key": "value"}' * 100)
+        archive.writestr("data.json.gz", b"not the content of data.json")
+    with patch.dict(os.environ, {"VDOC_VERSION_STORAGE": storage}):
+        get_settings.cache_clear()
+        response = authenticated_api.post(
+            "/api/projects/dummy-project-01/versions/3.0.0",
+            files={"file": (archive_path.name, archive_path.read_bytes(), "application/zip")},
+        )
+        assert wait_for_publish_job(api=authenticated_api, response=response)["status"] == "succeeded"
+    get_settings.cache_clear()
+
+    response = authenticated_api.get(
+        "/static/projects/dummy-project-01/3.0.0/data.json", headers={"Accept-Encoding": "gzip"}
+    )
+    assert "content-encoding" not in response.headers
+    assert response.text == '{"key": "value"}' * 100
+    # And a version copied in by hand has no copies vdoc placed at all
+    version_path = dummy_projects_dir / "dummy-project-01" / "2.0.0"
+    (version_path / "index.html.gz").write_bytes(b"not the content of index.html")
+    response = authenticated_api.get(
+        "/static/projects/dummy-project-01/2.0.0/index.html", headers={"Accept-Encoding": "gzip"}
+    )
+    assert "content-encoding" not in response.headers
+    assert response.text == (version_path / "index.html").read_text()
+
+
+@pytest.fixture
+def archive_storage() -> Iterator[None]:
+    with patch.dict(os.environ, {"VDOC_VERSION_STORAGE": "archive"}):
+        get_settings.cache_clear()
+        yield
+    get_settings.cache_clear()
+
+
+@pytest.mark.usefixtures("archive_storage")
+def test_upload_project_version_route_kept_as_an_archive(
+    dummy_projects_dir: Path, authenticated_api: TestClient, tmp_path: Path
+) -> None:
+    search_index = 'Search.setIndex({"docnames": ["index"], "titles": ["Home"]});\n' * 100
+    archive_path = tmp_path / "docs.zip"
+    with zipfile.ZipFile(file=archive_path, mode="w", compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("index.html", "<html>index</html>")
+        archive.writestr("api/index.html", "<html>api</html>")
+        archive.writestr("searchindex.js", search_index)
+        archive.writestr("objects.inv", b"inventory")
+    upload = {"file": (archive_path.name, archive_path.read_bytes(), "application/zip")}
+
+    response = authenticated_api.post("/api/projects/dummy-project-01/versions/3.0.0", files=upload)
+
+    assert wait_for_publish_job(api=authenticated_api, response=response)["status"] == "succeeded"
+    project_dir = dummy_projects_dir / "dummy-project-01"
+    assert (project_dir / "3.0.0.zip").is_file()
+    assert not (project_dir / "3.0.0").exists()
+    assert authenticated_api.get("/api/projects/dummy-project-01/versions/latest").json() == "3.0.0"
+
+    url = "/static/projects/dummy-project-01/3.0.0/searchindex.js"
+    response = authenticated_api.get(url, headers={"Accept-Encoding": "br"})
+    assert response.status_code == 200
+    assert response.text == search_index
+    assert response.headers["content-encoding"] == "br"
+    assert response.headers["content-type"].startswith("text/javascript")
+    assert response.headers["cache-control"] == "public, max-age=31536000, immutable"
+    assert "Accept-Encoding" in response.headers["vary"]
+    revalidated = authenticated_api.get(
+        url, headers={"Accept-Encoding": "br", "If-None-Match": response.headers["etag"]}
+    )
+    assert revalidated.status_code == 304
+
+    assert authenticated_api.get("/static/projects/dummy-project-01/3.0.0/").text == "<html>index</html>"
+    redirected = authenticated_api.get("/static/projects/dummy-project-01/3.0.0/api", follow_redirects=False)
+    assert redirected.headers["location"] == "http://testserver/static/projects/dummy-project-01/3.0.0/api/"
+    assert authenticated_api.get("/static/projects/dummy-project-01/3.0.0/api/").text == "<html>api</html>"
+    assert authenticated_api.get("/static/projects/dummy-project-01/3.0.0/missing.html").status_code == 404
+    resumed = authenticated_api.get(
+        "/static/projects/dummy-project-01/3.0.0/objects.inv", headers={"Range": "bytes=2-", "If-Range": '"none"'}
+    )
+    assert (resumed.status_code, resumed.content) == (200, b"inventory")
+    resumed = authenticated_api.get(
+        "/static/projects/dummy-project-01/3.0.0/objects.inv", headers={"Range": "bytes=2-"}
+    )
+    assert (resumed.status_code, resumed.content) == (206, b"ventory")
+    assert authenticated_api.get("/dummy-project-01/3.0.0/objects.inv").content == b"inventory"
+
+    assert_api_response(
+        response=authenticated_api.post("/api/projects/dummy-project-01/versions/3.0.0", files=upload),
+        status_code=403,
+        message="Version '3.0.0' of project 'dummy-project-01' already exists.",
+    )
+
+
+def test_upload_project_version_route_is_invisible_until_complete(
+    dummy_projects_dir: Path, authenticated_api: TestClient, example_docs_zip: Path
+) -> None:
+    project_version_dir = dummy_projects_dir / "dummy-project-01" / "3.0.0"
+
+    def extract_and_look(**kwargs: Any) -> dict[str, str]:
+        digests = extract_zip(**kwargs)
+        # Everything is extracted, and yet no reader can tell
+        assert not project_version_dir.exists()
+        assert "3.0.0" not in authenticated_api.get("/api/projects/dummy-project-01/versions/").json()
+        return digests
+
+    with patch("vdoc.methods.api.projects.extract_zip", side_effect=extract_and_look):
+        response = authenticated_api.post(
+            "/api/projects/dummy-project-01/versions/3.0.0",
+            files={"file": (example_docs_zip.name, example_docs_zip.read_bytes(), "application/zip")},
+        )
+        assert wait_for_publish_job(api=authenticated_api, response=response)["status"] == "succeeded"
+
+    assert (project_version_dir / "index.html").is_file()
+    assert not any((dummy_projects_dir / ".vdoc" / "staging").iterdir())
+
+
+def test_upload_project_version_route_fails_in_the_background(
+    dummy_projects_dir: Path, authenticated_api: TestClient, example_docs_zip: Path
+) -> None:
+    project_version_dir = dummy_projects_dir / "dummy-project-01" / "3.0.0"
+
+    def extract_while_another_upload_finishes(**kwargs: Any) -> dict[str, str]:
+        digests = extract_zip(**kwargs)
+        project_version_dir.mkdir()
+        (project_version_dir / "index.html").write_text("The other upload")
+        return digests
+
+    with patch("vdoc.methods.api.projects.extract_zip", side_effect=extract_while_another_upload_finishes):
+        response = authenticated_api.post(
+            "/api/projects/dummy-project-01/versions/3.0.0",
+            files={"file": (example_docs_zip.name, example_docs_zip.read_bytes(), "application/zip")},
+        )
+        job = wait_for_publish_job(api=authenticated_api, response=response)
+
+    assert job["status"] == "failed"
+    assert job["status_code"] == 403
+    assert job["message"] == "Version '3.0.0' of project 'dummy-project-01' already exists."
+    assert (project_version_dir / "index.html").read_text() == "The other upload"
+
+
+@patch.dict(os.environ, {"VDOC_PUBLISH_CONCURRENCY": "1", "VDOC_PUBLISH_QUEUE_DEPTH": "1"})
+def test_upload_project_version_route_queue_full(
+    dummy_projects_dir: Path, authenticated_api: TestClient, example_docs_zip: Path
+) -> None:
+    release = threading.Event()
+
+    def extract_once_released(**kwargs: Any) -> dict[str, str]:
+        assert release.wait(timeout=10)
+        return extract_zip(**kwargs)
+
+    def upload(version: str) -> Response:
+        return authenticated_api.post(
+            f"/api/projects/dummy-project-01/versions/{version}",
+            files={"file": (example_docs_zip.name, example_docs_zip.read_bytes(), "application/zip")},
+        )
+
+    with patch("vdoc.methods.api.projects.extract_zip", side_effect=extract_once_released):
+        # One running and one waiting is all the queue holds
+        accepted = [upload(version="3.0.0"), upload(version="3.1.0")]
+        turned_away = upload(version="3.2.0")
+        assert_api_response(
+            response=turned_away,
+            status_code=503,
+            message="Too many uploads are waiting to be published, try again later.",
+        )
+        assert turned_away.headers["retry-after"] == "30"
+
+        release.set()
+        for response in accepted:
+            assert wait_for_publish_job(api=authenticated_api, response=response)["status"] == "succeeded"
+
+    # Room again, once they finished
+    assert wait_for_publish_job(api=authenticated_api, response=upload(version="3.2.0"))["status"] == "succeeded"
+    assert (dummy_projects_dir / "dummy-project-01" / "3.2.0" / "index.html").is_file()
+
 
 def test_upload_project_version_route_invalid_version(dummy_projects_dir: Path, authenticated_api: TestClient) -> None:
     with ensure_project_dir_not_created(dummy_projects_dir, "dummy-project-01", "3.0.0"):
@@ -169,3 +562,285 @@ def test_upload_existing_project_version_route(
         message=f"Version '{version}' of project '{project_name}' already exists.",
     )
     assert (project_version_dir / "index.html").read_text() == f"This is {version} of {project_name}"
+
+
+def _manifest(files: dict[str, bytes]) -> dict[str, Any]:
+    return {
+        "files": [
+            {"path": path, "size": len(content), "sha256": hashlib.sha256(content).hexdigest()}
+            for path, content in files.items()
+        ]
+    }
+
+
+def _blobs_zip(contents: list[bytes]) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(file=buffer, mode="w") as archive:
+        for content in contents:
+            archive.writestr(hashlib.sha256(content).hexdigest(), content)
+    return buffer.getvalue()
+
+
+def test_delta_upload(dummy_projects_dir: Path, authenticated_api: TestClient) -> None:
+    theme = b"body { color: black }"
+    published = {"index.html": b"<html>3.0.0</html>", "_static/theme.css": theme}
+    response = authenticated_api.post(
+        "/api/projects/dummy-project-01/versions/3.0.0/blobs",
+        files={"file": ("blobs.zip", _blobs_zip(list(published.values())), "application/zip")},
+    )
+    assert response.status_code == 404
+
+    # The first version has nothing to build on, so everything is missing
+    response = authenticated_api.post(
+        "/api/projects/dummy-project-01/versions/3.0.0/manifest", json=_manifest(published)
+    )
+    assert response.json() == {"missing": sorted(hashlib.sha256(content).hexdigest() for content in published.values())}
+    response = authenticated_api.post(
+        "/api/projects/dummy-project-01/versions/3.0.0/blobs",
+        files={"file": ("blobs.zip", _blobs_zip(list(published.values())), "application/zip")},
+    )
+    assert wait_for_publish_job(api=authenticated_api, response=response)["status"] == "succeeded"
+
+    # The next one only sends the page that changed
+    changed = {"index.html": b"<html>3.1.0</html>", "_static/theme.css": theme}
+    response = authenticated_api.post("/api/projects/dummy-project-01/versions/3.1.0/manifest", json=_manifest(changed))
+    assert response.json() == {"missing": [hashlib.sha256(changed["index.html"]).hexdigest()]}
+    response = authenticated_api.post(
+        "/api/projects/dummy-project-01/versions/3.1.0/blobs",
+        files={"file": ("blobs.zip", _blobs_zip([changed["index.html"]]), "application/zip")},
+    )
+    job = wait_for_publish_job(api=authenticated_api, response=response)
+    assert job["message"] == "Version '3.1.0' of project 'dummy-project-01' uploaded successfully."
+
+    project_dir = dummy_projects_dir / "dummy-project-01"
+    assert (project_dir / "3.1.0" / "index.html").read_bytes() == changed["index.html"]
+    assert (project_dir / "3.1.0" / "_static" / "theme.css").samefile(project_dir / "3.0.0" / "_static" / "theme.css")
+    assert authenticated_api.get("/api/projects/dummy-project-01/versions/latest").json() == "3.1.0"
+
+    # And one that changed nothing sends nothing
+    response = authenticated_api.post("/api/projects/dummy-project-01/versions/3.1.1/manifest", json=_manifest(changed))
+    assert response.json() == {"missing": []}
+    response = authenticated_api.post("/api/projects/dummy-project-01/versions/3.1.1/blobs")
+    assert wait_for_publish_job(api=authenticated_api, response=response)["status"] == "succeeded"
+    assert not any((dummy_projects_dir / ".vdoc" / "pending").rglob("*.json"))
+
+
+@pytest.mark.parametrize(
+    ("manifest", "status_code"),
+    [
+        ({"files": [{"path": "page.html", "size": 0, "sha256": "0" * 64}]}, 400),
+        ({"files": [{"path": "../index.html", "size": 0, "sha256": "0" * 64}]}, 422),
+        ({"files": [{"path": "index.html", "size": 0, "sha256": "not a digest"}]}, 422),
+        (_manifest({"index.html": b"", "index.html/page.html": b""}), 422),
+    ],
+)
+def test_delta_upload_invalid_manifest(
+    dummy_projects_dir: Path, authenticated_api: TestClient, manifest: dict[str, Any], status_code: int
+) -> None:
+    with ensure_project_dir_not_created(base_dir=dummy_projects_dir, name="dummy-project-01", version="3.0.0"):
+        response = authenticated_api.post("/api/projects/dummy-project-01/versions/3.0.0/manifest", json=manifest)
+    assert response.status_code == status_code
+
+
+def test_delta_upload_unauthenticated(api: TestClient) -> None:
+    response = api.post("/api/projects/dummy-project-01/versions/3.0.0/manifest", json=_manifest({"index.html": b""}))
+    assert response.status_code == 401
+
+
+@pytest.mark.parametrize(
+    ("sent", "message"),
+    [
+        (
+            {},
+            f"The contents {hashlib.sha256(b'<html>3.0.0</html>').hexdigest()} are missing",
+        ),
+        (
+            {hashlib.sha256(b"<html>3.0.0</html>").hexdigest(): b"<html>something else</html>"},
+            (
+                f"The content of '{hashlib.sha256(b'<html>3.0.0</html>').hexdigest()}' has the digest "
+                f"'{hashlib.sha256(b'<html>something else</html>').hexdigest()}'"
+            ),
+        ),
+    ],
+)
+def test_delta_upload_incomplete(
+    dummy_projects_dir: Path, authenticated_api: TestClient, sent: dict[str, bytes], message: str
+) -> None:
+    files = {"index.html": b"<html>3.0.0</html>"}
+    authenticated_api.post("/api/projects/dummy-project-01/versions/3.0.0/manifest", json=_manifest(files))
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(file=buffer, mode="w") as archive:
+        for member_name, content in sent.items():
+            archive.writestr(member_name, content)
+
+    response = authenticated_api.post(
+        "/api/projects/dummy-project-01/versions/3.0.0/blobs",
+        files={"file": ("blobs.zip", buffer.getvalue(), "application/zip")},
+    )
+    job = wait_for_publish_job(api=authenticated_api, response=response)
+
+    assert (job["status"], job["status_code"]) == ("failed", 400)
+    assert job["message"] == f"The uploaded file is invalid: {message}."
+    assert not (dummy_projects_dir / "dummy-project-01" / "3.0.0").exists()
+
+
+def _tar_archive(members: dict[str, bytes]) -> bytes:
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w") as archive:
+        for member_name, content in members.items():
+            info = tarfile.TarInfo(name=member_name)
+            info.size = len(content)
+            archive.addfile(info, io.BytesIO(content))
+    return buffer.getvalue()
+
+
+@pytest.mark.parametrize(
+    ("content_type", "compress"),
+    [
+        ("application/x-tar", lambda archive: archive),
+        ("application/gzip", gzip.compress),
+        ("application/zstd; charset=binary", zstd.compress),
+    ],
+)
+def test_stream_project_version_route(
+    dummy_projects_dir: Path, authenticated_api: TestClient, content_type: str, compress: Callable[[bytes], bytes]
+) -> None:
+    archive = _tar_archive({"./index.html": b"<html>3.0.0</html>", "./guide/page.html": b"<html>page</html>"})
+
+    response = authenticated_api.put(
+        "/api/projects/dummy-project-01/versions/3.0.0",
+        content=compress(archive),
+        headers={"Content-Type": content_type},
+    )
+
+    assert_api_response(
+        response=response,
+        status_code=201,
+        message="Version '3.0.0' of project 'dummy-project-01' uploaded successfully.",
+    )
+    assert (
+        dummy_projects_dir / "dummy-project-01" / "3.0.0" / "guide" / "page.html"
+    ).read_bytes() == b"<html>page</html>"
+    assert authenticated_api.get("/api/projects/dummy-project-01/versions/latest").json() == "3.0.0"
+
+
+def test_stream_project_version_route_holds_threads_of_its_own(
+    dummy_projects_dir: Path,  # noqa: ARG001
+    authenticated_api: TestClient,
+) -> None:
+    """A streamed upload holds a thread while it arrives and while it is published, never a route's."""
+    limiter = get_stream_limiter(concurrency=get_settings().publish_concurrency)
+    borrowed = []
+
+    def precompress_and_count(**kwargs: Any) -> dict[str, dict[str, int]]:
+        borrowed.append(limiter.borrowed_tokens)
+        return precompress_version(**kwargs)
+
+    with patch("vdoc.methods.api.projects.precompress_version", side_effect=precompress_and_count):
+        response = authenticated_api.put(
+            "/api/projects/dummy-project-01/versions/3.0.0",
+            content=_tar_archive({"index.html": b"<html>3.0.0</html>"}),
+            headers={"Content-Type": "application/x-tar"},
+        )
+
+    assert response.status_code == 201
+    assert borrowed == [1]
+    assert limiter.borrowed_tokens == 0
+
+
+def test_stream_project_version_route_cleans_up_off_the_event_loop(
+    dummy_projects_dir: Path, authenticated_api: TestClient
+) -> None:
+    """Removing what a failed upload left behind can take seconds, which no other request may wait for."""
+    on_event_loop = []
+    rmtree = shutil.rmtree
+
+    def remove_and_look(**kwargs: Any) -> None:
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            on_event_loop.append(False)
+        else:
+            on_event_loop.append(True)
+        rmtree(**kwargs)
+
+    with patch("shutil.rmtree", side_effect=remove_and_look):
+        response = authenticated_api.put(
+            "/api/projects/dummy-project-01/versions/3.0.0",
+            content=_tar_archive({"page.html": b"<html>page</html>"}),
+            headers={"Content-Type": "application/x-tar"},
+        )
+
+    assert response.status_code == 400
+    assert on_event_loop == [False]
+    assert not any((dummy_projects_dir / ".vdoc" / "staging").glob("*"))
+
+
+def test_stream_project_version_route_unauthenticated(api: TestClient) -> None:
+    response = api.put(
+        "/api/projects/dummy-project-01/versions/3.0.0",
+        content=_tar_archive({"index.html": b""}),
+        headers={"Content-Type": "application/x-tar"},
+    )
+    assert response.status_code == 401
+
+
+@pytest.mark.parametrize(
+    ("content_type", "content", "message"),
+    [
+        (
+            "application/zip",
+            b"",
+            (
+                "Content type is not one of 'application/x-tar', 'application/gzip', 'application/x-gzip', "
+                "'application/zstd'"
+            ),
+        ),
+        ("application/gzip", b"not an archive", "not a gzip file"),
+        ("application/x-tar", _tar_archive({"page.html": b""}), "The archive doesn't contain an index.html file"),
+        ("application/x-tar", _tar_archive({"index.html": b"", "../escaped.html": b""}), None),
+    ],
+)
+def test_stream_project_version_route_invalid_archive(
+    dummy_projects_dir: Path, authenticated_api: TestClient, content_type: str, content: bytes, message: str | None
+) -> None:
+    with ensure_project_dir_not_created(base_dir=dummy_projects_dir, name="dummy-project-01", version="3.0.0"):
+        response = authenticated_api.put(
+            "/api/projects/dummy-project-01/versions/3.0.0", content=content, headers={"Content-Type": content_type}
+        )
+
+    assert response.status_code == 400
+    if message is not None:
+        assert response.json()["message"] == f"The uploaded file is invalid: {message}."
+    assert not (dummy_projects_dir / "dummy-project-01" / "escaped.html").exists()
+    assert not any((dummy_projects_dir / ".vdoc" / "staging").glob("*"))
+
+
+def test_stream_project_version_route_loses_the_race_to_another_upload(
+    dummy_projects_dir: Path, authenticated_api: TestClient
+) -> None:
+    project_version_dir = dummy_projects_dir / "dummy-project-01" / "3.0.0"
+
+    async def extract_while_another_upload_finishes(*args: Any, **kwargs: Any) -> dict[str, str]:
+        digests = await extract_tar_stream(*args, **kwargs)
+        project_version_dir.mkdir()
+        (project_version_dir / "index.html").write_text("The other upload")
+        return digests
+
+    with patch(
+        "vdoc.methods.api.projects.extract_tar_stream", side_effect=extract_while_another_upload_finishes
+    ) as extract_mock:
+        response = authenticated_api.put(
+            "/api/projects/dummy-project-01/versions/3.0.0",
+            content=_tar_archive({"index.html": b"This upload"}),
+            headers={"Content-Type": "application/x-tar"},
+        )
+
+    extract_mock.assert_called_once()
+    assert_api_response(
+        response=response,
+        status_code=403,
+        message="Version '3.0.0' of project 'dummy-project-01' already exists.",
+    )
+    assert (project_version_dir / "index.html").read_text() == "The other upload"
+    assert not any((dummy_projects_dir / ".vdoc" / "staging").iterdir())
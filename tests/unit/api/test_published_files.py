@@ -0,0 +1,189 @@
+"""Contains all unit tests for the file server of the published documentation."""
+
+import io
+import re
+import zipfile
+from pathlib import Path
+from typing import Any
+
+import anyio
+import pytest
+from starlette.types import Message
+
+from vdoc.api.published_files import ArchiveMemberResponse, PublishedFiles, _requested_ranges
+from vdoc.archives import repack_zip
+from vdoc.published_manifests import build_directory_manifest, write_published_manifest
+from vdoc.version_archives import get_version_archive
+
+CONTENT = bytes(range(256)) * 4
+
+
+@pytest.mark.parametrize(
+    ("range_header", "expected"),
+    [
+        ("bytes=0-99", [(0, 100)]),
+        ("bytes=1000-", [(1000, 1024)]),
+        ("bytes=-24", [(1000, 1024)]),
+        ("bytes=1000-5000", [(1000, 1024)]),
+        ("bytes=500-599, 0-9, 550-649", [(0, 10), (500, 650)]),
+        ("bytes=0-9,10-19", [(0, 20)]),
+        ("bytes=2000-", []),
+        ("bytes=-0", []),
+        ("bytes=10-5", None),
+        ("bytes=a-5", None),
+        ("bytes=-", None),
+        ("items=0-9", None),
+        ("bytes=" + ",".join(f"{start}-{start}" for start in range(0, 202, 2)), None),
+    ],
+)
+def test_requested_ranges(range_header: str, expected: list[tuple[int, int]] | None) -> None:
+    assert _requested_ranges(range_header=range_header, size=len(CONTENT)) == expected
+
+
+def _send_request(
+    app: Any, headers: dict[str, str], method: str = "GET", extensions: dict | None = None
+) -> list[Message]:
+    scope = {
+        "type": "http",
+        "method": method,
+        "path": "/",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(name.lower().encode(), value.encode()) for name, value in headers.items()],
+        "extensions": extensions or {},
+    }
+    messages: list[Message] = []
+
+    async def receive() -> Message:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: Message) -> None:
+        messages.append(message)
+
+    anyio.run(app, scope, receive, send)
+    return messages
+
+
+def _body(messages: list[Message]) -> bytes:
+    assert not messages[-1].get("more_body", False)
+    return b"".join(message.get("body", b"") for message in messages[1:])
+
+
+@pytest.fixture(name="member_response")
+def member_response_fixture(tmp_path: Path) -> ArchiveMemberResponse:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(file=buffer, mode="w") as upload:
+        upload.writestr("index.html", b"<p>")
+        upload.writestr("_downloads/manual.pdf", CONTENT)
+    repack_zip(source=buffer, target_path=tmp_path / "1.0.0.zip", threads=1)
+    member = get_version_archive(path=tmp_path / "1.0.0.zip").members["_downloads/manual.pdf"]
+    return ArchiveMemberResponse(
+        archive_path=tmp_path / "1.0.0.zip", member=member, headers={"ETag": '"tag"'}, media_type="application/pdf"
+    )
+
+
+def test_archive_member_response(member_response: ArchiveMemberResponse) -> None:
+    messages = _send_request(member_response, headers={})
+
+    assert messages[0]["status"] == 200
+    assert (b"accept-ranges", b"bytes") in messages[0]["headers"]
+    assert _body(messages) == CONTENT
+
+
+def test_archive_member_response_single_range(member_response: ArchiveMemberResponse) -> None:
+    messages = _send_request(member_response, headers={"Range": "bytes=1000-", "If-Range": '"tag"'})
+
+    assert messages[0]["status"] == 206
+    assert (b"content-range", b"bytes 1000-1023/1024") in messages[0]["headers"]
+    assert (b"content-length", b"24") in messages[0]["headers"]
+    assert _body(messages) == CONTENT[1000:]
+
+
+def test_archive_member_response_multiple_ranges(member_response: ArchiveMemberResponse) -> None:
+    messages = _send_request(member_response, headers={"Range": "bytes=0-9, 100-109"})
+
+    headers = dict(messages[0]["headers"])
+    assert messages[0]["status"] == 206
+    boundary = re.fullmatch(rb"multipart/byteranges; boundary=(\w+)", headers[b"content-type"])
+    assert boundary is not None
+    body = _body(messages)
+    assert int(headers[b"content-length"]) == len(body)
+    assert body == (
+        b"--%(b)s\r\nContent-Type: application/pdf\r\nContent-Range: bytes 0-9/1024\r\n\r\n%(first)s\r\n"
+        b"--%(b)s\r\nContent-Type: application/pdf\r\nContent-Range: bytes 100-109/1024\r\n\r\n%(second)s\r\n"
+        b"--%(b)s--" % {b"b": boundary.group(1), b"first": CONTENT[0:10], b"second": CONTENT[100:110]}
+    )
+
+
+def test_archive_member_response_outside_of_the_content(member_response: ArchiveMemberResponse) -> None:
+    messages = _send_request(member_response, headers={"Range": "bytes=5000-"})
+
+    assert messages[0]["status"] == 416
+    assert (b"content-range", b"bytes */1024") in messages[0]["headers"]
+
+
+def test_archive_member_response_to_a_range_of_another_form(member_response: ArchiveMemberResponse) -> None:
+    messages = _send_request(member_response, headers={"Range": "bytes=0-9", "If-Range": '"another tag"'})
+
+    assert messages[0]["status"] == 200
+    assert _body(messages) == CONTENT
+
+
+def test_archive_member_response_sent_by_the_server(member_response: ArchiveMemberResponse) -> None:
+    messages = _send_request(
+        member_response, headers={"Range": "bytes=10-19"}, extensions={"http.response.zerocopy": {}}
+    )
+
+    assert messages[0]["status"] == 206
+    assert messages[1]["type"] == "http.response.zerocopy"
+    assert (messages[1]["offset"] - member_response.member.offset, messages[1]["count"]) == (10, 10)
+    assert messages[1]["file"].closed
+
+
+def test_archive_member_response_to_head(member_response: ArchiveMemberResponse) -> None:
+    messages = _send_request(member_response, headers={"Range": "bytes=0-9"}, method="HEAD")
+
+    assert messages[0]["status"] == 206
+    assert _body(messages) == b""
+
+
+def test_published_files_are_sent_by_the_server(tmp_path: Path) -> None:
+    (tmp_path / "project" / "1.0.0" / "_downloads").mkdir(parents=True)
+    (tmp_path / "project" / "1.0.0" / "_downloads" / "manual.pdf").write_bytes(CONTENT)
+    published_files = PublishedFiles(directory=tmp_path)
+
+    async def get(scope: dict, receive: Any, send: Any) -> None:
+        await published_files({**scope, "path": "/project/1.0.0/_downloads/manual.pdf"}, receive, send)
+
+    messages = _send_request(get, headers={}, extensions={"http.response.pathsend": {}})
+
+    assert messages[0]["status"] == 200
+    assert messages[1] == {
+        "type": "http.response.pathsend",
+        "path": str(tmp_path / "project" / "1.0.0" / "_downloads" / "manual.pdf"),
+    }
+
+
+def test_published_files_offloaded_with_x_sendfile(tmp_path: Path) -> None:
+    version_path = tmp_path / "project" / "1.0.0"
+    version_path.mkdir(parents=True)
+    (version_path / "searchindex.js").write_bytes(b"Search.setIndex({});" * 100)
+    (version_path / "searchindex.js.br").write_bytes(b"standing in for brotli")
+    manifest = build_directory_manifest(path=version_path, threads=1, precompressed={"searchindex.js": {".br": 22}})
+    write_published_manifest(docs_dir=tmp_path, name="project", version="1.0.0", manifest=manifest)
+    published_files = PublishedFiles(directory=tmp_path, offload="x-sendfile")
+    scope = {"type": "http", "method": "GET", "path": "/", "headers": [(b"accept-encoding", b"br")]}
+
+    response = published_files.file_response(
+        version_path / "searchindex.js", (version_path / "searchindex.js").stat(), scope
+    )
+
+    # Sent with the headers of the response, so it is handed the form chosen here
+    assert response.headers["x-sendfile"] == str(version_path / "searchindex.js.br")
+    assert response.headers["content-encoding"] == "br"
+    assert response.body == b""
+    # The proxy would send a page that is not found as found
+    not_found = published_files.file_response(
+        version_path / "searchindex.js", (version_path / "searchindex.js").stat(), scope, status_code=404
+    )
+    assert "x-sendfile" not in not_found.headers
@@ -0,0 +1,64 @@
+"""Contains all unit tests for the dispatcher in front of the docs mount."""
+
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from vdoc.api.static_dispatch import _is_published_file_request
+
+
+@pytest.mark.parametrize(
+    ("method", "path", "headers", "expected"),
+    [
+        ("GET", "/static/projects/project/1.0.0/index.html", [], True),
+        ("HEAD", "/static/projects/project/1.0.0/", [], True),
+        ("GET", "/static/projects/project/latest/index.html", [], False),
+        ("GET", "/static/projects/project/2.x/index.html", [], False),
+        ("GET", "/static/projects/project/1.0.0/index.html", [(b"origin", b"https://example.com")], False),
+        ("OPTIONS", "/static/projects/project/1.0.0/index.html", [], False),
+        ("GET", "/static/projectsandmore/index.html", [], False),
+        ("GET", "/api/projects/", [], False),
+    ],
+)
+def test_is_published_file_request(method: str, path: str, headers: list[tuple[bytes, bytes]], expected: bool) -> None:
+    scope = {"type": "http", "method": method, "path": path, "root_path": "", "headers": headers}
+
+    assert _is_published_file_request(scope=scope) is expected
+
+
+def test_is_published_file_request_behind_a_root_path() -> None:
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": "/docs/static/projects/p/1.0.0/",
+        "root_path": "/docs",
+        "headers": [],
+    }
+
+    assert _is_published_file_request(scope=scope)
+
+
+def test_published_files_never_reach_the_app(dummy_projects_dir: Path, api: TestClient) -> None:  # noqa: ARG001
+    with patch.object(api.app, "app", new=MagicMock(side_effect=AssertionError("passed to the app"))):
+        response = api.get("/static/projects/dummy-project-01/2.0.0/index.html")
+        missing = api.get("/static/projects/dummy-project-01/2.0.0/missing.html")
+        hidden = api.get("/static/projects/.vdoc/catalog.sqlite3")
+
+    assert response.status_code == 200
+    assert response.text == "This is 2.0.0 of dummy-project-01"
+    assert (missing.status_code, missing.json()) == (404, {"detail": "Not Found"})
+    assert hidden.status_code == 404
+
+
+def test_what_the_docs_mount_does_not_answer_reaches_the_app(dummy_projects_dir: Path, api: TestClient) -> None:  # noqa: ARG001
+    redirect = api.get("/static/projects/dummy-project-01/latest/index.html", follow_redirects=False)
+    cross_origin = api.get(
+        "/static/projects/dummy-project-01/2.0.0/index.html", headers={"Origin": "https://example.com"}
+    )
+
+    assert redirect.status_code == 307
+    assert redirect.headers["location"] == "/static/projects/dummy-project-01/2.0.0/index.html"
+    assert cross_origin.status_code == 200
+    assert cross_origin.headers["access-control-allow-origin"] == "*"
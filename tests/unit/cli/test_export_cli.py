@@ -0,0 +1,35 @@
+"""Contains all unit tests for the export CLI."""
+
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+from typer.testing import CliRunner
+
+from vdoc.cli.main import app
+from vdoc.export import AliasStyle
+
+
+@patch("vdoc.cli.export.export_impl")
+def test_export_success(export_impl_mock: MagicMock, cli_runner: CliRunner) -> None:
+    result = cli_runner.invoke(
+        app=app, args=["export", "/srv/mirror", "--base-url", "https://docs.example.com", "--aliases", "stubs"]
+    )
+    assert result.exit_code == 0
+    export_impl_mock.assert_called_once()
+    assert export_impl_mock.call_args.kwargs["destination"] == Path("/srv/mirror")
+    assert export_impl_mock.call_args.kwargs["aliases"] is AliasStyle.STUBS
+
+
+@patch("vdoc.cli.export.export_impl")
+def test_export_requires_the_base_url(export_impl_mock: MagicMock, cli_runner: CliRunner) -> None:
+    result = cli_runner.invoke(app=app, args=["export", "/srv/mirror"])
+    assert result.exit_code == 2
+    export_impl_mock.assert_not_called()
+
+
+@patch("vdoc.cli.export.export_impl")
+def test_export_error(export_impl_mock: MagicMock, cli_runner: CliRunner) -> None:
+    export_impl_mock.side_effect = OSError("No space left on device")
+    result = cli_runner.invoke(app=app, args=["export", "/srv/mirror", "--base-url", "https://docs.example.com"])
+    assert result.exit_code == 1
+    assert "No space left on device" in result.stdout
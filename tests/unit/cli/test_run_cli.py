@@ -45,3 +45,17 @@ def test_run_keyboard_error(run_impl_mock: MagicMock, cli_runner: CliRunner) ->
     assert result.exit_code == 1
     run_impl_mock.assert_called_once()
     assert "Something is wrong" in result.stdout
+
+
+@patch("vdoc.cli.run.run_impl")
+def test_run_with_workers(run_impl_mock: MagicMock, cli_runner: CliRunner) -> None:
+    result = cli_runner.invoke(app=app, args=["run", "--workers", "4"])
+    assert result.exit_code == 0
+    assert run_impl_mock.call_args.kwargs["workers"] == 4
+
+
+@patch("vdoc.cli.run.run_impl")
+def test_run_with_no_workers(run_impl_mock: MagicMock, cli_runner: CliRunner) -> None:
+    result = cli_runner.invoke(app=app, args=["run", "--workers", "0"])
+    assert result.exit_code == 2
+    run_impl_mock.assert_not_called()
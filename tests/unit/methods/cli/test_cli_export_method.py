@@ -0,0 +1,68 @@
+"""Contains all tests for the CLI export method."""
+
+import json
+import shutil
+from pathlib import Path
+
+import pytest
+
+from vdoc.export import AliasStyle
+from vdoc.methods.cli.cli_export_method import export_impl
+
+
+@pytest.fixture(name="mirror")
+def mirror_fixture(monkeypatch: pytest.MonkeyPatch, tmp_path_factory: pytest.TempPathFactory) -> Path:
+    """The directory a mirror is written to, outside of the docs directory, and a built web UI to copy."""
+    webapp = tmp_path_factory.mktemp("webapp")
+    (webapp / "assets").mkdir()
+    (webapp / "assets" / "index.js").write_text("console.log('the bundle');")
+    (webapp / "index.html").write_text("<div id='root'></div>")
+    monkeypatch.setattr("vdoc.methods.cli.cli_export_method.webapp_path", webapp)
+    return tmp_path_factory.mktemp("mirror")
+
+
+def test_export_impl(dummy_projects_dir: Path, mirror: Path) -> None:  # noqa: ARG001
+    export_impl(destination=mirror, base_url="https://docs.example.com/", aliases=AliasStyle.SYMLINKS, processes=2)
+
+    static_path = mirror / "static" / "projects" / "dummy-project-01"
+    assert (static_path / "1.1.0" / "index.html").read_text() == "This is 1.1.0 of dummy-project-01"
+    assert (static_path / "latest").readlink() == Path("2.0.0")
+    assert (static_path / "1.x").readlink() == Path("1.1.0")
+    assert (
+        "https://docs.example.com/static/projects/dummy-project-01/2.0.0/index.html"
+        in (mirror / "sitemap.xml").read_text()
+    )
+    assert (mirror / "llms.txt").is_file()
+    assert "https://docs.example.com/sitemap.xml" in (mirror / "robots.txt").read_text()
+
+    catalog = json.loads((mirror / "api" / "catalog").read_text())
+    assert [project["latest"] for project in catalog["projects"]] == ["2.0.0", "6.0", "2.0.0-beta"]
+    assert json.loads((mirror / "api" / "version" / "index.json").read_text())
+    versions_path = mirror / "api" / "projects" / "dummy-project-02" / "versions"
+    assert json.loads((versions_path / "index.json").read_text()) == ["1.0", "3.6", "5.9.9", "6.0"]
+    assert json.loads((versions_path / "latest").read_text()) == "6.0"
+    assert json.loads((versions_path / "3.6").read_text()) == "3.6"
+
+    assert (mirror / "assets" / "index.js").is_file()
+    assert (mirror / "404.html").read_text() == "<div id='root'></div>"
+
+
+def test_export_impl_writes_only_what_changed(dummy_projects_dir: Path, mirror: Path) -> None:
+    export_impl(destination=mirror, base_url="https://docs.example.com", aliases=AliasStyle.STUBS, processes=1)
+    static_path = mirror / "static" / "projects" / "dummy-project-01"
+    # A version in the mirror is never written again, so this survives
+    (static_path / "1.0.0" / "index.html").write_text("kept")
+
+    (dummy_projects_dir / "dummy-project-01" / "3.0.0").mkdir()
+    (dummy_projects_dir / "dummy-project-01" / "3.0.0" / "index.html").write_text("This is 3.0.0")
+    shutil.rmtree(dummy_projects_dir / "dummy-project-01" / "0.0.1")
+    shutil.rmtree(dummy_projects_dir / "dummy-project-03")
+    export_impl(destination=mirror, base_url="https://docs.example.com", aliases=AliasStyle.STUBS, processes=1)
+
+    assert (static_path / "1.0.0" / "index.html").read_text() == "kept"
+    assert (static_path / "3.0.0" / "index.html").read_text() == "This is 3.0.0"
+    assert "url=../3.0.0/index.html" in (static_path / "latest" / "index.html").read_text()
+    assert not (static_path / "0.0.1").exists()
+    assert not (mirror / "static" / "projects" / "dummy-project-03").exists()
+    assert not (mirror / "api" / "projects" / "dummy-project-01" / "versions" / "0.0.1").exists()
+    assert not (mirror / "api" / "projects" / "dummy-project-03").exists()
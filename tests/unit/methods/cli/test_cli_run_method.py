@@ -19,3 +19,15 @@ def test_run_impl(create_app_mock: MagicMock, uvicorn_run_mock: MagicMock, caplo
     assert caplog.messages == [
         "Starting service on '127.0.0.1:4242'",
     ]
+
+
+@patch("vdoc.methods.cli.cli_run_method.uvicorn_run")
+@patch("vdoc.methods.cli.cli_run_method.create_app")
+def test_run_impl_with_workers(create_app_mock: MagicMock, uvicorn_run_mock: MagicMock) -> None:
+    """Each worker builds its own app, so uvicorn gets the factory rather than an app built here."""
+    run_impl("127.0.0.1", 4242, workers=4)
+
+    create_app_mock.assert_not_called()
+    uvicorn_run_mock.assert_called_once_with(
+        app="vdoc.api:create_app", factory=True, host="127.0.0.1", port=4242, workers=4
+    )
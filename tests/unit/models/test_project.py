@@ -1,7 +1,7 @@
 """Contains all tests for the project models."""
 
 import os
-from datetime import UTC, datetime
+from datetime import UTC, date, datetime
 from pathlib import Path
 from unittest.mock import patch
 
@@ -9,8 +9,11 @@ import pytest
 from packaging.version import Version
 
 from tests.conftest import DUMMY_DOCS_STRUCTURE
+from vdoc.catalog import get_catalog
 from vdoc.exceptions import InvalidVersion, ProjectVersionNotFound
 from vdoc.models.project import Project
+from vdoc.published_manifests import build_directory_manifest, write_published_manifest
+from vdoc.settings import get_settings
 
 
 @patch.dict(os.environ, {"VDOC_PROJECT_DISPLAY_NAME_MAPPING": '{"dummy-project-01": "Dummy Project 01"}'})
@@ -52,7 +55,31 @@ def test_list_published_projects(dummy_projects_dir: Path) -> None:
     """A project directory with nothing publishable in it must not reach whoever lists projects."""
     (dummy_projects_dir / "empty-project").mkdir()
 
-    assert Project.list_published() == [Project(name=project_name) for project_name in DUMMY_DOCS_STRUCTURE]
+    assert [record.name for record in Project.list_published()] == list(DUMMY_DOCS_STRUCTURE)
+
+
+def test_project_records_are_built_once_per_catalog_state(dummy_projects_dir: Path) -> None:
+    """Listing twice must not build the records twice, and publishing must build them again."""
+    first = Project.list_published()
+
+    assert all(again is record for again, record in zip(Project.list_published(), first, strict=True))
+
+    (dummy_projects_dir / "dummy-project-01" / "3.0.0").mkdir()
+    get_catalog(dummy_projects_dir).record_version(name="dummy-project-01", version="3.0.0")
+    rebuilt = Project.list_published()
+
+    assert rebuilt[0] is not first[0]
+    assert rebuilt[0].latest == "3.0.0"
+
+
+@patch.dict(os.environ, {"VDOC_PROJECT_DISPLAY_NAME_MAPPING": '{"dummy-project-01": "Dummy Project 01"}'})
+def test_project_records_follow_the_settings(dummy_projects_dir: Path) -> None:  # noqa: ARG001
+    before = Project.list_published()[0]
+    get_settings.cache_clear()
+    os.environ["VDOC_PROJECT_DISPLAY_NAME_MAPPING"] = '{"dummy-project-01": "Renamed"}'
+
+    assert before.display_name == "Dummy Project 01"
+    assert Project.list_published()[0].display_name == "Renamed"
 
 
 def test_project_equality_survives_its_caches(dummy_projects_dir: Path) -> None:  # noqa: ARG001
@@ -86,6 +113,28 @@ def test_project_latest_published_on(dummy_projects_dir: Path) -> None:
     assert Project(name="dummy-project-01").latest_published_on == published_on
 
 
+def test_project_read_from_the_manifest(dummy_projects_dir: Path) -> None:
+    """A version with a manifest is asked about in it, and not on the disk."""
+    manifest = build_directory_manifest(
+        path=dummy_projects_dir / "dummy-project-01" / "2.0.0", threads=1, precompressed={}
+    )
+    manifest.published_on = datetime(2020, 2, 29, 23, 30, tzinfo=UTC)
+    manifest.inventories = ["objects.inv"]
+    manifest.files["_static/page.js"] = manifest.files["index.html"]
+    write_published_manifest(docs_dir=dummy_projects_dir, name="dummy-project-01", version="2.0.0", manifest=manifest)
+    project = Project(name="dummy-project-01")
+
+    # The inventories from its summary, any other file from its manifest
+    assert project.latest_published_on == date(2020, 2, 29)
+    assert project.latest_contains("objects.inv")
+    assert project.contains(version="2.0.0", file_name="index.html")
+    assert project.contains(version="2.0.0", file_name="_static/page.js")
+    # Without a manifest, asked on the disk as before
+    assert project.version_manifest(version="1.1.0") is None
+    assert project.contains(version="1.1.0", file_name="index.html")
+    assert not project.contains(version="1.1.0", file_name="objects.inv")
+
+
 def test_get_version_and_docs_path(dummy_projects_dir: Path) -> None:
     assert ("1.0.0", dummy_projects_dir / "dummy-project-01" / "1.0.0") == Project.get_version_and_docs_path(
         name="dummy-project-01", version="1.0.0"
@@ -98,6 +147,32 @@ def test_get_version_and_docs_path_latest(dummy_projects_dir: Path) -> None:
     )
 
 
+@pytest.mark.parametrize(
+    ("name", "alias", "expected_version"),
+    [
+        ("dummy-project-01", "stable", "2.0.0"),
+        ("dummy-project-01", "1.x", "1.1.0"),
+        ("dummy-project-01", "0.0.x", "0.0.2"),
+        ("dummy-project-02", "5.9.x", "5.9.9"),
+        ("dummy-project-03", "latest", "2.0.0-beta"),
+        ("dummy-project-03", "stable", "1.3.0"),
+    ],
+)
+def test_get_version_and_docs_path_alias(
+    dummy_projects_dir: Path, name: str, alias: str, expected_version: str
+) -> None:
+    assert (expected_version, dummy_projects_dir / name / expected_version) == Project.get_version_and_docs_path(
+        name=name, version=alias
+    )
+    assert Project.is_published(name=name, version=alias)
+
+
+def test_get_version_and_docs_path_unresolved_alias(dummy_projects_dir: Path) -> None:  # noqa: ARG001
+    with pytest.raises(ProjectVersionNotFound):
+        Project.get_version_and_docs_path(name="dummy-project-03", version="2.x")
+    assert not Project.is_published(name="dummy-project-03", version="2.x")
+
+
 def test_get_version_and_docs_path_invalid_version(dummy_projects_dir: Path) -> None:  # noqa: ARG001
     with pytest.raises(InvalidVersion):
         Project.get_version_and_docs_path(name="dummy-project-01", version="abc")
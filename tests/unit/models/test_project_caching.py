@@ -4,6 +4,8 @@ from pathlib import Path
 
 from fastapi.testclient import TestClient
 
+from tests.utils import wait_for_publish_job
+from vdoc.catalog import get_catalog
 from vdoc.models.project import Project
 from vdoc.settings import get_settings
 
@@ -13,25 +15,38 @@ def test_the_settings_are_built_once() -> None:
     assert get_settings() is get_settings()
 
 
-def test_a_version_added_to_a_project_is_seen(dummy_projects_dir: Path) -> None:
-    """The scan is cached, so it has to notice that a project gained a version."""
+def test_a_version_added_behind_vdocs_back_is_seen_on_refresh(dummy_projects_dir: Path) -> None:
+    """The catalog is cached, so it has to notice that a project gained a version when it looks again."""
     project = Project(name="dummy-project-01")
     assert project.latest == "2.0.0"
 
     (dummy_projects_dir / "dummy-project-01" / "3.0.0").mkdir()
+    get_catalog(dummy_projects_dir).refresh()
 
     assert Project(name="dummy-project-01").latest == "3.0.0"
 
 
-def test_a_version_removed_from_a_project_is_seen(dummy_projects_dir: Path) -> None:
+def test_a_version_removed_behind_vdocs_back_is_seen_on_refresh(dummy_projects_dir: Path) -> None:
     assert Project(name="dummy-project-01").latest == "2.0.0"
 
     (dummy_projects_dir / "dummy-project-01" / "2.0.0" / "index.html").unlink()
     (dummy_projects_dir / "dummy-project-01" / "2.0.0").rmdir()
+    get_catalog(dummy_projects_dir).refresh()
 
     assert Project(name="dummy-project-01").latest == "1.1.0"
 
 
+def test_a_project_is_answered_without_the_disk(dummy_projects_dir: Path) -> None:
+    """Asked on every page load, so the catalog answers it from memory."""
+    assert Project.is_published(name="dummy-project-01", version="2.0.0")
+
+    # Moved out of the way, which the catalog does not notice until it is told to look again
+    dummy_projects_dir.rename(dummy_projects_dir.with_name("moved"))
+
+    assert Project.is_published(name="dummy-project-01", version="2.0.0")
+    assert [project.name for project in Project.list()] == ["dummy-project-01", "dummy-project-02", "dummy-project-03"]
+
+
 def test_an_upload_is_visible_immediately(
     dummy_projects_dir: Path,  # noqa: ARG001
     authenticated_api: TestClient,
@@ -44,7 +59,7 @@ def test_an_upload_is_visible_immediately(
         "/api/projects/dummy-project-01/versions/3.0.0",
         files={"file": ("docs.zip", example_docs_zip.read_bytes(), "application/zip")},
     )
-    assert response.status_code == 201
+    assert wait_for_publish_job(api=authenticated_api, response=response)["status"] == "succeeded"
 
     assert Project(name="dummy-project-01").latest == "3.0.0"
     assert authenticated_api.get("/api/projects/dummy-project-01/versions/latest").json() == "3.0.0"
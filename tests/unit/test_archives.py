@@ -0,0 +1,248 @@
+"""Contains all tests for unpacking uploaded archives."""
+
+import gzip
+import hashlib
+import io
+import tarfile
+import tempfile
+import zipfile
+from collections.abc import AsyncIterator
+from pathlib import Path
+from unittest.mock import patch
+
+import anyio
+import brotli
+import pytest
+
+from vdoc.archives import (
+    create_staging_directory,
+    extract_tar_stream,
+    extract_zip,
+    publish_staged_version,
+    publish_version_archive,
+    repack_zip,
+)
+from vdoc.blobs import BlobStore
+from vdoc.exceptions import UploadedFileInvalid
+
+
+def _tar_archive(members: dict[str, bytes]) -> bytes:
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w") as archive:
+        for member_name, content in members.items():
+            info = tarfile.TarInfo(name=member_name)
+            info.size = len(content)
+            archive.addfile(info, io.BytesIO(content))
+    return buffer.getvalue()
+
+
+async def _in_chunks(content: bytes, size: int) -> AsyncIterator[bytes]:
+    for offset in range(0, len(content), size):
+        yield content[offset : offset + size]
+
+
+def test_extract_tar_stream_in_chunks_of_any_size(tmp_path: Path) -> None:
+    """A request body arrives in chunks that have nothing to do with where one member ends."""
+    members = {"index.html": b"<html>index</html>", "api/module.html": bytes(range(256)) * 100}
+    archive = gzip.compress(_tar_archive(members))
+
+    digests = anyio.run(
+        extract_tar_stream, _in_chunks(archive, size=7), tmp_path / "1.0.0", "gzip", BlobStore(docs_dir=tmp_path)
+    )
+
+    for member_name, content in members.items():
+        assert (tmp_path / "1.0.0" / member_name).read_bytes() == content
+    assert digests == {member_name: hashlib.sha256(content).hexdigest() for member_name, content in members.items()}
+
+
+def test_extract_tar_stream_of_a_truncated_archive(tmp_path: Path) -> None:
+    archive = gzip.compress(_tar_archive({"index.html": b"x" * 100_000}))
+
+    with pytest.raises(UploadedFileInvalid):
+        anyio.run(
+            extract_tar_stream,
+            _in_chunks(archive[: len(archive) // 2], size=1024),
+            tmp_path,
+            "gzip",
+            BlobStore(docs_dir=tmp_path),
+        )
+
+
+def test_extract_tar_stream_refuses_a_link_out_of_the_target(tmp_path: Path) -> None:
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w") as archive:
+        link = tarfile.TarInfo(name="secret")
+        link.type, link.linkname = tarfile.SYMTYPE, "/etc/passwd"
+        archive.addfile(link)
+
+    with pytest.raises(UploadedFileInvalid):
+        anyio.run(
+            extract_tar_stream,
+            _in_chunks(buffer.getvalue(), size=1024),
+            tmp_path / "1.0.0",
+            "none",
+            BlobStore(docs_dir=tmp_path),
+        )
+    assert not (tmp_path / "1.0.0" / "secret").exists()
+
+
+def test_publish_staged_version(tmp_path: Path) -> None:
+    staging_path = create_staging_directory(docs_dir=tmp_path)
+    (staging_path / "api").mkdir()
+    (staging_path / "index.html").write_text("index")
+    (staging_path / "api" / "module.html").write_text("module")
+
+    with patch("vdoc.archives._sync") as sync_mock:
+        publish_staged_version(staging_path=staging_path, target_path=tmp_path / "new-project" / "1.0.0")
+
+    # The files were written to disk when they were placed, so only the directories are left
+    synced = {Path(call.args[0]) for call in sync_mock.call_args_list}
+    assert synced == {staging_path, staging_path / "api", tmp_path / "new-project", tmp_path}
+    assert not staging_path.exists()
+    assert (tmp_path / "new-project" / "1.0.0" / "index.html").read_text() == "index"
+    assert (tmp_path / "new-project" / "1.0.0" / "api" / "module.html").read_text() == "module"
+
+
+def test_publish_staged_version_never_replaces_a_published_one(tmp_path: Path) -> None:
+    (tmp_path / "project" / "1.0.0").mkdir(parents=True)
+    (tmp_path / "project" / "1.0.0" / "index.html").write_text("published")
+    staging_path = create_staging_directory(docs_dir=tmp_path)
+    (staging_path / "index.html").write_text("staged")
+
+    with pytest.raises(FileExistsError):
+        publish_staged_version(staging_path=staging_path, target_path=tmp_path / "project" / "1.0.0")
+
+    assert (tmp_path / "project" / "1.0.0" / "index.html").read_text() == "published"
+    assert (staging_path / "index.html").read_text() == "staged"
+
+
+def _zip_archive(members: dict[str, bytes], compression: int = zipfile.ZIP_DEFLATED) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(file=buffer, mode="w", compression=compression) as archive:
+        for member_name, content in members.items():
+            archive.writestr(member_name, content)
+    return buffer.getvalue()
+
+
+@pytest.mark.parametrize("max_size", [1, 1024 * 1024 * 1024], ids=["spooled to disk", "in memory"])
+def test_extract_zip_across_threads(tmp_path: Path, max_size: int) -> None:
+    members = {
+        f"module_{index % 7}/page_{index}.html": f"<html>{index}</html>".encode() * (index % 50 + 1)
+        for index in range(1000)
+    }
+    members |= {"index.html": b"<html>index</html>", "_static/": b""}
+
+    with tempfile.SpooledTemporaryFile(max_size=max_size) as upload:
+        upload.write(_zip_archive(members))
+        digests = extract_zip(
+            source=upload,  # type: ignore[arg-type]
+            target_path=tmp_path / "1.0.0",
+            threads=4,
+            blobs=BlobStore(docs_dir=tmp_path),
+        )
+
+    extracted = {
+        path.relative_to(tmp_path / "1.0.0").as_posix(): path.read_bytes()
+        for path in (tmp_path / "1.0.0").rglob("*")
+        if path.is_file()
+    }
+    assert extracted == {name: content for name, content in members.items() if not name.endswith("/")}
+    assert digests == {name: hashlib.sha256(content).hexdigest() for name, content in extracted.items()}
+    assert (tmp_path / "1.0.0" / "_static").is_dir()
+
+
+def test_extract_zip_checks_every_crc(tmp_path: Path) -> None:
+    members = {f"page_{index}.html": f"page {index:04}".encode() for index in range(200)}
+    archive = _zip_archive(members, compression=zipfile.ZIP_STORED)
+    # The content of a stored member is in the archive as it is, so it can be damaged without the archive
+    # noticing anything but the CRC
+    archive = archive.replace(b"page 0150", b"page 9150")
+
+    with pytest.raises(UploadedFileInvalid, match=r"Bad CRC-32 for file 'page_150\.html'"):
+        extract_zip(
+            source=io.BytesIO(archive), target_path=tmp_path / "1.0.0", threads=4, blobs=BlobStore(docs_dir=tmp_path)
+        )
+
+
+def test_extract_zip_stays_in_the_target(tmp_path: Path) -> None:
+    archive = _zip_archive({"index.html": b"index", "../escaped.html": b"escaped", "/absolute.html": b"absolute"})
+
+    extract_zip(
+        source=io.BytesIO(archive), target_path=tmp_path / "1.0.0", threads=1, blobs=BlobStore(docs_dir=tmp_path)
+    )
+
+    assert sorted(path.name for path in (tmp_path / "1.0.0").iterdir()) == [
+        "absolute.html",
+        "escaped.html",
+        "index.html",
+    ]
+    assert not (tmp_path / "escaped.html").exists()
+
+
+@pytest.mark.parametrize("threads", [1, 4])
+def test_repack_zip(tmp_path: Path, threads: int) -> None:
+    search_index = b'Search.setIndex({"docnames": ["index"]});' * 500
+    members = {f"page_{index}.html": f"<html>{index}</html>".encode() * 200 for index in range(50)}
+    members |= {"index.html": b"<p>", "searchindex.js": search_index, "_static/logo.png": bytes(range(256)) * 8}
+
+    repack_zip(source=io.BytesIO(_zip_archive(members)), target_path=tmp_path / "1.0.0.zip", threads=threads)
+
+    with zipfile.ZipFile(tmp_path / "1.0.0.zip") as archive:
+        assert {info.compress_type for info in archive.infolist()} == {zipfile.ZIP_STORED}
+        repacked = {info.filename: archive.read(info) for info in archive.infolist()}
+    assert {name: repacked[name] for name in members} == members
+    assert brotli.decompress(repacked["searchindex.js.br"]) == search_index
+    assert gzip.decompress(repacked["page_7.html.gz"]) == members["page_7.html"]
+    # Not text, and not worth it
+    assert "_static/logo.png.br" not in repacked
+    assert "index.html.gz" not in repacked
+
+
+def test_repack_zip_keeps_what_the_upload_brought(tmp_path: Path) -> None:
+    archive = _zip_archive(
+        {"index.html": b"<html>index</html>" * 100, "index.html.gz": b"shipped by the build", "../escaped.html": b"x"}
+    )
+
+    repack_zip(source=io.BytesIO(archive), target_path=tmp_path / "1.0.0.zip", threads=1)
+
+    with zipfile.ZipFile(tmp_path / "1.0.0.zip") as repacked:
+        assert repacked.read("index.html.gz") == b"shipped by the build"
+        assert "index.html.br" in repacked.namelist()
+        assert "escaped.html" in repacked.namelist()
+
+
+def test_repack_zip_checks_every_crc(tmp_path: Path) -> None:
+    archive = _zip_archive({"page.html": b"page 0150"}, compression=zipfile.ZIP_STORED)
+
+    with pytest.raises(UploadedFileInvalid, match=r"Bad CRC-32 for file 'page\.html'"):
+        repack_zip(
+            source=io.BytesIO(archive.replace(b"page 0150", b"page 9150")),
+            target_path=tmp_path / "1.0.0.zip",
+            threads=1,
+        )
+
+
+def test_publish_version_archive(tmp_path: Path) -> None:
+    staging_path = create_staging_directory(docs_dir=tmp_path)
+    (staging_path / "1.0.0.zip").write_bytes(b"archive")
+
+    publish_version_archive(staged_path=staging_path / "1.0.0.zip", target_path=tmp_path / "project" / "1.0.0")
+
+    assert (tmp_path / "project" / "1.0.0.zip").read_bytes() == b"archive"
+    assert not (staging_path / "1.0.0.zip").exists()
+
+
+@pytest.mark.parametrize("published", ["1.0.0", "1.0.0.zip"])
+def test_publish_version_archive_never_replaces_a_published_one(tmp_path: Path, published: str) -> None:
+    (tmp_path / "project").mkdir()
+    if published.endswith(".zip"):
+        (tmp_path / "project" / published).write_bytes(b"published")
+    else:
+        (tmp_path / "project" / published).mkdir()
+    staging_path = create_staging_directory(docs_dir=tmp_path)
+    (staging_path / "1.0.0.zip").write_bytes(b"staged")
+
+    with pytest.raises(FileExistsError):
+        publish_version_archive(staged_path=staging_path / "1.0.0.zip", target_path=tmp_path / "project" / "1.0.0")
+
+    assert (staging_path / "1.0.0.zip").read_bytes() == b"staged"
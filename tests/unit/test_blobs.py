@@ -0,0 +1,57 @@
+"""Contains all tests for the blob store."""
+
+import errno
+import hashlib
+import io
+from pathlib import Path
+from unittest.mock import patch
+
+from vdoc.blobs import BlobStore
+
+
+def _blobs(docs_dir: Path) -> list[Path]:
+    return [path for path in (docs_dir / ".vdoc" / "blobs").rglob("*") if path.is_file() and path.parent.name != "tmp"]
+
+
+def test_blob_store_keeps_each_content_once(tmp_path: Path) -> None:
+    store = BlobStore(docs_dir=tmp_path)
+    for version in ("1.0.0", "1.1.0"):
+        (tmp_path / version).mkdir()
+        store.place(source=io.BytesIO(b"body { color: black }"), target=tmp_path / version / "theme.css")
+        store.place(source=io.BytesIO(f"<html>{version}</html>".encode()), target=tmp_path / version / "index.html")
+
+    assert (tmp_path / "1.0.0" / "theme.css").read_bytes() == b"body { color: black }"
+    assert (tmp_path / "1.1.0" / "index.html").read_bytes() == b"<html>1.1.0</html>"
+    assert (tmp_path / "1.0.0" / "theme.css").samefile(tmp_path / "1.1.0" / "theme.css")
+    assert not (tmp_path / "1.0.0" / "index.html").samefile(tmp_path / "1.1.0" / "index.html")
+    assert len(_blobs(docs_dir=tmp_path)) == 3
+
+
+def test_blob_store_hashes_large_files_while_writing_them(tmp_path: Path) -> None:
+    store = BlobStore(docs_dir=tmp_path)
+    content = bytes(range(256)) * 64
+
+    with patch("vdoc.blobs._IN_MEMORY_LIMIT", 1024), patch("vdoc.blobs._CHUNK_SIZE", 1000):
+        store.place(source=io.BytesIO(content), target=tmp_path / "first.bin")
+        store.place(source=io.BytesIO(content), target=tmp_path / "second.bin")
+
+    assert (tmp_path / "first.bin").read_bytes() == content
+    assert (tmp_path / "first.bin").samefile(tmp_path / "second.bin")
+    assert len(_blobs(docs_dir=tmp_path)) == 1
+    assert not any((tmp_path / ".vdoc" / "blobs" / "tmp").iterdir())
+
+
+def test_blob_store_copies_what_it_cannot_link(tmp_path: Path) -> None:
+    store = BlobStore(docs_dir=tmp_path)
+
+    with (
+        patch.object(Path, "hardlink_to", side_effect=OSError(errno.EMLINK, "Too many links")),
+        patch("vdoc.blobs.os.fsync") as fsync_mock,
+    ):
+        digest = store.place(source=io.BytesIO(b"content"), target=tmp_path / "file.txt")
+
+    assert digest == hashlib.sha256(b"content").hexdigest()
+    assert (tmp_path / "file.txt").read_bytes() == b"content"
+    # The blob, and the copy, which publishing the version does not write to disk again
+    assert fsync_mock.call_count == 2
+    assert not (tmp_path / "file.txt").samefile(_blobs(docs_dir=tmp_path)[0])
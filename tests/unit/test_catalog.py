@@ -0,0 +1,262 @@
+"""Contains all tests for the catalog of what is published."""
+
+import sqlite3
+from collections.abc import Callable, Iterator
+from contextlib import ExitStack, closing
+from pathlib import Path
+from typing import Any
+from unittest.mock import Mock
+
+import pytest
+from packaging.specifiers import SpecifierSet
+from packaging.version import Version
+
+from vdoc.catalog import Catalog, PublishedVersions
+from vdoc.constants import CATALOG_FILE_NAME, STATE_DIR_NAME
+
+
+@pytest.fixture(name="open_catalog")
+def open_catalog_fixture() -> Iterator[Callable[[Path], Catalog]]:
+    """Opens catalogs the way each worker process does, and closes them once the test is over."""
+    with ExitStack() as stack:
+        yield lambda docs_dir: stack.enter_context(Catalog(docs_dir=docs_dir))
+
+
+def test_published_versions_skip_what_is_not_a_version() -> None:
+    published = PublishedVersions.from_directories(["2.0.0", "_static", "1.0.0"])
+
+    assert published.ordered == ((Version("1.0.0"), "1.0.0"), (Version("2.0.0"), "2.0.0"))
+    assert published.public_forms == {"1.0.0", "2.0.0"}
+
+
+def test_published_versions_resolve_their_aliases() -> None:
+    published = PublishedVersions.from_directories(["1.0.0", "1.1.0", "1.1.1", "2.0.0", "2.1.0rc1", "3.0.0.dev1"])
+
+    assert published.aliases == {
+        "latest": "3.0.0.dev1",
+        "stable": "2.0.0",
+        "1.x": "1.1.1",
+        "1.0.x": "1.0.0",
+        "1.1.x": "1.1.1",
+        "2.x": "2.0.0",
+        "2.0.x": "2.0.0",
+    }
+    assert PublishedVersions.from_directories([]).aliases == {}
+
+
+def test_published_versions_matching_a_specifier_set() -> None:
+    published = PublishedVersions.from_directories(["0.9", "1.0.0", "1.5.0", "2.0.0", "2.0.0+local", "2.1.0", "3.0.0"])
+
+    assert published.matching(SpecifierSet(">=1,<2")) == ("1.0.0", "1.5.0")
+    assert published.matching(SpecifierSet(">1.0.0,<=2.0.0")) == ("1.5.0", "2.0.0", "2.0.0+local")
+    assert published.matching(SpecifierSet("~=2.0")) == ("2.0.0", "2.0.0+local", "2.1.0")
+    assert published.matching(SpecifierSet("!=2.0.0,>=2")) == ("2.1.0", "3.0.0")
+    assert published.matching(SpecifierSet("")) == published.directories
+    assert published.matching(SpecifierSet(">=4")) == ()
+
+
+def test_catalog_lists_projects_and_versions(dummy_projects_dir: Path, open_catalog: Callable[[Path], Catalog]) -> None:
+    catalog = open_catalog(dummy_projects_dir)
+
+    assert list(catalog.projects) == ["dummy-project-01", "dummy-project-02", "dummy-project-03"]
+    versions = catalog.versions("dummy-project-03")
+    assert versions is not None
+    assert versions.directories == ("1.0.0", "1.3.0", "2.0.0-beta")
+    assert catalog.versions(".dummy_hidden") is None
+
+
+def test_catalog_is_persisted(dummy_projects_dir: Path, open_catalog: Callable[[Path], Catalog]) -> None:
+    open_catalog(dummy_projects_dir).refresh()
+
+    with closing(sqlite3.connect(dummy_projects_dir / STATE_DIR_NAME / CATALOG_FILE_NAME)) as connection, connection:
+        rows = connection.execute("SELECT directory FROM versions WHERE project = 'dummy-project-02'").fetchall()
+
+    assert sorted(directory for (directory,) in rows) == ["1.0", "3.6", "5.9.9", "6.0"]
+
+
+def test_catalog_rebuild_only_reads_the_projects_that_changed(
+    dummy_projects_dir: Path, open_catalog: Callable[[Path], Catalog]
+) -> None:
+    """A restart has to look at every project directory, but only walk the ones that changed."""
+    open_catalog(dummy_projects_dir).refresh()
+    # Dropped from what the database recorded, without touching the directory it was read from
+    with closing(sqlite3.connect(dummy_projects_dir / STATE_DIR_NAME / CATALOG_FILE_NAME)) as connection, connection:
+        connection.execute("DELETE FROM versions WHERE project = 'dummy-project-01' AND directory = '0.0.1'")
+    (dummy_projects_dir / "dummy-project-02" / "7.0").mkdir()
+
+    restarted = open_catalog(dummy_projects_dir)
+
+    unchanged, changed = restarted.versions("dummy-project-01"), restarted.versions("dummy-project-02")
+    assert unchanged is not None
+    assert "0.0.1" not in unchanged.directories, "An unchanged project is taken from the database"
+    assert changed is not None
+    assert changed.directories[-1] == "7.0"
+
+
+def test_catalog_notices_a_removed_project(dummy_projects_dir: Path, open_catalog: Callable[[Path], Catalog]) -> None:
+    catalog = open_catalog(dummy_projects_dir)
+    generation = catalog.generation
+
+    for version_dir in (dummy_projects_dir / "dummy-project-03").iterdir():
+        (version_dir / "index.html").unlink()
+        version_dir.rmdir()
+    (dummy_projects_dir / "dummy-project-03").rmdir()
+    catalog.refresh()
+
+    assert "dummy-project-03" not in catalog.projects
+    assert catalog.generation > generation
+    assert "dummy-project-03" not in open_catalog(dummy_projects_dir).projects
+
+
+def test_catalog_records_a_published_version(dummy_projects_dir: Path, open_catalog: Callable[[Path], Catalog]) -> None:
+    catalog = open_catalog(dummy_projects_dir)
+    generation = catalog.generation
+
+    (dummy_projects_dir / "new-project" / "1.0.0").mkdir(parents=True)
+    catalog.record_version(name="new-project", version="1.0.0")
+
+    assert catalog.generation == generation + 1
+    versions = catalog.versions("new-project")
+    assert versions is not None
+    assert versions.directories == ("1.0.0",)
+    assert "new-project" in open_catalog(dummy_projects_dir).projects
+
+
+def test_published_versions_kept_as_archives() -> None:
+    published = PublishedVersions.from_directories(["1.0.0.zip", "2.0.0", "2.0.0.zip", "notes.zip"])
+
+    assert published.directories == ("1.0.0", "2.0.0")
+    assert published.archives == {"1.0.0"}
+    assert published.entries == ("1.0.0.zip", "2.0.0")
+
+
+def test_catalog_records_a_version_published_as_an_archive(
+    dummy_projects_dir: Path, open_catalog: Callable[[Path], Catalog]
+) -> None:
+    catalog = open_catalog(dummy_projects_dir)
+
+    (dummy_projects_dir / "dummy-project-01" / "9.0.0.zip").write_bytes(b"archive")
+    catalog.record_version(name="dummy-project-01", version="9.0.0", archived=True)
+
+    for read in (catalog, open_catalog(dummy_projects_dir)):
+        versions = read.versions("dummy-project-01")
+        assert versions is not None
+        assert versions.directories[-1] == "9.0.0"
+        assert versions.archives == {"9.0.0"}
+
+
+def test_catalog_without_a_docs_directory(tmp_path: Path, open_catalog: Callable[[Path], Catalog]) -> None:
+    """Nothing is published yet, and nothing is written for it either."""
+    catalog = open_catalog(tmp_path / "never-created")
+
+    assert catalog.projects == {}
+    assert not (tmp_path / "never-created").exists()
+
+
+def test_catalog_survives_an_unreadable_database(
+    dummy_projects_dir: Path, open_catalog: Callable[[Path], Catalog]
+) -> None:
+    (dummy_projects_dir / STATE_DIR_NAME).mkdir()
+    (dummy_projects_dir / STATE_DIR_NAME / CATALOG_FILE_NAME).write_text("not a database")
+
+    assert list(open_catalog(dummy_projects_dir).projects) == [
+        "dummy-project-01",
+        "dummy-project-02",
+        "dummy-project-03",
+    ]
+
+
+def test_catalog_sees_what_another_process_published(
+    dummy_projects_dir: Path, open_catalog: Callable[[Path], Catalog]
+) -> None:
+    """Each worker process has a catalog of its own, so one has to learn of what another published."""
+    worker, other_worker = open_catalog(dummy_projects_dir), open_catalog(dummy_projects_dir)
+    assert "new-project" not in worker.projects
+    generation = worker.generation
+
+    (dummy_projects_dir / "new-project" / "1.0.0").mkdir(parents=True)
+    other_worker.record_version(name="new-project", version="1.0.0")
+
+    assert "new-project" in worker.projects
+    assert worker.generation == other_worker.generation > generation
+
+
+def test_catalog_keeps_what_another_process_published_when_writing(
+    dummy_projects_dir: Path, open_catalog: Callable[[Path], Catalog]
+) -> None:
+    """A write made from an outdated snapshot must not drop what it did not know about."""
+    worker, other_worker = open_catalog(dummy_projects_dir), open_catalog(dummy_projects_dir)
+    _ = worker.projects, other_worker.projects
+
+    (dummy_projects_dir / "project-a" / "1.0.0").mkdir(parents=True)
+    (dummy_projects_dir / "project-b" / "1.0.0").mkdir(parents=True)
+    worker.record_version(name="project-a", version="1.0.0")
+    other_worker.record_version(name="project-b", version="1.0.0")
+
+    assert {"project-a", "project-b"} <= other_worker.projects.keys()
+    assert {"project-a", "project-b"} <= worker.projects.keys()
+    assert worker.generation == other_worker.generation
+
+
+def test_catalog_tells_which_generation_a_project_changed_at(
+    dummy_projects_dir: Path, open_catalog: Callable[[Path], Catalog]
+) -> None:
+    """What is derived from one project must not change when another one does, in any process."""
+    worker, other_worker = open_catalog(dummy_projects_dir), open_catalog(dummy_projects_dir)
+    untouched = worker.versions("dummy-project-02")
+    assert untouched is not None
+
+    (dummy_projects_dir / "dummy-project-01" / "3.0.0").mkdir()
+    other_worker.record_version(name="dummy-project-01", version="3.0.0")
+
+    changed = worker.versions("dummy-project-01")
+    assert changed is not None
+    assert changed.generation == worker.generation > untouched.generation
+    assert worker.versions("dummy-project-02") == untouched
+    assert worker.versions("dummy-project-02").generation == untouched.generation  # type: ignore[union-attr]
+    assert open_catalog(dummy_projects_dir).versions("dummy-project-01") == changed
+
+
+def test_catalog_announces_only_what_it_committed(
+    dummy_projects_dir: Path, monkeypatch: pytest.MonkeyPatch, open_catalog: Callable[[Path], Catalog]
+) -> None:
+    """A generation announced but never committed would have every worker look for it in the database."""
+    worker, other_worker = open_catalog(dummy_projects_dir), open_catalog(dummy_projects_dir)
+    generation = worker.generation
+    connect = Catalog._connect
+
+    class _FailingCommit:
+        def __init__(self, connection: sqlite3.Connection) -> None:
+            self._connection = connection
+
+        def execute(self, sql: str, *args: Any) -> sqlite3.Cursor:
+            if sql == "COMMIT":
+                message = "disk I/O error"
+                raise sqlite3.OperationalError(message)
+            return self._connection.execute(sql, *args)
+
+        def __getattr__(self, name: str) -> Any:
+            return getattr(self._connection, name)
+
+    monkeypatch.setattr(Catalog, "_connect", lambda self: _FailingCommit(connect(self)))
+    (dummy_projects_dir / "new-project" / "1.0.0").mkdir(parents=True)
+    other_worker.record_version(name="new-project", version="1.0.0")
+    monkeypatch.undo()
+
+    opened = Mock(side_effect=lambda: connect(worker))
+    monkeypatch.setattr(worker, "_connect", opened)
+    assert worker.generation == generation
+    assert "new-project" not in worker.projects
+    opened.assert_not_called()
+
+
+def test_catalog_closes_what_it_keeps_open(dummy_projects_dir: Path) -> None:
+    with Catalog(docs_dir=dummy_projects_dir) as catalog:
+        assert "dummy-project-01" in catalog.projects
+        shared = catalog._shared
+        assert shared is not None
+
+    assert shared._map.closed
+    # Asked anything after, it opens what it needs again
+    assert "dummy-project-01" in catalog.projects
+    catalog.close()
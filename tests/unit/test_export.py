@@ -0,0 +1,78 @@
+"""Contains all tests for the writing of a static mirror."""
+
+import io
+import zipfile
+from pathlib import Path
+
+import pytest
+
+from vdoc.archives import repack_zip
+from vdoc.export import AliasStyle, export_version, write_alias
+
+
+def _write_version(path: Path) -> None:
+    (path / "api").mkdir(parents=True)
+    (path / "index.html").write_text("<p>index</p>")
+    (path / "api" / "module.html").write_text("<p>module</p>")
+    (path / "objects.inv").write_bytes(b"inventory")
+
+
+def test_export_version(tmp_path: Path) -> None:
+    _write_version(path=tmp_path / "docs" / "1.0.0")
+    target_path = tmp_path / "mirror" / "project" / "1.0.0"
+    target_path.mkdir(parents=True)
+    (target_path / "left-behind.html").write_text("<p>from an export that was interrupted</p>")
+
+    assert export_version(source_path=tmp_path / "docs" / "1.0.0", archive_path=None, target_path=target_path) == 3
+
+    assert sorted(path.relative_to(target_path).as_posix() for path in target_path.rglob("*")) == [
+        "api",
+        "api/module.html",
+        "index.html",
+        "objects.inv",
+    ]
+    assert not (target_path.parent / ".1.0.0.partial").exists()
+
+
+def test_export_version_kept_as_an_archive(tmp_path: Path) -> None:
+    upload = io.BytesIO()
+    with zipfile.ZipFile(file=upload, mode="w", compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("index.html", "<p>index</p>")
+        archive.writestr("_downloads/manual.pdf", bytes(range(256)) * 4)
+    repack_zip(source=upload, target_path=tmp_path / "1.0.0.zip", threads=1)
+    target_path = tmp_path / "mirror" / "project" / "1.0.0"
+
+    export_version(source_path=tmp_path / "1.0.0", archive_path=tmp_path / "1.0.0.zip", target_path=target_path)
+
+    assert (target_path / "index.html").read_text() == "<p>index</p>"
+    assert (target_path / "_downloads" / "manual.pdf").read_bytes() == bytes(range(256)) * 4
+
+
+def test_write_alias_as_a_link(tmp_path: Path) -> None:
+    for version in ("1.0.0", "2.0.0"):
+        _write_version(path=tmp_path / version)
+
+    write_alias(project_path=tmp_path, alias="latest", version="1.0.0", style=AliasStyle.SYMLINKS)
+    write_alias(project_path=tmp_path, alias="latest", version="2.0.0", style=AliasStyle.SYMLINKS)
+
+    assert (tmp_path / "latest").readlink() == Path("2.0.0")
+    assert (tmp_path / "latest" / "objects.inv").read_bytes() == b"inventory"
+
+
+@pytest.mark.parametrize("previous", ["1.0.0", None])
+def test_write_alias_as_redirect_pages(tmp_path: Path, previous: str | None) -> None:
+    for version in ("1.0.0", "2.0.0"):
+        _write_version(path=tmp_path / version)
+    (tmp_path / "2.0.0" / "api" / "a page.html").write_text("<p>a page</p>")
+    if previous is not None:
+        write_alias(project_path=tmp_path, alias="latest", version=previous, style=AliasStyle.SYMLINKS)
+
+    write_alias(project_path=tmp_path, alias="latest", version="2.0.0", style=AliasStyle.STUBS)
+
+    alias_path = tmp_path / "latest"
+    assert not alias_path.is_symlink()
+    assert 'content="0; url=../2.0.0/index.html"' in (alias_path / "index.html").read_text()
+    assert 'href="../../2.0.0/api/module.html"' in (alias_path / "api" / "module.html").read_text()
+    assert "url=../../2.0.0/api/a%20page.html" in (alias_path / "api" / "a page.html").read_text()
+    # Only pages can redirect
+    assert not (alias_path / "objects.inv").exists()
@@ -0,0 +1,43 @@
+"""Contains all tests for the cache of the files of the docs mount that are read most."""
+
+from vdoc.hot_files import HotFile, HotFileCache
+
+
+def _hot_file(size: int, generation: int = 1) -> HotFile:
+    return HotFile(body=b"x" * size, headers={"content-length": str(size)}, generation=generation)
+
+
+def test_hot_file_cache_drops_what_was_read_least_recently() -> None:
+    cache = HotFileCache(capacity=300)
+    for name in ("a", "b", "c"):
+        cache.put(key=name, hot_file=_hot_file(size=100))
+
+    assert cache.get(key="a", generation=1) is not None
+    cache.put(key="d", hot_file=_hot_file(size=100))
+
+    assert cache.get(key="b", generation=1) is None
+    assert all(cache.get(key=name, generation=1) is not None for name in ("a", "c", "d"))
+    statistics = cache.statistics()
+    assert (statistics.size, statistics.files, statistics.hits, statistics.misses) == (300, 3, 4, 1)
+
+
+def test_hot_file_cache_forgets_what_was_read_at_another_generation() -> None:
+    cache = HotFileCache(capacity=300)
+    cache.put(key="a", hot_file=_hot_file(size=100, generation=1))
+
+    assert cache.get(key="a", generation=2) is None
+    assert cache.get(key="a", generation=1) is None
+    assert cache.statistics().size == 0
+
+
+def test_hot_file_cache_keeps_nothing_larger_than_itself() -> None:
+    cache = HotFileCache(capacity=300)
+    cache.put(key="a", hot_file=_hot_file(size=100))
+    cache.put(key="a", hot_file=_hot_file(size=200))
+    cache.put(key="b", hot_file=_hot_file(size=301))
+
+    assert cache.get(key="b", generation=1) is None
+    hot_file = cache.get(key="a", generation=1)
+    assert hot_file is not None
+    assert len(hot_file.body) == 200
+    assert cache.statistics().size == 200
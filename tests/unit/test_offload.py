@@ -0,0 +1,35 @@
+"""Contains all tests for the offloading of documentation files to the reverse proxy."""
+
+from pathlib import Path
+
+import pytest
+
+from vdoc.offload import StaticOffloadT, offload_headers
+
+DOCS_DIR = Path("/srv/docs")
+
+
+@pytest.mark.parametrize(
+    ("mode", "location", "expected"),
+    [
+        ("off", "/_vdoc/docs/", None),
+        ("x-accel-redirect", "/_vdoc/docs/", {"X-Accel-Redirect": "/_vdoc/docs/project/1.0.0/api%20reference.html"}),
+        ("x-accel-redirect", "/internal", {"X-Accel-Redirect": "/internal/project/1.0.0/api%20reference.html"}),
+        ("x-sendfile", "/_vdoc/docs/", {"X-Sendfile": "/srv/docs/project/1.0.0/api reference.html"}),
+    ],
+)
+def test_offload_headers(mode: StaticOffloadT, location: str, expected: dict[str, str] | None) -> None:
+    path = DOCS_DIR / "project" / "1.0.0" / "api reference.html"
+    assert offload_headers(path=path, docs_dir=DOCS_DIR, mode=mode, location=location) == expected
+
+
+def test_offload_headers_name_the_file_by_its_bytes() -> None:
+    path = DOCS_DIR / "project" / "1.0.0" / "übersicht.html"
+
+    headers = offload_headers(path=path, docs_dir=DOCS_DIR, mode="x-sendfile", location="/_vdoc/docs/")
+
+    assert headers is not None
+    assert headers["X-Sendfile"].encode("latin-1") == b"/srv/docs/project/1.0.0/\xc3\xbcbersicht.html"
+    assert offload_headers(path=path, docs_dir=DOCS_DIR, mode="x-accel-redirect", location="/_vdoc/docs/") == {
+        "X-Accel-Redirect": "/_vdoc/docs/project/1.0.0/%C3%BCbersicht.html"
+    }
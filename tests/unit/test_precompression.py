@@ -0,0 +1,102 @@
+"""Contains all tests for the precompression of published versions."""
+
+import gzip
+import hashlib
+import random
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import brotli
+import pytest
+
+from vdoc.blobs import BlobStore
+from vdoc.precompression import precompress_version
+
+SEARCH_INDEX = b'Search.setIndex({"docnames": ["index", "guide"], "titles": ["Home", "Guide"]});' * 200
+
+
+def _write_version(path: Path) -> None:
+    (path / "_static").mkdir(parents=True)
+    (path / "searchindex.js").write_bytes(SEARCH_INDEX)
+    (path / "_static" / "theme.css").write_text("body { color: black }\n" * 100)
+    (path / "_static" / "logo.png").write_bytes(b"\x89PNG" + bytes(range(256)) * 16)
+    (path / "tiny.html").write_text("<p>")
+
+
+@pytest.mark.parametrize("threads", [1, 4])
+def test_precompress_version(tmp_path: Path, threads: int) -> None:
+    version_path = tmp_path / "project" / "1.0.0"
+    _write_version(path=version_path)
+
+    precompress_version(path=version_path, blobs=BlobStore(docs_dir=tmp_path), threads=threads)
+
+    assert brotli.decompress((version_path / "searchindex.js.br").read_bytes()) == SEARCH_INDEX
+    assert gzip.decompress((version_path / "searchindex.js.gz").read_bytes()) == SEARCH_INDEX
+    assert (version_path / "searchindex.js.br").stat().st_size * 5 < len(SEARCH_INDEX)
+    assert (version_path / "_static" / "theme.css.br").is_file()
+    assert (version_path / "_static" / "theme.css.gz").is_file()
+    # Not text, and not worth it
+    assert not (version_path / "_static" / "logo.png.br").exists()
+    assert not (version_path / "tiny.html.br").exists()
+    assert not (version_path / "tiny.html.gz").exists()
+    # Nor kept in the store, where nothing would ever link to them
+    assert not list((tmp_path / ".vdoc" / "blobs").rglob(f"{hashlib.sha256(b'<p>').hexdigest()}.*"))
+
+
+def test_precompress_version_compresses_each_content_once(tmp_path: Path) -> None:
+    blobs = BlobStore(docs_dir=tmp_path)
+    for version in ("1.0.0", "1.1.0"):
+        _write_version(path=tmp_path / "project" / version)
+
+    precompress_version(path=tmp_path / "project" / "1.0.0", blobs=blobs, threads=1)
+    encoder = MagicMock()
+    with patch.dict("vdoc.precompression._ENCODERS", {"br": encoder, "gzip": encoder}):
+        precompress_version(path=tmp_path / "project" / "1.1.0", blobs=blobs, threads=1)
+
+    encoder.assert_not_called()
+
+    first, second = tmp_path / "project" / "1.0.0", tmp_path / "project" / "1.1.0"
+    assert (first / "searchindex.js.br").samefile(second / "searchindex.js.br")
+    assert (first / "_static" / "theme.css.gz").samefile(second / "_static" / "theme.css.gz")
+
+
+def test_precompress_version_reads_nothing_it_knows_already(tmp_path: Path) -> None:
+    blobs = BlobStore(docs_dir=tmp_path)
+    for version in ("1.0.0", "1.1.0"):
+        _write_version(path=tmp_path / "project" / version)
+    precompress_version(path=tmp_path / "project" / "1.0.0", blobs=blobs, threads=1)
+    second = tmp_path / "project" / "1.1.0"
+    digests = {
+        path.relative_to(second).as_posix(): hashlib.sha256(path.read_bytes()).hexdigest()
+        for path in second.rglob("*")
+        if path.is_file()
+    }
+
+    with patch.object(Path, "read_bytes", side_effect=AssertionError("read again")):
+        precompressed = precompress_version(path=second, blobs=blobs, threads=1, digests=digests)
+
+    assert precompressed.keys() == {"searchindex.js", "_static/theme.css"}
+    assert precompressed["searchindex.js"][".br"] == (second / "searchindex.js.br").stat().st_size
+
+
+def test_precompress_version_stores_no_copy_it_does_not_keep(tmp_path: Path) -> None:
+    version_path = tmp_path / "project" / "1.0.0"
+    version_path.mkdir(parents=True)
+    # Large enough to be tried, and random enough not to be worth it
+    noise = random.Random(0).randbytes(4096)
+    (version_path / "noise.txt").write_bytes(noise)
+
+    assert precompress_version(path=version_path, blobs=BlobStore(docs_dir=tmp_path), threads=1) == {}
+
+    assert not list((tmp_path / ".vdoc" / "blobs").rglob(f"{hashlib.sha256(noise).hexdigest()}.*"))
+
+
+def test_precompress_version_keeps_what_the_upload_brought(tmp_path: Path) -> None:
+    version_path = tmp_path / "project" / "1.0.0"
+    _write_version(path=version_path)
+    (version_path / "searchindex.js.gz").write_bytes(b"shipped by the build")
+
+    precompress_version(path=version_path, blobs=BlobStore(docs_dir=tmp_path), threads=1)
+
+    assert (version_path / "searchindex.js.gz").read_bytes() == b"shipped by the build"
+    assert (version_path / "searchindex.js.br").is_file()
@@ -0,0 +1,93 @@
+"""Contains all tests for the publish queue."""
+
+import threading
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from vdoc.exceptions import ProjectVersionAlreadyExists, PublishQueueFull
+from vdoc.models.publish_job import PublishJob
+from vdoc.publish_queue import PublishQueue
+
+
+def _wait(queue: PublishQueue, job: PublishJob) -> PublishJob:
+    deadline = time.monotonic() + 10
+    while not (current := queue.get(job_id=job.id)) or not current.finished:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    return current
+
+
+def test_publish_queue_runs_jobs(tmp_path: Path) -> None:
+    queue = PublishQueue(docs_dir=tmp_path, concurrency=1, queue_depth=1)
+
+    job = queue.submit(project="project", version="1.0.0", publish=lambda: "Published")
+
+    assert job.status == "queued"
+    finished = _wait(queue=queue, job=job)
+    assert (finished.status, finished.status_code, finished.message) == ("succeeded", 201, "Published")
+
+
+def test_publish_queue_reports_failures(tmp_path: Path) -> None:
+    def refuse() -> str:
+        raise ProjectVersionAlreadyExists(name="project", version="1.0.0")
+
+    def break_down() -> str:
+        raise RuntimeError
+
+    queue = PublishQueue(docs_dir=tmp_path, concurrency=2, queue_depth=0)
+    refused = _wait(queue=queue, job=queue.submit(project="project", version="1.0.0", publish=refuse))
+    broken = _wait(queue=queue, job=queue.submit(project="project", version="1.0.0", publish=break_down))
+
+    assert (refused.status, refused.status_code) == ("failed", 403)
+    assert refused.message == "Version '1.0.0' of project 'project' already exists."
+    assert (broken.status, broken.status_code) == ("failed", 500)
+
+
+def test_publish_queue_is_bounded(tmp_path: Path) -> None:
+    release = threading.Event()
+    queue = PublishQueue(docs_dir=tmp_path, concurrency=1, queue_depth=1)
+
+    jobs = [queue.submit(project="project", version=version, publish=lambda: str(release.wait())) for version in "12"]
+    with pytest.raises(PublishQueueFull):
+        queue.submit(project="project", version="3", publish=lambda: "")
+
+    release.set()
+    for job in jobs:
+        assert _wait(queue=queue, job=job).status == "succeeded"
+    assert _wait(queue=queue, job=queue.submit(project="project", version="3", publish=lambda: "")).finished
+
+
+def test_publish_queue_gives_back_the_place_of_a_job_it_could_not_queue(tmp_path: Path) -> None:
+    queue = PublishQueue(docs_dir=tmp_path, concurrency=1, queue_depth=0)
+
+    with patch.object(queue, "_record", side_effect=RuntimeError("Cannot record")), pytest.raises(RuntimeError):
+        queue.submit(project="project", version="1", publish=lambda: "")
+    with (
+        patch.object(queue._executor, "submit", side_effect=RuntimeError("Shut down")),
+        pytest.raises(RuntimeError),
+    ):
+        queue.submit(project="project", version="2", publish=lambda: "")
+
+    assert _wait(queue=queue, job=queue.submit(project="project", version="3", publish=lambda: "")).finished
+
+
+def test_publish_queue_jobs_are_known_to_every_process(tmp_path: Path) -> None:
+    """With several worker processes, the job may well be asked about in another one."""
+    accepting = PublishQueue(docs_dir=tmp_path, concurrency=1, queue_depth=0)
+    other = PublishQueue(docs_dir=tmp_path, concurrency=1, queue_depth=0)
+
+    job = _wait(queue=accepting, job=accepting.submit(project="project", version="1.0.0", publish=lambda: "Published"))
+
+    assert other.get(job_id=job.id) == job
+    assert other.get(job_id="unknown") is None
+
+
+def test_publish_queue_forgets_finished_jobs(tmp_path: Path) -> None:
+    queue = PublishQueue(docs_dir=tmp_path, concurrency=1, queue_depth=0)
+    job = _wait(queue=queue, job=queue.submit(project="project", version="1.0.0", publish=lambda: "Published"))
+
+    with patch("vdoc.publish_queue.time.time", return_value=time.time() + 2 * 24 * 60 * 60):
+        assert PublishQueue(docs_dir=tmp_path, concurrency=1, queue_depth=0).get(job_id=job.id) is None
@@ -0,0 +1,127 @@
+"""Contains all tests for the manifests of published versions."""
+
+import hashlib
+import io
+import zipfile
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from vdoc.archives import repack_zip
+from vdoc.published_manifests import (
+    build_archive_manifest,
+    build_directory_manifest,
+    get_published_manifest,
+    get_published_summary,
+    published_file_etag,
+    published_manifest_path,
+    published_summary_path,
+    read_published_manifest,
+    read_published_summary,
+    write_published_manifest,
+)
+
+INDEX = b"<html><body>index</body></html>"
+INVENTORY = b"# Sphinx inventory version 2"
+
+
+@pytest.mark.parametrize("threads", [1, 4])
+def test_build_directory_manifest(tmp_path: Path, threads: int) -> None:
+    (tmp_path / "_static").mkdir()
+    (tmp_path / "index.html").write_bytes(INDEX)
+    (tmp_path / "objects.inv").write_bytes(INVENTORY)
+    (tmp_path / "_static" / "logo.png").write_bytes(bytes(range(256)))
+    (tmp_path / "index.html.br").write_bytes(b"compressed")
+    # Delivered by the upload, and not a copy vdoc placed
+    (tmp_path / "objects.inv.gz").write_bytes(b"uploaded")
+
+    manifest = build_directory_manifest(path=tmp_path, threads=threads, precompressed={"index.html": {".br": 10}})
+
+    assert list(manifest.files) == ["_static/logo.png", "index.html", "objects.inv", "objects.inv.gz"]
+    assert manifest.files["index.html"].precompressed == {".br": 10}
+    assert manifest.files["objects.inv"].precompressed == {}
+    assert (manifest.file_count, manifest.total_size) == (4, len(INDEX) + len(INVENTORY) + 256 + len(b"uploaded"))
+    assert manifest.files["index.html"].sha256 == hashlib.sha256(INDEX).hexdigest()
+    assert manifest.files["index.html"].media_type == "text/html"
+    assert manifest.files["index.html"].mtime == (tmp_path / "index.html").stat().st_mtime
+    assert manifest.files["_static/logo.png"].media_type == "image/png"
+    assert manifest.files["objects.inv"].media_type == "application/octet-stream"
+    assert manifest.inventories == ["objects.inv"]
+
+
+def test_build_directory_manifest_hashes_nothing_it_knows_already(tmp_path: Path) -> None:
+    (tmp_path / "index.html").write_bytes(INDEX)
+    (tmp_path / "objects.inv").write_bytes(INVENTORY)
+    digests = {"index.html": hashlib.sha256(INDEX).hexdigest()}
+
+    with patch("vdoc.published_manifests.hashlib.file_digest", wraps=hashlib.file_digest) as file_digest_mock:
+        manifest = build_directory_manifest(path=tmp_path, threads=1, precompressed={}, digests=digests)
+
+    # Only the file extracting it did not hash
+    file_digest_mock.assert_called_once()
+    assert manifest.files["index.html"].sha256 == digests["index.html"]
+    assert manifest.files["index.html"].size == len(INDEX)
+    assert manifest.files["objects.inv"].sha256 == hashlib.sha256(INVENTORY).hexdigest()
+
+
+def test_build_archive_manifest(tmp_path: Path) -> None:
+    upload = io.BytesIO()
+    with zipfile.ZipFile(file=upload, mode="w", compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("index.html", INDEX * 100)
+        archive.writestr("sitemap.xml", b"<urlset/>")
+    precompressed = repack_zip(source=upload, target_path=tmp_path / "1.0.0.zip", threads=1)
+
+    manifest = build_archive_manifest(path=tmp_path / "1.0.0.zip", precompressed=precompressed)
+
+    # The compressed copies are members of their own, listed with the member they are copies of
+    assert list(manifest.files) == ["index.html", "sitemap.xml"]
+    assert set(manifest.files["index.html"].precompressed) == {".br", ".gz"}
+    assert (manifest.file_count, manifest.total_size) == (2, len(INDEX * 100) + len(b"<urlset/>"))
+    assert manifest.files["index.html"].sha256 == hashlib.sha256(INDEX * 100).hexdigest()
+    assert manifest.inventories == ["sitemap.xml"]
+
+
+def test_published_manifest_written_and_read(tmp_path: Path) -> None:
+    (tmp_path / "project" / "1.0.0").mkdir(parents=True)
+    (tmp_path / "project" / "1.0.0" / "index.html").write_bytes(INDEX)
+    manifest = build_directory_manifest(path=tmp_path / "project" / "1.0.0", threads=1, precompressed={})
+
+    assert read_published_manifest(docs_dir=tmp_path, name="project", version="1.0.0") is None
+    write_published_manifest(docs_dir=tmp_path, name="project", version="1.0.0", manifest=manifest)
+
+    assert read_published_manifest(docs_dir=tmp_path, name="project", version="1.0.0") == manifest
+    assert read_published_summary(docs_dir=tmp_path, name="project", version="1.0.0") == manifest.summary()
+    digest = hashlib.sha256(INDEX).hexdigest()
+    assert published_file_etag(file=manifest.files["index.html"]) == f'"{digest[:32]}"'
+    assert published_file_etag(file=manifest.files["index.html"], coding="br") == f'"{digest[:32]}-br"'
+    assert [path.name for path in published_manifest_path(tmp_path, "project", "1.0.0").parent.iterdir()] == [
+        "1.0.0.json"
+    ]
+
+
+def test_published_manifest_that_cannot_be_read(tmp_path: Path, caplog: pytest.LogCaptureFixture) -> None:
+    manifest_path = published_manifest_path(docs_dir=tmp_path, name="project", version="1.0.0")
+    manifest_path.parent.mkdir(parents=True)
+    manifest_path.write_text('{"files": "truncated')
+
+    assert read_published_manifest(docs_dir=tmp_path, name="project", version="1.0.0") is None
+    assert "cannot be read" in caplog.text
+
+
+def test_published_manifest_read_once_per_generation(tmp_path: Path) -> None:
+    """What is served and listed reads a version once, until its project changes."""
+    (tmp_path / "project" / "1.0.0").mkdir(parents=True)
+    (tmp_path / "project" / "1.0.0" / "index.html").write_bytes(INDEX)
+    manifest = build_directory_manifest(path=tmp_path / "project" / "1.0.0", threads=1, precompressed={})
+    write_published_manifest(docs_dir=tmp_path, name="project", version="1.0.0", manifest=manifest)
+
+    assert get_published_manifest(docs_dir=tmp_path, name="project", version="1.0.0", generation=1) == manifest
+    assert get_published_summary(docs_dir=tmp_path, name="project", version="1.0.0", generation=1) is not None
+    published_manifest_path(docs_dir=tmp_path, name="project", version="1.0.0").unlink()
+    published_summary_path(docs_dir=tmp_path, name="project", version="1.0.0").unlink()
+
+    assert get_published_manifest(docs_dir=tmp_path, name="project", version="1.0.0", generation=1) == manifest
+    assert get_published_summary(docs_dir=tmp_path, name="project", version="1.0.0", generation=1) is not None
+    assert get_published_manifest(docs_dir=tmp_path, name="project", version="1.0.0", generation=2) is None
+    assert get_published_summary(docs_dir=tmp_path, name="project", version="1.0.0", generation=2) is None
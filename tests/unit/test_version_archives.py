@@ -0,0 +1,53 @@
+"""Contains all tests for the versions kept as archives."""
+
+import io
+import os
+import zipfile
+from pathlib import Path
+
+from vdoc.archives import repack_zip
+from vdoc.version_archives import get_version_archive
+
+
+def _read(path: Path, offset: int, size: int) -> bytes:
+    with path.open("rb") as file:
+        return os.pread(file.fileno(), size, offset)
+
+
+def test_version_archive_index(tmp_path: Path) -> None:
+    members = {"index.html": b"<p>index</p>", "api/module.html": b"<p>module</p>", "api/deep/page.html": b"<p>"}
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(file=buffer, mode="w", compression=zipfile.ZIP_DEFLATED) as upload:
+        for name, content in members.items():
+            upload.writestr(name, content)
+    repack_zip(source=buffer, target_path=tmp_path / "1.0.0.zip", threads=1)
+
+    archive = get_version_archive(path=tmp_path / "1.0.0.zip")
+
+    assert set(archive.members) == set(members)
+    for name, content in members.items():
+        member = archive.members[name]
+        assert _read(path=archive.path, offset=member.offset, size=member.size) == content
+    assert archive.is_directory(name="api")
+    assert archive.is_directory(name="api/deep")
+    assert not archive.is_directory(name="index.html")
+    assert get_version_archive(path=tmp_path / "1.0.0.zip") is archive
+
+
+def test_version_archive_skips_compressed_members(tmp_path: Path) -> None:
+    with zipfile.ZipFile(file=tmp_path / "1.0.0.zip", mode="w") as archive:
+        archive.writestr("stored.html", b"stored", compress_type=zipfile.ZIP_STORED)
+        archive.writestr("deflated.html", b"deflated" * 100, compress_type=zipfile.ZIP_DEFLATED)
+
+    assert set(get_version_archive(path=tmp_path / "1.0.0.zip").members) == {"stored.html"}
+
+
+def test_version_archive_replaced_by_hand_is_read_again(tmp_path: Path) -> None:
+    for content in (b"first", b"second, and longer"):
+        with zipfile.ZipFile(file=tmp_path / "1.0.0.zip.tmp", mode="w") as archive:
+            archive.writestr("index.html", content)
+        (tmp_path / "1.0.0.zip.tmp").replace(tmp_path / "1.0.0.zip")
+
+        member = get_version_archive(path=tmp_path / "1.0.0.zip").members["index.html"]
+
+        assert _read(path=tmp_path / "1.0.0.zip", offset=member.offset, size=member.size) == content
@@ -0,0 +1,88 @@
+"""Contains all tests for the watchers that keep the catalog current."""
+
+import sys
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+import pytest
+
+from vdoc.catalog import Catalog
+from vdoc.watcher import InotifyWatcher, PollingWatcher, Watcher, start_watcher
+
+
+def _eventually(condition: Callable[[], bool], timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return condition()
+
+
+def _latest(catalog: Catalog, name: str) -> str | None:
+    versions = catalog.versions(name)
+    return versions.directories[-1] if versions and versions.directories else None
+
+
+@pytest.fixture(name="watcher_factory", params=["polling", "inotify"])
+def watcher_factory_fixture(request: pytest.FixtureRequest) -> Callable[[Catalog], Watcher]:
+    if request.param == "inotify":
+        if not sys.platform.startswith("linux"):
+            pytest.skip("inotify is Linux only")
+        return InotifyWatcher
+    return lambda catalog: PollingWatcher(catalog=catalog, interval=0.05)
+
+
+def test_watcher_sees_a_version_added(dummy_projects_dir: Path, watcher_factory: Callable[[Catalog], Watcher]) -> None:
+    with Catalog(docs_dir=dummy_projects_dir) as catalog:
+        watcher = watcher_factory(catalog)
+        watcher.start()
+        try:
+            (dummy_projects_dir / "dummy-project-01" / "3.0.0").mkdir()
+
+            assert _eventually(lambda: _latest(catalog, "dummy-project-01") == "3.0.0")
+        finally:
+            watcher.stop()
+
+
+def test_watcher_sees_a_project_come_and_go(
+    dummy_projects_dir: Path, watcher_factory: Callable[[Catalog], Watcher]
+) -> None:
+    with Catalog(docs_dir=dummy_projects_dir) as catalog:
+        watcher = watcher_factory(catalog)
+        watcher.start()
+        try:
+            (dummy_projects_dir / "new-project").mkdir()
+            assert _eventually(lambda: "new-project" in catalog.projects)
+
+            # A version of the new project, which the watcher has to have started watching by now
+            (dummy_projects_dir / "new-project" / "1.0.0").mkdir()
+            assert _eventually(lambda: _latest(catalog, "new-project") == "1.0.0")
+
+            (dummy_projects_dir / "new-project" / "1.0.0").rmdir()
+            (dummy_projects_dir / "new-project").rmdir()
+            assert _eventually(lambda: "new-project" not in catalog.projects)
+        finally:
+            watcher.stop()
+
+
+def test_start_watcher_off(dummy_projects_dir: Path) -> None:
+    with Catalog(docs_dir=dummy_projects_dir) as catalog:
+        assert start_watcher(catalog=catalog, mode="off", interval=1) is None
+
+
+def test_start_watcher_falls_back_to_polling(tmp_path: Path) -> None:
+    """A docs directory inotify cannot watch, because it does not exist yet, is still watched."""
+    with Catalog(docs_dir=tmp_path / "not-yet") as catalog:
+        watcher = start_watcher(catalog=catalog, mode="auto", interval=1)
+
+        assert isinstance(watcher, PollingWatcher)
+        watcher.stop()
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inotify is Linux only")
+def test_start_watcher_inotify_does_not_fall_back(tmp_path: Path) -> None:
+    """Asked for by name, so not getting it is an error rather than a quiet substitute."""
+    with Catalog(docs_dir=tmp_path / "not-yet") as catalog, pytest.raises(OSError):  # noqa: PT011
+        start_watcher(catalog=catalog, mode="inotify", interval=1)
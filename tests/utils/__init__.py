@@ -1,12 +1,15 @@
 """This module contains utility functions for tests."""
 
 import sys
+import time
 from collections.abc import Generator
 from contextlib import contextmanager
 from pathlib import Path
 from subprocess import Popen
+from typing import Any
 
 import requests
+from fastapi.testclient import TestClient
 from httpx import Response
 from tenacity import retry, stop_after_attempt, wait_fixed
 
@@ -22,6 +25,25 @@ def assert_api_response(response: Response, status_code: int = 200, message: str
             assert response.json()["message"] == message
 
 
+def wait_for_publish_job(api: TestClient, response: Response, timeout: float = 10) -> dict[str, Any]:
+    """Waits for the job an upload was answered with to finish.
+
+    Args:
+        api: The client the upload was sent with.
+        response: The response to the upload.
+        timeout: How long to wait at most, in seconds.
+
+    Returns:
+        The finished job.
+    """
+    assert response.status_code == 202, response.text
+    deadline = time.monotonic() + timeout
+    while (job := api.get(response.headers["location"]).json())["status"] in {"queued", "running"}:
+        assert time.monotonic() < deadline, f"Publish job {job['id']} did not finish in time"
+        time.sleep(0.01)
+    return job
+
+
 @contextmanager
 def ensure_project_dir_not_created(base_dir: Path, name: str, version: str) -> Generator[None, None, None]:
     project_dir = base_dir / name / version